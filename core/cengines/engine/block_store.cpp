@@ -0,0 +1,138 @@
+#include "block_store.hpp"
+
+#include <algorithm>
+#include <stdexcept>
+
+#ifdef LX_ENGINE_ZLIB
+#include <zlib.h>
+#endif
+
+namespace lx::engine {
+
+bool BlockStore::available() {
+#ifdef LX_ENGINE_ZLIB
+    return true;
+#else
+    return false;
+#endif
+}
+
+bool BlockStore::build(const char* data, size_t size, const std::atomic<bool>& cancel) {
+    blocks_.clear();
+    compressed_bytes_ = 0;
+#ifdef LX_ENGINE_ZLIB
+    std::vector<Block> blocks;
+    blocks.reserve((size + kBlockBytes - 1) / kBlockBytes);
+    size_t compressed = 0;
+    for (size_t start = 0; start < size; start += kBlockBytes) {
+        if (cancel.load(std::memory_order_relaxed)) {
+            return false;
+        }
+        const size_t length = std::min(kBlockBytes, size - start);
+        Block block;
+        block.raw_size = static_cast<uint32_t>(length);
+        uLongf bound = compressBound(static_cast<uLong>(length));
+        block.bytes.resize(bound);
+        const int status = compress2(
+            reinterpret_cast<Bytef*>(&block.bytes[0]), &bound,
+            reinterpret_cast<const Bytef*>(data + start), static_cast<uLong>(length), Z_BEST_SPEED);
+        if (status != Z_OK || bound >= length) {
+            block.bytes.assign(data + start, length);
+            block.stored = true;
+        } else {
+            block.bytes.resize(bound);
+            block.bytes.shrink_to_fit();
+        }
+        compressed += block.bytes.size();
+        blocks.push_back(std::move(block));
+    }
+    blocks_ = std::move(blocks);
+    size_ = size;
+    compressed_bytes_ = compressed;
+    return !blocks_.empty();
+#else
+    (void)data;
+    (void)size;
+    (void)cancel;
+    return false;
+#endif
+}
+
+size_t BlockStore::memory_bytes() const {
+    std::lock_guard<std::mutex> lock(cache_mutex_);
+    size_t bytes = compressed_bytes_;
+    for (const auto& entry : hot_) bytes += entry.second->size();
+    return bytes;
+}
+
+void BlockStore::inflate_block(const Block& block, std::string& out) const {
+    if (block.stored) {
+        out.append(block.bytes);
+        return;
+    }
+#ifdef LX_ENGINE_ZLIB
+    const size_t base = out.size();
+    out.resize(base + block.raw_size);
+    uLongf length = block.raw_size;
+    const int status = uncompress(
+        reinterpret_cast<Bytef*>(&out[base]), &length,
+        reinterpret_cast<const Bytef*>(block.bytes.data()), static_cast<uLong>(block.bytes.size()));
+    if (status != Z_OK || length != block.raw_size) {
+        throw std::runtime_error("Corrupted text buffer block");
+    }
+#else
+    throw std::runtime_error("Text buffer block needs zlib");
+#endif
+}
+
+std::shared_ptr<const std::string> BlockStore::hot_block(size_t index) const {
+    {
+        std::lock_guard<std::mutex> lock(cache_mutex_);
+        for (auto it = hot_.begin(); it != hot_.end(); ++it) {
+            if (it->first == index) {
+                auto entry = *it;
+                hot_.erase(it);
+                hot_.push_back(entry);
+                return entry.second;
+            }
+        }
+    }
+    // Inflate outside the lock; two readers racing for one block both inflate it.
+    auto inflated = std::make_shared<std::string>();
+    inflate_block(blocks_[index], *inflated);
+    std::lock_guard<std::mutex> lock(cache_mutex_);
+    hot_.emplace_back(index, inflated);
+    if (hot_.size() > kHotBlocks) {
+        hot_.erase(hot_.begin());
+    }
+    return inflated;
+}
+
+void BlockStore::read(uint64_t offset, uint64_t length, std::string& out) const {
+    out.clear();
+    if (offset >= size_) {
+        return;
+    }
+    const uint64_t end = std::min(size_, offset + length);
+    out.reserve(static_cast<size_t>(end - offset));
+    while (offset < end) {
+        const size_t index = static_cast<size_t>(offset / kBlockBytes);
+        const uint64_t block_start = static_cast<uint64_t>(index) * kBlockBytes;
+        const auto block = hot_block(index);
+        const size_t from = static_cast<size_t>(offset - block_start);
+        const size_t count = static_cast<size_t>(std::min<uint64_t>(end, block_start + block->size()) - offset);
+        out.append(*block, from, count);
+        offset += count;
+    }
+}
+
+std::string BlockStore::inflate_all() const {
+    std::string text;
+    text.reserve(static_cast<size_t>(size_));
+    for (const Block& block : blocks_) {
+        inflate_block(block, text);
+    }
+    return text;
+}
+
+}  // namespace lx::engine
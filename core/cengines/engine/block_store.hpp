@@ -0,0 +1,58 @@
+#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace lx::engine {
+
+// A text kept as fixed-size blocks compressed with zlib (when the engine is
+// built with it). Reads inflate only the blocks they touch and keep the most
+// recent few inflated, so scrolling a cold buffer costs one block at a time.
+// Immutable after build(); reads are thread-safe.
+class BlockStore {
+public:
+    static constexpr size_t kBlockBytes = 1u << 20;
+    static constexpr size_t kHotBlocks = 8;
+
+    // Whether this build can compress at all.
+    static bool available();
+
+    // Compresses data[0, size) block by block (fast level). Returns false and
+    // stays empty if `cancel` is raised or compression is unavailable.
+    bool build(const char* data, size_t size, const std::atomic<bool>& cancel);
+
+    bool empty() const { return blocks_.empty(); }
+    uint64_t size() const { return size_; }
+    // Compressed blocks plus the inflated hot blocks.
+    size_t memory_bytes() const;
+
+    // Replaces `out` with text bytes [offset, offset + length), clamped to size().
+    void read(uint64_t offset, uint64_t length, std::string& out) const;
+    // The whole text, inflated block by block without touching the hot cache.
+    std::string inflate_all() const;
+
+private:
+    struct Block {
+        std::string bytes;
+        uint32_t raw_size = 0;
+        bool stored = false;  // kept as is: compressing did not pay off
+    };
+
+    std::shared_ptr<const std::string> hot_block(size_t index) const;
+    void inflate_block(const Block& block, std::string& out) const;
+
+    std::vector<Block> blocks_;
+    uint64_t size_ = 0;
+    size_t compressed_bytes_ = 0;
+    mutable std::mutex cache_mutex_;
+    // Most recently used last.
+    mutable std::vector<std::pair<size_t, std::shared_ptr<const std::string>>> hot_;
+};
+
+}  // namespace lx::engine
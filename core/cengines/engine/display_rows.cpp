@@ -0,0 +1,20 @@
+#include "display_rows.hpp"
+
+namespace lx::engine {
+
+size_t line_content_end(const char* data, size_t begin, size_t end) {
+    return line_content_end([data](size_t pos) { return data[pos]; }, begin, end);
+}
+
+uint64_t display_row_count(uint64_t content_bytes, uint64_t row_bytes) {
+    if (row_bytes == 0 || content_bytes <= row_bytes) {
+        return 1;
+    }
+    return (content_bytes + row_bytes - 1) / row_bytes;
+}
+
+size_t display_row_start(const char* data, size_t begin, size_t content_end, uint64_t row, uint64_t row_bytes) {
+    return display_row_start([data](size_t pos) { return data[pos]; }, begin, content_end, row, row_bytes);
+}
+
+}  // namespace lx::engine
@@ -0,0 +1,55 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+
+namespace lx::engine {
+
+// Lines longer than this are shown by the Large Viewer as several display
+// rows of at most this many bytes. The split is for display only: the text,
+// line numbers and columns stay those of the real line.
+constexpr uint64_t kDisplayRowBytes = 4096;
+
+// A line that needs more than one display row.
+struct LongLine {
+    uint64_t line;  // 0-based
+    uint64_t rows;  // >= 2
+};
+
+// The functions below read the text through `at(offset) -> char`, so a
+// caller without the text in one flat array (a compressed buffer) can use
+// them; the `const char*` overloads index a flat array.
+
+// End of the content of the line [begin, end), without its "\n" / "\r\n".
+template <typename ByteAt>
+size_t line_content_end(ByteAt&& at, size_t begin, size_t end) {
+    if (end > begin && at(end - 1) == '\n') --end;
+    if (end > begin && at(end - 1) == '\r') --end;
+    return end;
+}
+size_t line_content_end(const char* data, size_t begin, size_t end);
+
+// Display rows needed for `content_bytes` bytes of line content (at least one).
+uint64_t display_row_count(uint64_t content_bytes, uint64_t row_bytes = kDisplayRowBytes);
+
+// Byte offset where display row `row` of the line content [begin, content_end)
+// starts: row * row_bytes, moved back onto a UTF-8 lead byte so no code point
+// is split. Rows past the last one start (and end) at content_end.
+template <typename ByteAt>
+size_t display_row_start(ByteAt&& at, size_t begin, size_t content_end, uint64_t row, uint64_t row_bytes = kDisplayRowBytes) {
+    if (row == 0) {
+        return begin;
+    }
+    if (row_bytes == 0 || row >= (content_end - begin + row_bytes - 1) / row_bytes) {
+        return content_end;
+    }
+    size_t pos = begin + static_cast<size_t>(row * row_bytes);
+    // At most three continuation bytes precede a lead byte in valid UTF-8.
+    for (int step = 0; step < 3 && pos > begin && (static_cast<unsigned char>(at(pos)) & 0xC0) == 0x80; ++step) {
+        --pos;
+    }
+    return pos;
+}
+size_t display_row_start(const char* data, size_t begin, size_t content_end, uint64_t row, uint64_t row_bytes = kDisplayRowBytes);
+
+}  // namespace lx::engine
@@ -0,0 +1,144 @@
+#include "line_index.hpp"
+
+#include <algorithm>
+#include <cstring>
+
+namespace lx::engine {
+
+namespace {
+
+inline void put_varint(std::vector<uint8_t>& out, uint64_t value) {
+    while (value >= 0x80) {
+        out.push_back(static_cast<uint8_t>(value | 0x80));
+        value >>= 7;
+    }
+    out.push_back(static_cast<uint8_t>(value));
+}
+
+inline uint64_t get_varint(const uint8_t*& p) {
+    uint64_t value = 0;
+    int shift = 0;
+    while (true) {
+        const uint8_t byte = *p++;
+        value |= static_cast<uint64_t>(byte & 0x7F) << shift;
+        if ((byte & 0x80) == 0) return value;
+        shift += 7;
+    }
+}
+
+}  // namespace
+
+LineIndex LineIndex::build(const std::string& text) {
+    LineIndex index;
+    // Roughly one delta byte per line for typical text; avoids most regrowth.
+    index.deltas_.reserve(text.size() / 48 + 16);
+    index.push_back(0);
+
+    const char* data = text.data();
+    const size_t size = text.size();
+    size_t pos = 0;
+    while (pos < size) {
+        const void* hit = std::memchr(data + pos, '\n', size - pos);
+        if (hit == nullptr) break;
+        const size_t nl = static_cast<size_t>(static_cast<const char*>(hit) - data);
+        // A trailing newline does not open an extra (empty) line.
+        if (nl + 1 < size) index.push_back(nl + 1);
+        pos = nl + 1;
+    }
+    index.shrink_to_fit();
+    return index;
+}
+
+void LineIndex::push_back(uint64_t offset) {
+    if (count_ % kBlockLines == 0) {
+        blocks_.push_back(Block{offset, static_cast<uint64_t>(deltas_.size())});
+    } else {
+        put_varint(deltas_, offset - last_);
+    }
+    last_ = offset;
+    ++count_;
+}
+
+void LineIndex::clear() {
+    blocks_.clear();
+    deltas_.clear();
+    last_ = 0;
+    count_ = 0;
+}
+
+void LineIndex::shrink_to_fit() {
+    blocks_.shrink_to_fit();
+    deltas_.shrink_to_fit();
+}
+
+uint64_t LineIndex::offset(size_t line_index) const {
+    const Block& block = blocks_[line_index / kBlockLines];
+    uint64_t value = block.base;
+    const uint8_t* p = deltas_.data() + block.stream_pos;
+    for (size_t i = line_index % kBlockLines; i > 0; --i) {
+        value += get_varint(p);
+    }
+    return value;
+}
+
+void LineIndex::offsets(size_t first, size_t count, std::vector<uint64_t>& out) const {
+    out.clear();
+    if (first >= count_ || count == 0) return;
+    count = std::min(count, count_ - first);
+    out.reserve(count);
+
+    size_t line = first;
+    uint64_t value = offset(line);
+    out.push_back(value);
+    const uint8_t* p = nullptr;
+    if ((line + 1) % kBlockLines != 0) {
+        // Continue decoding right after `first` inside its block.
+        const Block& block = blocks_[line / kBlockLines];
+        p = deltas_.data() + block.stream_pos;
+        for (size_t i = line % kBlockLines; i > 0; --i) get_varint(p);
+    }
+    while (out.size() < count) {
+        ++line;
+        if (line % kBlockLines == 0) {
+            const Block& block = blocks_[line / kBlockLines];
+            value = block.base;
+            p = deltas_.data() + block.stream_pos;
+        } else {
+            value += get_varint(p);
+        }
+        out.push_back(value);
+    }
+}
+
+void LineIndex::line_span(size_t line_index, uint64_t text_size, uint64_t& begin, uint64_t& end) const {
+    begin = offset(line_index);
+    end = (line_index + 1 < count_) ? offset(line_index + 1) : text_size;
+}
+
+size_t LineIndex::line_for_offset(uint64_t byte_offset) const {
+    if (count_ == 0) return 0;
+    auto it = std::upper_bound(
+        blocks_.begin(), blocks_.end(), byte_offset,
+        [](uint64_t value, const Block& block) { return value < block.base; });
+    const size_t block_index = (it == blocks_.begin()) ? 0 : static_cast<size_t>(it - blocks_.begin()) - 1;
+
+    size_t line = block_index * kBlockLines;
+    uint64_t value = blocks_[block_index].base;
+    const uint8_t* p = deltas_.data() + blocks_[block_index].stream_pos;
+    const size_t block_end = std::min(count_, line + kBlockLines);
+    while (line + 1 < block_end) {
+        const uint8_t* next = p;
+        const uint64_t candidate = value + get_varint(next);
+        if (candidate > byte_offset) break;
+        value = candidate;
+        p = next;
+        ++line;
+    }
+    return line;
+}
+
+size_t LineIndex::memory_bytes() const {
+    return blocks_.capacity() * sizeof(Block) + deltas_.capacity();
+}
+
+}  // namespace lx::engine
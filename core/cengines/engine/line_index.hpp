@@ -0,0 +1,59 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+namespace lx::engine {
+
+// Compact line-start index for engine text buffers.
+//
+// Every kBlockLines lines store a 64-bit absolute offset plus the position of
+// the block in a varint stream; the remaining lines of the block are encoded
+// as LEB128 deltas to the previous line start. Typical source/log lines need
+// one or two bytes per line instead of the 4 (int) or 8 (int64) of a flat
+// vector, and offsets past 2 GB stay exact.
+class LineIndex {
+public:
+    static constexpr size_t kBlockLines = 64;
+
+    LineIndex() = default;
+
+    static LineIndex build(const std::string& text);
+
+    // Appends the start offset of the next line; offsets must be increasing.
+    void push_back(uint64_t offset);
+    void clear();
+    void shrink_to_fit();
+
+    size_t size() const { return count_; }
+    bool empty() const { return count_ == 0; }
+
+    // 0-based line index -> byte offset of the line start. O(kBlockLines).
+    uint64_t offset(size_t line_index) const;
+
+    // Decodes `count` consecutive line starts beginning at `first` into `out`.
+    void offsets(size_t first, size_t count, std::vector<uint64_t>& out) const;
+
+    // Byte span [begin, end) of a 0-based line, `end` includes the terminator.
+    void line_span(size_t line_index, uint64_t text_size, uint64_t& begin, uint64_t& end) const;
+
+    // 0-based line containing `byte_offset` (the last line start <= offset).
+    size_t line_for_offset(uint64_t byte_offset) const;
+
+    size_t memory_bytes() const;
+
+private:
+    struct Block {
+        uint64_t base;
+        uint64_t stream_pos;
+    };
+
+    std::vector<Block> blocks_;
+    std::vector<uint8_t> deltas_;
+    uint64_t last_ = 0;
+    size_t count_ = 0;
+};
+
+}  // namespace lx::engine
@@ -0,0 +1,181 @@
+#include "offset_map.hpp"
+
+#include <algorithm>
+
+namespace lx::engine {
+
+namespace {
+
+inline bool is_lead_byte(unsigned char c) { return (c & 0xC0) != 0x80; }
+
+// Code points encoded with 4 bytes need a surrogate pair in UTF-16.
+inline bool is_astral_lead(unsigned char c) { return c >= 0xF0; }
+
+inline uint64_t unit_width(unsigned char lead, OffsetUnit unit) {
+    return (unit == OffsetUnit::Utf16 && is_astral_lead(lead)) ? 2 : 1;
+}
+
+}  // namespace
+
+bool parse_offset_unit(const std::string& name, OffsetUnit& unit) {
+    if (name == "byte" || name == "bytes") {
+        unit = OffsetUnit::Byte;
+    } else if (name == "char" || name == "chars" || name == "codepoint" || name == "code_point") {
+        unit = OffsetUnit::CodePoint;
+    } else if (name == "utf16" || name == "utf-16" || name == "qt") {
+        unit = OffsetUnit::Utf16;
+    } else {
+        return false;
+    }
+    return true;
+}
+
+uint64_t count_units(const char* data, size_t begin, size_t end, OffsetUnit unit) {
+    if (unit == OffsetUnit::Byte) {
+        return end > begin ? end - begin : 0;
+    }
+    uint64_t count = 0;
+    for (size_t i = begin; i < end; ++i) {
+        const unsigned char c = static_cast<unsigned char>(data[i]);
+        count += is_lead_byte(c);
+        if (unit == OffsetUnit::Utf16) count += is_astral_lead(c);
+    }
+    return count;
+}
+
+size_t advance_units(const char* data, size_t size, size_t begin, uint64_t units, OffsetUnit unit) {
+    if (unit == OffsetUnit::Byte) {
+        return static_cast<size_t>(std::min<uint64_t>(size, begin + units));
+    }
+    size_t pos = begin;
+    while (pos < size) {
+        const unsigned char lead = static_cast<unsigned char>(data[pos]);
+        const uint64_t width = unit_width(lead, unit);
+        if (units < width) break;
+        units -= width;
+        ++pos;
+        while (pos < size && !is_lead_byte(static_cast<unsigned char>(data[pos]))) ++pos;
+    }
+    return pos;
+}
+
+uint64_t convert_offset(const std::string& text, uint64_t offset, OffsetUnit from, OffsetUnit to) {
+    const size_t byte = advance_units(text.data(), text.size(), 0, offset, from);
+    return count_units(text.data(), 0, byte, to);
+}
+
+void OffsetMap::append(const char* data, size_t end) {
+    while (bytes_ < end) {
+        const unsigned char current = static_cast<unsigned char>(data[bytes_]);
+        if (bytes_ >= next_checkpoint_ && is_lead_byte(current)) {
+            checkpoints_.push_back(Checkpoint{bytes_, code_points_, utf16_units_});
+            next_checkpoint_ = bytes_ + kCheckpointBytes;
+        }
+        // Count up to the next checkpoint in one tight loop; if that lands
+        // inside a code point the following iterations step byte by byte.
+        const size_t stop = static_cast<size_t>(std::min<uint64_t>(end, std::max(next_checkpoint_, bytes_ + 1)));
+        uint64_t leads = 0;
+        uint64_t astral = 0;
+        for (size_t i = static_cast<size_t>(bytes_); i < stop; ++i) {
+            const unsigned char c = static_cast<unsigned char>(data[i]);
+            leads += is_lead_byte(c);
+            astral += is_astral_lead(c);
+        }
+        code_points_ += leads;
+        utf16_units_ += leads + astral;
+        bytes_ = stop;
+    }
+}
+
+void OffsetMap::append_single_byte(const char* raw, size_t raw_end, const uint8_t* utf8_widths, size_t interval) {
+    while (code_points_ < raw_end) {
+        if (bytes_ >= next_checkpoint_) {
+            checkpoints_.push_back(Checkpoint{bytes_, code_points_, utf16_units_});
+            next_checkpoint_ = bytes_ + interval;
+        }
+        // Every byte is one code point of at least one UTF-8 byte, so this
+        // many raw bytes always reach the next checkpoint.
+        const size_t stop = static_cast<size_t>(std::min<uint64_t>(raw_end, code_points_ + (next_checkpoint_ - bytes_)));
+        uint64_t bytes = 0;
+        for (size_t i = static_cast<size_t>(code_points_); i < stop; ++i) {
+            bytes += utf8_widths[static_cast<unsigned char>(raw[i])];
+        }
+        bytes_ += bytes;
+        utf16_units_ += stop - code_points_;
+        code_points_ = stop;
+    }
+}
+
+void OffsetMap::clear() {
+    checkpoints_.clear();
+    bytes_ = 0;
+    code_points_ = 0;
+    utf16_units_ = 0;
+    next_checkpoint_ = 0;
+}
+
+uint64_t OffsetMap::total(OffsetUnit unit) const {
+    switch (unit) {
+        case OffsetUnit::Byte: return bytes_;
+        case OffsetUnit::CodePoint: return code_points_;
+        case OffsetUnit::Utf16: return utf16_units_;
+    }
+    return bytes_;
+}
+
+uint64_t OffsetMap::field(const Checkpoint& cp, OffsetUnit unit) {
+    switch (unit) {
+        case OffsetUnit::Byte: return cp.byte;
+        case OffsetUnit::CodePoint: return cp.code_point;
+        case OffsetUnit::Utf16: return cp.utf16;
+    }
+    return cp.byte;
+}
+
+uint64_t OffsetMap::convert(const char* data, uint64_t offset, OffsetUnit from, OffsetUnit to) const {
+    return convert(data, 0, bytes_, offset, from, to);
+}
+
+std::pair<uint64_t, uint64_t> OffsetMap::floor_checkpoint(uint64_t offset, OffsetUnit unit) const {
+    auto it = std::upper_bound(
+        checkpoints_.begin(), checkpoints_.end(), offset,
+        [unit](uint64_t value, const Checkpoint& cp) { return value < field(cp, unit); });
+    if (it == checkpoints_.begin()) return {0, 0};
+    --it;
+    return {it->byte, it->code_point};
+}
+
+std::pair<uint64_t, uint64_t> OffsetMap::convert_span(uint64_t offset, OffsetUnit from) const {
+    if (checkpoints_.empty()) return {0, 0};
+    offset = std::min(offset, total(from));
+    auto from_it = std::upper_bound(
+        checkpoints_.begin(), checkpoints_.end(), offset,
+        [from](uint64_t value, const Checkpoint& cp) { return value < field(cp, from); });
+    const uint64_t end = from_it == checkpoints_.end() ? bytes_ : from_it->byte;
+    // A few bytes past the next checkpoint cover a code point straddling it.
+    return {(from_it - 1)->byte, std::min<uint64_t>(bytes_, end + 4)};
+}
+
+uint64_t OffsetMap::convert(const char* data, uint64_t data_begin, uint64_t data_end, uint64_t offset, OffsetUnit from, OffsetUnit to) const {
+    if (checkpoints_.empty()) return 0;
+    offset = std::min(offset, total(from));
+    if (from == to && from == OffsetUnit::Byte) return offset;
+
+    auto from_it = std::upper_bound(
+        checkpoints_.begin(), checkpoints_.end(), offset,
+        [from](uint64_t value, const Checkpoint& cp) { return value < field(cp, from); });
+    const Checkpoint& start = *(from_it - 1);
+    const size_t byte = static_cast<size_t>(data_begin) + advance_units(
+        data, static_cast<size_t>(data_end - data_begin), static_cast<size_t>(start.byte - data_begin),
+        offset - field(start, from), from);
+    if (to == OffsetUnit::Byte) return byte;
+
+    auto to_it = std::upper_bound(
+        checkpoints_.begin(), checkpoints_.end(), static_cast<uint64_t>(byte),
+        [](uint64_t value, const Checkpoint& cp) { return value < cp.byte; });
+    const Checkpoint& base = *(to_it - 1);
+    return field(base, to) + count_units(
+        data, static_cast<size_t>(base.byte - data_begin), byte - static_cast<size_t>(data_begin), to);
+}
+
+}  // namespace lx::engine
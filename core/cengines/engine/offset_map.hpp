@@ -0,0 +1,77 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace lx::engine {
+
+// Units a text position can be expressed in. The engine works on UTF-8
+// bytes, Python indexes code points and Qt positions are UTF-16 code units.
+enum class OffsetUnit { Byte, CodePoint, Utf16 };
+
+// Accepts "byte", "char"/"codepoint" and "utf16"/"qt"; false for anything else.
+bool parse_offset_unit(const std::string& name, OffsetUnit& unit);
+
+// Number of `unit`s in the UTF-8 byte range [begin, end).
+uint64_t count_units(const char* data, size_t begin, size_t end, OffsetUnit unit);
+
+// Byte position reached by moving `units` forward from byte `begin`, stopping
+// at `size`. A UTF-16 offset inside a surrogate pair rounds down.
+size_t advance_units(const char* data, size_t size, size_t begin, uint64_t units, OffsetUnit unit);
+
+// One-shot conversion for a text without an index (linear in the offset).
+uint64_t convert_offset(const std::string& text, uint64_t offset, OffsetUnit from, OffsetUnit to);
+
+// Checkpointed byte <-> code point <-> UTF-16 map for a UTF-8 text. Every
+// ~kCheckpointBytes (on a code point boundary) stores all three positions, so
+// a conversion is a binary search plus a scan of at most one checkpoint span.
+// Can be built progressively with append().
+class OffsetMap {
+public:
+    static constexpr size_t kCheckpointBytes = 64u * 1024u;
+
+    // Extends the map over data[processed_bytes(), end).
+    void append(const char* data, size_t end);
+    // For a single-byte source text decoded to UTF-8 (code point i is raw
+    // byte i): extends the map over raw[code_points(), raw_end), with UTF-8
+    // byte widths from `utf8_widths` and a checkpoint every ~`interval` bytes.
+    void append_single_byte(const char* raw, size_t raw_end, const uint8_t* utf8_widths, size_t interval);
+    void clear();
+
+    uint64_t processed_bytes() const { return bytes_; }
+    uint64_t code_points() const { return code_points_; }
+    uint64_t utf16_units() const { return utf16_units_; }
+    uint64_t total(OffsetUnit unit) const;
+
+    // Offsets past the mapped range are clamped to its end.
+    uint64_t convert(const char* data, uint64_t offset, OffsetUnit from, OffsetUnit to) const;
+    // (byte, code point) of the last checkpoint at or before `offset`; (0, 0) if none.
+    std::pair<uint64_t, uint64_t> floor_checkpoint(uint64_t offset, OffsetUnit unit) const;
+    // Byte range [first, second) of the text that converting `offset` reads.
+    std::pair<uint64_t, uint64_t> convert_span(uint64_t offset, OffsetUnit from) const;
+    // convert() for a caller holding only text bytes [data_begin, data_end),
+    // e.g. the convert_span() of `offset`; `data` points at byte data_begin.
+    uint64_t convert(const char* data, uint64_t data_begin, uint64_t data_end, uint64_t offset, OffsetUnit from, OffsetUnit to) const;
+
+    size_t memory_bytes() const { return checkpoints_.capacity() * sizeof(Checkpoint); }
+
+private:
+    struct Checkpoint {
+        uint64_t byte;
+        uint64_t code_point;
+        uint64_t utf16;
+    };
+
+    static uint64_t field(const Checkpoint& cp, OffsetUnit unit);
+
+    std::vector<Checkpoint> checkpoints_;
+    uint64_t bytes_ = 0;
+    uint64_t code_points_ = 0;
+    uint64_t utf16_units_ = 0;
+    uint64_t next_checkpoint_ = 0;
+};
+
+}  // namespace lx::engine
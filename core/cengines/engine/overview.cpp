@@ -0,0 +1,25 @@
+#include "overview.hpp"
+
+namespace lx::engine {
+
+size_t Overview::bucket_for_line(uint64_t line) const {
+    const size_t buckets = bucket_count();
+    if (buckets == 0) {
+        return 0;
+    }
+    // Last bucket whose first line is <= line.
+    const auto it = std::upper_bound(first_lines.begin(), first_lines.begin() + static_cast<std::ptrdiff_t>(buckets), line);
+    return it == first_lines.begin() ? 0 : static_cast<size_t>(it - first_lines.begin()) - 1;
+}
+
+std::vector<uint64_t> overview_first_lines(uint64_t line_count, size_t buckets) {
+    line_count = std::max<uint64_t>(1, line_count);
+    buckets = static_cast<size_t>(std::max<uint64_t>(1, std::min<uint64_t>(buckets, line_count)));
+    std::vector<uint64_t> first_lines(buckets + 1);
+    for (size_t b = 0; b <= buckets; ++b) {
+        first_lines[b] = line_count * b / buckets;
+    }
+    return first_lines;
+}
+
+}  // namespace lx::engine
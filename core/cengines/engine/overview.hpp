@@ -0,0 +1,83 @@
+#pragma once
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+#include "search.hpp"
+
+namespace lx::engine {
+
+// Per-bucket summary of a whole text for the Large Viewer overview strip.
+// Buckets split the lines evenly, like the viewer's line-based scrollbar, so
+// bucket b maps to the same fraction of the strip as of the scrollbar.
+struct Overview {
+    uint64_t line_count = 0;
+    // 0-based first line of each bucket, plus line_count at the end.
+    std::vector<uint64_t> first_lines;
+    // Byte offset where each bucket starts, plus the text size at the end.
+    std::vector<uint64_t> offsets;
+    // keyword_hits[k][b]: non-overlapping hits of keyword k starting in bucket b.
+    std::vector<std::vector<uint32_t>> keyword_hits;
+
+    size_t bucket_count() const { return first_lines.empty() ? 0 : first_lines.size() - 1; }
+    // Bucket holding 0-based `line`.
+    size_t bucket_for_line(uint64_t line) const;
+};
+
+// Even split of `line_count` lines into at most `buckets` buckets.
+std::vector<uint64_t> overview_first_lines(uint64_t line_count, size_t buckets);
+
+constexpr uint64_t kOverviewWindowBytes = 1u << 20;
+
+// Counts keyword hits per bucket in one pass over the text: each window is
+// scanned for every keyword while it is still in cache. `source.window(start,
+// end, tail, base)` returns a string holding at least [start, end + tail)
+// of the text, where string index 0 is text offset `base` (a few bytes
+// before `start` are welcome for whole-word checks).
+template <typename WindowSource>
+void count_overview_keywords(
+    WindowSource& source,
+    uint64_t size,
+    const std::vector<std::string>& keywords,
+    bool case_sensitive,
+    Overview& overview) {
+    const size_t buckets = overview.bucket_count();
+    overview.keyword_hits.assign(keywords.size(), std::vector<uint32_t>(buckets, 0));
+    if (buckets == 0 || size == 0) {
+        return;
+    }
+    size_t tail = 0;
+    for (const std::string& keyword : keywords) tail = std::max(tail, keyword.size());
+
+    // Per keyword: next allowed match start and current bucket (hits only move forward).
+    std::vector<uint64_t> next_pos(keywords.size(), 0);
+    std::vector<size_t> bucket(keywords.size(), 0);
+    for (uint64_t start = 0; start < size; start += kOverviewWindowBytes) {
+        const uint64_t end = std::min<uint64_t>(size, start + kOverviewWindowBytes);
+        uint64_t base = 0;
+        const std::string& text = source.window(start, end, tail, base);
+        for (size_t k = 0; k < keywords.size(); ++k) {
+            const std::string& keyword = keywords[k];
+            if (keyword.empty()) continue;
+            ForwardScanner scanner(text, keyword, case_sensitive, false);
+            size_t local = static_cast<size_t>(std::max(next_pos[k], start) - base);
+            const size_t local_end = static_cast<size_t>(end - base);
+            std::vector<uint32_t>& hits = overview.keyword_hits[k];
+            while (local < local_end) {
+                const size_t hit = scanner.next(local, local_end);
+                if (hit == std::string::npos) break;
+                const uint64_t offset = base + hit;
+                size_t& b = bucket[k];
+                while (b + 1 < buckets && overview.offsets[b + 1] <= offset) ++b;
+                ++hits[b];
+                local = hit + keyword.size();
+            }
+            next_pos[k] = base + local;
+        }
+    }
+}
+
+}  // namespace lx::engine
@@ -0,0 +1,403 @@
+#include "piece_table.hpp"
+
+#include <algorithm>
+#include <cstring>
+
+namespace lx::engine {
+
+PieceTable::PieceTable(const std::string& original, const LineIndex* original_lines)
+    : original_(original), original_lines_(original_lines) {
+    if (original_lines_ != nullptr && original_lines_->empty()) {
+        original_lines_ = nullptr;
+    }
+    if (!original_.empty()) {
+        pieces_.push_back(make_piece(false, 0, original_.size()));
+        size_ = original_.size();
+        newlines_ = pieces_.back().newlines;
+    }
+}
+
+PieceTable PieceTable::snapshot() const {
+    PieceTable copy(original_, original_lines_);
+    copy.add_ = add_;
+    copy.pieces_ = pieces_;
+    copy.size_ = size_;
+    copy.newlines_ = newlines_;
+    copy.revision_ = revision_;
+    copy.next_revision_ = next_revision_;
+    return copy;
+}
+
+size_t PieceTable::line_count() const {
+    if (size_ == 0) {
+        return 1;
+    }
+    const Piece& last = pieces_.back();
+    const bool trailing_newline = source(last)[last.start + last.length - 1] == '\n';
+    return static_cast<size_t>(newlines_ + 1 - (trailing_newline ? 1 : 0));
+}
+
+size_t PieceTable::memory_bytes() const {
+    size_t bytes = add_.capacity() + pieces_.capacity() * sizeof(Piece);
+    for (const auto* stack : {&undo_, &redo_}) {
+        bytes += stack->capacity() * sizeof(Operation);
+        for (const Operation& op : *stack) bytes += op.pieces.capacity() * sizeof(Piece);
+    }
+    return bytes;
+}
+
+bool PieceTable::is_original() const {
+    if (original_.empty()) {
+        return pieces_.empty();
+    }
+    return pieces_.size() == 1 && !pieces_[0].add && pieces_[0].start == 0 && pieces_[0].length == original_.size();
+}
+
+const char* PieceTable::source(const Piece& piece) const {
+    return piece.add ? add_.data() : original_.data();
+}
+
+uint64_t PieceTable::count_newlines(bool add, uint64_t start, uint64_t length) const {
+    if (length == 0) {
+        return 0;
+    }
+    if (!add && original_lines_ != nullptr) {
+        // Line starts in (start, end] are newlines in [start, end); the
+        // trailing newline of the text has no line start of its own.
+        const uint64_t end = start + length;
+        uint64_t count = original_lines_->line_for_offset(end) - original_lines_->line_for_offset(start);
+        if (end == original_.size() && original_[end - 1] == '\n') ++count;
+        return count;
+    }
+    const char* data = (add ? add_.data() : original_.data()) + start;
+    const char* const stop = data + length;
+    uint64_t count = 0;
+    while (data < stop) {
+        const void* hit = std::memchr(data, '\n', static_cast<size_t>(stop - data));
+        if (hit == nullptr) break;
+        ++count;
+        data = static_cast<const char*>(hit) + 1;
+    }
+    return count;
+}
+
+uint64_t PieceTable::after_newline(const Piece& piece, uint64_t k) const {
+    if (!piece.add && original_lines_ != nullptr) {
+        const size_t target = original_lines_->line_for_offset(piece.start) + static_cast<size_t>(k);
+        const uint64_t pos = target < original_lines_->size() ? original_lines_->offset(target) : original_.size();
+        return pos - piece.start;
+    }
+    const char* base = source(piece) + piece.start;
+    const char* data = base;
+    const char* const stop = base + piece.length;
+    while (data < stop) {
+        const void* hit = std::memchr(data, '\n', static_cast<size_t>(stop - data));
+        if (hit == nullptr) break;
+        data = static_cast<const char*>(hit) + 1;
+        if (--k == 0) break;
+    }
+    return static_cast<uint64_t>(data - base);
+}
+
+PieceTable::Piece PieceTable::make_piece(bool add, uint64_t start, uint64_t length) const {
+    return Piece{add, start, length, count_newlines(add, start, length)};
+}
+
+size_t PieceTable::split_at(uint64_t offset) {
+    uint64_t pos = 0;
+    for (size_t i = 0; i < pieces_.size(); ++i) {
+        if (pos == offset) {
+            return i;
+        }
+        const Piece piece = pieces_[i];
+        if (offset < pos + piece.length) {
+            const Piece left = make_piece(piece.add, piece.start, offset - pos);
+            const Piece right{piece.add, piece.start + left.length, piece.length - left.length, piece.newlines - left.newlines};
+            pieces_[i] = left;
+            pieces_.insert(pieces_.begin() + static_cast<std::ptrdiff_t>(i) + 1, right);
+            return i + 1;
+        }
+        pos += piece.length;
+    }
+    return pieces_.size();
+}
+
+void PieceTable::insert_pieces(uint64_t offset, const std::vector<Piece>& pieces) {
+    const size_t at = split_at(offset);
+    pieces_.insert(pieces_.begin() + static_cast<std::ptrdiff_t>(at), pieces.begin(), pieces.end());
+    for (const Piece& piece : pieces) {
+        size_ += piece.length;
+        newlines_ += piece.newlines;
+    }
+}
+
+std::vector<PieceTable::Piece> PieceTable::remove_range(uint64_t offset, uint64_t length) {
+    const size_t first = split_at(offset);
+    const size_t last = split_at(offset + length);
+    std::vector<Piece> removed(pieces_.begin() + static_cast<std::ptrdiff_t>(first),
+                               pieces_.begin() + static_cast<std::ptrdiff_t>(last));
+    pieces_.erase(pieces_.begin() + static_cast<std::ptrdiff_t>(first),
+                  pieces_.begin() + static_cast<std::ptrdiff_t>(last));
+    for (const Piece& piece : removed) {
+        size_ -= piece.length;
+        newlines_ -= piece.newlines;
+    }
+    return removed;
+}
+
+void PieceTable::insert(uint64_t offset, const std::string& text) {
+    if (text.empty()) {
+        return;
+    }
+    offset = std::min(offset, size_);
+    const uint64_t add_start = add_.size();
+    const uint64_t length = text.size();
+    const bool has_newline = text.find('\n') != std::string::npos;
+    add_ += text;
+    redo_.clear();
+    revision_ = ++next_revision_;
+
+    // Typing: extend the piece appended by the previous insert in place, so a
+    // word is one piece and one undo step.
+    if (coalesce_ && !has_newline && !undo_.empty()) {
+        Operation& op = undo_.back();
+        Piece& recorded = op.pieces.back();
+        if (op.kind == OpKind::Insert && op.offset + op.length == offset && recorded.add && recorded.start + recorded.length == add_start) {
+            uint64_t pos = 0;
+            for (Piece& piece : pieces_) {
+                pos += piece.length;
+                if (pos == offset && piece.add && piece.start + piece.length == add_start) {
+                    piece.length += length;
+                    recorded.length += length;
+                    op.length += length;
+                    size_ += length;
+                    op.revision = revision_;
+                    return;
+                }
+                if (pos > offset) break;
+            }
+        }
+    }
+
+    const std::vector<Piece> pieces{make_piece(true, add_start, length)};
+    insert_pieces(offset, pieces);
+    undo_.push_back(Operation{revision_, OpKind::Insert, offset, length, pieces});
+    coalesce_ = !has_newline;
+}
+
+void PieceTable::erase(uint64_t offset, uint64_t length) {
+    offset = std::min(offset, size_);
+    length = std::min(length, size_ - offset);
+    if (length == 0) {
+        return;
+    }
+    std::vector<Piece> removed = remove_range(offset, length);
+    revision_ = ++next_revision_;
+    undo_.push_back(Operation{revision_, OpKind::Erase, offset, length, std::move(removed)});
+    redo_.clear();
+    coalesce_ = false;
+}
+
+void PieceTable::replace_all(const std::vector<uint64_t>& offsets, uint64_t length, const std::string& replacement) {
+    std::vector<Edit> edits;
+    edits.reserve(offsets.size());
+    for (const uint64_t offset : offsets) {
+        edits.push_back(Edit{offset, offset + length, 0, replacement.size()});
+    }
+    replace_spans(edits, replacement);
+}
+
+void PieceTable::replace_spans(const std::vector<Edit>& edits, const std::string& texts) {
+    if (edits.empty()) {
+        return;
+    }
+    // Dense matches would cost more in pieces than the text itself; then the
+    // result is written to the add buffer as one flat piece instead.
+    uint64_t new_size = size_;
+    for (const Edit& edit : edits) {
+        new_size = new_size - (edit.end - edit.start) + edit.text_length;
+    }
+    const uint64_t count = edits.size();
+    const bool flat = (pieces_.size() + 2 * count) * sizeof(Piece) > new_size;
+
+    const uint64_t add_start = add_.size();
+    if (flat) {
+        add_.reserve(add_.size() + static_cast<size_t>(new_size));
+    } else {
+        add_ += texts;
+    }
+
+    std::vector<Piece> rebuilt;
+    rebuilt.reserve(flat ? 1 : pieces_.size() + count * 2);
+    size_t index = 0;
+    uint64_t piece_pos = 0;
+    // Appends the document bytes [from, to) as (parts of) existing pieces,
+    // or as bytes to the add buffer when flattening.
+    auto keep = [&](uint64_t from, uint64_t to) {
+        while (from < to && index < pieces_.size()) {
+            const Piece& piece = pieces_[index];
+            const uint64_t piece_end = piece_pos + piece.length;
+            if (piece_end <= from) {
+                piece_pos = piece_end;
+                ++index;
+                continue;
+            }
+            const uint64_t cut_from = from - piece_pos;
+            const uint64_t cut_to = std::min(to, piece_end) - piece_pos;
+            if (flat) {
+                add_.append(source(piece) + piece.start + cut_from, static_cast<size_t>(cut_to - cut_from));
+            } else if (cut_from == 0 && cut_to == piece.length) {
+                rebuilt.push_back(piece);
+            } else {
+                rebuilt.push_back(make_piece(piece.add, piece.start + cut_from, cut_to - cut_from));
+            }
+            from = piece_pos + cut_to;
+        }
+    };
+    uint64_t pos = 0;
+    for (const Edit& edit : edits) {
+        keep(pos, edit.start);
+        if (flat) {
+            add_.append(texts, static_cast<size_t>(edit.text_start), static_cast<size_t>(edit.text_length));
+        } else if (edit.text_length > 0) {
+            rebuilt.push_back(make_piece(true, add_start + edit.text_start, edit.text_length));
+        }
+        pos = edit.end;
+    }
+    keep(pos, size_);
+    if (flat && new_size > 0) {
+        rebuilt.push_back(make_piece(true, add_start, new_size));
+    }
+
+    Operation op{0, OpKind::Replace, edits.front().start, 0, std::move(rebuilt)};
+    apply(op, true);
+    revision_ = ++next_revision_;
+    op.revision = revision_;
+    undo_.push_back(std::move(op));
+    redo_.clear();
+}
+
+void PieceTable::recount() {
+    size_ = 0;
+    newlines_ = 0;
+    for (const Piece& piece : pieces_) {
+        size_ += piece.length;
+        newlines_ += piece.newlines;
+    }
+}
+
+void PieceTable::apply(Operation& op, bool forward) {
+    if (op.kind == OpKind::Replace) {
+        pieces_.swap(op.pieces);
+        recount();
+    } else if ((op.kind == OpKind::Insert) == forward) {
+        insert_pieces(op.offset, op.pieces);
+    } else {
+        remove_range(op.offset, op.length);
+    }
+    coalesce_ = false;
+}
+
+bool PieceTable::undo(uint64_t& cursor) {
+    if (undo_.empty()) {
+        return false;
+    }
+    Operation op = std::move(undo_.back());
+    undo_.pop_back();
+    apply(op, false);
+    revision_ = undo_.empty() ? 0 : undo_.back().revision;
+    cursor = op.kind == OpKind::Insert ? op.offset : op.offset + op.length;
+    redo_.push_back(std::move(op));
+    return true;
+}
+
+bool PieceTable::redo(uint64_t& cursor) {
+    if (redo_.empty()) {
+        return false;
+    }
+    Operation op = std::move(redo_.back());
+    redo_.pop_back();
+    apply(op, true);
+    revision_ = op.revision;
+    cursor = op.kind == OpKind::Insert ? op.offset + op.length : op.offset;
+    undo_.push_back(std::move(op));
+    return true;
+}
+
+uint64_t PieceTable::line_start(size_t line) const {
+    if (line == 0) {
+        return 0;
+    }
+    uint64_t need = line;
+    uint64_t pos = 0;
+    for (const Piece& piece : pieces_) {
+        if (piece.newlines >= need) {
+            return pos + after_newline(piece, need);
+        }
+        need -= piece.newlines;
+        pos += piece.length;
+    }
+    return size_;
+}
+
+size_t PieceTable::line_of_offset(uint64_t offset, uint64_t& line_begin) const {
+    offset = std::min(offset, size_);
+    uint64_t line = 0;
+    uint64_t pos = 0;
+    for (const Piece& piece : pieces_) {
+        if (offset < pos + piece.length) {
+            line += count_newlines(piece.add, piece.start, offset - pos);
+            break;
+        }
+        line += piece.newlines;
+        pos += piece.length;
+    }
+    line_begin = line_start(static_cast<size_t>(line));
+    return static_cast<size_t>(line);
+}
+
+void PieceTable::read(uint64_t offset, uint64_t length, std::string& out) const {
+    out.clear();
+    const uint64_t end = std::min(size_, offset + length);
+    if (offset >= end) {
+        return;
+    }
+    out.reserve(static_cast<size_t>(end - offset));
+    uint64_t pos = 0;
+    for (const Piece& piece : pieces_) {
+        const uint64_t piece_end = pos + piece.length;
+        if (piece_end > offset) {
+            const uint64_t from = std::max(offset, pos);
+            const uint64_t to = std::min(end, piece_end);
+            out.append(source(piece) + piece.start + (from - pos), static_cast<size_t>(to - from));
+        }
+        pos = piece_end;
+        if (pos >= end) break;
+    }
+}
+
+void PieceTable::lines(size_t first, size_t count, std::vector<std::string>& out) const {
+    out.clear();
+    const size_t total = line_count();
+    if (count == 0 || first >= total) {
+        return;
+    }
+    count = std::min(count, total - first);
+    const uint64_t begin = line_start(first);
+    const uint64_t end = first + count < total ? line_start(first + count) : size_;
+    std::string text;
+    read(begin, end - begin, text);
+
+    out.reserve(count);
+    size_t pos = 0;
+    while (out.size() < count) {
+        size_t stop = text.find('\n', pos);
+        const size_t next = stop == std::string::npos ? text.size() : stop + 1;
+        if (stop == std::string::npos) stop = text.size();
+        if (stop > pos && text[stop - 1] == '\r') --stop;
+        out.emplace_back(text, pos, stop - pos);
+        pos = next;
+    }
+}
+
+}  // namespace lx::engine
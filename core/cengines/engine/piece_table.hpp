@@ -0,0 +1,134 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+#include "line_index.hpp"
+
+namespace lx::engine {
+
+// Editable view over an immutable original text.
+//
+// The document is a sequence of pieces, each pointing into either the
+// original text or an append-only `add` buffer. Inserting or deleting only
+// splits and rewires pieces, so memory grows with the edits rather than the
+// file. Undo/redo records piece operations, never text copies. Offsets are
+// UTF-8 bytes; callers keep them on code point boundaries.
+//
+// Line semantics match LineIndex: a trailing '\n' does not open an extra line.
+class PieceTable {
+public:
+    // `original` (and `original_lines`, if given) must outlive the table.
+    // With a complete line index, newline counts and line lookups inside
+    // original pieces are index lookups instead of scans.
+    PieceTable(const std::string& original, const LineIndex* original_lines);
+
+    // Copy of the current pieces and appended text, without undo history.
+    // Costs O(edits); used to save while the user keeps typing.
+    PieceTable snapshot() const;
+
+    uint64_t size() const { return size_; }
+    uint64_t newline_count() const { return newlines_; }
+    size_t line_count() const;
+    size_t piece_count() const { return pieces_.size(); }
+    size_t add_bytes() const { return add_.size(); }
+    // Identifies the document state: every edit gets a fresh value and
+    // undo/redo return to the value of the state they restore, so
+    // "revision == saved revision" means "unchanged since save".
+    uint64_t revision() const { return revision_; }
+    size_t memory_bytes() const;
+    bool is_original() const;
+
+    void insert(uint64_t offset, const std::string& text);
+    void erase(uint64_t offset, uint64_t length);
+    // Replace `length` bytes at each of the sorted, non-overlapping
+    // `offsets` with `replacement` as a single undo step. The replacement is
+    // appended once and shared by every match, so memory is O(matches).
+    void replace_all(const std::vector<uint64_t>& offsets, uint64_t length, const std::string& replacement);
+
+    // One replacement for replace_spans: bytes [start, end) of the document
+    // become texts[text_start, text_start + text_length).
+    struct Edit {
+        uint64_t start;
+        uint64_t end;
+        uint64_t text_start;
+        uint64_t text_length;
+    };
+    // Apply sorted, non-overlapping edits as a single undo step, appending
+    // `texts` once (regex Replace All, where every match has its own text).
+    void replace_spans(const std::vector<Edit>& edits, const std::string& texts);
+
+    // Start a new undo step even if the next insert continues the last one.
+    void break_undo_group() { coalesce_ = false; }
+    bool can_undo() const { return !undo_.empty(); }
+    bool can_redo() const { return !redo_.empty(); }
+    // On success stores the caret offset after the operation in `cursor`.
+    bool undo(uint64_t& cursor);
+    bool redo(uint64_t& cursor);
+
+    // Byte offset where 0-based `line` starts (size() past the last line).
+    uint64_t line_start(size_t line) const;
+    // 0-based line containing `offset` and the byte offset of its start.
+    size_t line_of_offset(uint64_t offset, uint64_t& line_begin) const;
+
+    void read(uint64_t offset, uint64_t length, std::string& out) const;
+    // Rows without terminators, like get_text_buffer_lines.
+    void lines(size_t first, size_t count, std::vector<std::string>& out) const;
+
+    // Calls fn(const char* data, size_t length) for each piece in order.
+    template <typename Fn>
+    void for_each_span(Fn&& fn) const {
+        for (const Piece& piece : pieces_) {
+            fn(source(piece) + piece.start, static_cast<size_t>(piece.length));
+        }
+    }
+
+private:
+    struct Piece {
+        bool add;
+        uint64_t start;
+        uint64_t length;
+        uint64_t newlines;
+    };
+
+    enum class OpKind : uint8_t { Insert, Erase, Replace };
+
+    struct Operation {
+        uint64_t revision;
+        OpKind kind;
+        uint64_t offset;
+        uint64_t length;
+        // Insert/Erase: the pieces added or removed. Replace: the piece list
+        // to swap in, which trades places with the current one on each apply.
+        std::vector<Piece> pieces;
+    };
+
+    const char* source(const Piece& piece) const;
+    uint64_t count_newlines(bool add, uint64_t start, uint64_t length) const;
+    // Byte offset (relative to the piece) just past its k-th newline, k >= 1.
+    uint64_t after_newline(const Piece& piece, uint64_t k) const;
+    Piece make_piece(bool add, uint64_t start, uint64_t length) const;
+
+    // Index of the piece starting at `offset`, splitting one if needed.
+    size_t split_at(uint64_t offset);
+    void insert_pieces(uint64_t offset, const std::vector<Piece>& pieces);
+    std::vector<Piece> remove_range(uint64_t offset, uint64_t length);
+    void apply(Operation& op, bool forward);
+    void recount();
+
+    const std::string& original_;
+    const LineIndex* original_lines_;
+    std::string add_;
+    std::vector<Piece> pieces_;
+    std::vector<Operation> undo_;
+    std::vector<Operation> redo_;
+    uint64_t size_ = 0;
+    uint64_t newlines_ = 0;
+    uint64_t revision_ = 0;
+    uint64_t next_revision_ = 0;
+    bool coalesce_ = false;
+};
+
+}  // namespace lx::engine
@@ -0,0 +1,897 @@
+#include "regex.hpp"
+
+#include "unicode.hpp"
+#include "unicode_tables.hpp"
+
+#include <algorithm>
+#include <cctype>
+#include <cstring>
+#include <iterator>
+#include <stdexcept>
+
+namespace lx::engine {
+namespace {
+
+constexpr size_t kNpos = static_cast<size_t>(-1);
+// With an open end, the bytes a step may look at past its position: a whole
+// UTF-8 character, or "\r\n" for `$`.
+constexpr size_t kOpenEndBytes = 8;
+constexpr uint32_t kUnbounded = UINT32_MAX;
+constexpr uint32_t kMaxRepeat = 1000;
+constexpr size_t kMaxProgram = 50000;
+// Parsing and compiling recurse per group level.
+constexpr int kMaxNesting = 200;
+
+bool is_space(uint32_t cp) {
+    switch (cp) {
+        case ' ': case '\t': case '\n': case '\v': case '\f': case '\r':
+        case 0x85: case 0xA0: case 0x1680: case 0x2028: case 0x2029: case 0x202F: case 0x205F: case 0x3000:
+            return true;
+        default:
+            return cp >= 0x2000 && cp <= 0x200A;
+    }
+}
+
+bool is_digit(uint32_t cp) { return cp >= '0' && cp <= '9'; }
+
+struct Node {
+    enum class Kind : uint8_t { Empty, Char, Any, Class, Assert, Group, Concat, Alternate, Repeat };
+
+    Kind kind = Kind::Empty;
+    uint32_t value = 0;  // Char: code point; Class: class index; Assert: Check
+    int group = -1;      // Group: capture number, -1 for (?:...)
+    uint32_t min = 0;
+    uint32_t max = 0;
+    bool greedy = true;
+    std::vector<Node> children;
+};
+
+}  // namespace
+
+bool Regex::CharClass::contains(uint32_t cp) const {
+    const uint32_t c = folded ? fold_case(cp) : cp;
+    bool in = false;
+    if (c < 128) {
+        in = (ascii[c >> 6] >> (c & 63)) & 1;
+    } else {
+        auto it = std::upper_bound(ranges.begin(), ranges.end(), c, [](uint32_t value, const std::pair<uint32_t, uint32_t>& range) {
+            return value < range.first;
+        });
+        in = it != ranges.begin() && c <= std::prev(it)->second;
+        if (!in && named != 0) {
+            in = ((named & kClassWord) && is_word_char(c)) || ((named & kClassNotWord) && !is_word_char(c)) ||
+                 ((named & kClassSpace) && is_space(c)) || ((named & kClassNotSpace) && !is_space(c)) ||
+                 (named & kClassNotDigit);
+        }
+    }
+    return in != negated;
+}
+
+// Parses a pattern into a Node tree and compiles that into a Regex program.
+class RegexCompiler {
+public:
+    RegexCompiler(Regex& regex, const std::string& pattern, bool case_sensitive)
+        : regex_(regex), case_sensitive_(case_sensitive) {
+        for (size_t pos = 0; pos < pattern.size();) {
+            uint32_t cp = 0;
+            pos += utf8_decode(pattern.data(), pattern.size(), pos, cp);
+            pattern_.push_back(cp);
+        }
+    }
+
+    void compile() {
+        Node root = alternation();
+        if (!at_end()) {
+            fail("unbalanced parenthesis");
+        }
+        regex_.slot_count_ = 2 * static_cast<size_t>(groups_ + 1);
+        emit(Regex::Op::Save, 0);
+        emit_node(root);
+        emit(Regex::Op::Save, 1);
+        emit(Regex::Op::Match);
+        analyze_start();
+    }
+
+private:
+    // --- parsing ---
+
+    [[noreturn]] void fail(const std::string& what) const {
+        throw std::invalid_argument(what + " at position " + std::to_string(pos_));
+    }
+
+    bool at_end() const { return pos_ >= pattern_.size(); }
+    uint32_t peek(size_t ahead = 0) const { return pos_ + ahead < pattern_.size() ? pattern_[pos_ + ahead] : 0; }
+    bool accept(uint32_t cp) {
+        if (!at_end() && pattern_[pos_] == cp) {
+            ++pos_;
+            return true;
+        }
+        return false;
+    }
+
+    Node alternation() {
+        Node first = concatenation();
+        if (peek() != '|' || at_end()) {
+            return first;
+        }
+        Node node;
+        node.kind = Node::Kind::Alternate;
+        node.children.push_back(std::move(first));
+        while (accept('|')) node.children.push_back(concatenation());
+        return node;
+    }
+
+    Node concatenation() {
+        Node node;
+        node.kind = Node::Kind::Concat;
+        while (!at_end() && peek() != '|' && peek() != ')') {
+            node.children.push_back(repetition());
+        }
+        if (node.children.size() == 1) {
+            return std::move(node.children.front());
+        }
+        if (node.children.empty()) node.kind = Node::Kind::Empty;
+        return node;
+    }
+
+    // Parses {n}, {n,} or {n,m} at pos_; leaves pos_ alone (literal '{') if it is not one.
+    bool counted(uint32_t& min, uint32_t& max) {
+        size_t pos = pos_ + 1;
+        auto number = [&](uint32_t& out) {
+            const size_t begin = pos;
+            uint64_t value = 0;
+            while (pos < pattern_.size() && is_digit(pattern_[pos])) {
+                value = std::min<uint64_t>(value * 10 + (pattern_[pos] - '0'), kUnbounded - 1);
+                ++pos;
+            }
+            out = static_cast<uint32_t>(value);
+            return pos > begin;
+        };
+        if (!number(min)) return false;
+        max = min;
+        if (pos < pattern_.size() && pattern_[pos] == ',') {
+            ++pos;
+            if (!number(max)) max = kUnbounded;
+        }
+        if (pos >= pattern_.size() || pattern_[pos] != '}') return false;
+        pos_ = pos + 1;
+        return true;
+    }
+
+    Node repetition() {
+        Node atom_node = atom();
+        bool repeated = false;
+        while (!at_end()) {
+            uint32_t min = 0;
+            uint32_t max = 0;
+            const uint32_t c = peek();
+            if (c == '*') {
+                max = kUnbounded;
+            } else if (c == '+') {
+                min = 1;
+                max = kUnbounded;
+            } else if (c == '?') {
+                max = 1;
+            } else if (c == '{') {
+                const size_t start = pos_;
+                if (!counted(min, max)) break;
+                if (repeated) {
+                    pos_ = start;
+                    fail("multiple repeat");
+                }
+                if (min > max) fail("min repeat greater than max repeat");
+                if (min > kMaxRepeat || (max != kUnbounded && max > kMaxRepeat)) fail("repeat count too large");
+                --pos_;  // '}' is consumed below with the other quantifiers
+            } else {
+                break;
+            }
+            if (repeated) fail("multiple repeat");
+            if (atom_node.kind == Node::Kind::Assert || atom_node.kind == Node::Kind::Empty) fail("nothing to repeat");
+            ++pos_;
+            Node node;
+            node.kind = Node::Kind::Repeat;
+            node.min = min;
+            node.max = max;
+            node.greedy = !accept('?');
+            node.children.push_back(std::move(atom_node));
+            atom_node = std::move(node);
+            repeated = true;
+        }
+        return atom_node;
+    }
+
+    Node atom() {
+        const uint32_t c = peek();
+        switch (c) {
+            case '(':
+                ++pos_;
+                return group();
+            case '[':
+                ++pos_;
+                return char_class();
+            case '.': {
+                ++pos_;
+                Node node;
+                node.kind = Node::Kind::Any;
+                return node;
+            }
+            case '^':
+                ++pos_;
+                return assertion(Regex::Check::LineStart);
+            case '$':
+                ++pos_;
+                return assertion(Regex::Check::LineEnd);
+            case '\\':
+                ++pos_;
+                return escape();
+            case '*':
+            case '+':
+            case '?':
+                fail("nothing to repeat");
+            default:
+                ++pos_;
+                return literal(c);
+        }
+    }
+
+    Node literal(uint32_t cp) const {
+        Node node;
+        node.kind = Node::Kind::Char;
+        node.value = cp;
+        return node;
+    }
+
+    static Node assertion(Regex::Check check) {
+        Node node;
+        node.kind = Node::Kind::Assert;
+        node.value = static_cast<uint32_t>(check);
+        return node;
+    }
+
+    Node group() {
+        if (++nesting_ > kMaxNesting) fail("too many nested groups");
+        Node node;
+        node.kind = Node::Kind::Group;
+        if (accept('?')) {
+            if (accept(':')) {
+                node.group = -1;
+            } else if (peek() == '=' || peek() == '!' || (peek() == '<' && (peek(1) == '=' || peek(1) == '!'))) {
+                fail("lookaround is not supported");
+            } else if (peek() == '<' || (peek() == 'P' && peek(1) == '<')) {
+                pos_ += peek() == 'P' ? 2 : 1;
+                std::string name;
+                while (!at_end() && peek() != '>') {
+                    const uint32_t cp = pattern_[pos_++];
+                    if (!(is_word_char(cp) && !(name.empty() && is_digit(cp)))) fail("bad character in group name");
+                    utf8_append(cp, name);
+                }
+                if (!accept('>') || name.empty()) fail("missing group name");
+                if (regex_.group_index(name) >= 0) fail("redefinition of group name '" + name + "'");
+                node.group = ++groups_;
+                regex_.names_.emplace_back(name, node.group);
+            } else if (peek() == 'P' && peek(1) == '=') {
+                fail("backreferences are not supported");
+            } else {
+                fail("unknown extension ?" + std::string(1, static_cast<char>(peek() < 128 ? peek() : '?')));
+            }
+        } else {
+            node.group = ++groups_;
+        }
+        node.children.push_back(alternation());
+        if (!accept(')')) fail("missing ), unterminated subpattern");
+        --nesting_;
+        return node;
+    }
+
+    uint32_t hex_digits(size_t count, bool braced) {
+        uint32_t value = 0;
+        size_t digits = 0;
+        while (!at_end() && (braced || digits < count)) {
+            const uint32_t c = peek();
+            int digit = -1;
+            if (c >= '0' && c <= '9') digit = static_cast<int>(c - '0');
+            else if (c >= 'a' && c <= 'f') digit = static_cast<int>(c - 'a' + 10);
+            else if (c >= 'A' && c <= 'F') digit = static_cast<int>(c - 'A' + 10);
+            if (digit < 0) break;
+            value = value * 16 + static_cast<uint32_t>(digit);
+            if (value > 0x10FFFF) fail("character code out of range");
+            ++pos_;
+            ++digits;
+        }
+        if (digits == 0 || (!braced && digits != count)) fail("incomplete escape");
+        return value;
+    }
+
+    // A single character escape (also valid in classes); false if `c` is not one.
+    bool char_escape(uint32_t c, uint32_t& out) {
+        switch (c) {
+            case 't': out = '\t'; return true;
+            case 'n': out = '\n'; return true;
+            case 'r': out = '\r'; return true;
+            case 'f': out = '\f'; return true;
+            case 'v': out = '\v'; return true;
+            case 'a': out = 0x07; return true;
+            case '0': out = 0; return true;
+            case 'x':
+                if (accept('{')) {
+                    out = hex_digits(0, true);
+                    if (!accept('}')) fail("missing } in \\x{...}");
+                } else {
+                    out = hex_digits(2, false);
+                }
+                return true;
+            case 'u': out = hex_digits(4, false); return true;
+            case 'U': out = hex_digits(8, false); return true;
+            default: return false;
+        }
+    }
+
+    static uint8_t named_class(uint32_t c) {
+        switch (c) {
+            case 'd': return Regex::kClassDigit;
+            case 'D': return Regex::kClassNotDigit;
+            case 'w': return Regex::kClassWord;
+            case 'W': return Regex::kClassNotWord;
+            case 's': return Regex::kClassSpace;
+            case 'S': return Regex::kClassNotSpace;
+            default: return 0;
+        }
+    }
+
+    Node escape() {
+        if (at_end()) fail("bad escape (end of pattern)");
+        const uint32_t c = pattern_[pos_++];
+        if (const uint8_t named = named_class(c)) {
+            Regex::CharClass cls;
+            cls.named = named;
+            return class_node(std::move(cls));
+        }
+        switch (c) {
+            case 'b': return assertion(Regex::Check::WordBoundary);
+            case 'B': return assertion(Regex::Check::NotWordBoundary);
+            case 'A': return assertion(Regex::Check::TextStart);
+            case 'z':
+            case 'Z': return assertion(Regex::Check::TextEnd);
+            default: break;
+        }
+        uint32_t cp = 0;
+        if (char_escape(c, cp)) return literal(cp);
+        if ((c >= '1' && c <= '9') || c == 'k' || c == 'g') {
+            --pos_;
+            fail("backreferences are not supported");
+        }
+        if (c < 128 && (std::isalnum(static_cast<int>(c)) != 0)) {
+            --pos_;
+            fail(std::string("bad escape \\") + static_cast<char>(c));
+        }
+        return literal(c);
+    }
+
+    Node char_class() {
+        Regex::CharClass cls;
+        cls.negated = accept('^');
+        auto& ranges = cls.ranges;
+        bool first = true;
+        while (true) {
+            if (at_end()) fail("unterminated character set");
+            uint32_t c = pattern_[pos_];
+            if (c == ']' && !first) {
+                ++pos_;
+                break;
+            }
+            first = false;
+            ++pos_;
+            uint32_t low = c;
+            if (c == '\\') {
+                if (at_end()) fail("unterminated character set");
+                const uint32_t e = pattern_[pos_++];
+                if (const uint8_t named = named_class(e)) {
+                    cls.named |= named;
+                    continue;
+                }
+                if (e == 'b') {
+                    low = 0x08;
+                } else if (!char_escape(e, low)) {
+                    if (e < 128 && std::isalnum(static_cast<int>(e)) != 0) {
+                        --pos_;
+                        fail(std::string("bad escape \\") + static_cast<char>(e));
+                    }
+                    low = e;
+                }
+            }
+            uint32_t high = low;
+            if (peek() == '-' && pos_ + 1 < pattern_.size() && peek(1) != ']') {
+                ++pos_;
+                high = pattern_[pos_++];
+                if (high == '\\') {
+                    if (at_end()) fail("unterminated character set");
+                    const uint32_t e = pattern_[pos_++];
+                    if (!char_escape(e, high)) {
+                        if (named_class(e) != 0 || (e < 128 && std::isalnum(static_cast<int>(e)) != 0)) {
+                            fail("bad character range");
+                        }
+                        high = e;
+                    }
+                }
+                if (high < low) fail("bad character range");
+            }
+            ranges.emplace_back(low, high);
+        }
+        return class_node(std::move(cls));
+    }
+
+    Node class_node(Regex::CharClass cls) {
+        auto& ranges = cls.ranges;
+        if (!case_sensitive_) {
+            // Add the folded form of every member, so testing fold_case(cp)
+            // against the class matches any case of a member.
+            const size_t count = ranges.size();
+            for (size_t i = 0; i < count; ++i) {
+                const uint32_t low = std::max<uint32_t>(ranges[i].first, 'A');
+                const uint32_t high = std::min<uint32_t>(ranges[i].second, 'Z');
+                if (low <= high) ranges.emplace_back(low + ('a' - 'A'), high + ('a' - 'A'));
+            }
+            for (const unicode::CaseFoldEntry& entry : unicode::kCaseFold) {
+                for (size_t i = 0; i < count; ++i) {
+                    if (entry.from >= ranges[i].first && entry.from <= ranges[i].second) {
+                        ranges.emplace_back(entry.to, entry.to);
+                        break;
+                    }
+                }
+            }
+            cls.folded = true;
+        }
+        std::sort(ranges.begin(), ranges.end());
+        std::vector<std::pair<uint32_t, uint32_t>> merged;
+        for (const auto& range : ranges) {
+            if (!merged.empty() && range.first <= merged.back().second + 1) {
+                merged.back().second = std::max(merged.back().second, range.second);
+            } else {
+                merged.push_back(range);
+            }
+        }
+        ranges.swap(merged);
+        // ASCII membership as a bitmap, named classes included (the
+        // negation is applied by contains()).
+        const bool negated = cls.negated;
+        const bool folded = cls.folded;
+        cls.negated = false;
+        cls.folded = false;
+        for (uint32_t c = 0; c < 128; ++c) {
+            bool in = false;
+            for (const auto& range : ranges) in = in || (c >= range.first && c <= range.second);
+            const uint8_t named = cls.named;
+            in = in || ((named & Regex::kClassDigit) && is_digit(c)) || ((named & Regex::kClassNotDigit) && !is_digit(c)) ||
+                 ((named & Regex::kClassWord) && is_word_char(c)) || ((named & Regex::kClassNotWord) && !is_word_char(c)) ||
+                 ((named & Regex::kClassSpace) && is_space(c)) || ((named & Regex::kClassNotSpace) && !is_space(c));
+            if (in) cls.ascii[c >> 6] |= uint64_t{1} << (c & 63);
+        }
+        cls.negated = negated;
+        cls.folded = folded;
+
+        Node node;
+        node.kind = Node::Kind::Class;
+        node.value = static_cast<uint32_t>(regex_.classes_.size());
+        regex_.classes_.push_back(std::move(cls));
+        return node;
+    }
+
+    // --- compiling ---
+
+    uint32_t emit(Regex::Op op, uint32_t x = 0, uint32_t y = 0) {
+        if (regex_.program_.size() >= kMaxProgram) {
+            throw std::invalid_argument("pattern is too large");
+        }
+        regex_.program_.push_back(Regex::Inst{op, x, y});
+        return static_cast<uint32_t>(regex_.program_.size() - 1);
+    }
+
+    uint32_t here() const { return static_cast<uint32_t>(regex_.program_.size()); }
+
+    void emit_node(const Node& node) {
+        auto& program = regex_.program_;
+        switch (node.kind) {
+            case Node::Kind::Empty:
+                break;
+            case Node::Kind::Char:
+                if (!case_sensitive_) {
+                    const uint32_t folded = fold_case(node.value);
+                    if (case_variants(folded).size() > 1) {
+                        emit(Regex::Op::CharFold, folded);
+                        break;
+                    }
+                }
+                emit(Regex::Op::Char, node.value);
+                break;
+            case Node::Kind::Any:
+                emit(Regex::Op::Any);
+                break;
+            case Node::Kind::Class:
+                emit(Regex::Op::Class, node.value);
+                break;
+            case Node::Kind::Assert:
+                emit(Regex::Op::Assert, node.value);
+                break;
+            case Node::Kind::Group:
+                if (node.group >= 0) emit(Regex::Op::Save, 2 * static_cast<uint32_t>(node.group));
+                emit_node(node.children.front());
+                if (node.group >= 0) emit(Regex::Op::Save, 2 * static_cast<uint32_t>(node.group) + 1);
+                break;
+            case Node::Kind::Concat:
+                for (const Node& child : node.children) emit_node(child);
+                break;
+            case Node::Kind::Alternate: {
+                std::vector<uint32_t> exits;
+                for (size_t i = 0; i < node.children.size(); ++i) {
+                    if (i + 1 < node.children.size()) {
+                        const uint32_t split = emit(Regex::Op::Split);
+                        program[split].x = here();
+                        emit_node(node.children[i]);
+                        exits.push_back(emit(Regex::Op::Jump));
+                        program[split].y = here();
+                    } else {
+                        emit_node(node.children[i]);
+                    }
+                }
+                for (const uint32_t jump : exits) program[jump].x = here();
+                break;
+            }
+            case Node::Kind::Repeat:
+                emit_repeat(node);
+                break;
+        }
+    }
+
+    // Split preferring `body` (greedy) or `exit` (lazy).
+    void patch_split(uint32_t split, uint32_t body, uint32_t exit, bool greedy) {
+        auto& inst = regex_.program_[split];
+        inst.x = greedy ? body : exit;
+        inst.y = greedy ? exit : body;
+    }
+
+    void emit_repeat(const Node& node) {
+        const Node& child = node.children.front();
+        for (uint32_t i = 0; i < node.min; ++i) emit_node(child);
+        if (node.max == kUnbounded) {
+            const uint32_t split = emit(Regex::Op::Split);
+            emit_node(child);
+            emit(Regex::Op::Jump, split);
+            patch_split(split, split + 1, here(), node.greedy);
+            return;
+        }
+        std::vector<uint32_t> splits;
+        for (uint32_t i = node.min; i < node.max; ++i) {
+            splits.push_back(emit(Regex::Op::Split));
+            emit_node(child);
+        }
+        for (const uint32_t split : splits) patch_split(split, split + 1, here(), node.greedy);
+    }
+
+    // Which bytes can start a match, and whether one can be empty: walk the
+    // epsilon closure of the start, letting assertions through.
+    void analyze_start() {
+        const auto& program = regex_.program_;
+        std::vector<bool> seen(program.size(), false);
+        std::vector<uint32_t> stack{0};
+        std::array<bool, 256>& first = regex_.first_bytes_;
+        first.fill(false);
+        auto add_lead = [&](uint32_t cp) {
+            std::string bytes;
+            utf8_append(cp, bytes);
+            first[static_cast<unsigned char>(bytes[0])] = true;
+        };
+        bool empty = false;
+        while (!stack.empty()) {
+            const uint32_t pc = stack.back();
+            stack.pop_back();
+            if (seen[pc]) continue;
+            seen[pc] = true;
+            const Regex::Inst& inst = program[pc];
+            switch (inst.op) {
+                case Regex::Op::Jump:
+                    stack.push_back(inst.x);
+                    break;
+                case Regex::Op::Split:
+                    stack.push_back(inst.x);
+                    stack.push_back(inst.y);
+                    break;
+                case Regex::Op::Save:
+                case Regex::Op::Assert:
+                    stack.push_back(pc + 1);
+                    break;
+                case Regex::Op::Match:
+                    empty = true;
+                    break;
+                case Regex::Op::Char:
+                    add_lead(inst.x);
+                    break;
+                case Regex::Op::CharFold:
+                    for (const uint32_t variant : case_variants(inst.x)) add_lead(variant);
+                    break;
+                case Regex::Op::Any:
+                case Regex::Op::Class: {
+                    const Regex::CharClass* cls = inst.op == Regex::Op::Class ? &regex_.classes_[inst.x] : nullptr;
+                    for (uint32_t b = 0; b < 128; ++b) {
+                        first[b] = first[b] || (cls ? cls->contains(b) : b != '\n');
+                    }
+                    const bool wide = cls == nullptr || cls->negated || cls->named != 0 ||
+                                      (!cls->ranges.empty() && cls->ranges.back().second >= 0x80);
+                    // Lead bytes only: matches start on character boundaries.
+                    if (wide) {
+                        for (uint32_t b = 0xC0; b < 256; ++b) first[b] = true;
+                    }
+                    break;
+                }
+            }
+        }
+        regex_.can_match_empty_ = empty;
+        const size_t count = static_cast<size_t>(std::count(first.begin(), first.end(), true));
+        // A filter letting most bytes through costs more than it saves.
+        regex_.has_first_bytes_ = !empty && count <= 128;
+        if (!regex_.has_first_bytes_) first.fill(true);
+    }
+
+    Regex& regex_;
+    bool case_sensitive_;
+    std::vector<uint32_t> pattern_;
+    size_t pos_ = 0;
+    int groups_ = 0;
+    int nesting_ = 0;
+};
+
+Regex::Regex(const std::string& pattern, bool case_sensitive) {
+    RegexCompiler(*this, pattern, case_sensitive).compile();
+    if (has_first_bytes_) {
+        for (size_t b = 0; b < 256; ++b) {
+            if (first_bytes_[b] && first_list_.size() <= 2) first_list_.push_back(static_cast<unsigned char>(b));
+        }
+    }
+}
+
+int Regex::group_index(const std::string& name) const {
+    for (const auto& entry : names_) {
+        if (entry.first == name) return entry.second;
+    }
+    return -1;
+}
+
+RegexScanner::RegexScanner(const Regex& regex, const char* text, size_t size)
+    : regex_(regex), text_(text), size_(size), scratch_(regex.slot_count_, kNpos) {
+    const size_t count = regex.program_.size();
+    for (ThreadList* list : {&current_, &next_}) {
+        list->dense.assign(count, 0);
+        list->sparse.assign(count, 0);
+        list->slots.assign(count * regex.slot_count_, kNpos);
+    }
+}
+
+bool RegexScanner::next(size_t from, size_t end, std::vector<size_t>& groups, bool allow_empty_at_from) {
+    return run(from, end, false, allow_empty_at_from, groups);
+}
+
+bool RegexScanner::full_match(std::vector<size_t>& groups) { return run(0, size_, true, true, groups); }
+
+bool RegexScanner::check(Regex::Check kind, size_t at) const {
+    if (open_end_ && size_ - at < kOpenEndBytes && kind != Regex::Check::LineStart && kind != Regex::Check::TextStart) {
+        // Depends on text that is not loaded yet.
+        ran_out_ = true;
+        return false;
+    }
+    switch (kind) {
+        case Regex::Check::LineStart:
+            return at == 0 || text_[at - 1] == '\n';
+        case Regex::Check::LineEnd:
+            return at == size_ || text_[at] == '\n' || (text_[at] == '\r' && at + 1 < size_ && text_[at + 1] == '\n');
+        case Regex::Check::TextStart:
+            return at == 0;
+        case Regex::Check::TextEnd:
+            return at == size_;
+        case Regex::Check::WordBoundary:
+        case Regex::Check::NotWordBoundary: {
+            const bool before = at > 0 && is_word_char(utf8_code_point_before(text_, at));
+            uint32_t cp = 0;
+            const bool after = at < size_ && (utf8_decode(text_, size_, at, cp), is_word_char(cp));
+            return (before != after) == (kind == Regex::Check::WordBoundary);
+        }
+    }
+    return false;
+}
+
+size_t RegexScanner::skip_to_candidate(size_t at, size_t limit) const {
+    limit = std::min(limit, size_);
+    if (at >= limit) {
+        return limit;
+    }
+    const auto& list = regex_.first_list_;
+    if (list.size() == 1) {
+        const void* hit = std::memchr(text_ + at, list[0], limit - at);
+        return hit == nullptr ? limit : static_cast<size_t>(static_cast<const char*>(hit) - text_);
+    }
+    const std::array<bool, 256>& first = regex_.first_bytes_;
+    while (at < limit && !first[static_cast<unsigned char>(text_[at])]) ++at;
+    return at;
+}
+
+void RegexScanner::add_thread(ThreadList& list, uint32_t start, size_t at) {
+    const auto& program = regex_.program_;
+    const size_t slots = regex_.slot_count_;
+    stack_.clear();
+    stack_.push_back(Frame{false, start, 0});
+    while (!stack_.empty()) {
+        const Frame frame = stack_.back();
+        stack_.pop_back();
+        if (frame.restore) {
+            scratch_[frame.pc_or_slot] = frame.value;
+            continue;
+        }
+        uint32_t pc = frame.pc_or_slot;
+        while (!list.contains(pc)) {
+            list.insert(pc);
+            const Regex::Inst& inst = program[pc];
+            if (inst.op == Regex::Op::Jump) {
+                pc = inst.x;
+            } else if (inst.op == Regex::Op::Split) {
+                // The preferred branch is explored (and queued) first.
+                stack_.push_back(Frame{false, inst.y, 0});
+                pc = inst.x;
+            } else if (inst.op == Regex::Op::Save) {
+                stack_.push_back(Frame{true, inst.x, scratch_[inst.x]});
+                scratch_[inst.x] = at;
+                ++pc;
+            } else if (inst.op == Regex::Op::Assert) {
+                if (!check(static_cast<Regex::Check>(inst.x), at)) break;
+                ++pc;
+            } else {
+                std::copy(scratch_.begin(), scratch_.end(), list.slots.begin() + static_cast<ptrdiff_t>(pc * slots));
+                break;
+            }
+        }
+    }
+}
+
+bool RegexScanner::run(size_t from, size_t end, bool full, bool allow_empty_at_from, std::vector<size_t>& groups) {
+    const auto& program = regex_.program_;
+    const auto& classes = regex_.classes_;
+    const size_t slots = regex_.slot_count_;
+    // Matches may start at positions below `start_limit`.
+    const size_t start_limit = full ? from + 1 : (end >= size_ ? size_ + 1 : end);
+    current_.size = 0;
+    ran_out_ = false;
+    bool matched = false;
+    size_t at = from;
+    while (true) {
+        if (!matched && at < start_limit) {
+            if (current_.size == 0 && regex_.has_first_bytes_ && !full) {
+                at = skip_to_candidate(at, start_limit);
+                if (at >= std::min(start_limit, size_)) break;
+            }
+            std::fill(scratch_.begin(), scratch_.end(), kNpos);
+            add_thread(current_, 0, at);
+        }
+        if (current_.size == 0) {
+            break;
+        }
+        if (open_end_ && size_ - at < kOpenEndBytes) {
+            // A live thread needs the next character, which may be cut off.
+            ran_out_ = true;
+            return false;
+        }
+        if (ran_out_) {
+            return false;
+        }
+        uint32_t cp = 0;
+        const size_t length = at < size_ ? utf8_decode(text_, size_, at, cp) : 0;
+        next_.size = 0;
+        for (size_t i = 0; i < current_.size; ++i) {
+            const uint32_t pc = current_.dense[i];
+            const Regex::Inst& inst = program[pc];
+            const size_t* thread = current_.slots.data() + pc * slots;
+            bool step = false;
+            switch (inst.op) {
+                case Regex::Op::Match:
+                    if ((full && at != size_) || (!allow_empty_at_from && at == from && thread[0] == from)) continue;
+                    matched = true;
+                    groups.assign(thread, thread + slots);
+                    // Threads after this one have lower priority: drop them.
+                    i = current_.size;
+                    continue;
+                case Regex::Op::Char:
+                    step = length != 0 && cp == inst.x;
+                    break;
+                case Regex::Op::CharFold:
+                    step = length != 0 && fold_case(cp) == inst.x;
+                    break;
+                case Regex::Op::Any:
+                    step = length != 0 && cp != '\n';
+                    break;
+                case Regex::Op::Class:
+                    step = length != 0 && classes[inst.x].contains(cp);
+                    break;
+                default:
+                    break;
+            }
+            if (step) {
+                std::copy(thread, thread + slots, scratch_.begin());
+                add_thread(next_, pc + 1, at + length);
+            }
+        }
+        std::swap(current_, next_);
+        if (at >= size_) {
+            break;
+        }
+        at += length;
+    }
+    return matched;
+}
+
+RegexReplacement::RegexReplacement(const std::string& replacement, const Regex& regex) {
+    std::string literal;
+    auto flush = [&]() {
+        if (!literal.empty()) parts_.push_back(Part{-1, std::move(literal)});
+        literal.clear();
+    };
+    const int groups = static_cast<int>(regex.group_count());
+    for (size_t i = 0; i < replacement.size(); ++i) {
+        const char c = replacement[i];
+        if (c != '\\' || i + 1 == replacement.size()) {
+            literal.push_back(c);
+            continue;
+        }
+        const char e = replacement[++i];
+        int group = -1;
+        if (e >= '0' && e <= '9') {
+            group = e - '0';
+        } else if (e == 'g') {
+            const size_t close = replacement.find('>', i + 1);
+            if (i + 1 >= replacement.size() || replacement[i + 1] != '<' || close == std::string::npos) {
+                throw std::invalid_argument("missing group name in \\g<...>");
+            }
+            const std::string name = replacement.substr(i + 2, close - i - 2);
+            if (!name.empty() && std::all_of(name.begin(), name.end(), [](char d) { return d >= '0' && d <= '9'; })) {
+                group = name.size() > 4 ? groups + 1 : std::stoi(name);
+            } else {
+                group = regex.group_index(name);
+                if (group < 0) throw std::invalid_argument("unknown group name '" + name + "'");
+            }
+            i = close;
+        } else if (e == 'n') {
+            literal.push_back('\n');
+            continue;
+        } else if (e == 'r') {
+            literal.push_back('\r');
+            continue;
+        } else if (e == 't') {
+            literal.push_back('\t');
+            continue;
+        } else if (e == '\\') {
+            literal.push_back('\\');
+            continue;
+        } else if ((e >= 'a' && e <= 'z') || (e >= 'A' && e <= 'Z')) {
+            throw std::invalid_argument(std::string("bad escape \\") + e + " in replacement");
+        } else {
+            literal.push_back('\\');
+            literal.push_back(e);
+            continue;
+        }
+        if (group > groups) {
+            throw std::invalid_argument("invalid group reference " + std::to_string(group));
+        }
+        flush();
+        parts_.push_back(Part{group, {}});
+    }
+    flush();
+}
+
+void RegexReplacement::expand(const char* text, const std::vector<size_t>& groups, std::string& out) const {
+    for (const Part& part : parts_) {
+        if (part.group < 0) {
+            out += part.text;
+            continue;
+        }
+        const size_t begin = groups[2 * static_cast<size_t>(part.group)];
+        const size_t end = groups[2 * static_cast<size_t>(part.group) + 1];
+        if (begin != kNpos && end != kNpos) out.append(text + begin, end - begin);
+    }
+}
+
+}  // namespace lx::engine
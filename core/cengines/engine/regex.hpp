@@ -0,0 +1,153 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace lx::engine {
+
+// A regular expression run by a Pike VM: every candidate match advances in
+// lockstep over the text, one character at a time, so a search costs
+// O(text x pattern) whatever the pattern looks like. There is no
+// backtracking, and no pattern can hang a scan.
+//
+// Syntax (Python/PCRE flavoured, on UTF-8 code points): literals, `.`
+// (anything but '\n'), [...] classes with ranges and negation, \d (0-9),
+// \w (word characters as in whole-word search), \s and their negations,
+// ^ and $ (line start/end), \A and \z (text start/end), \b and \B, groups
+// (...), (?:...) and (?<name>...) / (?P<name>...), alternation, and the
+// quantifiers * + ? {n} {n,} {n,m} with lazy `?` forms. Backreferences
+// and lookaround are rejected: they cannot be matched in linear time.
+// Case-insensitive patterns compare fold_case() forms.
+class Regex {
+public:
+    // Throws std::invalid_argument naming the first syntax error.
+    Regex(const std::string& pattern, bool case_sensitive);
+
+    // Capture groups, not counting group 0 (the whole match).
+    size_t group_count() const { return slot_count_ / 2 - 1; }
+    // Number of the group called `name`, or -1.
+    int group_index(const std::string& name) const;
+    // Whether some match may be empty (e.g. `a*`, `^`).
+    bool can_match_empty() const { return can_match_empty_; }
+
+private:
+    friend class RegexCompiler;
+    friend class RegexScanner;
+
+    // Matching program; see regex.cpp.
+    enum class Op : uint8_t { Char, CharFold, Any, Class, Split, Jump, Save, Assert, Match };
+    enum class Check : uint8_t { LineStart, LineEnd, TextStart, TextEnd, WordBoundary, NotWordBoundary };
+    struct Inst {
+        Op op;
+        uint32_t x;  // code point, class index, jump target, slot or Check
+        uint32_t y;  // Split: the lower-priority target
+    };
+    struct CharClass {
+        std::vector<std::pair<uint32_t, uint32_t>> ranges;  // sorted, merged, inclusive
+        uint8_t named = 0;                                  // kClass* bits below
+        bool negated = false;
+        bool folded = false;  // test fold_case(cp); ranges hold folded forms too
+        std::array<uint64_t, 2> ascii{};
+
+        bool contains(uint32_t cp) const;
+    };
+    static constexpr uint8_t kClassDigit = 1, kClassNotDigit = 2, kClassWord = 4, kClassNotWord = 8, kClassSpace = 16,
+                             kClassNotSpace = 32;
+
+    std::vector<Inst> program_;
+    std::vector<CharClass> classes_;
+    std::vector<std::pair<std::string, int>> names_;
+    size_t slot_count_ = 2;
+    bool can_match_empty_ = false;
+    // Bytes a match can start with (lead bytes only); all true when unknown.
+    std::array<bool, 256> first_bytes_{};
+    bool has_first_bytes_ = false;
+    // The first few of those bytes, for a memchr scan when there is only one.
+    std::vector<unsigned char> first_list_;
+};
+
+// Runs one Regex over one text, keeping its scratch space between calls so
+// a scan for every match allocates only once. Not thread-safe; use one
+// scanner per thread.
+class RegexScanner {
+public:
+    // `text` must outlive the scanner.
+    RegexScanner(const Regex& regex, const char* text, size_t size);
+
+    // Leftmost-first match starting in [from, end) (at `size` too when
+    // end == size). It may run past `end`. On success `groups` holds
+    // 2 * (group_count() + 1) byte offsets, npos for groups that did not
+    // take part. Iterate like Python's re: after an empty match at p, look
+    // again from p with allow_empty_at_from = false.
+    bool next(size_t from, size_t end, std::vector<size_t>& groups, bool allow_empty_at_from = true);
+
+    // A match covering exactly text[0, size).
+    bool full_match(std::vector<size_t>& groups);
+
+    // For a window of a longer text: the text goes on past `size`. A scan
+    // that would need to look at or past the last few bytes then stops and
+    // sets ran_out() instead of treating them as the end; the caller loads
+    // a longer window and asks again.
+    void set_open_end(bool open) { open_end_ = open; }
+    bool ran_out() const { return ran_out_; }
+
+private:
+    struct ThreadList {
+        std::vector<uint32_t> dense;
+        std::vector<uint32_t> sparse;
+        std::vector<size_t> slots;  // slot_count per program counter
+        size_t size = 0;
+
+        bool contains(uint32_t pc) const { return sparse[pc] < size && dense[sparse[pc]] == pc; }
+        void insert(uint32_t pc) {
+            sparse[pc] = static_cast<uint32_t>(size);
+            dense[size++] = pc;
+        }
+    };
+    struct Frame {
+        bool restore;
+        uint32_t pc_or_slot;
+        size_t value;
+    };
+
+    bool run(size_t from, size_t end, bool full, bool allow_empty_at_from, std::vector<size_t>& groups);
+    void add_thread(ThreadList& list, uint32_t pc, size_t at);
+    bool check(Regex::Check kind, size_t at) const;
+    size_t skip_to_candidate(size_t at, size_t end) const;
+
+    const Regex& regex_;
+    const char* text_;
+    size_t size_;
+    bool open_end_ = false;
+    mutable bool ran_out_ = false;
+    ThreadList current_;
+    ThreadList next_;
+    std::vector<size_t> scratch_;
+    std::vector<Frame> stack_;
+};
+
+// A replacement template for regex Replace: \0-\9 and \g<n> / \g<name>
+// insert groups (empty if a group did not take part), \n \r \t \\ are
+// escapes, other backslashes stay as typed.
+class RegexReplacement {
+public:
+    // Throws std::invalid_argument for a bad group reference.
+    RegexReplacement(const std::string& replacement, const Regex& regex);
+
+    // Appends the expansion for a match of `text`.
+    void expand(const char* text, const std::vector<size_t>& groups, std::string& out) const;
+
+private:
+    // Literal text when group < 0, else that group.
+    struct Part {
+        int group;
+        std::string text;
+    };
+    std::vector<Part> parts_;
+};
+
+}  // namespace lx::engine
@@ -1,39 +1,53 @@
 #include "search.hpp"
 
 #include "logger.hpp"
-#include "text_utils.hpp"
+#include "unicode.hpp"
 
 #include <algorithm>
 #include <chrono>
-#include <cctype>
+#include <cstring>
 
 namespace lx::engine {
 namespace {
 
-inline char fold_char(char c, bool case_sensitive) {
-    if (case_sensitive) {
-        return c;
+// ASCII case folding through a table, for queries without non-ASCII letters.
+struct FoldTable {
+    std::array<unsigned char, 256> lower{};
+
+    FoldTable() {
+        for (int c = 0; c < 256; ++c) {
+            lower[c] = static_cast<unsigned char>(c >= 'A' && c <= 'Z' ? c - 'A' + 'a' : c);
+        }
     }
-    return static_cast<char>(std::tolower(static_cast<unsigned char>(c)));
-}
+};
 
+const FoldTable kFold;
+
+// No word character right before text[pos] or right after text[pos + len).
 inline bool is_word_match(const std::string& text, size_t pos, size_t len) {
-    if (pos > 0 && is_word_char(static_cast<unsigned char>(text[pos - 1]))) {
+    if (pos > 0 && is_word_char(utf8_code_point_before(text.data(), pos))) {
         return false;
     }
-    if (pos + len < text.size() && is_word_char(static_cast<unsigned char>(text[pos + len]))) {
-        return false;
+    if (pos + len < text.size()) {
+        uint32_t cp = 0;
+        utf8_decode(text.data(), text.size(), pos + len, cp);
+        if (is_word_char(cp)) {
+            return false;
+        }
     }
     return true;
 }
 
-inline bool matches_at(const std::string& text, const std::string& query, size_t pos, bool case_sensitive) {
-    for (size_t j = 0; j < query.size(); ++j) {
-        if (fold_char(text[pos + j], case_sensitive) != fold_char(query[j], case_sensitive)) {
-            return false;
+// Next match (whole-word filtered) starting in [from, end), or npos.
+inline size_t next_match(const Searcher& searcher, const std::string& text, bool whole_words, size_t from, size_t end) {
+    while (from < end) {
+        const size_t hit = searcher.find(text.data(), text.size(), from, end);
+        if (hit == std::string::npos || !whole_words || is_word_match(text, hit, searcher.size())) {
+            return hit;
         }
+        from = hit + 1;
     }
-    return true;
+    return std::string::npos;
 }
 
 inline int find_next_position_impl(
@@ -47,42 +61,197 @@ inline int find_next_position_impl(
         return -1;
     }
 
-    const size_t tlen = text.size();
-    const size_t qlen = query.size();
-    const size_t max_pos = tlen - qlen;
+    const size_t max_pos = text.size() - query.size();
     const size_t normalized_start = std::min(start_pos, max_pos + 1);
-    const char first_query = fold_char(query[0], case_sensitive);
+    const Searcher searcher(query, case_sensitive);
 
-    auto scan_range = [&](size_t begin, size_t end_exclusive) -> int {
-        if (begin >= end_exclusive) {
-            return -1;
-        }
+    const size_t direct = next_match(searcher, text, whole_words, normalized_start, max_pos + 1);
+    if (direct != std::string::npos || !wrap || normalized_start == 0) {
+        return direct == std::string::npos ? -1 : static_cast<int>(direct);
+    }
+    const size_t wrapped = next_match(searcher, text, whole_words, 0, normalized_start);
+    return wrapped == std::string::npos ? -1 : static_cast<int>(wrapped);
+}
 
-        for (size_t i = begin; i < end_exclusive; ++i) {
-            if (fold_char(text[i], case_sensitive) != first_query) {
-                continue;
-            }
-            if (!matches_at(text, query, i, case_sensitive)) {
-                continue;
+}  // namespace
+
+Searcher::Searcher(const std::string& query, bool case_sensitive)
+    : mode_(case_sensitive ? Mode::Exact : Mode::AsciiFold), needle_(case_sensitive ? query : fold_case_utf8(query)) {
+    shift_.fill(needle_.size());
+    if (mode_ == Mode::Exact) {
+        for (size_t j = 0; j < needle_.size(); ++j) allow(j, static_cast<unsigned char>(needle_[j]));
+        return;
+    }
+    std::string encoded;
+    for (size_t pos = 0; pos < needle_.size();) {
+        uint32_t cp = 0;
+        const size_t length = utf8_decode(needle_.data(), needle_.size(), pos, cp);
+        folded_.push_back(cp);
+        if (cp >= 0x80) mode_ = Mode::UnicodeFold;
+        if (cp >= kInvalidUtf8) {
+            allow(pos, static_cast<unsigned char>(needle_[pos]));
+        } else {
+            // Folding keeps UTF-8 lengths, so every variant covers the same bytes.
+            for (uint32_t variant : case_variants(cp)) {
+                encoded.clear();
+                utf8_append(variant, encoded);
+                for (size_t k = 0; k < length; ++k) allow(pos + k, static_cast<unsigned char>(encoded[k]));
             }
-            if (whole_words && !is_word_match(text, i, qlen)) {
-                continue;
+        }
+        pos += length;
+    }
+    if (mode_ == Mode::AsciiFold) folded_.clear();
+}
+
+void Searcher::allow(size_t index, unsigned char byte) {
+    // Horspool: how far the window may slide when its last byte is `byte`.
+    const size_t m = needle_.size();
+    if (index + 1 < m) {
+        shift_[byte] = std::min(shift_[byte], m - 1 - index);
+    } else {
+        tail_[byte] = true;
+    }
+    if (index == 0 && (first_count_ == 0 || first_[0] != byte) && (first_count_ < 2 || first_[1] != byte)) {
+        if (first_count_ < 2) first_[first_count_] = byte;
+        ++first_count_;
+    }
+}
+
+template <Searcher::Mode M>
+bool Searcher::matches_at(const char* text) const {
+    const size_t m = needle_.size();
+    if (M == Mode::Exact) {
+        return std::memcmp(text, needle_.data(), m) == 0;
+    }
+    if (M == Mode::AsciiFold) {
+        for (size_t j = 0; j < m; ++j) {
+            if (kFold.lower[static_cast<unsigned char>(text[j])] != static_cast<unsigned char>(needle_[j])) {
+                return false;
             }
-            return static_cast<int>(i);
         }
+        return true;
+    }
+    // Fold the text one UTF-8 character at a time; no decoding up front.
+    size_t at = 0;
+    for (uint32_t want : folded_) {
+        if (at >= m) {
+            return false;
+        }
+        uint32_t cp = 0;
+        at += utf8_decode(text, m, at, cp);
+        if (fold_case(cp) != want) {
+            return false;
+        }
+    }
+    return at == m;
+}
 
-        return -1;
-    };
+template <Searcher::Mode M>
+size_t Searcher::find_short(const char* text, size_t from, size_t last) const {
+    while (from < last) {
+        // memchr for each byte a match can start with, take the nearer.
+        const void* a = std::memchr(text + from, first_[0], last - from);
+        size_t hit = a == nullptr ? last : static_cast<size_t>(static_cast<const char*>(a) - text);
+        if (first_count_ == 2 && hit > from) {
+            const void* b = std::memchr(text + from, first_[1], hit - from);
+            if (b != nullptr) hit = static_cast<size_t>(static_cast<const char*>(b) - text);
+        }
+        if (hit >= last) {
+            return std::string::npos;
+        }
+        if (matches_at<M>(text + hit)) {
+            return hit;
+        }
+        from = hit + 1;
+    }
+    return std::string::npos;
+}
 
-    const int direct = scan_range(normalized_start, max_pos + 1);
-    if (direct >= 0 || !wrap || normalized_start == 0) {
-        return direct;
+template <Searcher::Mode M>
+size_t Searcher::find_horspool(const char* text, size_t from, size_t last) const {
+    const size_t m = needle_.size();
+    size_t pos = from;
+    while (pos < last) {
+        const unsigned char c = static_cast<unsigned char>(text[pos + m - 1]);
+        if (tail_[c] && matches_at<M>(text + pos)) {
+            return pos;
+        }
+        pos += shift_[c];
     }
+    return std::string::npos;
+}
 
-    return scan_range(0, normalized_start);
+template <Searcher::Mode M>
+size_t Searcher::find_in(const char* text, size_t from, size_t last) const {
+    if (needle_.size() < kHorspoolMinLength && first_count_ <= 2) {
+        return find_short<M>(text, from, last);
+    }
+    return find_horspool<M>(text, from, last);
 }
 
-}  // namespace
+size_t Searcher::find(const char* text, size_t size, size_t from, size_t end) const {
+    const size_t m = needle_.size();
+    if (m == 0 || m > size) {
+        return std::string::npos;
+    }
+    // Matches must fit in the text: `last` bounds their start.
+    const size_t last = std::min(end, size - m + 1);
+    if (from >= last) {
+        return std::string::npos;
+    }
+    switch (mode_) {
+        case Mode::Exact:
+            return find_in<Mode::Exact>(text, from, last);
+        case Mode::AsciiFold:
+            return find_in<Mode::AsciiFold>(text, from, last);
+        case Mode::UnicodeFold:
+            break;
+    }
+    return find_in<Mode::UnicodeFold>(text, from, last);
+}
+
+ForwardScanner::ForwardScanner(const std::string& text, const std::string& query, bool case_sensitive, bool whole_words)
+    : text_(text), searcher_(query, case_sensitive), whole_words_(whole_words) {}
+
+size_t ForwardScanner::occurrence(size_t from, size_t end) {
+    if (cached_end_ == end && cached_from_ <= from && from <= cached_) {
+        return cached_;
+    }
+    const size_t hit = searcher_.find(text_.data(), text_.size(), from, end);
+    cached_ = hit == std::string::npos ? end : hit;
+    cached_from_ = from;
+    cached_end_ = end;
+    return cached_;
+}
+
+size_t ForwardScanner::next(size_t from, size_t end) {
+    const size_t qlen = searcher_.size();
+    if (qlen == 0 || qlen > text_.size()) {
+        return std::string::npos;
+    }
+    end = std::min(end, text_.size() - qlen + 1);
+    while (from < end) {
+        const size_t hit = occurrence(from, end);
+        if (hit >= end) {
+            return std::string::npos;
+        }
+        if (!whole_words_ || is_word_match(text_, hit, qlen)) {
+            return hit;
+        }
+        from = hit + 1;
+    }
+    return std::string::npos;
+}
+
+size_t find_forward(
+    const std::string& text,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    size_t from,
+    size_t end) {
+    return ForwardScanner(text, query, case_sensitive, whole_words).next(from, end);
+}
 
 std::vector<int> find_all(const std::string& text, const std::string& query, bool case_sensitive, bool whole_words) {
     const auto start = std::chrono::high_resolution_clock::now();
@@ -92,28 +261,19 @@ std::vector<int> find_all(const std::string& text, const std::string& query, boo
         return positions;
     }
 
-    const size_t tlen = text.size();
-    const size_t qlen = query.size();
-    const char first_query = fold_char(query[0], case_sensitive);
-
-    for (size_t i = 0; i + qlen <= tlen; ++i) {
-        if (fold_char(text[i], case_sensitive) != first_query) {
-            continue;
-        }
-
-        if (!matches_at(text, query, i, case_sensitive)) {
-            continue;
-        }
-
-        if (whole_words && !is_word_match(text, i, qlen)) {
-            continue;
-        }
-
-        positions.push_back(static_cast<int>(i));
+    const Searcher searcher(query, case_sensitive);
+    const size_t end = text.size();
+    size_t pos = 0;
+    while (true) {
+        const size_t hit = next_match(searcher, text, whole_words, pos, end);
+        if (hit == std::string::npos) break;
+        positions.push_back(static_cast<int>(hit));
+        // Overlapping matches count, as before: resume one byte on.
+        pos = hit + 1;
     }
 
-    const auto end = std::chrono::high_resolution_clock::now();
-    const std::chrono::duration<double, std::milli> elapsed = end - start;
+    const auto finish = std::chrono::high_resolution_clock::now();
+    const std::chrono::duration<double, std::milli> elapsed = finish - start;
     log_to_py(
         "Found " + std::to_string(positions.size()) + " matches in " + std::to_string(elapsed.count()) + " ms",
         "SUCCESS");
@@ -146,30 +306,20 @@ std::string replace_all(
         return text;
     }
 
-    std::string result;
-    result.reserve(text.size());
-
-    const size_t tlen = text.size();
+    const Searcher searcher(query, case_sensitive);
     const size_t qlen = query.size();
-    const char first_query = fold_char(query[0], case_sensitive);
-
+    std::string result;
     size_t last_pos = 0;
-    size_t i = 0;
     size_t replacements = 0;
 
-    while (i + qlen <= tlen) {
-        if (fold_char(text[i], case_sensitive) == first_query &&
-            matches_at(text, query, i, case_sensitive) &&
-            (!whole_words || is_word_match(text, i, qlen))) {
-            result.append(text, last_pos, i - last_pos);
-            result.append(replacement);
-            last_pos = i + qlen;
-            i = last_pos;
-            ++replacements;
-            continue;
-        }
-
-        ++i;
+    while (true) {
+        const size_t hit = next_match(searcher, text, whole_words, last_pos, text.size());
+        if (hit == std::string::npos) break;
+        if (replacements == 0) result.reserve(text.size());
+        result.append(text, last_pos, hit - last_pos);
+        result.append(replacement);
+        last_pos = hit + qlen;
+        ++replacements;
     }
 
     if (replacements == 0) {
@@ -1,10 +1,90 @@
 #pragma once
 
+#include <array>
+#include <cstddef>
+#include <cstdint>
 #include <string>
 #include <vector>
 
 namespace lx::engine {
 
+// A query prepared once for repeated scans. The strategy follows the query:
+// memchr on the first byte (every case variant of it when folding) plus a
+// compare for short needles, Horspool skipping for longer ones.
+// Case-insensitive search uses Unicode simple case folding straight on the
+// UTF-8 bytes; an ASCII query folds through a 256-entry table. A match is
+// always size() bytes long. Finds raw occurrences; whole-word checks are the
+// caller's.
+class Searcher {
+public:
+    Searcher(const std::string& query, bool case_sensitive);
+
+    size_t size() const { return needle_.size(); }
+
+    // First occurrence in text[0, size) starting in [from, end), or npos.
+    size_t find(const char* text, size_t size, size_t from, size_t end) const;
+
+private:
+    enum class Mode { Exact, AsciiFold, UnicodeFold };
+
+    // Below this length skipping cannot beat memchr.
+    static constexpr size_t kHorspoolMinLength = 4;
+
+    // `byte` may appear at needle position `index` in some match.
+    void allow(size_t index, unsigned char byte);
+
+    template <Mode M>
+    bool matches_at(const char* text) const;
+    template <Mode M>
+    size_t find_in(const char* text, size_t from, size_t last) const;
+    template <Mode M>
+    size_t find_short(const char* text, size_t from, size_t last) const;
+    template <Mode M>
+    size_t find_horspool(const char* text, size_t from, size_t last) const;
+
+    Mode mode_;
+    std::string needle_;             // folded unless Mode::Exact
+    std::vector<uint32_t> folded_;   // needle_'s code points, Mode::UnicodeFold only
+    unsigned char first_[2] = {0, 0};
+    size_t first_count_ = 0;         // distinct bytes a match can start with
+    std::array<bool, 256> tail_{};   // bytes a match can end with
+    std::array<size_t, 256> shift_{};
+};
+
+// Incremental forward matcher for scanning a text match after match.
+// Remembers where the query occurs next, so repeated next() calls over one
+// range stay linear overall.
+class ForwardScanner {
+public:
+    ForwardScanner(const std::string& text, const std::string& query, bool case_sensitive, bool whole_words);
+
+    // First match starting in [from, end) or std::string::npos.
+    size_t next(size_t from, size_t end);
+
+private:
+    size_t occurrence(size_t from, size_t end);
+
+    const std::string& text_;
+    Searcher searcher_;
+    bool whole_words_;
+    // Last occurrence found for [cached_from_, cached_end_): still valid for
+    // any later `from` up to it, so a needle that never occurs is not
+    // rescanned on every call.
+    size_t cached_ = 0;
+    size_t cached_from_ = 1;
+    size_t cached_end_ = 0;
+};
+
+// First match starting in [from, end) or std::string::npos. Works on 64-bit
+// offsets so it can walk multi-GB buffers window by window.
+size_t find_forward(
+    const std::string& text,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    size_t from,
+    size_t end);
+
 std::vector<int> find_all(const std::string& text, const std::string& query, bool case_sensitive, bool whole_words);
 int find_next_position(
     const std::string& text,
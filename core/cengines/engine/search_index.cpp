@@ -0,0 +1,225 @@
+#include "search_index.hpp"
+
+#include <algorithm>
+#include <cctype>
+#include <cstring>
+
+#include "unicode.hpp"
+
+namespace lx::engine {
+
+namespace {
+
+uint32_t bucket_of(const unsigned char* p) {
+    const uint32_t trigram = static_cast<uint32_t>(p[0]) | (static_cast<uint32_t>(p[1]) << 8) |
+                             (static_cast<uint32_t>(p[2]) << 16);
+    return (trigram * 0x9E3779B1u) >> (32 - 18);
+}
+
+static_assert(SearchIndex::kBuckets == (1u << 18), "bucket_of() hashes into 18 bits");
+
+}  // namespace
+
+std::string fold_for_index(const std::string& text) {
+    std::string folded(text);
+    std::string encoded;
+    for (size_t pos = 0; pos < folded.size();) {
+        const unsigned char c = static_cast<unsigned char>(folded[pos]);
+        if (c < 0x80) {
+            if (c >= 'A' && c <= 'Z') folded[pos] = static_cast<char>(c + ('a' - 'A'));
+            ++pos;
+            continue;
+        }
+        uint32_t cp = 0;
+        const size_t length = utf8_decode(text.data(), text.size(), pos, cp);
+        if (cp < kInvalidUtf8) {
+            const uint32_t fold = fold_case(cp);
+            if (fold != cp) {
+                encoded.clear();
+                utf8_append(fold, encoded);
+                folded.replace(pos, length, encoded);
+            }
+        }
+        pos += length;
+    }
+    return folded;
+}
+
+std::string regex_literal_prefix(const std::string& pattern) {
+    // With alternation a match may start with any branch.
+    for (size_t i = 0; i < pattern.size(); ++i) {
+        if (pattern[i] == '\\') {
+            ++i;
+        } else if (pattern[i] == '|') {
+            return "";
+        }
+    }
+    size_t pos = !pattern.empty() && pattern[0] == '^' ? 1 : 0;
+    std::string literal;
+    while (pos < pattern.size()) {
+        const unsigned char c = static_cast<unsigned char>(pattern[pos]);
+        const size_t char_start = literal.size();
+        if (c == 0 || std::strchr(".[](){}*+?^$|", c) != nullptr) break;
+        if (c == '\\') {
+            // Only escaped punctuation is a plain character (\d, \n, \x41 are not taken).
+            const unsigned char escaped = pos + 1 < pattern.size() ? static_cast<unsigned char>(pattern[pos + 1]) : 0;
+            if (escaped == 0 || escaped >= 0x80 || std::isalnum(escaped) != 0) break;
+            literal.push_back(static_cast<char>(escaped));
+            pos += 2;
+        } else {
+            uint32_t cp = 0;
+            const size_t length = utf8_decode(pattern.data(), pattern.size(), pos, cp);
+            literal.append(pattern, pos, length);
+            pos += length;
+        }
+        if (pos < pattern.size()) {
+            const char next = pattern[pos];
+            if (next == '*' || next == '?' || next == '{') {
+                // The character may be absent (or is counted): the literal ends before it.
+                literal.resize(char_start);
+                break;
+            }
+            if (next == '+') break;
+        }
+    }
+    return literal;
+}
+
+bool SearchIndex::build(uint64_t size, const Reader& read, uint64_t memory_cap, const std::atomic<bool>& cancel,
+                        std::atomic<uint64_t>& progress, std::string& error) {
+    size_ = size;
+    block_bytes_ = kMinBlockBytes;
+    postings_.assign(kBuckets, {});
+    block_lines_.clear();
+    posting_bytes_ = 0;
+
+    uint64_t line = 1;
+    std::string window;
+    for (uint64_t begin = 0; begin < size; begin += kMinBlockBytes) {
+        if (cancel.load(std::memory_order_relaxed)) {
+            return false;
+        }
+        const size_t count = static_cast<size_t>(std::min<uint64_t>(kMinBlockBytes, size - begin));
+        // The overlap, two more bytes for its last trigram and up to three to
+        // finish a character cut off there (so it folds like in the text).
+        read(begin, count + kOverlapBytes + 2 + 3, window);
+        if (begin % block_bytes_ == 0) {
+            block_lines_.push_back(line);
+        }
+        const std::string folded = fold_for_index(window);
+        add_slice(begin, folded, std::min(count + kOverlapBytes, folded.size() < 3 ? 0 : folded.size() - 2));
+        line += static_cast<uint64_t>(std::count(window.data(), window.data() + std::min(count, window.size()), '\n'));
+        progress.store(begin + count);
+
+        while (memory_bytes() > memory_cap) {
+            if (block_bytes_ * 2 > kMaxBlockBytes) {
+                error = "search index does not fit in " + std::to_string(memory_cap / (1024 * 1024)) + " MB";
+                postings_.clear();
+                postings_.shrink_to_fit();
+                block_lines_.clear();
+                return false;
+            }
+            coarsen();
+        }
+    }
+    posting_bytes_ = 0;
+    for (auto& list : postings_) {
+        list.shrink_to_fit();
+        posting_bytes_ += list.capacity() * sizeof(uint32_t);
+    }
+    block_lines_.shrink_to_fit();
+    std::vector<uint64_t>().swap(seen_);
+    std::vector<uint32_t>().swap(touched_);
+    progress.store(size);
+    return true;
+}
+
+void SearchIndex::add_slice(uint64_t begin, const std::string& folded, size_t count) {
+    const uint32_t block = static_cast<uint32_t>(begin / block_bytes_);
+    const auto* data = reinterpret_cast<const unsigned char*>(folded.data());
+    // Collect the slice's distinct buckets in a small bitmap first: touching
+    // each posting list once per slice, not once per byte, keeps the build
+    // out of cache misses.
+    seen_.resize(kBuckets / 64);
+    touched_.clear();
+    for (size_t i = 0; i < count; ++i) {
+        const uint32_t bucket = bucket_of(data + i);
+        uint64_t& word = seen_[bucket / 64];
+        const uint64_t bit = uint64_t{1} << (bucket % 64);
+        if ((word & bit) == 0) {
+            word |= bit;
+            touched_.push_back(bucket);
+        }
+    }
+    for (const uint32_t bucket : touched_) {
+        seen_[bucket / 64] = 0;
+        std::vector<uint32_t>& list = postings_[bucket];
+        // Blocks arrive in order, so a repeat is always the last entry.
+        if (!list.empty() && list.back() == block) continue;
+        const size_t capacity = list.capacity();
+        list.push_back(block);
+        posting_bytes_ += (list.capacity() - capacity) * sizeof(uint32_t);
+    }
+}
+
+void SearchIndex::coarsen() {
+    posting_bytes_ = 0;
+    for (auto& list : postings_) {
+        size_t kept = 0;
+        for (const uint32_t block : list) {
+            const uint32_t merged = block / 2;
+            if (kept == 0 || list[kept - 1] != merged) list[kept++] = merged;
+        }
+        list.resize(kept);
+        list.shrink_to_fit();
+        posting_bytes_ += list.capacity() * sizeof(uint32_t);
+    }
+    size_t kept = 0;
+    for (size_t i = 0; i < block_lines_.size(); i += 2) {
+        block_lines_[kept++] = block_lines_[i];
+    }
+    block_lines_.resize(kept);
+    block_bytes_ *= 2;
+}
+
+size_t SearchIndex::memory_bytes() const {
+    return posting_bytes_ + postings_.capacity() * sizeof(std::vector<uint32_t>) +
+           block_lines_.capacity() * sizeof(uint64_t);
+}
+
+bool SearchIndex::candidates(const std::string& literal, std::vector<Range>& out) const {
+    out.clear();
+    const std::string folded = fold_for_index(literal);
+    if (folded.size() < 3 || postings_.empty()) {
+        return false;
+    }
+    std::vector<const std::vector<uint32_t>*> lists;
+    const auto* data = reinterpret_cast<const unsigned char*>(folded.data());
+    const size_t last = std::min(folded.size() - 3, kOverlapBytes);
+    for (size_t i = 0; i <= last; ++i) {
+        const std::vector<uint32_t>* list = &postings_[bucket_of(data + i)];
+        if (std::find(lists.begin(), lists.end(), list) == lists.end()) lists.push_back(list);
+    }
+    // Shortest first: the running intersection only shrinks.
+    std::sort(lists.begin(), lists.end(), [](const auto* a, const auto* b) { return a->size() < b->size(); });
+    std::vector<uint32_t> blocks(*lists.front());
+    std::vector<uint32_t> narrowed;
+    for (size_t i = 1; i < lists.size() && !blocks.empty(); ++i) {
+        narrowed.clear();
+        std::set_intersection(blocks.begin(), blocks.end(), lists[i]->begin(), lists[i]->end(),
+                              std::back_inserter(narrowed));
+        blocks.swap(narrowed);
+    }
+    for (const uint32_t block : blocks) {
+        const uint64_t begin = static_cast<uint64_t>(block) * block_bytes_;
+        const uint64_t end = std::min<uint64_t>(size_, begin + block_bytes_);
+        if (!out.empty() && out.back().end == begin) {
+            out.back().end = end;
+        } else {
+            out.push_back(Range{begin, end, block_lines_[block]});
+        }
+    }
+    return true;
+}
+
+}  // namespace lx::engine
@@ -0,0 +1,87 @@
+#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <string>
+#include <vector>
+
+namespace lx::engine {
+
+// Trigram index over a read-only text, for buffers searched again and again.
+// The text is split into blocks and every trigram of its case-folded bytes
+// gets a posting list of the blocks it occurs in (hashed into kBuckets
+// lists, so a list may also name blocks of other trigrams). A query can only
+// start a match in a block that holds all of its leading trigrams, so a
+// search scans just those blocks instead of the whole text.
+//
+// Each block also indexes the trigrams that start up to kOverlapBytes past
+// its end: a match starting near the end of a block is still found through
+// that block alone. Queries therefore use only trigrams starting in their
+// first kOverlapBytes + 1 bytes.
+//
+// Blocks start at kMinBlockBytes; whenever the postings outgrow the memory
+// cap the block size doubles and neighbouring lists merge, so the index
+// trades precision for size instead of failing. Immutable after build();
+// queries are thread-safe.
+class SearchIndex {
+public:
+    static constexpr size_t kBuckets = 1u << 18;
+    static constexpr size_t kMinBlockBytes = 64u * 1024u;
+    // Past this block size the index filters too little to be worth keeping.
+    static constexpr size_t kMaxBlockBytes = 64u * 1024u * 1024u;
+    static constexpr size_t kOverlapBytes = 64;
+
+    // Replaces `out` with text bytes [offset, offset + length), clamped to the text.
+    using Reader = std::function<void(uint64_t offset, uint64_t length, std::string& out)>;
+
+    // A byte range a match may start in, with the 1-based line it starts on.
+    struct Range {
+        uint64_t begin;
+        uint64_t end;
+        uint64_t line;
+    };
+
+    // Indexes text[0, size) read through `read`, reporting the bytes done in
+    // `progress`. Returns false if `cancel` is raised or the index cannot fit
+    // in `memory_cap` bytes (then `error` says so).
+    bool build(uint64_t size, const Reader& read, uint64_t memory_cap, const std::atomic<bool>& cancel,
+               std::atomic<uint64_t>& progress, std::string& error);
+
+    uint64_t size() const { return size_; }
+    size_t block_bytes() const { return block_bytes_; }
+    size_t memory_bytes() const;
+
+    // Ranges where a match of `literal` (a query prefix every match starts
+    // with, compared case-folded) may start, in text order; adjacent blocks
+    // are merged. False if the literal is too short to filter anything.
+    bool candidates(const std::string& literal, std::vector<Range>& out) const;
+
+private:
+    void add_slice(uint64_t begin, const std::string& folded, size_t count);
+    // Halves the block count: block b becomes b / 2 in every list.
+    void coarsen();
+
+    uint64_t size_ = 0;
+    size_t block_bytes_ = kMinBlockBytes;
+    std::vector<std::vector<uint32_t>> postings_;
+    // 1-based line at the start of every block.
+    std::vector<uint64_t> block_lines_;
+    size_t posting_bytes_ = 0;
+    // Build scratch: buckets seen in the current slice.
+    std::vector<uint64_t> seen_;
+    std::vector<uint32_t> touched_;
+};
+
+// `text` case-folded for the index: ASCII letters lowered in place, the rest as
+// fold_case_utf8 does it (same length in bytes).
+std::string fold_for_index(const std::string& text);
+
+// The literal every match of `pattern` (engine regex syntax) starts with,
+// or "" if there is none worth using: the leading run of plain characters
+// after an optional '^', without a last character made optional by a
+// quantifier. Patterns with alternation give none.
+std::string regex_literal_prefix(const std::string& pattern);
+
+}  // namespace lx::engine
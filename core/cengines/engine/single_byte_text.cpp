@@ -0,0 +1,79 @@
+#include "single_byte_text.hpp"
+
+#include <algorithm>
+#include <stdexcept>
+
+namespace lx::engine {
+
+SingleByteText::SingleByteText(std::string raw, const std::vector<int32_t>& code_points) : raw_(std::move(raw)) {
+    if (code_points.size() != 256) {
+        throw std::invalid_argument("single-byte table needs 256 entries");
+    }
+    for (size_t b = 0; b < 256; ++b) {
+        const int32_t cp = code_points[b];
+        if (cp < 0) continue;  // undefined: width stays 0
+        if ((b < 0x80 && cp != static_cast<int32_t>(b)) || cp > 0xFFFF || (cp >= 0xD800 && cp <= 0xDFFF)) {
+            throw std::invalid_argument("single-byte table must be ASCII-compatible and map into the BMP");
+        }
+        auto& bytes = utf8_[b];
+        if (cp < 0x80) {
+            bytes[0] = static_cast<char>(cp);
+            width_[b] = 1;
+        } else if (cp < 0x800) {
+            bytes[0] = static_cast<char>(0xC0 | (cp >> 6));
+            bytes[1] = static_cast<char>(0x80 | (cp & 0x3F));
+            width_[b] = 2;
+        } else {
+            bytes[0] = static_cast<char>(0xE0 | (cp >> 12));
+            bytes[1] = static_cast<char>(0x80 | ((cp >> 6) & 0x3F));
+            bytes[2] = static_cast<char>(0x80 | (cp & 0x3F));
+            width_[b] = 3;
+        }
+    }
+    // One pass validates the bytes and sizes the UTF-8 text.
+    uint64_t size = 0;
+    for (size_t i = 0; i < raw_.size(); ++i) {
+        const uint8_t w = width(raw_[i]);
+        if (w == 0) {
+            throw std::invalid_argument("byte " + std::to_string(static_cast<unsigned char>(raw_[i])) +
+                                        " at offset " + std::to_string(i) + " is undefined in this encoding");
+        }
+        size += w;
+    }
+    utf8_size_ = size;
+}
+
+void SingleByteText::decode(size_t begin, size_t end, std::string& out) const {
+    end = std::min(end, raw_.size());
+    if (begin >= end) return;
+    size_t pos = out.size();
+    out.resize(pos + static_cast<size_t>(utf8_length(begin, end)));
+    for (size_t i = begin; i < end; ++i) {
+        const unsigned char b = static_cast<unsigned char>(raw_[i]);
+        if (b < 0x80) {
+            out[pos++] = static_cast<char>(b);
+            continue;
+        }
+        const auto& bytes = utf8_[b];
+        for (uint8_t k = 0; k < width_[b]; ++k) out[pos++] = bytes[k];
+    }
+}
+
+std::pair<size_t, uint64_t> SingleByteText::seek(size_t raw_pos, uint64_t utf8_pos, uint64_t target) const {
+    while (raw_pos < raw_.size()) {
+        const uint8_t w = width(raw_[raw_pos]);
+        if (utf8_pos + w > target) break;
+        utf8_pos += w;
+        ++raw_pos;
+    }
+    return {raw_pos, utf8_pos};
+}
+
+uint64_t SingleByteText::utf8_length(size_t begin, size_t end) const {
+    end = std::min(end, raw_.size());
+    uint64_t length = 0;
+    for (size_t i = begin; i < end; ++i) length += width(raw_[i]);
+    return length;
+}
+
+}  // namespace lx::engine
@@ -0,0 +1,46 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace lx::engine {
+
+// A text kept in a single-byte legacy encoding (cp1250, ISO-8859-2,
+// Latin-1, ...) and decoded to UTF-8 only where it is read. Raw byte i is
+// code point i, so UTF-8 positions follow from a per-byte width table.
+class SingleByteText {
+public:
+    // `code_points[b]` is the BMP code point byte b decodes to, or -1 if the
+    // encoding leaves it undefined; bytes below 0x80 must map to themselves.
+    // Throws std::invalid_argument for a bad table or a text using a byte
+    // the encoding does not define.
+    SingleByteText(std::string raw, const std::vector<int32_t>& code_points);
+
+    const std::string& raw() const { return raw_; }
+    uint64_t utf8_size() const { return utf8_size_; }
+    const uint8_t* widths() const { return width_.data(); }
+    uint8_t width(char byte) const { return width_[static_cast<unsigned char>(byte)]; }
+
+    // Appends the UTF-8 for raw bytes [begin, end).
+    void decode(size_t begin, size_t end, std::string& out) const;
+
+    // Walks forward from the character at raw `raw_pos` (UTF-8 offset
+    // `utf8_pos`) to the one holding UTF-8 offset `target`; returns its raw
+    // index and UTF-8 start (the text end if `target` is past it).
+    std::pair<size_t, uint64_t> seek(size_t raw_pos, uint64_t utf8_pos, uint64_t target) const;
+
+    // UTF-8 bytes of raw bytes [begin, end).
+    uint64_t utf8_length(size_t begin, size_t end) const;
+
+private:
+    std::string raw_;
+    uint64_t utf8_size_ = 0;
+    std::array<uint8_t, 256> width_{};
+    std::array<std::array<char, 3>, 256> utf8_{};
+};
+
+}  // namespace lx::engine
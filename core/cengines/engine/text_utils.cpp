@@ -1,19 +1,11 @@
 #include "text_utils.hpp"
 
 #include <algorithm>
-#include <cctype>
 
 namespace lx::engine {
 
 bool is_utf8_boundary(unsigned char c) { return (c & 0xC0) != 0x80; }
 
-bool is_word_char(unsigned char c) {
-    if (c > 127) {
-        return true;
-    }
-    return std::isalnum(c) || c == '_';
-}
-
 int get_line_offset(const std::string& text, int line_number) {
     if (line_number <= 1) {
         return 0;
@@ -0,0 +1,135 @@
+#include "unicode.hpp"
+
+#include "unicode_tables.hpp"
+
+#include <algorithm>
+#include <iterator>
+
+namespace lx::engine {
+namespace {
+
+inline bool is_continuation(unsigned char c) { return (c & 0xC0) == 0x80; }
+
+inline bool is_ascii_word_char(uint32_t cp) {
+    return (cp >= '0' && cp <= '9') || (cp >= 'A' && cp <= 'Z') || (cp >= 'a' && cp <= 'z') || cp == '_';
+}
+
+}  // namespace
+
+size_t utf8_decode(const char* text, size_t size, size_t pos, uint32_t& cp) {
+    const unsigned char lead = static_cast<unsigned char>(text[pos]);
+    if (lead < 0x80) {
+        cp = lead;
+        return 1;
+    }
+    size_t length = 0;
+    uint32_t value = 0;
+    if (lead >= 0xC2 && lead <= 0xDF) {
+        length = 2;
+        value = lead & 0x1F;
+    } else if (lead >= 0xE0 && lead <= 0xEF) {
+        length = 3;
+        value = lead & 0x0F;
+    } else if (lead >= 0xF0 && lead <= 0xF4) {
+        length = 4;
+        value = lead & 0x07;
+    }
+    if (length == 0 || pos + length > size) {
+        cp = kInvalidUtf8 + lead;
+        return 1;
+    }
+    for (size_t k = 1; k < length; ++k) {
+        const unsigned char c = static_cast<unsigned char>(text[pos + k]);
+        if (!is_continuation(c)) {
+            cp = kInvalidUtf8 + lead;
+            return 1;
+        }
+        value = (value << 6) | (c & 0x3F);
+    }
+    cp = value;
+    return length;
+}
+
+uint32_t utf8_code_point_before(const char* text, size_t pos) {
+    const unsigned char last = static_cast<unsigned char>(text[pos - 1]);
+    if (last < 0x80) {
+        return last;
+    }
+    size_t lead = pos - 1;
+    while (lead > 0 && pos - lead < 4 && is_continuation(static_cast<unsigned char>(text[lead]))) --lead;
+    uint32_t cp = 0;
+    if (utf8_decode(text, pos, lead, cp) != pos - lead) {
+        return kInvalidUtf8 + last;
+    }
+    return cp;
+}
+
+void utf8_append(uint32_t cp, std::string& out) {
+    if (cp < 0x80) {
+        out.push_back(static_cast<char>(cp));
+    } else if (cp < 0x800) {
+        out.push_back(static_cast<char>(0xC0 | (cp >> 6)));
+        out.push_back(static_cast<char>(0x80 | (cp & 0x3F)));
+    } else if (cp < 0x10000) {
+        out.push_back(static_cast<char>(0xE0 | (cp >> 12)));
+        out.push_back(static_cast<char>(0x80 | ((cp >> 6) & 0x3F)));
+        out.push_back(static_cast<char>(0x80 | (cp & 0x3F)));
+    } else {
+        out.push_back(static_cast<char>(0xF0 | (cp >> 18)));
+        out.push_back(static_cast<char>(0x80 | ((cp >> 12) & 0x3F)));
+        out.push_back(static_cast<char>(0x80 | ((cp >> 6) & 0x3F)));
+        out.push_back(static_cast<char>(0x80 | (cp & 0x3F)));
+    }
+}
+
+uint32_t fold_case(uint32_t cp) {
+    if (cp < 0x80) {
+        return cp >= 'A' && cp <= 'Z' ? cp + ('a' - 'A') : cp;
+    }
+    const auto* begin = std::begin(unicode::kCaseFold);
+    const auto* end = std::end(unicode::kCaseFold);
+    const auto* it = std::lower_bound(
+        begin, end, cp, [](const unicode::CaseFoldEntry& entry, uint32_t value) { return entry.from < value; });
+    return it != end && it->from == cp ? it->to : cp;
+}
+
+std::vector<uint32_t> case_variants(uint32_t folded) {
+    std::vector<uint32_t> variants{folded};
+    if (folded < 0x80) {
+        if (folded >= 'a' && folded <= 'z') variants.push_back(folded - ('a' - 'A'));
+        return variants;
+    }
+    for (const unicode::CaseFoldEntry& entry : unicode::kCaseFold) {
+        if (entry.to == folded) variants.push_back(entry.from);
+    }
+    return variants;
+}
+
+std::string fold_case_utf8(const std::string& text) {
+    std::string folded;
+    folded.reserve(text.size());
+    for (size_t pos = 0; pos < text.size();) {
+        uint32_t cp = 0;
+        const size_t length = utf8_decode(text.data(), text.size(), pos, cp);
+        if (cp >= kInvalidUtf8) {
+            folded.push_back(text[pos]);
+        } else {
+            utf8_append(fold_case(cp), folded);
+        }
+        pos += length;
+    }
+    return folded;
+}
+
+bool is_word_char(uint32_t cp) {
+    if (cp < 0x80) {
+        return is_ascii_word_char(cp);
+    }
+    const auto* begin = std::begin(unicode::kWordRanges);
+    const auto* end = std::end(unicode::kWordRanges);
+    const auto* it = std::upper_bound(
+        begin, end, cp, [](uint32_t value, const unicode::CodePointRange& range) { return value < range.first; });
+    return it != begin && cp <= std::prev(it)->last;
+}
+
+}  // namespace lx::engine
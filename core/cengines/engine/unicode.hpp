@@ -0,0 +1,37 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+namespace lx::engine {
+
+// What a byte that does not start a valid UTF-8 sequence decodes to: the
+// byte value above U+10FFFF, so it never equals or folds to a real character.
+constexpr uint32_t kInvalidUtf8 = 0x110000;
+
+// Decodes the character at text[pos] (pos < size) into `cp` and returns its
+// length in bytes; an invalid or truncated sequence is one byte long.
+size_t utf8_decode(const char* text, size_t size, size_t pos, uint32_t& cp);
+
+// Code point of the character that ends right before text[pos] (pos > 0).
+uint32_t utf8_code_point_before(const char* text, size_t pos);
+
+void utf8_append(uint32_t cp, std::string& out);
+
+// Unicode simple case folding, restricted to pairs of equal UTF-8 length
+// (see scripts/gen_unicode_tables.py), so folding never changes byte offsets.
+uint32_t fold_case(uint32_t cp);
+
+// Every code point that folds to `folded`, starting with `folded` itself.
+std::vector<uint32_t> case_variants(uint32_t folded);
+
+// `text` with each character folded; same length in bytes.
+std::string fold_case_utf8(const std::string& text);
+
+// Word characters for whole-word search: letters, numbers, combining marks
+// and connector punctuation such as '_'.
+bool is_word_char(uint32_t cp);
+
+}  // namespace lx::engine
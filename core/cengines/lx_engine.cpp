@@ -4,30 +4,282 @@
 #include <pybind11/pytypes.h>
 
 #include <algorithm>
+#include <array>
 #include <atomic>
 #include <cctype>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <limits>
+#include <memory>
 #include <mutex>
+#include <shared_mutex>
 #include <string>
+#include <thread>
+#include <tuple>
 #include <unordered_map>
+#include <utility>
 #include <vector>
 
+#include "engine/block_store.hpp"
+#include "engine/display_rows.hpp"
 #include "engine/io_codec.hpp"
+#include "engine/line_index.hpp"
 #include "engine/logger.hpp"
+#include "engine/offset_map.hpp"
+#include "engine/overview.hpp"
+#include "engine/piece_table.hpp"
+#include "engine/regex.hpp"
 #include "engine/search.hpp"
+#include "engine/search_index.hpp"
+#include "engine/single_byte_text.hpp"
 #include "engine/stats.hpp"
 #include "engine/text_utils.hpp"
+#include "engine/unicode.hpp"
 
 namespace py = pybind11;
 
 namespace {
+int64_t steady_now_ms() {
+    return std::chrono::duration_cast<std::chrono::milliseconds>(
+               std::chrono::steady_clock::now().time_since_epoch())
+        .count();
+}
+
+// A buffer's text never changes after creation, so any thread holding a
+// TextBufferPtr can read it without registry locks; only the indexes below
+// grow, under their own locks.
+//
+// The text is held flat ("resident") while in use. A large buffer left idle
+// (or asked to via compress_text_buffer) goes cold: its text is kept only as
+// compressed blocks, viewport reads inflate just the blocks they touch and
+// whole-text work (search, editing) makes it resident again. Read it through
+// read() / byte_at() / resident(), never by holding on to `resident_text`.
+//
+// A buffer over a single-byte legacy encoding keeps the raw bytes instead
+// (`single_byte`) and starts out not resident: reads decode just their range,
+// and going cold only drops the decoded copy. All offsets stay UTF-8 bytes.
 struct TextBuffer {
-    std::string text;
-    std::vector<int> line_offsets;
+    explicit TextBuffer(std::string value)
+        : size(value.size()), resident_text(std::make_shared<const std::string>(std::move(value))) {
+        touch();
+    }
+    explicit TextBuffer(std::shared_ptr<const lx::engine::SingleByteText> source)
+        : size(source->utf8_size()), single_byte(std::move(source)) {
+        touch();
+    }
+
+    const uint64_t size;
+    const std::shared_ptr<const lx::engine::SingleByteText> single_byte;
+    lx::engine::LineIndex line_index;
+    // Byte <-> code point <-> UTF-16 checkpoints, filled by the same indexer
+    // pass under its own lock so line reads never wait on it.
+    lx::engine::OffsetMap offset_map;
+    std::shared_mutex offset_mutex;
+
+    // Background indexing state. `line_index` is appended to in batches under
+    // `index_mutex`; readers take it shared. `indexed_lines` mirrors
+    // line_index.size() so waiters can check the frontier without the lock.
+    std::shared_mutex index_mutex;
+    std::mutex progress_mutex;
+    std::condition_variable progress_cv;
+    std::atomic<uint64_t> indexed_bytes{0};
+    std::atomic<uint64_t> indexed_lines{0};
+    std::atomic<bool> index_complete{false};
+    std::atomic<bool> index_finished{false};
+    std::atomic<bool> cancel_indexing{false};
+    std::thread indexer;
+    // Lines too long for one display row, in line order; appended together
+    // with `line_index` under `index_mutex`. Empty for ordinary files.
+    std::vector<lx::engine::LongLine> long_lines;
+    // Registry handles pointing at this buffer (tabs showing the same file
+    // share one buffer, each through its own handle).
+    std::atomic<int> handles{0};
+
+    // Storage: `resident_text` is null while the buffer is cold. `blocks` is
+    // built once by the indexer thread (`blocks_ready` set after) and never
+    // changes again; the text only goes cold once it exists.
+    std::mutex storage_mutex;
+    std::shared_ptr<const std::string> resident_text;
+    lx::engine::BlockStore blocks;
+    std::atomic<bool> blocks_ready{false};
+    std::atomic<int64_t> last_access_ms{0};
+    std::atomic<bool> cold_requested{false};
+
+    // Optional trigram index for repeated searches, built on its own thread
+    // on request (build_text_buffer_search_index). `search_index` is set
+    // once the build completes and never changes after; searches started
+    // before that scan the whole text.
+    std::mutex search_index_mutex;
+    std::shared_ptr<const lx::engine::SearchIndex> search_index;
+    std::string search_index_error;
+    std::atomic<int> search_index_state{0};  // a SearchIndexState
+    std::atomic<uint64_t> search_index_progress{0};
+    std::atomic<bool> cancel_search_index{false};
+    std::thread search_index_builder;
+
+    ~TextBuffer() { stop_indexing(); }
+
+    void stop_indexing() {
+        cancel_indexing.store(true);
+        cancel_search_index.store(true);
+        {
+            // Also wakes the cold-storage wait that follows indexing.
+            std::lock_guard<std::mutex> lock(progress_mutex);
+        }
+        progress_cv.notify_all();
+        if (indexer.joinable()) indexer.join();
+        if (search_index_builder.joinable()) search_index_builder.join();
+    }
+
+    std::shared_ptr<const lx::engine::SearchIndex> ready_search_index() {
+        std::lock_guard<std::mutex> lock(search_index_mutex);
+        return search_index;
+    }
+
+    void touch() { last_access_ms.store(steady_now_ms(), std::memory_order_relaxed); }
+
+    // The flat text if resident, else null; never inflates.
+    std::shared_ptr<const std::string> resident_if_warm() {
+        std::lock_guard<std::mutex> lock(storage_mutex);
+        return resident_text;
+    }
+
+    bool is_resident() { return resident_if_warm() != nullptr; }
+
+    // The flat text, inflating (or decoding) a cold buffer back to resident first.
+    std::shared_ptr<const std::string> resident() {
+        touch();
+        if (auto text = resident_if_warm()) return text;
+        // Inflate outside the lock; a racing caller's copy is simply dropped.
+        std::shared_ptr<const std::string> text;
+        if (single_byte) {
+            std::string decoded;
+            single_byte->decode(0, single_byte->raw().size(), decoded);
+            text = std::make_shared<const std::string>(std::move(decoded));
+        } else {
+            text = std::make_shared<const std::string>(blocks.inflate_all());
+        }
+        std::lock_guard<std::mutex> lock(storage_mutex);
+        if (!resident_text) resident_text = std::move(text);
+        return resident_text;
+    }
+
+    // Replaces `out` with bytes [offset, offset + length), clamped to size;
+    // a cold buffer inflates (or decodes) only what the range touches.
+    void read(uint64_t offset, uint64_t length, std::string& out) {
+        touch();
+        if (auto text = resident_if_warm()) {
+            out.clear();
+            if (offset < text->size()) out.assign(*text, static_cast<size_t>(offset), static_cast<size_t>(length));
+            return;
+        }
+        if (single_byte) {
+            read_single_byte(offset, length, out);
+            return;
+        }
+        blocks.read(offset, length, out);
+    }
+
+    void read_single_byte(uint64_t offset, uint64_t length, std::string& out) {
+        out.clear();
+        if (offset >= size) return;
+        std::pair<uint64_t, uint64_t> checkpoint;
+        {
+            std::shared_lock<std::shared_mutex> lock(offset_mutex);
+            checkpoint = offset_map.floor_checkpoint(offset, lx::engine::OffsetUnit::Byte);
+        }
+        const uint64_t end = std::min(size, offset + length);
+        const auto first = single_byte->seek(static_cast<size_t>(checkpoint.second), checkpoint.first, offset);
+        const auto last = single_byte->seek(first.first, first.second, end);
+        // Ranges may start or end inside a character: decode it whole, then trim.
+        single_byte->decode(first.first, last.first + (last.second < end ? 1 : 0), out);
+        out.erase(0, static_cast<size_t>(offset - first.second));
+        out.resize(static_cast<size_t>(end - offset));
+    }
+
+    char byte_at(uint64_t offset) {
+        std::string byte;
+        read(offset, 1, byte);
+        return byte.empty() ? '\0' : byte[0];
+    }
+
+    // Compresses the text (once) and drops the flat copy. Unless `forced`,
+    // gives up if the buffer was read while compressing. Runs on the indexer
+    // thread; readers holding the flat text keep it alive until done.
+    void make_cold(bool forced) {
+        const auto text = resident_if_warm();
+        if (!text) return;
+        const int64_t started = last_access_ms.load();
+        // A single-byte buffer needs no blocks: its raw bytes are the cold form.
+        if (!single_byte && !blocks_ready.load()) {
+            if (!blocks.build(text->data(), text->size(), cancel_indexing)) return;
+            blocks_ready.store(true);
+        }
+        std::lock_guard<std::mutex> lock(storage_mutex);
+        if (forced || last_access_ms.load() == started) resident_text.reset();
+    }
+};
+
+using TextBufferPtr = std::shared_ptr<TextBuffer>;
+
+// Handle -> buffer map split into shards with read-mostly locks. A lookup
+// takes one shard's shared lock just long enough to copy the shared_ptr, so
+// reads from different tabs and threads never serialize on each other.
+class TextBufferRegistry {
+public:
+    int add(TextBufferPtr buffer) {
+        buffer->handles.fetch_add(1);
+        const int handle = next_handle_.fetch_add(1);
+        Shard& shard = shard_for(handle);
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        shard.buffers.emplace(handle, std::move(buffer));
+        return handle;
+    }
+
+    TextBufferPtr find(int handle) const {
+        const Shard& shard = shard_for(handle);
+        std::shared_lock<std::shared_mutex> lock(shard.mutex);
+        auto it = shard.buffers.find(handle);
+        return it == shard.buffers.end() ? nullptr : it->second;
+    }
+
+    TextBufferPtr remove(int handle) {
+        Shard& shard = shard_for(handle);
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        auto it = shard.buffers.find(handle);
+        if (it == shard.buffers.end()) return nullptr;
+        TextBufferPtr buffer = std::move(it->second);
+        shard.buffers.erase(it);
+        buffer->handles.fetch_sub(1);
+        return buffer;
+    }
+
+private:
+    static constexpr size_t kShards = 16;
+
+    struct Shard {
+        mutable std::shared_mutex mutex;
+        std::unordered_map<int, TextBufferPtr> buffers;
+    };
+
+    Shard& shard_for(int handle) { return shards_[static_cast<size_t>(handle) % kShards]; }
+    const Shard& shard_for(int handle) const { return shards_[static_cast<size_t>(handle) % kShards]; }
+
+    std::array<Shard, kShards> shards_;
+    std::atomic<int> next_handle_{1};
 };
 
-std::mutex g_text_buffers_mutex;
-std::unordered_map<int, TextBuffer> g_text_buffers;
-std::atomic<int> g_next_text_buffer_id{1};
+TextBufferRegistry g_text_buffers;
+
+constexpr size_t kIndexSliceBytes = 8u * 1024u * 1024u;
+// Buffers from this size on go cold after kColdBufferMs without reads.
+constexpr uint64_t kColdBufferMinBytes = 8u * 1024u * 1024u;
+constexpr int64_t kColdBufferMs = 60 * 1000;
+// Single-byte buffers checkpoint densely: every read walks from one.
+constexpr size_t kSingleByteCheckpointBytes = 4096;
 
 std::string normalize_encoding(std::string value) {
     std::transform(
@@ -154,20 +406,381 @@ py::dict decode_bytes_binding(
     throw py::value_error("Unable to decode bytes with provided encodings");
 }
 
-int create_text_buffer_binding(const std::string& text) {
-    TextBuffer buffer;
-    buffer.text = text;
-    buffer.line_offsets = lx::engine::get_line_offsets(buffer.text);
+// Scans the flat UTF-8 text, or a single-byte buffer's raw bytes; `data`
+// positions are then raw and `utf8` tracks the matching UTF-8 offset, which
+// is what the indexes store.
+void run_line_indexer(TextBuffer* buffer) {
+    const std::shared_ptr<const std::string> text = buffer->single_byte ? nullptr : buffer->resident_if_warm();
+    const std::string& source = text ? *text : buffer->single_byte->raw();
+    const uint8_t* widths = buffer->single_byte ? buffer->single_byte->widths() : nullptr;
+    const char* data = source.data();
+    const size_t size = source.size();
+    uint64_t utf8 = 0;
+    auto advance = [&](size_t from, size_t to) {
+        if (widths == nullptr) {
+            utf8 = to;
+            return;
+        }
+        for (size_t i = from; i < to; ++i) utf8 += widths[static_cast<unsigned char>(data[i])];
+    };
+    std::vector<uint64_t> batch;
+    batch.reserve(kIndexSliceBytes / 32);
+    std::vector<lx::engine::LongLine> long_batch;
+    // The line still being scanned: its end is the next line start found.
+    uint64_t open_line = 0;
+    size_t open_start = 0;
+    uint64_t open_start_utf8 = 0;
+    auto close_line = [&](size_t next_start, uint64_t next_start_utf8) {
+        // Line terminators are ASCII: one byte in either form.
+        const size_t content_end = lx::engine::line_content_end(data, open_start, next_start);
+        const uint64_t rows = lx::engine::display_row_count(next_start_utf8 - open_start_utf8 - (next_start - content_end));
+        if (rows > 1) long_batch.push_back({open_line, rows});
+    };
+
+    {
+        std::unique_lock<std::shared_mutex> lock(buffer->index_mutex);
+        buffer->line_index.push_back(0);
+    }
+    buffer->indexed_lines.store(1);
+
+    size_t pos = 0;
+    while (pos < size && !buffer->cancel_indexing.load(std::memory_order_relaxed)) {
+        const size_t slice_end = std::min(size, pos + kIndexSliceBytes);
+        batch.clear();
+        while (pos < slice_end) {
+            const void* hit = std::memchr(data + pos, '\n', slice_end - pos);
+            if (hit == nullptr) {
+                advance(pos, slice_end);
+                pos = slice_end;
+                break;
+            }
+            const size_t nl = static_cast<size_t>(static_cast<const char*>(hit) - data);
+            advance(pos, nl + 1);
+            // A trailing newline does not open an extra (empty) line.
+            if (nl + 1 < size) {
+                batch.push_back(utf8);
+                close_line(nl + 1, utf8);
+                ++open_line;
+                open_start = nl + 1;
+                open_start_utf8 = utf8;
+            }
+            pos = nl + 1;
+        }
+
+        if (widths != nullptr) {
+            // Ahead of the lines: raw reads seek from these checkpoints.
+            std::unique_lock<std::shared_mutex> lock(buffer->offset_mutex);
+            buffer->offset_map.append_single_byte(data, pos, widths, kSingleByteCheckpointBytes);
+        }
+        if (!batch.empty()) {
+            std::unique_lock<std::shared_mutex> lock(buffer->index_mutex);
+            for (uint64_t offset : batch) buffer->line_index.push_back(offset);
+            buffer->long_lines.insert(buffer->long_lines.end(), long_batch.begin(), long_batch.end());
+            buffer->indexed_lines.store(buffer->line_index.size());
+        }
+        long_batch.clear();
+        if (widths == nullptr) {
+            std::unique_lock<std::shared_mutex> lock(buffer->offset_mutex);
+            buffer->offset_map.append(data, pos);
+        }
+        buffer->indexed_bytes.store(utf8);
+        {
+            std::lock_guard<std::mutex> lock(buffer->progress_mutex);
+        }
+        buffer->progress_cv.notify_all();
+    }
+
+    if (!buffer->cancel_indexing.load()) {
+        close_line(size, buffer->size);
+        std::unique_lock<std::shared_mutex> lock(buffer->index_mutex);
+        buffer->long_lines.insert(buffer->long_lines.end(), long_batch.begin(), long_batch.end());
+        buffer->line_index.shrink_to_fit();
+        buffer->indexed_bytes.store(buffer->size);
+        buffer->index_complete.store(true);
+    }
+    {
+        std::lock_guard<std::mutex> lock(buffer->progress_mutex);
+        buffer->index_finished.store(true);
+    }
+    buffer->progress_cv.notify_all();
+}
 
-    const int handle = g_next_text_buffer_id.fetch_add(1);
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    g_text_buffers.emplace(handle, std::move(buffer));
-    return handle;
+// After indexing, the same thread sends a large buffer cold once it has not
+// been read for kColdBufferMs, or right away on compress_text_buffer.
+bool can_go_cold(const TextBuffer& buffer) {
+    return (buffer.single_byte || lx::engine::BlockStore::available()) && buffer.size >= kColdBufferMinBytes;
+}
+
+void run_cold_storage(TextBuffer* buffer) {
+    if (!can_go_cold(*buffer)) return;
+    std::unique_lock<std::mutex> lock(buffer->progress_mutex);
+    while (!buffer->cancel_indexing.load()) {
+        int64_t wait_ms = kColdBufferMs;
+        if (buffer->is_resident()) {
+            const int64_t idle = steady_now_ms() - buffer->last_access_ms.load();
+            wait_ms = std::max<int64_t>(1000, kColdBufferMs - idle);
+        }
+        buffer->progress_cv.wait_for(lock, std::chrono::milliseconds(wait_ms), [&]() {
+            return buffer->cancel_indexing.load() || buffer->cold_requested.load();
+        });
+        if (buffer->cancel_indexing.load()) break;
+        const bool forced = buffer->cold_requested.exchange(false);
+        if (!forced && steady_now_ms() - buffer->last_access_ms.load() < kColdBufferMs) continue;
+        lock.unlock();
+        buffer->make_cold(forced);
+        lock.lock();
+    }
+}
+
+void run_buffer_worker(TextBuffer* buffer) {
+    run_line_indexer(buffer);
+    run_cold_storage(buffer);
+}
+
+TextBufferPtr find_text_buffer(int handle) {
+    TextBufferPtr buffer = g_text_buffers.find(handle);
+    if (!buffer) {
+        throw py::value_error("Invalid text buffer handle");
+    }
+    return buffer;
+}
+
+// Lines whose end is known: while indexing, the last indexed line may still grow.
+uint64_t available_line_count(const TextBuffer& buffer) {
+    const uint64_t lines = buffer.indexed_lines.load();
+    if (buffer.index_complete.load()) return lines;
+    return lines > 0 ? lines - 1 : 0;
+}
+
+// Blocks until `line_number` (1-based) is fully indexed or indexing has ended.
+// timeout_ms < 0 waits without limit. Returns true if the line is available.
+bool wait_for_line(TextBuffer& buffer, uint64_t line_number, int timeout_ms = -1) {
+    auto ready = [&]() { return buffer.index_finished.load() || available_line_count(buffer) >= line_number; };
+    if (!ready()) {
+        std::unique_lock<std::mutex> lock(buffer.progress_mutex);
+        if (timeout_ms < 0) {
+            buffer.progress_cv.wait(lock, ready);
+        } else {
+            buffer.progress_cv.wait_for(lock, std::chrono::milliseconds(timeout_ms), ready);
+        }
+    }
+    return available_line_count(buffer) >= line_number;
+}
+
+lx::engine::OffsetUnit parse_unit(const std::string& name) {
+    lx::engine::OffsetUnit unit = lx::engine::OffsetUnit::Byte;
+    if (!lx::engine::parse_offset_unit(name, unit)) {
+        throw py::value_error("Unknown offset unit: " + name + " (expected 'byte', 'char' or 'utf16')");
+    }
+    return unit;
+}
+
+// Blocks until the offset map covers `offset` (in `unit`) or indexing has ended.
+void wait_for_offset(TextBuffer& buffer, uint64_t offset, lx::engine::OffsetUnit unit) {
+    auto covered = [&]() {
+        if (buffer.index_finished.load()) return true;
+        std::shared_lock<std::shared_mutex> lock(buffer.offset_mutex);
+        return buffer.offset_map.total(unit) > offset;
+    };
+    if (!covered()) {
+        std::unique_lock<std::mutex> lock(buffer.progress_mutex);
+        buffer.progress_cv.wait(lock, covered);
+    }
+}
+
+// Single-byte buffers: code point (and UTF-16) offsets are raw byte offsets,
+// so a checkpoint and a walk over raw bytes convert without any decoding
+// and without waiting for the indexer.
+uint64_t convert_single_byte_offset(TextBuffer& buffer, uint64_t offset, lx::engine::OffsetUnit from, lx::engine::OffsetUnit to) {
+    using lx::engine::OffsetUnit;
+    const lx::engine::SingleByteText& text = *buffer.single_byte;
+    if (from == OffsetUnit::Byte) {
+        offset = std::min(offset, buffer.size);
+        std::pair<uint64_t, uint64_t> checkpoint;
+        {
+            std::shared_lock<std::shared_mutex> lock(buffer.offset_mutex);
+            checkpoint = buffer.offset_map.floor_checkpoint(offset, OffsetUnit::Byte);
+        }
+        const auto hit = text.seek(static_cast<size_t>(checkpoint.second), checkpoint.first, offset);
+        // Like count_units: a character starting before `offset` counts.
+        return hit.first + (hit.second < offset ? 1 : 0);
+    }
+    const uint64_t raw = std::min<uint64_t>(offset, text.raw().size());
+    if (to != OffsetUnit::Byte) return raw;
+    std::pair<uint64_t, uint64_t> checkpoint;
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer.offset_mutex);
+        checkpoint = buffer.offset_map.floor_checkpoint(raw, OffsetUnit::CodePoint);
+    }
+    return checkpoint.first + text.utf8_length(static_cast<size_t>(checkpoint.second), static_cast<size_t>(raw));
+}
+
+uint64_t convert_buffer_offset(TextBuffer& buffer, uint64_t offset, lx::engine::OffsetUnit from, lx::engine::OffsetUnit to) {
+    if (from == to) return offset;
+    if (buffer.single_byte) return convert_single_byte_offset(buffer, offset, from, to);
+    wait_for_offset(buffer, offset, from);
+    std::shared_lock<std::shared_mutex> lock(buffer.offset_mutex);
+    if (const auto text = buffer.resident_if_warm()) {
+        return buffer.offset_map.convert(text->data(), offset, from, to);
+    }
+    // Cold: only the checkpoint span holding `offset` is inflated.
+    const auto span = buffer.offset_map.convert_span(offset, from);
+    std::string window;
+    buffer.read(span.first, span.second - span.first, window);
+    return buffer.offset_map.convert(window.data(), span.first, span.first + window.size(), offset, from, to);
+}
+
+int create_text_buffer_binding(std::string text) {
+    auto buffer = std::make_shared<TextBuffer>(std::move(text));
+    // The handle is usable right away; line starts are indexed on a worker
+    // thread and lookups past the frontier wait for it.
+    buffer->indexer = std::thread(run_buffer_worker, buffer.get());
+    return g_text_buffers.add(std::move(buffer));
+}
+
+// A buffer over text in a single-byte encoding, kept raw: `code_points[b]`
+// is what byte b decodes to (-1: undefined). Only the validation pass runs
+// up front; line indexing follows on the worker thread like any buffer and
+// reads decode just the range they cover.
+int create_single_byte_text_buffer_binding(const py::bytes& raw, const std::vector<int32_t>& code_points) {
+    std::string bytes = raw;
+    std::shared_ptr<TextBuffer> buffer;
+    {
+        py::gil_scoped_release release;
+        buffer = std::make_shared<TextBuffer>(
+            std::make_shared<const lx::engine::SingleByteText>(std::move(bytes), code_points));
+        buffer->indexer = std::thread(run_buffer_worker, buffer.get());
+    }
+    return g_text_buffers.add(std::move(buffer));
+}
+
+// Another handle to the same immutable buffer and line index. Each handle is
+// released on its own; the buffer lives until the last one goes.
+int share_text_buffer_binding(int handle) {
+    return g_text_buffers.add(find_text_buffer(handle));
 }
 
 void release_text_buffer_binding(int handle) {
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    g_text_buffers.erase(handle);
+    TextBufferPtr buffer = g_text_buffers.remove(handle);
+    if (!buffer || buffer->handles.load() > 0) return;
+    // Readers that already hold the snapshot keep it alive; stop the indexer
+    // so their waits end, the memory goes with the last reference.
+    py::gil_scoped_release release;
+    buffer->stop_indexing();
+}
+
+// Asks the buffer's worker to send it cold now (asynchronously, once indexing
+// has finished). Returns false if this buffer never goes cold: the engine
+// was built without zlib or the buffer is too small to be worth it.
+bool compress_text_buffer_binding(int handle) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    if (!can_go_cold(*buffer)) {
+        return false;
+    }
+    {
+        std::lock_guard<std::mutex> lock(buffer->progress_mutex);
+        buffer->cold_requested.store(true);
+    }
+    buffer->progress_cv.notify_all();
+    return true;
+}
+
+py::dict get_text_buffer_index_progress_binding(int handle) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    py::dict progress;
+    progress["indexed_bytes"] = buffer->indexed_bytes.load();
+    progress["total_bytes"] = buffer->size;
+    progress["line_count"] = available_line_count(*buffer);
+    progress["complete"] = buffer->index_complete.load();
+    return progress;
+}
+
+bool wait_text_buffer_index_binding(int handle, int64_t line_number, int timeout_ms) {
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
+    }
+    if (line_number <= 0) {
+        // Non-positive line: wait for the whole index.
+        line_number = std::numeric_limits<int64_t>::max();
+    }
+    wait_for_line(*buffer, static_cast<uint64_t>(line_number), timeout_ms);
+    return buffer->index_complete.load() || available_line_count(*buffer) >= static_cast<uint64_t>(line_number);
+}
+
+// --- SEARCH INDEX ---
+
+enum SearchIndexState : int { kSearchIndexNone = 0, kSearchIndexBuilding, kSearchIndexReady, kSearchIndexFailed };
+
+// Default memory cap: a quarter of the text, at least 32 MB.
+constexpr uint64_t kSearchIndexMinCapBytes = 32u * 1024u * 1024u;
+
+void run_search_index_build(TextBuffer* buffer, uint64_t memory_cap) {
+    auto index = std::make_shared<lx::engine::SearchIndex>();
+    std::string error;
+    // Reads go through the buffer, so a cold one stays cold.
+    const bool built = index->build(
+        buffer->size,
+        [buffer](uint64_t offset, uint64_t length, std::string& out) { buffer->read(offset, length, out); },
+        memory_cap, buffer->cancel_search_index, buffer->search_index_progress, error);
+    std::lock_guard<std::mutex> lock(buffer->search_index_mutex);
+    if (built) {
+        buffer->search_index = std::move(index);
+        buffer->search_index_state.store(kSearchIndexReady);
+    } else {
+        buffer->search_index_error = buffer->cancel_search_index.load() ? "cancelled" : error;
+        buffer->search_index_state.store(kSearchIndexFailed);
+    }
+}
+
+// Starts building the buffer's search index in the background; false if one
+// is already built or being built. `memory_cap` <= 0 picks the default.
+bool build_text_buffer_search_index_binding(int handle, int64_t memory_cap) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    py::gil_scoped_release release;
+    std::lock_guard<std::mutex> lock(buffer->search_index_mutex);
+    const int state = buffer->search_index_state.load();
+    if (state == kSearchIndexBuilding || state == kSearchIndexReady) {
+        return false;
+    }
+    // A failed build's thread has already finished.
+    if (buffer->search_index_builder.joinable()) buffer->search_index_builder.join();
+    const uint64_t cap = memory_cap > 0 ? static_cast<uint64_t>(memory_cap)
+                                        : std::max<uint64_t>(kSearchIndexMinCapBytes, buffer->size / 4);
+    buffer->search_index_error.clear();
+    buffer->search_index_progress.store(0);
+    buffer->cancel_search_index.store(false);
+    buffer->search_index_state.store(kSearchIndexBuilding);
+    buffer->search_index_builder = std::thread(run_search_index_build, buffer.get(), cap);
+    return true;
+}
+
+// Stops a build or frees a built index; searches go back to scanning.
+void drop_text_buffer_search_index_binding(int handle) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    py::gil_scoped_release release;
+    buffer->cancel_search_index.store(true);
+    if (buffer->search_index_builder.joinable()) buffer->search_index_builder.join();
+    std::lock_guard<std::mutex> lock(buffer->search_index_mutex);
+    buffer->search_index.reset();
+    buffer->search_index_error.clear();
+    buffer->search_index_progress.store(0);
+    buffer->search_index_state.store(kSearchIndexNone);
+}
+
+py::dict get_text_buffer_search_index_info_binding(int handle) {
+    static const char* const kStates[] = {"none", "building", "ready", "failed"};
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    py::dict info;
+    std::lock_guard<std::mutex> lock(buffer->search_index_mutex);
+    info["state"] = kStates[buffer->search_index_state.load()];
+    info["indexed_bytes"] = buffer->search_index_progress.load();
+    info["total_bytes"] = buffer->size;
+    info["memory_bytes"] = static_cast<uint64_t>(buffer->search_index ? buffer->search_index->memory_bytes() : 0);
+    info["block_bytes"] = static_cast<uint64_t>(buffer->search_index ? buffer->search_index->block_bytes() : 0);
+    info["error"] = buffer->search_index_error;
+    return info;
 }
 
 py::dict get_text_buffer_info_binding(int handle, int lines_per_chunk) {
@@ -175,51 +788,83 @@ py::dict get_text_buffer_info_binding(int handle, int lines_per_chunk) {
         lines_per_chunk = 4000;
     }
 
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
-    }
-
-    const auto& buffer = it->second;
-    const int line_count = static_cast<int>(buffer.line_offsets.size());
-    const int chunk_count = std::max(1, (line_count + lines_per_chunk - 1) / lines_per_chunk);
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    const int64_t line_count = static_cast<int64_t>(available_line_count(*buffer));
+    const int64_t chunk_count = std::max<int64_t>(1, (line_count + lines_per_chunk - 1) / lines_per_chunk);
 
     py::dict info;
-    info["chars"] = static_cast<py::int_>(buffer.text.size());
+    info["bytes"] = buffer->size;
+    // Code point / UTF-16 totals are only known once the indexer has finished,
+    // except for single-byte buffers: one code point per raw byte.
+    if (buffer->single_byte) {
+        info["chars"] = static_cast<uint64_t>(buffer->single_byte->raw().size());
+        info["utf16_units"] = static_cast<uint64_t>(buffer->single_byte->raw().size());
+    } else if (buffer->index_complete.load()) {
+        std::shared_lock<std::shared_mutex> lock(buffer->offset_mutex);
+        info["chars"] = buffer->offset_map.code_points();
+        info["utf16_units"] = buffer->offset_map.utf16_units();
+    } else {
+        info["chars"] = py::none();
+        info["utf16_units"] = py::none();
+    }
     info["line_count"] = line_count;
     info["chunk_count"] = chunk_count;
     info["lines_per_chunk"] = lines_per_chunk;
+    info["indexed_bytes"] = buffer->indexed_bytes.load();
+    info["index_complete"] = buffer->index_complete.load();
+    info["handles"] = buffer->handles.load();
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+        info["index_bytes"] = static_cast<uint64_t>(buffer->line_index.memory_bytes());
+    }
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer->offset_mutex);
+        info["offset_map_bytes"] = static_cast<uint64_t>(buffer->offset_map.memory_bytes());
+    }
+    info["resident"] = buffer->is_resident();
+    info["single_byte"] = buffer->single_byte != nullptr;
+    info["compressed_bytes"] = static_cast<uint64_t>(buffer->blocks_ready.load() ? buffer->blocks.memory_bytes() : 0);
     return info;
 }
 
-py::dict get_text_buffer_chunk_binding(int handle, int chunk_index, int lines_per_chunk) {
+py::dict get_text_buffer_chunk_binding(int handle, int64_t chunk_index, int lines_per_chunk) {
     if (lines_per_chunk <= 0) {
         lines_per_chunk = 4000;
     }
 
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
-    }
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    std::string chunk_text;
+    int64_t chunk_count = 0;
+    int64_t start_line = 0;
+    int64_t end_line = 0;
+    {
+        // Chunks are also fetched by the Large Viewer prefetch thread: copy the
+        // slice without holding the GIL, only the py::str build needs it.
+        py::gil_scoped_release release;
+        if (chunk_index >= 0) {
+            wait_for_line(*buffer, static_cast<uint64_t>(chunk_index + 1) * static_cast<uint64_t>(lines_per_chunk));
+        }
+        std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+        const int64_t line_count = static_cast<int64_t>(available_line_count(*buffer));
+        chunk_count = std::max<int64_t>(1, (line_count + lines_per_chunk - 1) / lines_per_chunk);
+        if (chunk_index < 0 || chunk_index >= chunk_count) {
+            py::gil_scoped_acquire acquire;
+            throw py::value_error("Chunk index out of range");
+        }
 
-    const auto& buffer = it->second;
-    const int line_count = static_cast<int>(buffer.line_offsets.size());
-    const int chunk_count = std::max(1, (line_count + lines_per_chunk - 1) / lines_per_chunk);
-    if (chunk_index < 0 || chunk_index >= chunk_count) {
-        throw py::value_error("Chunk index out of range");
+        start_line = chunk_index * lines_per_chunk + 1;
+        end_line = std::min(line_count, start_line + lines_per_chunk - 1);
+        if (end_line >= start_line) {
+            const uint64_t start_offset = buffer->line_index.offset(static_cast<size_t>(start_line - 1));
+            const uint64_t end_offset = (static_cast<size_t>(end_line) < buffer->line_index.size())
+                                            ? buffer->line_index.offset(static_cast<size_t>(end_line))
+                                            : buffer->size;
+            buffer->read(start_offset, end_offset - start_offset, chunk_text);
+        }
     }
 
-    const int start_line = chunk_index * lines_per_chunk + 1;
-    const int end_line = std::min(line_count, start_line + lines_per_chunk - 1);
-
-    const int start_offset = buffer.line_offsets[start_line - 1];
-    const int end_offset = (end_line < line_count) ? buffer.line_offsets[end_line] : static_cast<int>(buffer.text.size());
-    const int chunk_len = std::max(0, end_offset - start_offset);
-
     py::dict d;
-    d["text"] = py::str(buffer.text.substr(static_cast<size_t>(start_offset), static_cast<size_t>(chunk_len)));
+    d["text"] = py::str(chunk_text);
     d["chunk_index"] = chunk_index;
     d["chunk_count"] = chunk_count;
     d["start_line"] = start_line;
@@ -227,57 +872,114 @@ py::dict get_text_buffer_chunk_binding(int handle, int chunk_index, int lines_pe
     return d;
 }
 
-int get_text_buffer_line_count_binding(int handle) {
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
-    }
-    return static_cast<int>(it->second.line_offsets.size());
+int64_t get_text_buffer_line_count_binding(int handle) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    return static_cast<int64_t>(available_line_count(*buffer));
 }
 
-int get_text_buffer_line_offset_binding(int handle, int line_number) {
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
+int64_t get_text_buffer_line_offset_binding(int handle, int64_t line_number, const std::string& unit) {
+    const lx::engine::OffsetUnit to = parse_unit(unit);
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
     }
-
     if (line_number <= 0) {
         return -1;
     }
-    const auto& offsets = it->second.line_offsets;
-    const int line_count = static_cast<int>(offsets.size());
-    if (line_number > line_count) {
+    if (!wait_for_line(*buffer, static_cast<uint64_t>(line_number))) {
         return -1;
     }
-    return offsets[static_cast<size_t>(line_number - 1)];
+    uint64_t byte_offset = 0;
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+        byte_offset = buffer->line_index.offset(static_cast<size_t>(line_number - 1));
+    }
+    return static_cast<int64_t>(convert_buffer_offset(*buffer, byte_offset, lx::engine::OffsetUnit::Byte, to));
 }
 
-py::dict get_text_buffer_chunk_for_line_binding(int handle, int line_number, int lines_per_chunk) {
-    if (lines_per_chunk <= 0) {
-        lines_per_chunk = 4000;
+int64_t convert_text_buffer_offset_binding(int handle, int64_t offset, const std::string& from_unit, const std::string& to_unit) {
+    const lx::engine::OffsetUnit from = parse_unit(from_unit);
+    const lx::engine::OffsetUnit to = parse_unit(to_unit);
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
     }
+    if (offset <= 0) return 0;
+    return static_cast<int64_t>(convert_buffer_offset(*buffer, static_cast<uint64_t>(offset), from, to));
+}
 
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
+int64_t convert_offset_binding(const std::string& text, int64_t offset, const std::string& from_unit, const std::string& to_unit) {
+    if (offset <= 0) return 0;
+    return static_cast<int64_t>(
+        lx::engine::convert_offset(text, static_cast<uint64_t>(offset), parse_unit(from_unit), parse_unit(to_unit)));
+}
+
+int64_t find_next_position_binding(
+    const std::string& text,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    int64_t start_pos,
+    bool wrap,
+    const std::string& unit) {
+    const lx::engine::OffsetUnit caller_unit = parse_unit(unit);
+    if (caller_unit == lx::engine::OffsetUnit::Byte) {
+        return lx::engine::find_next_position(text, query, case_sensitive, whole_words, static_cast<int>(start_pos), wrap);
     }
+    const size_t start_byte = lx::engine::advance_units(
+        text.data(), text.size(), 0, static_cast<uint64_t>(std::max<int64_t>(0, start_pos)), caller_unit);
+    const int found = lx::engine::find_next_position(
+        text, query, case_sensitive, whole_words, static_cast<int>(start_byte), wrap);
+    if (found < 0) return found;
+    return static_cast<int64_t>(lx::engine::count_units(text.data(), 0, static_cast<size_t>(found), caller_unit));
+}
 
+std::vector<int64_t> find_all_binding(
+    const std::string& text,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    const std::string& unit) {
+    const lx::engine::OffsetUnit caller_unit = parse_unit(unit);
+    const std::vector<int> found = lx::engine::find_all(text, query, case_sensitive, whole_words);
+    std::vector<int64_t> positions;
+    positions.reserve(found.size());
+    // Matches are ascending, so one running count converts them all in O(n).
+    size_t last_byte = 0;
+    uint64_t last_units = 0;
+    for (int pos : found) {
+        last_units += lx::engine::count_units(text.data(), last_byte, static_cast<size_t>(pos), caller_unit);
+        last_byte = static_cast<size_t>(pos);
+        positions.push_back(static_cast<int64_t>(last_units));
+    }
+    return positions;
+}
+
+py::dict get_text_buffer_chunk_for_line_binding(int handle, int64_t line_number, int lines_per_chunk) {
+    if (lines_per_chunk <= 0) {
+        lines_per_chunk = 4000;
+    }
     if (line_number <= 0) {
         throw py::value_error("line_number must be >= 1");
     }
 
-    const auto& offsets = it->second.line_offsets;
-    const int line_count = static_cast<int>(offsets.size());
-    if (line_number > line_count) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    bool available = false;
+    {
+        // Go To Line only blocks here when the target is past the indexed frontier.
+        py::gil_scoped_release release;
+        available = wait_for_line(*buffer, static_cast<uint64_t>(line_number));
+    }
+    if (!available) {
         throw py::value_error("line_number out of range");
     }
 
-    const int chunk_index = (line_number - 1) / lines_per_chunk;
-    const int start_line = chunk_index * lines_per_chunk + 1;
-    const int end_line = std::min(line_count, start_line + lines_per_chunk - 1);
+    const int64_t line_count = static_cast<int64_t>(available_line_count(*buffer));
+    const int64_t chunk_index = (line_number - 1) / lines_per_chunk;
+    const int64_t start_line = chunk_index * lines_per_chunk + 1;
+    const int64_t end_line = std::min(line_count, start_line + lines_per_chunk - 1);
 
     py::dict d;
     d["chunk_index"] = chunk_index;
@@ -287,13 +989,1464 @@ py::dict get_text_buffer_chunk_for_line_binding(int handle, int line_number, int
     return d;
 }
 
+std::vector<std::string> get_text_buffer_lines_binding(int handle, int64_t start_line, int count) {
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
+    }
+
+    std::vector<std::string> lines;
+    if (start_line <= 0 || count <= 0) {
+        return lines;
+    }
+    wait_for_line(*buffer, static_cast<uint64_t>(start_line) + static_cast<uint64_t>(count) - 1);
+
+    std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+    const int64_t line_count = static_cast<int64_t>(available_line_count(*buffer));
+    if (start_line > line_count) {
+        return lines;
+    }
+
+    // One sequential decode covers the requested rows plus the next line start.
+    std::vector<uint64_t> starts;
+    buffer->line_index.offsets(static_cast<size_t>(start_line - 1), static_cast<size_t>(count) + 1, starts);
+    const size_t row_count = std::min<size_t>(
+        std::min(starts.size(), static_cast<size_t>(count)), static_cast<size_t>(line_count - start_line + 1));
+    if (row_count == 0) {
+        return lines;
+    }
+    lines.reserve(row_count);
+    const uint64_t first = starts.front();
+    const uint64_t last = row_count < starts.size() ? starts[row_count] : buffer->size;
+    std::string text;
+    buffer->read(first, last - first, text);
+    for (size_t row = 0; row < row_count; ++row) {
+        const size_t begin = static_cast<size_t>(starts[row] - first);
+        size_t end = (row + 1 < starts.size()) ? static_cast<size_t>(starts[row + 1] - first) : text.size();
+        // Viewport rows never carry their line terminator.
+        if (end > begin && text[end - 1] == '\n') --end;
+        if (end > begin && text[end - 1] == '\r') --end;
+        lines.emplace_back(text, begin, end - begin);
+    }
+    return lines;
+}
+
+// --- DISPLAY ROWS ---
+// Lines longer than kDisplayRowBytes are soft-split into several display rows
+// so the viewer never lays out (or copies) a whole multi-megabyte line.
+
+// (1-based line, display rows) for the long lines from index `start` on, as
+// far as the index has got.
+std::vector<std::pair<int64_t, int64_t>> get_text_buffer_long_lines_binding(int handle, int64_t start) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    std::vector<std::pair<int64_t, int64_t>> entries;
+    std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+    const size_t first = static_cast<size_t>(std::max<int64_t>(0, start));
+    for (size_t i = first; i < buffer->long_lines.size(); ++i) {
+        const lx::engine::LongLine& entry = buffer->long_lines[i];
+        entries.emplace_back(static_cast<int64_t>(entry.line + 1), static_cast<int64_t>(entry.rows));
+    }
+    return entries;
+}
+
+// Up to `count` display rows starting at row `row` of 1-based `start_line`,
+// as (line, column, text): `column` is the code point column the row starts
+// at within its line.
+std::vector<std::tuple<int64_t, int64_t, std::string>> get_text_buffer_rows_binding(
+    int handle, int64_t start_line, int64_t row, int count) {
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
+    }
+
+    std::vector<std::tuple<int64_t, int64_t, std::string>> rows;
+    if (start_line <= 0 || row < 0 || count <= 0) {
+        return rows;
+    }
+    wait_for_line(*buffer, static_cast<uint64_t>(start_line) + static_cast<uint64_t>(count) - 1);
+
+    struct Span {
+        int64_t line;
+        uint64_t row;
+        size_t line_begin;
+        size_t begin;
+        size_t end;
+    };
+    const auto at = [&buffer](size_t pos) { return buffer->byte_at(pos); };
+    std::vector<Span> spans;
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+        const int64_t line_count = static_cast<int64_t>(available_line_count(*buffer));
+        if (start_line > line_count) {
+            return rows;
+        }
+        std::vector<uint64_t> starts;
+        buffer->line_index.offsets(static_cast<size_t>(start_line - 1), static_cast<size_t>(count) + 1, starts);
+        const size_t lines = std::min<size_t>(
+            std::min(starts.size(), static_cast<size_t>(count)), static_cast<size_t>(line_count - start_line + 1));
+        for (size_t i = 0; i < lines && spans.size() < static_cast<size_t>(count); ++i) {
+            const size_t begin = static_cast<size_t>(starts[i]);
+            const size_t end = (i + 1 < starts.size()) ? static_cast<size_t>(starts[i + 1]) : static_cast<size_t>(buffer->size);
+            const size_t content_end = lx::engine::line_content_end(at, begin, end);
+            const uint64_t row_total = lx::engine::display_row_count(content_end - begin);
+            for (uint64_t r = i == 0 ? static_cast<uint64_t>(row) : 0; r < row_total && spans.size() < static_cast<size_t>(count); ++r) {
+                spans.push_back({start_line + static_cast<int64_t>(i), r, begin,
+                                 lx::engine::display_row_start(at, begin, content_end, r),
+                                 lx::engine::display_row_start(at, begin, content_end, r + 1)});
+            }
+        }
+    }
+
+    // Columns outside the index lock: the first continuation row asks the
+    // offset map, the rows after it count on over the previous row's text.
+    rows.reserve(spans.size());
+    uint64_t column = 0;
+    for (size_t i = 0; i < spans.size(); ++i) {
+        const Span& span = spans[i];
+        if (span.row == 0) {
+            column = 0;
+        } else if (i > 0 && spans[i - 1].line == span.line) {
+            const std::string& previous = std::get<2>(rows.back());
+            column += lx::engine::count_units(previous.data(), 0, previous.size(), lx::engine::OffsetUnit::CodePoint);
+        } else {
+            column = convert_buffer_offset(*buffer, span.begin, lx::engine::OffsetUnit::Byte, lx::engine::OffsetUnit::CodePoint) -
+                     convert_buffer_offset(*buffer, span.line_begin, lx::engine::OffsetUnit::Byte, lx::engine::OffsetUnit::CodePoint);
+        }
+        std::string text;
+        buffer->read(span.begin, span.end - span.begin, text);
+        rows.emplace_back(span.line, static_cast<int64_t>(column), std::move(text));
+    }
+    return rows;
+}
+
+// Display row of 1-based `line_number` holding code point `column`, as
+// (row within the line, column the row starts at).
+std::pair<int64_t, int64_t> locate_text_buffer_column_binding(int handle, int64_t line_number, int64_t column) {
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
+    }
+    if (line_number <= 0 || column <= 0 || !wait_for_line(*buffer, static_cast<uint64_t>(line_number))) {
+        return {0, 0};
+    }
+    size_t begin = 0;
+    size_t end = 0;
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer->index_mutex);
+        begin = static_cast<size_t>(buffer->line_index.offset(static_cast<size_t>(line_number - 1)));
+        end = static_cast<size_t>(line_number) < buffer->line_index.size()
+                  ? static_cast<size_t>(buffer->line_index.offset(static_cast<size_t>(line_number)))
+                  : static_cast<size_t>(buffer->size);
+    }
+    const auto data = [&buffer](size_t pos) { return buffer->byte_at(pos); };
+    const size_t content_end = lx::engine::line_content_end(data, begin, end);
+    const uint64_t row_total = lx::engine::display_row_count(content_end - begin);
+    if (row_total == 1) {
+        return {0, 0};
+    }
+
+    using lx::engine::OffsetUnit;
+    const uint64_t line_column = convert_buffer_offset(*buffer, begin, OffsetUnit::Byte, OffsetUnit::CodePoint);
+    const uint64_t line_end_column = convert_buffer_offset(*buffer, content_end, OffsetUnit::Byte, OffsetUnit::CodePoint);
+    const uint64_t target_column = std::min(line_column + static_cast<uint64_t>(column), line_end_column);
+    const size_t target = static_cast<size_t>(convert_buffer_offset(*buffer, target_column, OffsetUnit::CodePoint, OffsetUnit::Byte));
+
+    uint64_t r = std::min<uint64_t>(row_total - 1, (target - begin) / lx::engine::kDisplayRowBytes);
+    if (r > 0 && target < lx::engine::display_row_start(data, begin, content_end, r)) --r;
+    const size_t row_begin = lx::engine::display_row_start(data, begin, content_end, r);
+    const uint64_t row_column = convert_buffer_offset(*buffer, row_begin, OffsetUnit::Byte, OffsetUnit::CodePoint) - line_column;
+    return {static_cast<int64_t>(r), static_cast<int64_t>(row_column)};
+}
+
 std::string get_text_buffer_full_binding(int handle) {
-    std::lock_guard<std::mutex> lock(g_text_buffers_mutex);
-    auto it = g_text_buffers.find(handle);
-    if (it == g_text_buffers.end()) {
-        throw py::value_error("Invalid text buffer handle");
+    TextBufferPtr buffer;
+    {
+        py::gil_scoped_acquire acquire;
+        buffer = find_text_buffer(handle);
+    }
+    return *buffer->resident();
+}
+
+// --- STREAMING EXPORT ---
+
+constexpr size_t kExportChunkBytes = 4u * 1024u * 1024u;
+
+// Longest prefix of [data, data + length) that does not end inside a UTF-8
+// sequence, so chunks handed to Python always decode.
+size_t utf8_safe_length(const char* data, size_t length) {
+    if (length == 0) {
+        return 0;
     }
-    return it->second.text;
+    size_t lead = length - 1;
+    while (lead > 0 && (static_cast<unsigned char>(data[lead]) & 0xC0) == 0x80) --lead;
+    const unsigned char byte = static_cast<unsigned char>(data[lead]);
+    const size_t need = byte >= 0xF0 ? 4 : byte >= 0xE0 ? 3 : byte >= 0xC0 ? 2 : 1;
+    return lead + need > length ? lead : length;
+}
+
+bool is_utf8_encoding(std::string name) {
+    std::transform(name.begin(), name.end(), name.begin(), [](unsigned char c) {
+        return c == '_' ? '-' : static_cast<char>(std::tolower(c));
+    });
+    return name.empty() || name == "utf-8" || name == "utf8";
+}
+
+// Writes the spans produced by `for_each_span(fn)` to `path`. UTF-8 goes to
+// the file straight from engine memory; any other encoding is encoded in
+// chunks with Python's incremental encoder, so a character the codec cannot
+// represent raises the usual UnicodeEncodeError. Called with the GIL held;
+// the file object releases it during each write.
+template <typename ForEachSpan>
+uint64_t write_spans_to_file(const std::string& path, const std::string& encoding, ForEachSpan&& for_each_span) {
+    py::object encoder = py::none();
+    if (!is_utf8_encoding(encoding)) {
+        encoder = py::module_::import("codecs").attr("getincrementalencoder")(encoding)();
+    }
+    py::object file = py::module_::import("io").attr("open")(path, "wb");
+    uint64_t written = 0;
+    auto write_bytes = [&](const py::bytes& data) {
+        written += static_cast<uint64_t>(py::len(data));
+        file.attr("write")(data);
+    };
+    // Small pieces (e.g. after a dense Replace All) are batched so the file
+    // sees few large writes instead of one call per piece.
+    std::string pending;
+    auto emit = [&](const char* data, size_t length) {
+        if (encoder.is_none()) {
+            file.attr("write")(py::memoryview::from_memory(data, static_cast<py::ssize_t>(length)));
+            written += length;
+        } else {
+            write_bytes(encoder.attr("encode")(py::str(data, length)));
+        }
+    };
+    auto flush = [&]() {
+        if (!pending.empty()) {
+            emit(pending.data(), pending.size());
+            pending.clear();
+        }
+    };
+    try {
+        for_each_span([&](const char* data, size_t length) {
+            if (length < kExportChunkBytes / 64) {
+                pending.append(data, length);
+                if (pending.size() >= kExportChunkBytes) flush();
+                return;
+            }
+            flush();
+            while (length > 0) {
+                size_t part = std::min(length, kExportChunkBytes);
+                if (part < length) part = std::max<size_t>(1, utf8_safe_length(data, part));
+                emit(data, part);
+                data += part;
+                length -= part;
+            }
+        });
+        flush();
+        if (!encoder.is_none()) {
+            write_bytes(encoder.attr("encode")(py::str(""), true));
+        }
+    } catch (...) {
+        file.attr("close")();
+        throw;
+    }
+    file.attr("close")();
+    return written;
+}
+
+// Calls fn(data, length) over the whole buffer: one span while resident,
+// else UTF-8-safe windows inflated block by block (the buffer stays cold).
+template <typename Fn>
+void for_each_buffer_span(TextBuffer& buffer, Fn&& fn) {
+    if (const auto text = buffer.resident_if_warm()) {
+        fn(text->data(), text->size());
+        return;
+    }
+    std::string window;
+    for (uint64_t offset = 0; offset < buffer.size;) {
+        buffer.read(offset, kExportChunkBytes, window);
+        size_t length = window.size();
+        if (offset + length < buffer.size) length = std::max<size_t>(1, utf8_safe_length(window.data(), length));
+        fn(window.data(), length);
+        offset += length;
+    }
+}
+
+uint64_t write_text_buffer_to_file_binding(int handle, const std::string& path, const std::string& encoding) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    return write_spans_to_file(path, encoding, [&](auto&& fn) { for_each_buffer_span(*buffer, fn); });
+}
+
+// Yields a buffer snapshot as str chunks of about `chunk_bytes` UTF-8 bytes.
+// Holds the snapshot, so it stays valid after release_text_buffer.
+class TextBufferChunkIterator {
+public:
+    TextBufferChunkIterator(TextBufferPtr buffer, size_t chunk_bytes)
+        : buffer_(std::move(buffer)), chunk_bytes_(std::max<size_t>(4, chunk_bytes)) {}
+
+    py::str next() {
+        const uint64_t size = buffer_->size;
+        if (offset_ >= size) {
+            throw py::stop_iteration();
+        }
+        // Read through the buffer so a cold one is not made resident.
+        buffer_->read(offset_, chunk_bytes_, window_);
+        size_t length = window_.size();
+        if (offset_ + length < size) {
+            length = std::max<size_t>(1, utf8_safe_length(window_.data(), length));
+        }
+        py::str chunk(window_.data(), length);
+        offset_ += length;
+        return chunk;
+    }
+
+private:
+    TextBufferPtr buffer_;
+    size_t chunk_bytes_;
+    uint64_t offset_ = 0;
+    std::string window_;
+};
+
+TextBufferChunkIterator iter_text_buffer_binding(int handle, int64_t chunk_bytes) {
+    return TextBufferChunkIterator(
+        find_text_buffer(handle),
+        chunk_bytes > 0 ? static_cast<size_t>(chunk_bytes) : kExportChunkBytes);
+}
+
+// --- WHOLE-BUFFER SEARCH ---
+
+struct BufferSearchMatch {
+    uint64_t line;
+    uint64_t column;  // code points from line start (Python str index)
+    uint64_t byte;
+    uint64_t length;  // code points
+};
+
+// Windows straight from a buffer: the whole flat text while resident, else
+// windows read block by block (with a little leading context).
+struct BufferWindowSource {
+    TextBuffer& buffer;
+    std::shared_ptr<const std::string> text;
+    std::string cold_window;
+    bool flat() const { return text != nullptr; }
+    const std::string& window(uint64_t start, uint64_t end, size_t tail, uint64_t& base) {
+        if (text) {
+            base = 0;
+            return *text;
+        }
+        constexpr uint64_t kContext = 4;
+        base = start >= kContext ? start - kContext : 0;
+        buffer.read(base, end - base + tail, cold_window);
+        return cold_window;
+    }
+};
+
+// Windows copied out of a piece table, with a little leading context.
+struct PieceTableWindowSource {
+    const lx::engine::PieceTable& table;
+    std::string buffer;
+    bool flat() const { return false; }
+    const std::string& window(uint64_t start, uint64_t end, size_t tail, uint64_t& base) {
+        constexpr uint64_t kContext = 4;
+        base = start >= kContext ? start - kContext : 0;
+        table.read(base, end - base + tail, buffer);
+        return buffer;
+    }
+};
+
+// One background search over a buffer snapshot. Matches are appended in
+// windows so pollers see results stream in while the scan continues.
+struct BufferSearchJob {
+    TextBufferPtr buffer;
+    std::string query;
+    bool case_sensitive = false;
+    bool whole_words = false;
+    size_t max_results = 0;
+    // Regex searches only; a replace job also expands `replacement` for
+    // every match into `edits` (worker-owned until `done`).
+    std::unique_ptr<lx::engine::Regex> regex;
+    std::unique_ptr<lx::engine::RegexReplacement> replacement;
+    std::vector<lx::engine::PieceTable::Edit> edits;
+    std::string replacement_texts;
+    // Piece-table searches: the table and revision the snapshot was taken at.
+    int edit_id = 0;
+    uint64_t revision = 0;
+    // An edited piece table is scanned through this copy of its pieces and
+    // added text, window by window; `pieces_original` keeps the original
+    // text it points into alive. Null when the job scans `buffer`.
+    std::shared_ptr<const lx::engine::PieceTable> pieces;
+    std::shared_ptr<const std::string> pieces_original;
+    // Narrowed searches check only these positions (an earlier job's
+    // matches) instead of scanning the text; see can_narrow_search.
+    std::vector<BufferSearchMatch> candidates;
+    bool narrowed = false;
+    // Set by the worker when the buffer's search index let it skip blocks.
+    std::atomic<bool> indexed{false};
+
+    std::mutex mutex;
+    std::vector<BufferSearchMatch> matches;
+    std::atomic<uint64_t> total{0};
+    std::atomic<uint64_t> scanned_bytes{0};
+    std::atomic<bool> done{false};
+    std::atomic<bool> cancel{false};
+    std::thread worker;
+
+    ~BufferSearchJob() { stop(); }
+
+    uint64_t text_size() const { return pieces ? pieces->size() : buffer->size; }
+
+    void stop() {
+        cancel.store(true);
+        if (worker.joinable()) worker.join();
+    }
+};
+
+using BufferSearchJobPtr = std::shared_ptr<BufferSearchJob>;
+
+std::mutex g_search_jobs_mutex;
+std::unordered_map<int, BufferSearchJobPtr> g_search_jobs;
+std::atomic<int> g_next_search_id{1};
+
+constexpr size_t kSearchWindowBytes = 16u * 1024u * 1024u;
+// Regex scans cost more per byte; smaller windows keep progress and
+// cancellation responsive.
+constexpr size_t kRegexWindowBytes = 1024u * 1024u;
+// Text loaded past a regex window for matches that run over its end;
+// doubled (up to the whole rest of the text) when a match needs more.
+constexpr size_t kRegexTailBytes = 64u * 1024u;
+// Bytes around a window for whole-word checks (one UTF-8 character).
+constexpr size_t kWordContextBytes = 4;
+
+bool touches_word(const char* data, size_t size, size_t start, size_t end) {
+    uint32_t cp = 0;
+    return (start > 0 && lx::engine::is_word_char(lx::engine::utf8_code_point_before(data, start))) ||
+           (end < size && (lx::engine::utf8_decode(data, size, end, cp), lx::engine::is_word_char(cp)));
+}
+
+// Line and column (in code points) of the offset a scan has counted up to.
+// It only moves forward, over whichever window of the text is loaded.
+struct ScanPosition {
+    uint64_t line = 1;
+    uint64_t offset = 0;
+    uint64_t column = 0;
+
+    // Counts text[offset, to); `window` holds the text from byte `base` on.
+    void advance(const std::string& window, uint64_t base, uint64_t to) {
+        if (to <= offset) return;
+        const char* data = window.data();
+        size_t from = static_cast<size_t>(offset - base);
+        const size_t end = static_cast<size_t>(to - base);
+        while (const void* nl = std::memchr(data + from, '\n', end - from)) {
+            from = static_cast<size_t>(static_cast<const char*>(nl) - data) + 1;
+            ++line;
+            column = 0;
+        }
+        column += lx::engine::count_units(data, from, end, lx::engine::OffsetUnit::CodePoint);
+        offset = to;
+    }
+
+    // Skips to `to`, which starts on `to_line` (from the search index),
+    // without counting the text in between. Only the column is counted,
+    // reading back to the line start or the old offset, whichever is nearer.
+    template <typename Source>
+    void jump(Source& source, uint64_t to, uint64_t to_line) {
+        constexpr uint64_t kStep = 4096;
+        uint64_t counted = 0;
+        for (uint64_t end = to; end > offset;) {
+            const uint64_t begin = end - std::min<uint64_t>(kStep, end - offset);
+            uint64_t base = 0;
+            const std::string& window = source.window(begin, end, 0, base);
+            const char* data = window.data() + (begin - base);
+            size_t nl = static_cast<size_t>(end - begin);
+            while (nl > 0 && data[nl - 1] != '\n') --nl;
+            counted += lx::engine::count_units(data, nl, static_cast<size_t>(end - begin), lx::engine::OffsetUnit::CodePoint);
+            if (nl > 0) {
+                column = 0;
+                offset = begin + nl;
+                break;
+            }
+            end = begin;
+        }
+        line = to_line;
+        column += counted;
+        offset = to;
+    }
+};
+
+// Batch of candidates checked between publishes and cancel checks.
+constexpr size_t kNarrowBatch = 65536;
+
+template <typename Source>
+void run_narrowed_search(BufferSearchJob* job, Source& source) {
+    const uint64_t size = job->text_size();
+    const lx::engine::Searcher searcher(job->query, job->case_sensitive);
+    // Case folding keeps character widths, so every match is as long as the query.
+    const uint64_t length = lx::engine::count_units(
+        job->query.data(), 0, job->query.size(), lx::engine::OffsetUnit::CodePoint);
+
+    std::vector<BufferSearchMatch> batch;
+    uint64_t free_from = 0;
+    const std::vector<BufferSearchMatch>& candidates = job->candidates;
+    for (size_t first = 0; first < candidates.size();) {
+        // One window over the next candidates, however sparse they are.
+        size_t last = first;
+        while (last + 1 < candidates.size() && last + 1 - first < kNarrowBatch &&
+               candidates[last + 1].byte < candidates[first].byte + kSearchWindowBytes) {
+            ++last;
+        }
+        uint64_t base = 0;
+        const std::string& window =
+            source.window(candidates[first].byte, candidates[last].byte + 1, job->query.size(), base);
+        for (size_t i = first; i <= last; ++i) {
+            const BufferSearchMatch& candidate = candidates[i];
+            const uint64_t hit = candidate.byte;
+            const size_t local = static_cast<size_t>(hit - base);
+            // Same overlap rule as a scan: the leftmost match wins.
+            if (hit >= free_from && searcher.find(window.data(), window.size(), local, local + 1) == local) {
+                const uint64_t found = job->total.fetch_add(1) + 1;
+                if (job->max_results == 0 || found <= job->max_results) {
+                    batch.push_back(BufferSearchMatch{candidate.line, candidate.column, candidate.byte, length});
+                }
+                free_from = hit + job->query.size();
+            }
+        }
+        {
+            std::lock_guard<std::mutex> lock(job->mutex);
+            job->matches.insert(job->matches.end(), batch.begin(), batch.end());
+        }
+        batch.clear();
+        first = last + 1;
+        job->scanned_bytes.store(first == candidates.size() ? size : candidates[last].byte);
+        if (job->cancel.load(std::memory_order_relaxed)) break;
+    }
+    std::vector<BufferSearchMatch>().swap(job->candidates);
+    job->scanned_bytes.store(size);
+    job->done.store(true);
+}
+
+// Ranges of `size` bytes the buffer's search index leaves for `job` to scan;
+// false (and no ranges) when there is no index or the query gives it nothing
+// to filter on. A regex is filtered by the literal all its matches start with.
+bool indexed_search_ranges(const BufferSearchJob& job, size_t size, std::vector<lx::engine::SearchIndex::Range>& ranges) {
+    const auto index = job.buffer->ready_search_index();
+    if (!index || index->size() != size) return false;
+    const std::string literal = job.regex ? lx::engine::regex_literal_prefix(job.query) : job.query;
+    return index->candidates(literal, ranges);
+}
+
+// Scans `ranges` of the text for `job`. A flat source is one window over the
+// whole text; any other is loaded window by window, each with enough text
+// around it to check and finish the matches that start inside it.
+template <typename Source>
+void scan_buffer_search(BufferSearchJob* job, Source& source, const std::vector<lx::engine::SearchIndex::Range>& ranges) {
+    const uint64_t size = job->text_size();
+    const std::string& query = job->query;
+    ScanPosition position;
+
+    // Jumping to a later range takes its line from the index instead of
+    // counting the line breaks in between.
+    auto enter = [&](const lx::engine::SearchIndex::Range& range) {
+        if (range.line != 0 && range.begin > position.offset) position.jump(source, range.begin, range.line);
+    };
+    std::vector<BufferSearchMatch> batch;
+    auto record = [&](const std::string& window, uint64_t base, uint64_t hit, uint64_t hit_end) {
+        position.advance(window, base, hit);
+        const uint64_t found = job->total.fetch_add(1) + 1;
+        if (job->max_results == 0 || found <= job->max_results) {
+            const uint64_t length = lx::engine::count_units(
+                window.data(), static_cast<size_t>(hit - base), static_cast<size_t>(hit_end - base),
+                lx::engine::OffsetUnit::CodePoint);
+            batch.push_back(BufferSearchMatch{position.line, position.column, hit, length});
+        }
+    };
+    // Ends a window: counts the rest of it (the next one may not hold it)
+    // and hands its matches to pollers.
+    auto publish = [&](const std::string& window, uint64_t base, uint64_t window_end) {
+        if (!source.flat()) position.advance(window, base, window_end);
+        if (!batch.empty()) {
+            std::lock_guard<std::mutex> lock(job->mutex);
+            job->matches.insert(job->matches.end(), batch.begin(), batch.end());
+        }
+        batch.clear();
+        job->scanned_bytes.store(window_end);
+    };
+    auto cancelled = [&]() { return job->cancel.load(std::memory_order_relaxed); };
+
+    if (job->regex) {
+        std::vector<size_t> groups;
+        uint64_t pos = 0;
+        bool allow_empty = true;
+        size_t tail = kRegexTailBytes;
+        for (const auto& range : ranges) {
+            enter(range);
+            uint64_t window_start = range.begin;
+            if (window_start > pos) {
+                pos = window_start;
+                allow_empty = true;
+            }
+            // At least one window: an empty text can still hold an empty match.
+            do {
+                const uint64_t window_end = std::min<uint64_t>(range.end, window_start + kRegexWindowBytes);
+                uint64_t base = 0;
+                const std::string* window = &source.window(window_start, window_end, tail, base);
+                auto scanner = std::make_unique<lx::engine::RegexScanner>(*job->regex, window->data(), window->size());
+                scanner->set_open_end(base + window->size() < size);
+                while (true) {
+                    const bool found = scanner->next(
+                        static_cast<size_t>(pos - base), static_cast<size_t>(window_end - base), groups, allow_empty);
+                    if (scanner->ran_out()) {
+                        // A match may run past the loaded text: load more and look again.
+                        tail *= 2;
+                        window = &source.window(window_start, window_end, tail, base);
+                        scanner = std::make_unique<lx::engine::RegexScanner>(*job->regex, window->data(), window->size());
+                        scanner->set_open_end(base + window->size() < size);
+                        continue;
+                    }
+                    if (!found) break;
+                    const uint64_t hit = base + groups[0];
+                    const uint64_t hit_end = base + groups[1];
+                    if (job->whole_words && touches_word(window->data(), window->size(), groups[0], groups[1])) {
+                        // Not a whole word: look again from the next character.
+                        uint32_t cp = 0;
+                        pos = hit < size ? hit + lx::engine::utf8_decode(window->data(), window->size(), groups[0], cp)
+                                         : size + 1;
+                        allow_empty = true;
+                        if (pos > size) break;
+                        continue;
+                    }
+                    record(*window, base, hit, hit_end);
+                    if (job->replacement) {
+                        const size_t text_start = job->replacement_texts.size();
+                        job->replacement->expand(window->data(), groups, job->replacement_texts);
+                        job->edits.push_back(lx::engine::PieceTable::Edit{
+                            hit, hit_end, text_start, job->replacement_texts.size() - text_start});
+                    }
+                    pos = hit_end;
+                    allow_empty = hit_end != hit;
+                }
+                window_start = window_end;
+                pos = std::max(pos, window_start);
+                publish(*window, base, window_end);
+            } while (window_start < range.end && !cancelled());
+            if (cancelled()) break;
+        }
+        if (!cancelled()) job->scanned_bytes.store(size);
+        job->done.store(true);
+        return;
+    }
+
+    uint64_t pos = 0;
+    for (const auto& range : ranges) {
+        enter(range);
+        uint64_t window_start = range.begin;
+        pos = std::max(pos, window_start);
+        while (window_start < range.end && !cancelled()) {
+            const uint64_t window_end = std::min<uint64_t>(range.end, window_start + kSearchWindowBytes);
+            uint64_t base = 0;
+            const std::string& window =
+                source.window(window_start, window_end, query.size() - 1 + kWordContextBytes, base);
+            lx::engine::ForwardScanner scanner(window, query, job->case_sensitive, job->whole_words);
+            while (true) {
+                const size_t hit = scanner.next(static_cast<size_t>(pos - base), static_cast<size_t>(window_end - base));
+                if (hit == std::string::npos) break;
+                record(window, base, base + hit, base + hit + query.size());
+                pos = base + hit + std::max<size_t>(1, query.size());
+            }
+            window_start = window_end;
+            pos = std::max(pos, window_start);
+            publish(window, base, window_end);
+        }
+        if (cancelled()) break;
+    }
+    if (!cancelled()) job->scanned_bytes.store(size);
+    job->done.store(true);
+}
+
+void run_buffer_search(BufferSearchJob* job) {
+    const std::vector<lx::engine::SearchIndex::Range> whole_text{{0, job->text_size(), 0}};
+    if (job->pieces) {
+        PieceTableWindowSource source{*job->pieces, {}};
+        if (job->narrowed) {
+            run_narrowed_search(job, source);
+        } else {
+            scan_buffer_search(job, source, whole_text);
+        }
+        return;
+    }
+    TextBuffer& buffer = *job->buffer;
+    if (job->narrowed) {
+        // Only the windows around earlier matches are read; a cold buffer
+        // stays cold.
+        BufferWindowSource source{buffer, buffer.resident_if_warm(), {}};
+        run_narrowed_search(job, source);
+        return;
+    }
+    // Where a match may start: the whole text, or only the blocks the search
+    // index could not rule out (each with the line it starts on). Only those
+    // blocks are read then, so a cold buffer stays cold; a full scan makes
+    // it resident like any whole-text work.
+    std::vector<lx::engine::SearchIndex::Range> ranges;
+    job->indexed.store(indexed_search_ranges(*job, buffer.size, ranges));
+    BufferWindowSource source{buffer, job->indexed.load() ? buffer.resident_if_warm() : buffer.resident(), {}};
+    scan_buffer_search(job, source, job->indexed.load() ? ranges : whole_text);
+}
+
+BufferSearchJobPtr find_search_job(int search_id) {
+    std::lock_guard<std::mutex> lock(g_search_jobs_mutex);
+    auto it = g_search_jobs.find(search_id);
+    if (it == g_search_jobs.end()) {
+        throw py::value_error("Invalid search id");
+    }
+    return it->second;
+}
+
+// Options of a search start: the query is a regex when `regex` is set, and
+// a non-None `replacement` (regex only) makes it a replace job.
+struct SearchOptions {
+    bool case_sensitive = false;
+    bool whole_words = false;
+    int64_t max_results = 0;
+    bool regex = false;
+    py::object replacement = py::none();
+};
+
+BufferSearchJobPtr make_search_job(TextBufferPtr buffer, const std::string& query, const SearchOptions& options) {
+    if (query.empty()) {
+        throw py::value_error("query must not be empty");
+    }
+    auto job = std::make_shared<BufferSearchJob>();
+    if (options.regex) {
+        // Syntax errors surface as ValueError before any thread starts.
+        job->regex = std::make_unique<lx::engine::Regex>(query, options.case_sensitive);
+        if (!options.replacement.is_none()) {
+            job->replacement = std::make_unique<lx::engine::RegexReplacement>(
+                options.replacement.cast<std::string>(), *job->regex);
+        }
+    } else if (!options.replacement.is_none()) {
+        throw py::value_error("replacement needs regex=True");
+    }
+    job->buffer = std::move(buffer);
+    job->query = query;
+    job->case_sensitive = options.case_sensitive;
+    job->whole_words = options.whole_words;
+    job->max_results = options.max_results > 0 ? static_cast<size_t>(options.max_results) : 0;
+    return job;
+}
+
+// The text a search job scans: a buffer, or a snapshot of an edited piece
+// table over it (see BufferSearchJob::pieces).
+struct SearchText {
+    TextBufferPtr buffer;
+    int edit_id = 0;
+    uint64_t revision = 0;
+    std::shared_ptr<const lx::engine::PieceTable> pieces;
+    std::shared_ptr<const std::string> pieces_original;
+};
+
+SearchText search_text_of(const BufferSearchJob& job) {
+    return SearchText{job.buffer, job.edit_id, job.revision, job.pieces, job.pieces_original};
+}
+
+int start_search_job(
+    SearchText text,
+    const std::string& query,
+    const SearchOptions& options,
+    std::vector<BufferSearchMatch>* candidates = nullptr) {
+    BufferSearchJobPtr job = make_search_job(std::move(text.buffer), query, options);
+    job->edit_id = text.edit_id;
+    job->revision = text.revision;
+    job->pieces = std::move(text.pieces);
+    job->pieces_original = std::move(text.pieces_original);
+    if (candidates != nullptr) {
+        job->candidates = std::move(*candidates);
+        job->narrowed = true;
+    }
+    job->worker = std::thread(run_buffer_search, job.get());
+
+    const int search_id = g_next_search_id.fetch_add(1);
+    std::lock_guard<std::mutex> lock(g_search_jobs_mutex);
+    g_search_jobs.emplace(search_id, std::move(job));
+    return search_id;
+}
+
+int start_text_buffer_search_binding(
+    int handle,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    int64_t max_results,
+    bool regex,
+    py::object replacement) {
+    const SearchOptions options{case_sensitive, whole_words, max_results, regex, std::move(replacement)};
+    return start_search_job(SearchText{find_text_buffer(handle)}, query, options);
+}
+
+// The same scan as a background search, run to the end on the calling
+// thread over text that never becomes a registered buffer. Meant for many
+// small texts searched from a pool of worker threads (find in files), where
+// a thread per search would only add overhead. "matches" rows are
+// (line, column, byte, length) as in get_text_buffer_search_results;
+// "lines" counts the line breaks in `text`, so a caller walking a file
+// chunk by chunk keeps line numbers without rescanning the chunk itself.
+// Only data[0, end) is searched (all of it when end < 0), so a caller can
+// leave an unfinished last line in place instead of slicing it off.
+py::dict search_bytes_binding(
+    const py::bytes& data,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    int64_t max_results,
+    bool regex,
+    int64_t end) {
+    char* raw = nullptr;
+    Py_ssize_t raw_size = 0;
+    if (PyBytes_AsStringAndSize(data.ptr(), &raw, &raw_size) != 0) {
+        throw py::error_already_set();
+    }
+    const size_t size = end < 0 ? static_cast<size_t>(raw_size) : std::min(static_cast<size_t>(end), static_cast<size_t>(raw_size));
+    std::string text(raw, size);
+    const SearchOptions options{case_sensitive, whole_words, max_results, regex};
+    BufferSearchJobPtr job = make_search_job(std::make_shared<TextBuffer>(std::move(text)), query, options);
+    std::vector<std::tuple<int64_t, int64_t, int64_t, int64_t>> rows;
+    uint64_t lines = 0;
+    {
+        py::gil_scoped_release release;
+        run_buffer_search(job.get());
+        rows.reserve(job->matches.size());
+        for (const BufferSearchMatch& match : job->matches) {
+            rows.emplace_back(
+                static_cast<int64_t>(match.line),
+                static_cast<int64_t>(match.column),
+                static_cast<int64_t>(match.byte),
+                static_cast<int64_t>(match.length));
+        }
+        const std::shared_ptr<const std::string> resident = job->buffer->resident();
+        const char* data = resident->data();
+        const char* end = data + resident->size();
+        while (const void* nl = std::memchr(data, '\n', static_cast<size_t>(end - data))) {
+            ++lines;
+            data = static_cast<const char*>(nl) + 1;
+        }
+    }
+    py::dict result;
+    result["matches"] = std::move(rows);
+    result["lines"] = lines;
+    result["total"] = job->total.load();
+    return result;
+}
+
+// Replace in files: `data` with every match search_bytes would report
+// replaced, on the calling thread with the GIL released. A regex
+// replacement is a template as in start_text_buffer_search, a plain one is
+// literal text. Empty regex matches (`^`, `a*`) are left alone, as find in
+// files leaves them out. "count" is the number of replacements made.
+py::dict replace_bytes_binding(
+    const py::bytes& data,
+    const std::string& query,
+    const std::string& replacement,
+    bool case_sensitive,
+    bool whole_words,
+    bool regex) {
+    char* raw = nullptr;
+    Py_ssize_t raw_size = 0;
+    if (PyBytes_AsStringAndSize(data.ptr(), &raw, &raw_size) != 0) {
+        throw py::error_already_set();
+    }
+    SearchOptions options{case_sensitive, whole_words, 0, regex};
+    if (regex) options.replacement = py::str(replacement);
+    BufferSearchJobPtr job = make_search_job(
+        std::make_shared<TextBuffer>(std::string(raw, static_cast<size_t>(raw_size))), query, options);
+    std::string out;
+    uint64_t count = 0;
+    {
+        py::gil_scoped_release release;
+        run_buffer_search(job.get());
+        const std::shared_ptr<const std::string> resident = job->buffer->resident();
+        const std::string& text = *resident;
+        size_t pos = 0;
+        auto replace = [&](size_t start, size_t end, const char* with, size_t length) {
+            out.append(text, pos, start - pos);
+            out.append(with, length);
+            pos = end;
+            ++count;
+        };
+        if (job->replacement) {
+            for (const lx::engine::PieceTable::Edit& edit : job->edits) {
+                if (edit.end == edit.start) continue;
+                replace(static_cast<size_t>(edit.start), static_cast<size_t>(edit.end),
+                        job->replacement_texts.data() + edit.text_start, static_cast<size_t>(edit.text_length));
+            }
+        } else {
+            for (const BufferSearchMatch& match : job->matches) {
+                const size_t start = static_cast<size_t>(match.byte);
+                const size_t end = lx::engine::advance_units(
+                    text.data(), text.size(), start, match.length, lx::engine::OffsetUnit::CodePoint);
+                replace(start, end, replacement.data(), replacement.size());
+            }
+        }
+        out.append(text, pos, std::string::npos);
+    }
+    py::dict result;
+    result["data"] = py::bytes(out);
+    result["count"] = count;
+    return result;
+}
+
+// Whether occurrences of `query` can overlap (it has a border: a proper
+// prefix that is also a suffix, as in "aba").
+bool overlaps_itself(const std::string& query) {
+    std::vector<size_t> border(query.size(), 0);
+    for (size_t i = 1, k = 0; i < query.size(); ++i) {
+        while (k > 0 && query[i] != query[k]) k = border[k - 1];
+        if (query[i] == query[k]) ++k;
+        border[i] = k;
+    }
+    return !query.empty() && border.back() > 0;
+}
+
+// Whether the matches of a finished job hold every match of `query`, so a
+// refined search only has to check them. True when both are plain
+// searches without whole words, every match of the old one was stored,
+// `query` extends the old query (by the old job's case rule; a
+// case-insensitive job also covers a case-sensitive refinement) and the
+// old query cannot overlap itself, so no occurrence was skipped.
+bool can_narrow_search(const BufferSearchJob& previous, const std::string& query, const SearchOptions& options) {
+    if (previous.regex || previous.whole_words || options.regex || options.whole_words) return false;
+    if (previous.case_sensitive && !options.case_sensitive) return false;
+    if (!previous.done.load() || previous.cancel.load()) return false;
+    if (previous.max_results != 0 && previous.total.load() > previous.max_results) return false;
+    const std::string& old_query = previous.query;
+    if (query.size() < old_query.size() ||
+        (query.size() > old_query.size() && (static_cast<unsigned char>(query[old_query.size()]) & 0xC0) == 0x80)) {
+        return false;
+    }
+    if (previous.case_sensitive) {
+        return query.compare(0, old_query.size(), old_query) == 0 && !overlaps_itself(old_query);
+    }
+    const std::string folded = lx::engine::fold_case_utf8(old_query);
+    return lx::engine::fold_case_utf8(query.substr(0, old_query.size())) == folded && !overlaps_itself(folded);
+}
+
+int refine_text_buffer_search_binding(
+    int search_id,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    int64_t max_results,
+    bool regex) {
+    const BufferSearchJobPtr previous = find_search_job(search_id);
+    const SearchOptions options{case_sensitive, whole_words, max_results, regex, py::none()};
+    if (!query.empty() && can_narrow_search(*previous, query, options)) {
+        std::vector<BufferSearchMatch> candidates;
+        {
+            py::gil_scoped_release release;
+            std::lock_guard<std::mutex> lock(previous->mutex);
+            candidates = previous->matches;
+        }
+        return start_search_job(search_text_of(*previous), query, options, &candidates);
+    }
+    return start_search_job(search_text_of(*previous), query, options);
+}
+
+py::dict get_text_buffer_search_results_binding(int search_id, int64_t start, int64_t max_count) {
+    const BufferSearchJobPtr job = find_search_job(search_id);
+    // Read `done` before copying: if it was set, every match is already stored.
+    const bool done = job->done.load();
+    std::vector<BufferSearchMatch> slice;
+    size_t stored = 0;
+    {
+        py::gil_scoped_release release;
+        std::lock_guard<std::mutex> lock(job->mutex);
+        stored = job->matches.size();
+        const size_t first = static_cast<size_t>(std::max<int64_t>(0, start));
+        if (first < stored) {
+            size_t count = stored - first;
+            if (max_count > 0) count = std::min(count, static_cast<size_t>(max_count));
+            slice.assign(job->matches.begin() + first, job->matches.begin() + first + count);
+        }
+    }
+
+    py::list rows(slice.size());
+    for (size_t i = 0; i < slice.size(); ++i) {
+        rows[i] = py::make_tuple(slice[i].line, slice[i].column, slice[i].byte, slice[i].length);
+    }
+    py::dict d;
+    d["matches"] = rows;
+    d["stored"] = static_cast<uint64_t>(stored);
+    d["total"] = job->total.load();
+    d["done"] = done;
+    d["scanned_bytes"] = job->scanned_bytes.load();
+    d["total_bytes"] = job->text_size();
+    d["narrowed"] = job->narrowed;
+    d["indexed"] = job->indexed.load();
+    return d;
+}
+
+void cancel_text_buffer_search_binding(int search_id) {
+    BufferSearchJobPtr job;
+    {
+        std::lock_guard<std::mutex> lock(g_search_jobs_mutex);
+        auto it = g_search_jobs.find(search_id);
+        if (it == g_search_jobs.end()) return;
+        job = std::move(it->second);
+        g_search_jobs.erase(it);
+    }
+    py::gil_scoped_release release;
+    job->stop();
+}
+
+// Stops the scan but keeps the job registered: its matches so far and its
+// snapshot can still be read and refined until cancel_text_buffer_search.
+void stop_text_buffer_search_binding(int search_id) {
+    find_search_job(search_id)->cancel.store(true);
+}
+
+BufferSearchJobPtr finished_replace_job(int search_id) {
+    const BufferSearchJobPtr job = find_search_job(search_id);
+    if (!job->replacement) {
+        throw py::value_error("Not a replace search");
+    }
+    if (!job->done.load() || job->cancel.load()) {
+        throw py::value_error("Replace search has not finished");
+    }
+    return job;
+}
+
+py::str get_text_buffer_search_replacement_binding(int search_id) {
+    const BufferSearchJobPtr job = finished_replace_job(search_id);
+    std::string out;
+    {
+        py::gil_scoped_release release;
+        std::shared_ptr<const std::string> resident;
+        std::string edited;
+        if (job->pieces) {
+            job->pieces->read(0, job->pieces->size(), edited);
+        } else {
+            resident = job->buffer->resident();
+        }
+        const std::string& text = job->pieces ? edited : *resident;
+        out.reserve(text.size() + job->replacement_texts.size());
+        size_t pos = 0;
+        for (const lx::engine::PieceTable::Edit& edit : job->edits) {
+            out.append(text, pos, static_cast<size_t>(edit.start) - pos);
+            out.append(job->replacement_texts, static_cast<size_t>(edit.text_start), static_cast<size_t>(edit.text_length));
+            pos = static_cast<size_t>(edit.end);
+        }
+        out.append(text, pos, std::string::npos);
+    }
+    return py::str(out);
+}
+
+py::object regex_expand_match_binding(
+    const std::string& text,
+    const std::string& pattern,
+    const std::string& replacement,
+    bool case_sensitive) {
+    const lx::engine::Regex regex(pattern, case_sensitive);
+    const lx::engine::RegexReplacement expansion(replacement, regex);
+    std::string out;
+    bool matched = false;
+    {
+        py::gil_scoped_release release;
+        lx::engine::RegexScanner scanner(regex, text.data(), text.size());
+        std::vector<size_t> groups;
+        matched = scanner.full_match(groups);
+        if (matched) expansion.expand(text.data(), groups, out);
+    }
+    if (!matched) {
+        return py::none();
+    }
+    return py::str(out);
+}
+
+// --- PIECE TABLE EDITING ---
+
+// Editable session over a text buffer snapshot. The piece table reads the
+// buffer's resident text and completed line index directly; the shared_ptrs
+// keep both alive even after the viewer releases its handle or the buffer
+// goes cold.
+struct EditSession {
+    EditSession(TextBufferPtr source, std::shared_ptr<const std::string> text, bool use_index)
+        : buffer(std::move(source)), original(std::move(text)), table(*original, use_index ? &buffer->line_index : nullptr) {}
+    EditSession(TextBufferPtr source, std::shared_ptr<const std::string> text, lx::engine::PieceTable copy)
+        : buffer(std::move(source)), original(std::move(text)), table(std::move(copy)) {}
+
+    TextBufferPtr buffer;
+    std::shared_ptr<const std::string> original;
+    lx::engine::PieceTable table;
+};
+
+using EditSessionPtr = std::shared_ptr<EditSession>;
+
+std::mutex g_edit_sessions_mutex;
+std::unordered_map<int, EditSessionPtr> g_edit_sessions;
+std::atomic<int> g_next_edit_id{1};
+
+int add_edit_session(EditSessionPtr session) {
+    const int edit_id = g_next_edit_id.fetch_add(1);
+    std::lock_guard<std::mutex> lock(g_edit_sessions_mutex);
+    g_edit_sessions.emplace(edit_id, std::move(session));
+    return edit_id;
+}
+
+EditSessionPtr find_edit_session(int edit_id) {
+    std::lock_guard<std::mutex> lock(g_edit_sessions_mutex);
+    auto it = g_edit_sessions.find(edit_id);
+    if (it == g_edit_sessions.end()) {
+        throw py::value_error("Invalid piece table handle");
+    }
+    return it->second;
+}
+
+int create_piece_table_binding(int handle) {
+    TextBufferPtr buffer = find_text_buffer(handle);
+    std::shared_ptr<const std::string> text;
+    {
+        // Line lookups inside original pieces use the finished index.
+        py::gil_scoped_release release;
+        std::unique_lock<std::mutex> lock(buffer->progress_mutex);
+        buffer->progress_cv.wait(lock, [&]() { return buffer->index_finished.load(); });
+        lock.unlock();
+        text = buffer->resident();
+    }
+    const bool use_index = buffer->index_complete.load();
+    return add_edit_session(std::make_shared<EditSession>(std::move(buffer), std::move(text), use_index));
+}
+
+void release_piece_table_binding(int edit_id) {
+    EditSessionPtr session;
+    {
+        std::lock_guard<std::mutex> lock(g_edit_sessions_mutex);
+        auto it = g_edit_sessions.find(edit_id);
+        if (it == g_edit_sessions.end()) return;
+        session = std::move(it->second);
+        g_edit_sessions.erase(it);
+    }
+}
+
+int snapshot_piece_table_binding(int edit_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    return add_edit_session(std::make_shared<EditSession>(session->buffer, session->original, session->table.snapshot()));
+}
+
+py::dict get_piece_table_info_binding(int edit_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    const lx::engine::PieceTable& table = session->table;
+    py::dict d;
+    d["bytes"] = table.size();
+    d["line_count"] = static_cast<uint64_t>(table.line_count());
+    d["pieces"] = static_cast<uint64_t>(table.piece_count());
+    d["add_bytes"] = static_cast<uint64_t>(table.add_bytes());
+    d["memory_bytes"] = static_cast<uint64_t>(table.memory_bytes());
+    d["revision"] = table.revision();
+    d["can_undo"] = table.can_undo();
+    d["can_redo"] = table.can_redo();
+    d["is_original"] = table.is_original();
+    return d;
+}
+
+void piece_table_insert_binding(int edit_id, int64_t offset, const std::string& text) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    session->table.insert(static_cast<uint64_t>(std::max<int64_t>(0, offset)), text);
+}
+
+void piece_table_erase_binding(int edit_id, int64_t offset, int64_t length) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    if (length <= 0) return;
+    session->table.erase(static_cast<uint64_t>(std::max<int64_t>(0, offset)), static_cast<uint64_t>(length));
+}
+
+void piece_table_break_undo_group_binding(int edit_id) {
+    find_edit_session(edit_id)->table.break_undo_group();
+}
+
+int64_t piece_table_undo_binding(int edit_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    uint64_t cursor = 0;
+    return session->table.undo(cursor) ? static_cast<int64_t>(cursor) : -1;
+}
+
+int64_t piece_table_redo_binding(int edit_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    uint64_t cursor = 0;
+    return session->table.redo(cursor) ? static_cast<int64_t>(cursor) : -1;
+}
+
+std::vector<std::string> get_piece_table_lines_binding(int edit_id, int64_t start_line, int count) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    std::vector<std::string> rows;
+    if (start_line <= 0 || count <= 0) {
+        return rows;
+    }
+    session->table.lines(static_cast<size_t>(start_line - 1), static_cast<size_t>(count), rows);
+    return rows;
+}
+
+int64_t piece_table_offset_binding(int edit_id, int64_t line_number, int64_t column) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    const lx::engine::PieceTable& table = session->table;
+    const size_t line = static_cast<size_t>(std::max<int64_t>(1, line_number) - 1);
+    if (line >= table.line_count()) {
+        return static_cast<int64_t>(table.size());
+    }
+    const uint64_t begin = table.line_start(line);
+    const uint64_t end = table.line_start(line + 1);
+    std::string row;
+    table.read(begin, end - begin, row);
+    size_t row_end = row.size();
+    if (row_end > 0 && row[row_end - 1] == '\n') --row_end;
+    if (row_end > 0 && row[row_end - 1] == '\r') --row_end;
+    const size_t advanced = lx::engine::advance_units(
+        row.data(), row_end, 0, static_cast<uint64_t>(std::max<int64_t>(0, column)), lx::engine::OffsetUnit::CodePoint);
+    return static_cast<int64_t>(begin + advanced);
+}
+
+py::tuple piece_table_position_binding(int edit_id, int64_t offset) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    const lx::engine::PieceTable& table = session->table;
+    uint64_t target = std::min<uint64_t>(table.size(), static_cast<uint64_t>(std::max<int64_t>(0, offset)));
+    uint64_t begin = 0;
+    size_t line = table.line_of_offset(target, begin);
+    if (line >= table.line_count()) {
+        // Past a trailing newline: clamp to the end of the last line.
+        line = table.line_count() - 1;
+        begin = table.line_start(line);
+        target = table.size() > begin ? table.size() - 1 : begin;
+    }
+    std::string prefix;
+    table.read(begin, target - begin, prefix);
+    const uint64_t column = lx::engine::count_units(prefix.data(), 0, prefix.size(), lx::engine::OffsetUnit::CodePoint);
+    return py::make_tuple(static_cast<uint64_t>(line + 1), column);
+}
+
+py::tuple read_piece_table_chunk_binding(int edit_id, int64_t offset, int64_t max_bytes) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    std::string text;
+    {
+        py::gil_scoped_release release;
+        const uint64_t start = static_cast<uint64_t>(std::max<int64_t>(0, offset));
+        session->table.read(start, static_cast<uint64_t>(std::max<int64_t>(4, max_bytes)), text);
+        // Keep multi-byte sequences whole; the next call resumes at the cut.
+        if (!text.empty() && start + text.size() < session->table.size()) {
+            text.resize(utf8_safe_length(text.data(), text.size()));
+        }
+    }
+    const uint64_t next = static_cast<uint64_t>(std::max<int64_t>(0, offset)) + text.size();
+    return py::make_tuple(py::str(text), next);
+}
+
+uint64_t write_piece_table_to_file_binding(int edit_id, const std::string& path, const std::string& encoding) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    return write_spans_to_file(path, encoding, [&](auto&& fn) { session->table.for_each_span(fn); });
+}
+
+int piece_table_to_text_buffer_binding(int edit_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    if (session->table.is_original()) {
+        // Unedited: share the original snapshot under a new handle.
+        return g_text_buffers.add(session->buffer);
+    }
+    std::string text;
+    {
+        py::gil_scoped_release release;
+        session->table.read(0, session->table.size(), text);
+    }
+    return create_text_buffer_binding(std::move(text));
+}
+
+int64_t piece_table_replace_all_binding(
+    int edit_id,
+    const std::string& query,
+    const std::string& replacement,
+    bool case_sensitive,
+    bool whole_words) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    if (query.empty()) {
+        return 0;
+    }
+    py::gil_scoped_release release;
+    lx::engine::PieceTable& table = session->table;
+    const uint64_t size = table.size();
+    // Scan the current text window by window. Each window carries a few
+    // bytes of context for whole-word checks and query.size() - 1 extra
+    // bytes so matches starting near its end are complete.
+    constexpr uint64_t kContext = 4;
+    std::vector<uint64_t> offsets;
+    std::string window;
+    uint64_t pos = 0;
+    for (uint64_t start = 0; start < size; start += kSearchWindowBytes) {
+        const uint64_t end = std::min<uint64_t>(size, start + kSearchWindowBytes);
+        const uint64_t read_from = start >= kContext ? start - kContext : 0;
+        table.read(read_from, end - read_from + query.size() - 1 + kContext, window);
+        lx::engine::ForwardScanner scanner(window, query, case_sensitive, whole_words);
+        size_t local = static_cast<size_t>(pos - read_from);
+        const size_t local_end = static_cast<size_t>(end - read_from);
+        while (local < local_end) {
+            const size_t hit = scanner.next(local, local_end);
+            if (hit == std::string::npos) break;
+            offsets.push_back(read_from + hit);
+            local = hit + query.size();
+        }
+        pos = std::max<uint64_t>(read_from + local, end);
+    }
+    table.replace_all(offsets, query.size(), replacement);
+    return static_cast<int64_t>(offsets.size());
+}
+
+int start_piece_table_search_binding(
+    int edit_id,
+    const std::string& query,
+    bool case_sensitive,
+    bool whole_words,
+    int64_t max_results,
+    bool regex,
+    py::object replacement) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    const SearchOptions options{case_sensitive, whole_words, max_results, regex, std::move(replacement)};
+    const uint64_t revision = session->table.revision();
+    SearchText text{session->buffer, edit_id, revision};
+    if (!session->table.is_original()) {
+        // Edited: scan a copy of the piece list and added text, so the scan
+        // never races with further edits and the file is never copied whole.
+        text.pieces = std::make_shared<const lx::engine::PieceTable>(session->table.snapshot());
+        text.pieces_original = session->original;
+    }
+    return start_search_job(std::move(text), query, options);
+}
+
+int64_t piece_table_apply_search_replacements_binding(int edit_id, int search_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    const BufferSearchJobPtr job = finished_replace_job(search_id);
+    if (job->edit_id != edit_id || job->revision != session->table.revision()) {
+        throw py::value_error("The text changed since the search started");
+    }
+    py::gil_scoped_release release;
+    session->table.replace_spans(job->edits, job->replacement_texts);
+    return static_cast<int64_t>(job->edits.size());
+}
+
+// --- DOCUMENT OVERVIEW ---
+
+// Bucket line boundaries and their byte offsets; `line_start(i)` maps a
+// 0-based line to its first byte.
+template <typename LineStart>
+void bucket_overview_lines(lx::engine::Overview& overview, uint64_t line_count, uint64_t size, size_t buckets, LineStart&& line_start) {
+    overview.line_count = line_count;
+    overview.first_lines = lx::engine::overview_first_lines(line_count, buckets);
+    const size_t count = overview.bucket_count();
+    overview.offsets.resize(count + 1);
+    for (size_t b = 0; b < count; ++b) {
+        overview.offsets[b] = std::min<uint64_t>(size, line_start(overview.first_lines[b]));
+    }
+    overview.offsets[count] = size;
+}
+
+std::vector<uint32_t> search_overview_hits(const BufferSearchJobPtr& job, const lx::engine::Overview& overview) {
+    std::vector<uint32_t> hits(overview.bucket_count(), 0);
+    std::lock_guard<std::mutex> lock(job->mutex);
+    size_t bucket = 0;
+    for (const BufferSearchMatch& match : job->matches) {
+        const uint64_t line = match.line > 0 ? match.line - 1 : 0;
+        // Matches arrive in line order, so the bucket only moves forward.
+        while (bucket + 1 < hits.size() && overview.first_lines[bucket + 1] <= line) ++bucket;
+        if (!hits.empty()) ++hits[bucket];
+    }
+    return hits;
+}
+
+py::dict overview_to_dict(
+    const lx::engine::Overview& overview,
+    const std::vector<std::string>& keywords,
+    const std::vector<uint32_t>* search_hits) {
+    const size_t count = overview.bucket_count();
+    std::vector<uint64_t> bucket_bytes(count);
+    for (size_t b = 0; b < count; ++b) {
+        bucket_bytes[b] = overview.offsets[b + 1] - overview.offsets[b];
+    }
+    py::dict keyword_rows;
+    for (size_t k = 0; k < keywords.size(); ++k) {
+        keyword_rows[py::str(keywords[k])] = py::cast(overview.keyword_hits[k]);
+    }
+    py::dict d;
+    d["line_count"] = overview.line_count;
+    d["bytes"] = overview.offsets.empty() ? 0 : overview.offsets.back();
+    d["first_lines"] = py::cast(std::vector<uint64_t>(overview.first_lines.begin(), overview.first_lines.end() - (count > 0 ? 1 : 0)));
+    d["bucket_bytes"] = py::cast(bucket_bytes);
+    d["keywords"] = keyword_rows;
+    if (search_hits != nullptr) {
+        d["search"] = py::cast(*search_hits);
+    } else {
+        d["search"] = py::none();
+    }
+    return d;
+}
+
+void build_buffer_overview(
+    TextBuffer& buffer,
+    size_t buckets,
+    const std::vector<std::string>& keywords,
+    bool case_sensitive,
+    lx::engine::Overview& overview) {
+    const uint64_t size = buffer.size;
+    {
+        std::shared_lock<std::shared_mutex> lock(buffer.index_mutex);
+        bucket_overview_lines(overview, available_line_count(buffer), size, buckets, [&](uint64_t line) {
+            return buffer.line_index.offset(static_cast<size_t>(line));
+        });
+    }
+    BufferWindowSource source{buffer, buffer.resident_if_warm(), {}};
+    lx::engine::count_overview_keywords(source, size, keywords, case_sensitive, overview);
+}
+
+py::dict build_text_buffer_overview_binding(
+    int handle,
+    int buckets,
+    const std::vector<std::string>& keywords,
+    bool case_sensitive,
+    int search_id) {
+    const TextBufferPtr buffer = find_text_buffer(handle);
+    lx::engine::Overview overview;
+    const BufferSearchJobPtr job = search_id >= 0 ? find_search_job(search_id) : nullptr;
+    std::vector<uint32_t> search_hits;
+    {
+        py::gil_scoped_release release;
+        std::unique_lock<std::mutex> lock(buffer->progress_mutex);
+        buffer->progress_cv.wait(lock, [&]() { return buffer->index_finished.load(); });
+        lock.unlock();
+        build_buffer_overview(*buffer, static_cast<size_t>(std::max(1, buckets)), keywords, case_sensitive, overview);
+        if (job) search_hits = search_overview_hits(job, overview);
+    }
+    return overview_to_dict(overview, keywords, job ? &search_hits : nullptr);
+}
+
+py::dict build_piece_table_overview_binding(
+    int edit_id,
+    int buckets,
+    const std::vector<std::string>& keywords,
+    bool case_sensitive,
+    int search_id) {
+    const EditSessionPtr session = find_edit_session(edit_id);
+    lx::engine::Overview overview;
+    const BufferSearchJobPtr job = search_id >= 0 ? find_search_job(search_id) : nullptr;
+    std::vector<uint32_t> search_hits;
+    {
+        py::gil_scoped_release release;
+        const size_t bucket_limit = static_cast<size_t>(std::max(1, buckets));
+        const lx::engine::PieceTable& table = session->table;
+        if (table.is_original()) {
+            build_buffer_overview(*session->buffer, bucket_limit, keywords, case_sensitive, overview);
+        } else {
+            bucket_overview_lines(overview, table.line_count(), table.size(), bucket_limit, [&](uint64_t line) {
+                return table.line_start(static_cast<size_t>(line));
+            });
+            PieceTableWindowSource source{table, {}};
+            lx::engine::count_overview_keywords(source, table.size(), keywords, case_sensitive, overview);
+        }
+        if (job) search_hits = search_overview_hits(job, overview);
+    }
+    return overview_to_dict(overview, keywords, job ? &search_hits : nullptr);
 }
 }  // namespace
 
@@ -311,17 +2464,26 @@ PYBIND11_MODULE(lx_engine, m) {
           py::arg("input"), 
           py::call_guard<py::gil_scoped_release>());
           
-    m.def("find_all", &lx::engine::find_all, 
+    m.def("find_all", &find_all_binding,
           py::arg("text"), py::arg("query"), py::arg("case_sensitive"), py::arg("whole_words"),
+          py::arg("unit") = "byte",
           py::call_guard<py::gil_scoped_release>());
 
-    m.def("find_next_position", &lx::engine::find_next_position,
+    m.def("find_next_position", &find_next_position_binding,
           py::arg("text"),
           py::arg("query"),
           py::arg("case_sensitive"),
           py::arg("whole_words"),
           py::arg("start_pos"),
           py::arg("wrap") = false,
+          py::arg("unit") = "byte",
+          py::call_guard<py::gil_scoped_release>());
+
+    m.def("convert_offset", &convert_offset_binding,
+          py::arg("text"),
+          py::arg("offset"),
+          py::arg("from_unit"),
+          py::arg("to_unit"),
           py::call_guard<py::gil_scoped_release>());
           
     m.def("replace_all",
@@ -343,6 +2505,17 @@ PYBIND11_MODULE(lx_engine, m) {
           py::arg("whole_words") = false,
           py::call_guard<py::gil_scoped_release>());
 
+    m.def("fold_case", &lx::engine::fold_case_utf8,
+          py::arg("text"),
+          py::call_guard<py::gil_scoped_release>());
+
+    m.def("regex_expand_match", &regex_expand_match_binding,
+          py::arg("text"),
+          py::arg("pattern"),
+          py::arg("replacement"),
+          py::arg("case_sensitive"),
+          "Replacement for `text` if the pattern matches all of it, else None");
+
     m.def("get_statistics", &get_statistics_dict, py::arg("text"));
 
     m.def("get_line_offset", &lx::engine::get_line_offset, 
@@ -361,8 +2534,18 @@ PYBIND11_MODULE(lx_engine, m) {
 
     m.def("create_text_buffer", &create_text_buffer_binding,
           py::arg("text"));
+    m.def("create_single_byte_text_buffer", &create_single_byte_text_buffer_binding,
+          py::arg("raw"),
+          py::arg("code_points"),
+          "Buffer over raw single-byte-encoded text, decoded only where read");
+    m.def("share_text_buffer", &share_text_buffer_binding,
+          py::arg("handle"),
+          "New handle to the same buffer and line index (released independently)");
     m.def("release_text_buffer", &release_text_buffer_binding,
           py::arg("handle"));
+    m.def("compress_text_buffer", &compress_text_buffer_binding,
+          py::arg("handle"),
+          "Send an idle buffer's text to compressed storage now; False if it never compresses");
     m.def("get_text_buffer_info", &get_text_buffer_info_binding,
           py::arg("handle"),
           py::arg("lines_per_chunk") = 4000);
@@ -374,11 +2557,180 @@ PYBIND11_MODULE(lx_engine, m) {
           py::arg("handle"));
     m.def("get_text_buffer_line_offset", &get_text_buffer_line_offset_binding,
           py::arg("handle"),
-          py::arg("line_number"));
+          py::arg("line_number"),
+          py::arg("unit") = "byte",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("convert_text_buffer_offset", &convert_text_buffer_offset_binding,
+          py::arg("handle"),
+          py::arg("offset"),
+          py::arg("from_unit") = "byte",
+          py::arg("to_unit") = "utf16",
+          py::call_guard<py::gil_scoped_release>());
     m.def("get_text_buffer_chunk_for_line", &get_text_buffer_chunk_for_line_binding,
           py::arg("handle"),
           py::arg("line_number"),
           py::arg("lines_per_chunk") = 4000);
+    m.def("get_text_buffer_lines", &get_text_buffer_lines_binding,
+          py::arg("handle"),
+          py::arg("start_line"),
+          py::arg("count"),
+          py::call_guard<py::gil_scoped_release>());
+    m.attr("DISPLAY_ROW_BYTES") = lx::engine::kDisplayRowBytes;
+    m.def("get_text_buffer_long_lines", &get_text_buffer_long_lines_binding,
+          py::arg("handle"),
+          py::arg("start") = 0);
+    m.def("get_text_buffer_rows", &get_text_buffer_rows_binding,
+          py::arg("handle"),
+          py::arg("start_line"),
+          py::arg("row"),
+          py::arg("count"),
+          py::call_guard<py::gil_scoped_release>());
+    m.def("locate_text_buffer_column", &locate_text_buffer_column_binding,
+          py::arg("handle"),
+          py::arg("line_number"),
+          py::arg("column"),
+          py::call_guard<py::gil_scoped_release>());
     m.def("get_text_buffer_full", &get_text_buffer_full_binding,
+          py::arg("handle"),
+          py::call_guard<py::gil_scoped_release>());
+    py::class_<TextBufferChunkIterator>(m, "TextBufferChunkIterator")
+        .def("__iter__", [](TextBufferChunkIterator& it) -> TextBufferChunkIterator& { return it; },
+             py::return_value_policy::reference_internal)
+        .def("__next__", &TextBufferChunkIterator::next);
+    m.def("iter_text_buffer", &iter_text_buffer_binding,
+          py::arg("handle"),
+          py::arg("chunk_bytes") = static_cast<int64_t>(kExportChunkBytes));
+    m.def("write_text_buffer_to_file", &write_text_buffer_to_file_binding,
+          py::arg("handle"),
+          py::arg("path"),
+          py::arg("encoding") = "utf-8");
+    m.def("create_piece_table", &create_piece_table_binding,
+          py::arg("handle"));
+    m.def("release_piece_table", &release_piece_table_binding,
+          py::arg("edit_handle"));
+    m.def("snapshot_piece_table", &snapshot_piece_table_binding,
+          py::arg("edit_handle"));
+    m.def("get_piece_table_info", &get_piece_table_info_binding,
+          py::arg("edit_handle"));
+    m.def("piece_table_insert", &piece_table_insert_binding,
+          py::arg("edit_handle"),
+          py::arg("offset"),
+          py::arg("text"));
+    m.def("piece_table_erase", &piece_table_erase_binding,
+          py::arg("edit_handle"),
+          py::arg("offset"),
+          py::arg("length"));
+    m.def("piece_table_break_undo_group", &piece_table_break_undo_group_binding,
+          py::arg("edit_handle"));
+    m.def("piece_table_undo", &piece_table_undo_binding,
+          py::arg("edit_handle"));
+    m.def("piece_table_redo", &piece_table_redo_binding,
+          py::arg("edit_handle"));
+    m.def("get_piece_table_lines", &get_piece_table_lines_binding,
+          py::arg("edit_handle"),
+          py::arg("start_line"),
+          py::arg("count"));
+    m.def("piece_table_offset", &piece_table_offset_binding,
+          py::arg("edit_handle"),
+          py::arg("line_number"),
+          py::arg("column"));
+    m.def("piece_table_position", &piece_table_position_binding,
+          py::arg("edit_handle"),
+          py::arg("offset"));
+    m.def("read_piece_table_chunk", &read_piece_table_chunk_binding,
+          py::arg("edit_handle"),
+          py::arg("offset"),
+          py::arg("max_bytes"));
+    m.def("write_piece_table_to_file", &write_piece_table_to_file_binding,
+          py::arg("edit_handle"),
+          py::arg("path"),
+          py::arg("encoding") = "utf-8");
+    m.def("piece_table_to_text_buffer", &piece_table_to_text_buffer_binding,
+          py::arg("edit_handle"));
+    m.def("piece_table_replace_all", &piece_table_replace_all_binding,
+          py::arg("edit_handle"),
+          py::arg("query"),
+          py::arg("replacement"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false);
+    m.def("start_piece_table_search", &start_piece_table_search_binding,
+          py::arg("edit_handle"),
+          py::arg("query"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false,
+          py::arg("max_results") = 0,
+          py::arg("regex") = false,
+          py::arg("replacement") = py::none());
+    m.def("piece_table_apply_search_replacements", &piece_table_apply_search_replacements_binding,
+          py::arg("edit_handle"),
+          py::arg("search_id"),
+          "Apply a finished replace search as one undo step; ValueError if the table changed since it started");
+    m.def("build_text_buffer_overview", &build_text_buffer_overview_binding,
+          py::arg("handle"), py::arg("buckets"), py::arg("keywords") = std::vector<std::string>{},
+          py::arg("case_sensitive") = true, py::arg("search_id") = -1,
+          "Line-density, keyword and search-hit buckets for the overview strip, in one pass");
+    m.def("build_piece_table_overview", &build_piece_table_overview_binding,
+          py::arg("edit_handle"), py::arg("buckets"), py::arg("keywords") = std::vector<std::string>{},
+          py::arg("case_sensitive") = true, py::arg("search_id") = -1,
+          "Overview buckets for a piece table (call it on a snapshot from a worker thread)");
+    m.def("start_text_buffer_search", &start_text_buffer_search_binding,
+          py::arg("handle"),
+          py::arg("query"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false,
+          py::arg("max_results") = 0,
+          py::arg("regex") = false,
+          py::arg("replacement") = py::none(),
+          "Background search; with regex=True the query is a pattern and a replacement makes it a replace job");
+    m.def("search_bytes", &search_bytes_binding,
+          py::arg("data"),
+          py::arg("query"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false,
+          py::arg("max_results") = 0,
+          py::arg("regex") = false,
+          py::arg("end") = -1,
+          "Search UTF-8 bytes on the calling thread with the GIL released; returns matches, lines and total");
+    m.def("replace_bytes", &replace_bytes_binding,
+          py::arg("data"),
+          py::arg("query"),
+          py::arg("replacement"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false,
+          py::arg("regex") = false,
+          "Replace every non-empty match in UTF-8 bytes on the calling thread with the GIL released; returns data and count");
+    m.def("refine_text_buffer_search", &refine_text_buffer_search_binding,
+          py::arg("search_id"),
+          py::arg("query"),
+          py::arg("case_sensitive") = false,
+          py::arg("whole_words") = false,
+          py::arg("max_results") = 0,
+          py::arg("regex") = false,
+          "Search the snapshot of an earlier search again; a longer plain query only rechecks its matches");
+    m.def("get_text_buffer_search_results", &get_text_buffer_search_results_binding,
+          py::arg("search_id"),
+          py::arg("start") = 0,
+          py::arg("max_count") = 0);
+    m.def("cancel_text_buffer_search", &cancel_text_buffer_search_binding,
+          py::arg("search_id"));
+    m.def("stop_text_buffer_search", &stop_text_buffer_search_binding,
+          py::arg("search_id"),
+          "Stop scanning but keep the job, so refine_text_buffer_search can still use its snapshot");
+    m.def("get_text_buffer_search_replacement", &get_text_buffer_search_replacement_binding,
+          py::arg("search_id"),
+          "Full text with a finished replace search applied");
+    m.def("get_text_buffer_index_progress", &get_text_buffer_index_progress_binding,
+          py::arg("handle"));
+    m.def("wait_text_buffer_index", &wait_text_buffer_index_binding,
+          py::arg("handle"),
+          py::arg("line_number") = 0,
+          py::arg("timeout_ms") = -1,
+          py::call_guard<py::gil_scoped_release>());
+    m.def("build_text_buffer_search_index", &build_text_buffer_search_index_binding,
+          py::arg("handle"),
+          py::arg("memory_cap") = 0);
+    m.def("drop_text_buffer_search_index", &drop_text_buffer_search_index_binding,
+          py::arg("handle"));
+    m.def("get_text_buffer_search_index_info", &get_text_buffer_search_index_info_binding,
           py::arg("handle"));
 }
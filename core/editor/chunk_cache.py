@@ -0,0 +1,179 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def _available_memory_bytes() -> int:
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as fp:
+            for line in fp:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES")) * int(os.sysconf("SC_PAGE_SIZE"))
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+class ChunkCacheService:
+    """Process-wide cache of Large Viewer row blocks shared by all tabs.
+
+    A block is the ``(line, column, text)`` display rows of one chunk; the
+    viewport and the cursor mirror read their rows from it, and scrolling
+    prefetches the blocks ahead.
+
+    Every tab (owner) keeps its blocks in its own ``OrderedDict`` so LRU
+    touches are O(1). The byte budget is global and derived from available
+    RAM; when it is exceeded the victim is taken from the owner that is most
+    over its share, where shares are weighted by how recently each tab was
+    used. Five open Large Viewer tabs therefore split one budget instead of
+    multiplying it.
+    """
+
+    RAM_FRACTION = 0.08
+    MIN_BUDGET_BYTES = 32 * 1024 * 1024
+    MAX_BUDGET_BYTES = 1024 * 1024 * 1024
+    FALLBACK_BUDGET_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, budget_bytes=None):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._owner_bytes = {}
+        self._owner_last_used = {}
+        self._bytes = 0
+        self.budget_bytes = int(budget_bytes) if budget_bytes else self.default_budget()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def default_budget(cls) -> int:
+        available = _available_memory_bytes()
+        if available <= 0:
+            return cls.FALLBACK_BUDGET_BYTES
+        return int(min(cls.MAX_BUDGET_BYTES, max(cls.MIN_BUDGET_BYTES, available * cls.RAM_FRACTION)))
+
+    @staticmethod
+    def entry_size(rows) -> int:
+        """Bytes held by a block of ``(line, column, text)`` rows."""
+        return sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in rows)
+
+    def get(self, owner, idx):
+        with self._lock:
+            entries = self._entries.get(owner)
+            item = entries.get(idx) if entries is not None else None
+            if item is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(idx)
+            self._owner_last_used[owner] = time.monotonic()
+            self.hits += 1
+            return item[0]
+
+    def contains(self, owner, idx) -> bool:
+        with self._lock:
+            entries = self._entries.get(owner)
+            return entries is not None and idx in entries
+
+    def put(self, owner, idx, text):
+        size = self.entry_size(text)
+        with self._lock:
+            entries = self._entries.setdefault(owner, OrderedDict())
+            previous = entries.pop(idx, None)
+            if previous is not None:
+                self._account(owner, -previous[1])
+            entries[idx] = (text, size)
+            self._account(owner, size)
+            self._owner_last_used[owner] = time.monotonic()
+            self._evict_locked(protect=(owner, idx))
+
+    def touch(self, owner):
+        with self._lock:
+            if owner in self._entries:
+                self._owner_last_used[owner] = time.monotonic()
+
+    def release_owner(self, owner):
+        with self._lock:
+            entries = self._entries.pop(owner, None)
+            self._bytes -= self._owner_bytes.pop(owner, 0)
+            self._owner_last_used.pop(owner, None)
+            return len(entries) if entries else 0
+
+    def set_budget(self, budget_bytes: int):
+        with self._lock:
+            self.budget_bytes = max(1, int(budget_bytes))
+            self._evict_locked()
+
+    def owner_bytes(self, owner) -> int:
+        with self._lock:
+            return self._owner_bytes.get(owner, 0)
+
+    def owner_keys(self, owner) -> list:
+        with self._lock:
+            return list(self._entries.get(owner, ()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "entries": sum(len(entries) for entries in self._entries.values()),
+                "owners": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def _account(self, owner, delta: int):
+        self._owner_bytes[owner] = self._owner_bytes.get(owner, 0) + delta
+        self._bytes += delta
+
+    def _shares(self) -> dict:
+        ranked = sorted(self._entries, key=lambda o: self._owner_last_used.get(o, 0.0), reverse=True)
+        weights = {owner: 1.0 / (rank + 1) for rank, owner in enumerate(ranked)}
+        total = sum(weights.values()) or 1.0
+        return {owner: self.budget_bytes * weight / total for owner, weight in weights.items()}
+
+    def _evict_locked(self, protect=None):
+        while self._bytes > self.budget_bytes:
+            shares = self._shares()
+            victim_owner = None
+            victim_excess = None
+            for owner, entries in self._entries.items():
+                if not entries or (protect is not None and protect[0] == owner and len(entries) == 1):
+                    continue
+                excess = self._owner_bytes.get(owner, 0) - shares.get(owner, 0.0)
+                if victim_excess is None or excess > victim_excess:
+                    victim_owner, victim_excess = owner, excess
+            if victim_owner is None:
+                return
+
+            entries = self._entries[victim_owner]
+            victim_idx = next(iter(entries))
+            if protect is not None and (victim_owner, victim_idx) == protect:
+                victim_idx = next(k for k in entries if k != victim_idx)
+            _text, size = entries.pop(victim_idx)
+            self._account(victim_owner, -size)
+            self.evictions += 1
+            if not entries:
+                del self._entries[victim_owner]
+                self._owner_bytes.pop(victim_owner, None)
+                self._owner_last_used.pop(victim_owner, None)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_chunk_cache() -> ChunkCacheService:
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ChunkCacheService()
+        return _shared_cache
@@ -0,0 +1,63 @@
+import queue
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ChunkPrefetchWorker(QThread):
+    """Fetches Large Viewer row blocks off the GUI thread.
+
+    Requests are tagged with a generation number; ``cancel_pending()`` bumps
+    the generation so queued work for a stale scroll position is skipped
+    instead of fetched. Results are delivered through ``chunk_ready`` and
+    cached on the GUI thread.
+    """
+
+    chunk_ready = pyqtSignal(int, int, object)
+
+    def __init__(self, fetch_chunk):
+        super().__init__()
+        self._fetch_chunk = fetch_chunk
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def request(self, indices):
+        generation = self.generation
+        for idx in indices:
+            self._queue.put((generation, int(idx)))
+        if not self.isRunning():
+            self.start()
+        return generation
+
+    def cancel_pending(self) -> int:
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def stop(self, timeout_ms: int = 2000):
+        self.cancel_pending()
+        self.requestInterruption()
+        self._queue.put(None)
+        if self.isRunning():
+            self.wait(timeout_ms)
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            item = self._queue.get()
+            if item is None:
+                return
+            generation, idx = item
+            if generation != self.generation:
+                continue
+            try:
+                rows = self._fetch_chunk(idx)
+            except Exception:
+                continue
+            if generation == self.generation and not self.isInterruptionRequested():
+                self.chunk_ready.emit(generation, idx, rows)
@@ -6,6 +6,7 @@ import sys
 import subprocess
 import threading
 from core.logging import log_message, flush_runtime_logs
+from core.editor.chunk_cache import shared_chunk_cache
 
 class ConsoleLogic:
     COMMAND_DOCS = {
@@ -75,6 +76,12 @@ class ConsoleLogic:
             "examples": ["turbo", "turbo on", "turbo off"],
             "aliases": [],
         },
+        "cache": {
+            "usage": "cache",
+            "description": "Show Large Viewer row-block cache usage and hit/miss/eviction counters for viewport reads.",
+            "examples": ["cache"],
+            "aliases": [],
+        },
         "exit": {
             "usage": "exit",
             "description": "Close application window.",
@@ -355,6 +362,33 @@ class ConsoleLogic:
         template = self._tr("console_cmd_opening_recent", "Opening recent file: {path}")
         return template.format(path=path)
 
+    @staticmethod
+    def _format_bytes(value):
+        size = float(max(0, int(value)))
+        for unit in ("B", "KB", "MB"):
+            if size < 1024:
+                return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+            size /= 1024
+        return f"{size:.1f}GB"
+
+    def _format_chunk_cache_stats(self):
+        stats = shared_chunk_cache().stats()
+        template = self._tr(
+            "console_cmd_cache_stats",
+            "Chunk cache: {used} / {budget} | entries={entries} tabs={tabs} | "
+            "hits={hits} misses={misses} evictions={evictions} (hit rate {hit_rate})",
+        )
+        return template.format(
+            used=self._format_bytes(stats["bytes"]),
+            budget=self._format_bytes(stats["budget_bytes"]),
+            entries=stats["entries"],
+            tabs=stats["owners"],
+            hits=stats["hits"],
+            misses=stats["misses"],
+            evictions=stats["evictions"],
+            hit_rate=f"{stats['hit_rate'] * 100:.1f}%",
+        )
+
     def execute_command(self, cmd_text):
         """Parser komend terminala."""
         full_cmd = cmd_text.strip()
@@ -437,6 +471,9 @@ class ConsoleLogic:
         elif cmd == "recent":
             return self._format_recent_files_text()
 
+        elif cmd == "cache":
+            return self._format_chunk_cache_stats()
+
         elif cmd == "open-recent":
             if not args:
                 return self._tr(
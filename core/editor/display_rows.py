@@ -0,0 +1,94 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import sub
+
+# Python fallback for the engine's DISPLAY_ROW_BYTES (counts characters).
+DISPLAY_ROW_CHARS = 4096
+
+
+class DisplayRowMap:
+    """Display rows of a Large Viewer buffer whose long lines are soft-split.
+
+    A line longer than one display row is shown as several rows; the split is
+    for display only. Just those lines are stored, as ``(line, rows)`` pairs in
+    line order, so a file without long lines costs nothing and row ``r`` is
+    simply line ``r + 1``. Rows are 0-based, lines 1-based.
+    """
+
+    def __init__(self, entries=()):
+        self._lines = array("q")
+        self._rows = array("q")
+        self._first_rows = array("q")
+        self._extra = 0
+        self.extend(entries)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def extra_rows(self) -> int:
+        """Rows added by soft-splitting, on top of one row per line."""
+        return self._extra
+
+    def extend(self, entries):
+        """Append ``(line, rows)`` pairs for lines after the ones already known."""
+        for line, rows in entries:
+            self._first_rows.append(int(line) - 1 + self._extra)
+            self._lines.append(int(line))
+            self._rows.append(int(rows))
+            self._extra += int(rows) - 1
+
+    def row_count(self, line_count: int) -> int:
+        return max(0, int(line_count)) + self._extra
+
+    def segment_count(self, line_number: int) -> int:
+        idx = bisect_left(self._lines, line_number)
+        if idx < len(self._lines) and self._lines[idx] == line_number:
+            return self._rows[idx]
+        return 1
+
+    def first_row(self, line_number: int) -> int:
+        """Row showing the start of ``line_number``."""
+        idx = bisect_left(self._lines, line_number)
+        if idx == 0:
+            return line_number - 1
+        prev = idx - 1
+        return self._first_rows[prev] + self._rows[prev] + (line_number - self._lines[prev] - 1)
+
+    def row_line(self, row: int) -> tuple:
+        """``(line, segment)`` shown at ``row``; ``segment`` counts rows within the line."""
+        idx = bisect_right(self._first_rows, row) - 1
+        if idx < 0:
+            return row + 1, 0
+        first = self._first_rows[idx]
+        if row < first + self._rows[idx]:
+            return self._lines[idx], row - first
+        return self._lines[idx] + (row - first - self._rows[idx]) + 1, 0
+
+
+def python_long_lines(content: str, offsets, row_chars: int = DISPLAY_ROW_CHARS) -> list:
+    """``(line, rows)`` for lines of ``content`` longer than ``row_chars``.
+
+    ``offsets`` are the line starts from ``build_line_offsets``; the common
+    no-long-lines case is settled by one C-level pass over their differences.
+    """
+    if not offsets:
+        return []
+    spans = array("q", map(sub, islice(offsets, 1, None), offsets))
+    spans.append(len(content) - offsets[-1])
+    if max(spans) <= row_chars:
+        return []
+    entries = []
+    for idx, span in enumerate(spans):
+        if span <= row_chars:
+            continue
+        end = offsets[idx] + span
+        if content.endswith("\n", 0, end):
+            end -= 1
+        if content.endswith("\r", offsets[idx], end):
+            end -= 1
+        length = end - offsets[idx]
+        if length > row_chars:
+            entries.append((idx + 1, -(-length // row_chars)))
+    return entries
@@ -3,6 +3,7 @@ from typing import List, Optional
 from PyQt6.QtWidgets import QTabWidget, QMessageBox
 from PyQt6.QtCore import Qt
 from core.editor.editor_tab import EditorTab
+from core.editor.large_edit import PieceTableSnapshot, TextBufferStream
 
 class EditorManager:
     def __init__(self, parent):
@@ -79,15 +80,22 @@ class EditorManager:
     def _remember_closed_tab(self, editor: EditorTab, title: str):
         snapshot = {
             "title": title.replace("*", "").strip() or "Untitled",
-            "content": editor.get_full_text() if hasattr(editor, "get_full_text") else editor.toPlainText(),
+            # Large Viewer tabs hand over their engine buffer instead of a str copy.
+            "content": editor.detach_large_text() if hasattr(editor, "detach_large_text") else editor.toPlainText(),
             "file_path": getattr(editor, "file_path", None),
             "is_turbo_mode": bool(getattr(editor, "is_turbo_mode", False)),
             "file_encoding": getattr(editor, "file_encoding", "utf-8"),
             "file_encoding_confidence": float(getattr(editor, "file_encoding_confidence", 0.0) or 0.0),
             "safe_edit_mode": bool(getattr(editor, "safe_edit_mode", False)),
         }
+        if isinstance(snapshot["content"], TextBufferStream):
+            # Nobody reads a closed tab: let the engine compress its buffer.
+            snapshot["content"].compress()
         self._closed_tabs_history.append(snapshot)
         if len(self._closed_tabs_history) > self._closed_tabs_limit:
+            for dropped in self._closed_tabs_history[: -self._closed_tabs_limit]:
+                if hasattr(dropped.get("content"), "close"):
+                    dropped["content"].close()
             self._closed_tabs_history = self._closed_tabs_history[-self._closed_tabs_limit :]
 
     def reopen_last_closed_tab(self) -> bool:
@@ -97,7 +105,13 @@ class EditorManager:
         snapshot = self._closed_tabs_history.pop()
         editor = self.new_tab(title=snapshot.get("title", "Untitled"))
         restored_content = snapshot.get("content", "")
-        if isinstance(restored_content, str) and len(restored_content) > 8_000_000 and hasattr(editor, "enable_large_file_mode"):
+        if isinstance(restored_content, PieceTableSnapshot):
+            snapshot_content = restored_content
+            restored_content = snapshot_content.to_text_buffer()
+            snapshot_content.close()
+        if isinstance(restored_content, TextBufferStream):
+            editor.enable_large_file_mode(restored_content)
+        elif isinstance(restored_content, str) and len(restored_content) > 8_000_000 and hasattr(editor, "enable_large_file_mode"):
             editor.enable_large_file_mode(restored_content)
         else:
             editor.setPlainText(restored_content)
@@ -106,7 +120,7 @@ class EditorManager:
         editor.file_encoding_confidence = float(snapshot.get("file_encoding_confidence", 0.0) or 0.0)
         if snapshot.get("is_turbo_mode") and hasattr(editor, "set_turbo_mode"):
             editor.set_turbo_mode(True)
-        if snapshot.get("safe_edit_mode") and hasattr(editor, "enable_safe_edit_mode"):
+        if snapshot.get("safe_edit_mode") and isinstance(restored_content, str) and hasattr(editor, "enable_safe_edit_mode"):
             editor.enable_safe_edit_mode(snapshot_text=restored_content)
         editor.document().setModified(False)
         self.handle_text_changed(editor)
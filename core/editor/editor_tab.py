@@ -1,7 +1,20 @@
-from PyQt6.QtWidgets import QTextEdit
-from PyQt6.QtGui import QTextCharFormat, QFont, QColor, QTextOption
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QTextEdit, QPlainTextDocumentLayout
+from PyQt6.QtGui import QTextCharFormat, QFont, QColor, QTextOption, QTextCursor, QKeySequence
+from PyQt6.QtCore import Qt, QPoint, QTimer
+import itertools
 import math
+import time
+
+from core.editor.chunk_cache import shared_chunk_cache
+from core.editor.chunk_prefetch import ChunkPrefetchWorker
+from core.editor.display_rows import DISPLAY_ROW_CHARS, DisplayRowMap, python_long_lines
+from core.editor.large_edit import PieceTableSnapshot, TextBufferStream
+from core.editor.large_overview import DEFAULT_KEYWORDS, LargeOverviewStrip, OverviewWorker, build_python_overview
+from core.editor.large_search import LargeSearchSession
+from core.editor.large_text_view import LargeTextView
+from core.editor.line_index import build_line_offsets, chunk_first_lines, line_index_for_offset
+from core.editor.line_number_gutter import LineNumberGutter
+from core.editor.match_highlighter import MatchHighlighter
 
 try:
     import lx_engine
@@ -10,6 +23,27 @@ except Exception:
     lx_engine = None
     _ENGINE_AVAILABLE = False
 
+_large_cache_owner_ids = itertools.count(1)
+
+# Mirror chunks of soft-split files hold at most about this much text.
+_LARGE_ROW_CHUNK_BYTES = 2 * 1024 * 1024
+# Rows the mirror keeps around the viewport cursor: enough for Replace, copy
+# and Find selections, cheap to rebuild when the cursor moves on.
+_LARGE_MIRROR_ROWS = 400
+_NO_DISPLAY_ROWS = DisplayRowMap()
+# Read-only buffers from this size on get a search index after their first search.
+_SEARCH_INDEX_MIN_BYTES = 64 * 1024 * 1024
+
+
+def _engine_overview(build, handle, buckets, keywords, search_id):
+    try:
+        return build(handle, buckets, keywords, True, search_id)
+    except ValueError:
+        if search_id < 0:
+            raise
+        # The search was cancelled meanwhile; keep the rest of the overview.
+        return build(handle, buckets, keywords, True, -1)
+
 class EditorTab(QTextEdit):
     def __init__(self, console=None):
         super().__init__()
@@ -22,18 +56,67 @@ class EditorTab(QTextEdit):
         self._large_chunk_index = 0
         self._large_chunk_count = 0
         self._large_chunk_lines = 4000
+        self._large_chunk_lines_base = 4000
         self._switching_chunk = False
         self._large_buffer_handle = -1
         self._large_virtual_chars = 0
-        self._large_chunk_cache = {}
-        self._large_chunk_cache_order = []
-        self._large_chunk_cache_limit = 3
-        self._large_chunk_cache_char_budget = 5_000_000
-        self._large_chunk_cache_chars = 0
-        self._last_scroll_value = 0
+        self._chunk_cache = shared_chunk_cache()
+        self._large_cache_owner = next(_large_cache_owner_ids)
         self._large_line_offsets = []
+        self._large_chunk_first_lines = []
         self._large_line_count = 0
+        # Soft-split rows of over-long lines; chunks count these rows, not lines.
+        self._large_rows = DisplayRowMap()
+        self._large_rows_final = True
+        self._large_index_complete = True
+        self._large_index_bytes = 0
+        self._large_index_total_bytes = 0
+        self._large_index_started = 0.0
+        self._large_index_timer = QTimer(self)
+        self._large_index_timer.setInterval(150)
+        self._large_index_timer.timeout.connect(self._poll_large_index_progress)
+        self._large_search = None
+        self._large_search_index_requested = False
+        self._large_search_index_logged = 0
+        self._large_search_index_started = 0.0
+        self._large_search_index_timer = QTimer(self)
+        self._large_search_index_timer.setInterval(500)
+        self._large_search_index_timer.timeout.connect(self._poll_large_search_index)
+        # Search whose matches the Large Viewer paints (set by highlight_matches).
+        self._large_highlight_search = None
+        self.large_edit_mode = False
+        self._large_edit_handle = -1
+        self._large_edit_revision = 0
+        self._large_edit_saved_revision = 0
+        self._large_edit_base_bytes = 0
+        self._large_edit_base_chars = 0
+        self._large_mirror_stale = False
+        # Display row of the mirror's first block while it holds a row window
+        # around the viewport cursor; None while it holds a whole chunk.
+        self._large_mirror_first_row = None
         self._large_ro_hint_shown = False
+        self._large_view = None
+        self._large_overview = None
+        self._large_overview_worker = None
+        self._large_overview_generation = 0
+        self._large_overview_pending = False
+        self._large_overview_keywords = list(DEFAULT_KEYWORDS)
+        self._large_overview_timer = QTimer(self)
+        self._large_overview_timer.setSingleShot(True)
+        self._large_overview_timer.setInterval(300)
+        self._large_overview_timer.timeout.connect(self._refresh_large_overview)
+        self._large_prefetch_worker = None
+        self._large_prefetch_pending = set()
+        self._large_prefetch_max_ahead = 3
+        self._large_scroll_line = 1
+        self._large_scroll_time = 0.0
+        self._large_scroll_velocity = 0.0
+        self._syncing_large_view = False
+        self._large_view_sync_timer = QTimer(self)
+        self._large_view_sync_timer.setSingleShot(True)
+        self._large_view_sync_timer.setInterval(120)
+        self._large_view_sync_timer.timeout.connect(self._sync_large_document_to_view)
+        self.cursorPositionChanged.connect(self._mirror_document_cursor_to_view)
         self.safe_edit_mode = False
         self._safe_edit_snapshot = ""
         self._safe_paste_limit = 200_000
@@ -52,32 +135,63 @@ class EditorTab(QTextEdit):
         metrics = self.fontMetrics()
         self.setTabStopDistance(tab_stop * metrics.horizontalAdvance(' '))
 
+        # Numery linii: rysowane tylko dla widocznych bloków
+        self._line_gutter = LineNumberGutter(self, parent=self)
+        self.verticalScrollBar().valueChanged.connect(self._line_gutter.update)
+        self.cursorPositionChanged.connect(self._line_gutter.update)
+        self.textChanged.connect(self._line_gutter.update)
+        self.document().blockCountChanged.connect(lambda _count: self._update_line_gutter_geometry())
+        self._update_line_gutter_geometry()
+
+        # Find "highlight all": only on-screen matches become extra selections.
+        self._match_highlighter = MatchHighlighter(self)
+
         if self.console:
             self.console.log("EditorTab: Evergreen core initialized.", "DEBUG")
 
-    def enable_large_file_mode(self, content: str, chunk_size: int = None):
-        """Enable chunked read-only viewer mode for ultra-large texts."""
+    def enable_large_file_mode(self, content, chunk_size: int = None):
+        """Enable chunked read-only viewer mode for ultra-large texts.
+
+        ``content`` is a ``str`` or a ``TextBufferStream`` whose engine buffer
+        is adopted as-is (e.g. a reopened closed tab), without a copy.
+        """
+        adopted = content if isinstance(content, TextBufferStream) else None
+        if adopted is not None and not (_ENGINE_AVAILABLE and hasattr(lx_engine, "create_text_buffer")):
+            content = "".join(adopted)
+            adopted.close()
+            adopted = None
+        char_count = adopted.char_count() if adopted is not None else len(content)
         self.large_file_mode = True
-        self._large_chunk_lines = self._recommend_chunk_lines(len(content))
+        self._large_chunk_lines = self._recommend_chunk_lines(char_count)
+        self._large_chunk_lines_base = self._large_chunk_lines
         self.setReadOnly(True)
         self.set_turbo_mode(True)
-        self._last_scroll_value = 0
-        self._large_chunk_cache = {}
-        self._large_chunk_cache_order = []
-        self._large_chunk_cache_chars = 0
+        self._clear_large_chunk_cache()
         self._large_line_offsets = []
+        self._large_chunk_first_lines = []
         self._large_line_count = 0
+        self._large_rows = DisplayRowMap()
+        self._large_rows_final = False
 
         using_engine_buffer = False
         if _ENGINE_AVAILABLE and hasattr(lx_engine, "create_text_buffer"):
             try:
-                self._large_buffer_handle = int(lx_engine.create_text_buffer(content))
+                if adopted is not None:
+                    self._large_buffer_handle = adopted.detach_handle()
+                else:
+                    self._large_buffer_handle = int(lx_engine.create_text_buffer(content))
                 info = lx_engine.get_text_buffer_info(self._large_buffer_handle, self._large_chunk_lines)
                 self._large_chunk_count = int(info.get("chunk_count", 1))
-                self._large_virtual_chars = int(info.get("chars", len(content)))
+                # Engine offsets are UTF-8 bytes; the editor counts characters itself.
+                self._large_virtual_chars = char_count
                 self._large_chunk_index = 0
                 self._large_content = ""
                 self._large_line_count = int(info.get("line_count", 0))
+                self._large_index_complete = bool(info.get("index_complete", True))
+                self._large_index_total_bytes = int(info.get("bytes", char_count))
+                self._large_index_bytes = int(info.get("indexed_bytes", self._large_index_total_bytes))
+                self._refresh_large_rows(self._large_index_complete)
+                self._large_chunk_count = self._large_chunk_total()
                 using_engine_buffer = True
             except Exception as e:
                 self._large_buffer_handle = -1
@@ -92,13 +206,17 @@ class EditorTab(QTextEdit):
             self._large_virtual_chars = len(content)
             self._large_chunk_index = 0
 
+        self._set_plain_document_layout(True)
+        self._start_large_prefetch_worker()
         self._load_large_chunk(0)
-
-        try:
-            self.verticalScrollBar().valueChanged.disconnect(self._on_large_scroll)
-        except Exception:
-            pass
-        self.verticalScrollBar().valueChanged.connect(self._on_large_scroll)
+        self._schedule_large_prefetch(0)
+        self._show_large_view()
+        if self._large_index_complete:
+            self._schedule_large_overview()
+        else:
+            # The engine indexes line starts on its own thread; grow the view as it goes.
+            self._large_index_started = time.monotonic()
+            self._large_index_timer.start()
 
         if self.console:
             self.console.log(
@@ -107,6 +225,13 @@ class EditorTab(QTextEdit):
             )
 
     def disable_large_file_mode(self):
+        self._large_index_timer.stop()
+        self._large_search_index_timer.stop()
+        self._large_search_index_requested = False
+        self.cancel_large_search()
+        self._stop_large_overview()
+        self._release_large_edit()
+        self._stop_large_prefetch_worker()
         if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "release_text_buffer"):
             try:
                 lx_engine.release_text_buffer(self._large_buffer_handle)
@@ -117,18 +242,19 @@ class EditorTab(QTextEdit):
         self._large_chunk_size = 0
         self._large_chunk_index = 0
         self._large_chunk_count = 0
+        self._large_mirror_first_row = None
         self._large_buffer_handle = -1
         self._large_virtual_chars = 0
-        self._large_chunk_cache = {}
-        self._large_chunk_cache_order = []
-        self._large_chunk_cache_chars = 0
-        self._last_scroll_value = 0
+        self._clear_large_chunk_cache()
         self._large_line_offsets = []
+        self._large_chunk_first_lines = []
         self._large_line_count = 0
-        try:
-            self.verticalScrollBar().valueChanged.disconnect(self._on_large_scroll)
-        except Exception:
-            pass
+        self._large_rows = DisplayRowMap()
+        self._large_rows_final = True
+        self._large_index_complete = True
+        self._large_index_bytes = 0
+        self._hide_large_view()
+        self._set_plain_document_layout(False)
         self.setReadOnly(False)
 
     def get_virtual_char_count(self) -> int:
@@ -137,34 +263,138 @@ class EditorTab(QTextEdit):
         return max(0, self.document().characterCount() - 1)
 
     def get_full_text(self) -> str:
+        """The whole text as one ``str``, for tabs that already hold one.
+
+        Engine-backed Large Viewer and Large Edit tabs never build it; read
+        them with ``iter_full_text`` or ``full_text_stream`` instead.
+        """
+        if self.large_edit_mode or (self.large_file_mode and self._large_buffer_handle >= 0):
+            raise RuntimeError(
+                "Large Viewer text is held by the engine; stream it with iter_full_text() or full_text_stream()"
+            )
         if self.large_file_mode:
-            if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "get_text_buffer_full"):
-                try:
-                    return str(lx_engine.get_text_buffer_full(self._large_buffer_handle))
-                except Exception:
-                    pass
             return self._large_content
         return self.toPlainText()
 
+    def full_text_stream(self):
+        """Stream object for saving a Large Viewer tab without building one huge ``str``.
+
+        Returns a ``PieceTableSnapshot`` in Large Edit Mode, a
+        ``TextBufferStream`` over the engine buffer in Large Viewer Mode, or
+        ``None`` when ``get_full_text`` returns a ``str`` the tab already holds.
+        """
+        if self.large_edit_mode:
+            return self.large_edit_snapshot()
+        if self.large_file_mode and _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(
+            lx_engine, "iter_text_buffer"
+        ):
+            return TextBufferStream(lx_engine, self._large_buffer_handle)
+        return None
+
+    def iter_full_text(self):
+        """Yield the whole text in chunks (one chunk for a regular document)."""
+        stream = self.full_text_stream()
+        if stream is not None:
+            try:
+                yield from stream
+            finally:
+                if isinstance(stream, PieceTableSnapshot):
+                    stream.close()
+            return
+        if self.large_file_mode:
+            text = self.get_full_text()
+            step = TextBufferStream.CHUNK_BYTES
+            for start in range(0, len(text), step):
+                yield text[start:start + step]
+            return
+        yield self.toPlainText()
+
+    def detach_large_text(self):
+        """Leave Large Viewer Mode and hand over its text without copying it.
+
+        Returns the Python-held ``str`` or an owned stream over the engine
+        buffer (edits included); the caller must ``close()`` a stream.
+        """
+        if not self.large_file_mode:
+            return self.toPlainText()
+        if self.large_edit_mode:
+            source = self.large_edit_snapshot()
+        elif _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "iter_text_buffer"):
+            source = TextBufferStream(lx_engine, self._large_buffer_handle, owned=True)
+            # Ownership moved to the stream; disable_large_file_mode must not release it.
+            self._large_buffer_handle = -1
+        else:
+            source = self._large_content
+        self.disable_large_file_mode()
+        return source
+
+    def share_large_buffer(self):
+        """Owned stream over this tab's original engine buffer for another tab, or ``None``.
+
+        Both tabs then read one buffer and line index through separate handles.
+        Edits never touch it: Large Edit Mode keeps them in its own pieces and
+        Load Full Editable copies the text out, so sharing is copy-on-write.
+        """
+        if not (self.large_file_mode and _ENGINE_AVAILABLE and self._large_buffer_handle >= 0):
+            return None
+        if not hasattr(lx_engine, "share_text_buffer"):
+            return None
+        try:
+            return TextBufferStream(lx_engine, lx_engine.share_text_buffer(self._large_buffer_handle), owned=True)
+        except Exception:
+            return None
+
+    def set_text_chunks(self, source):
+        """Load a ``str`` or an iterable of chunks into the (regular) document."""
+        if isinstance(source, str):
+            self.setPlainText(source)
+            return
+        self.setUndoRedoEnabled(False)
+        try:
+            self.clear()
+            cursor = QTextCursor(self.document())
+            for chunk in source:
+                cursor.insertText(chunk)
+        finally:
+            self.setUndoRedoEnabled(True)
+        cursor = self.textCursor()
+        cursor.setPosition(0)
+        self.setTextCursor(cursor)
+
     def get_large_viewer_label(self) -> str:
         if not self.large_file_mode:
             return ""
-        return f"VIEW {self._large_chunk_index + 1}/{self._large_chunk_count} RO"
+        mode = "EDIT" if self.large_edit_mode else "RO"
+        label = f"VIEW {self._large_chunk_index + 1}/{self._large_chunk_count} {mode}"
+        if not self._large_index_complete and self._large_index_total_bytes > 0:
+            percent = min(99, int(self._large_index_bytes * 100 / self._large_index_total_bytes))
+            label += f" IDX {percent}%"
+        return label
 
-    def enable_safe_edit_mode(self, snapshot_text: str = ""):
+    def enable_safe_edit_mode(self, snapshot_text=""):
+        """``snapshot_text`` may be a ``str`` or an owned stream (kept, not copied)."""
+        self._close_safe_edit_snapshot()
         self.safe_edit_mode = True
-        self._safe_edit_snapshot = snapshot_text if isinstance(snapshot_text, str) else ""
+        if isinstance(snapshot_text, (str, TextBufferStream, PieceTableSnapshot)):
+            self._safe_edit_snapshot = snapshot_text
+        else:
+            self._safe_edit_snapshot = ""
         if self.console:
             self.console.log("Safe Edit Mode enabled.", "INFO")
 
     def disable_safe_edit_mode(self):
+        self._close_safe_edit_snapshot()
         self.safe_edit_mode = False
         self._safe_edit_snapshot = ""
 
+    def _close_safe_edit_snapshot(self):
+        if hasattr(self._safe_edit_snapshot, "close"):
+            self._safe_edit_snapshot.close()
+
     def quick_revert_safe_edit(self) -> bool:
-        if not self.safe_edit_mode or not isinstance(self._safe_edit_snapshot, str):
+        if not self.safe_edit_mode or self._safe_edit_snapshot is None:
             return False
-        self.setPlainText(self._safe_edit_snapshot)
+        self.set_text_chunks(self._safe_edit_snapshot)
         self.document().setModified(False)
         if self.console:
             self.console.log("Safe Edit Mode: content reverted to snapshot.", "INFO")
@@ -174,26 +404,77 @@ class EditorTab(QTextEdit):
         if not self.large_file_mode:
             return
         idx = max(0, min(index, self._large_chunk_count - 1))
-        if idx == self._large_chunk_index and self.document().characterCount() > 1:
-            self._prefetch_large_chunk(idx + 1)
-            self._prefetch_large_chunk(idx - 1)
+        if (
+            idx == self._large_chunk_index
+            and self.document().characterCount() > 1
+            and not self._large_mirror_stale
+            and self._large_mirror_first_row is None
+        ):
             return
         self._switching_chunk = True
         self._large_chunk_index = idx
+        self._large_mirror_stale = False
+        self._large_mirror_first_row = None
 
-        chunk_text = self._get_chunk_text_cached(idx)
+        chunk_text = self._fetch_large_chunk_text(idx)
 
         self.setPlainText(chunk_text)
-        self.document().setModified(False)
+        # The mirror is only a view; the tab is modified when the piece table is.
+        self.document().setModified(self.is_large_edit_dirty())
         cursor = self.textCursor()
         cursor.setPosition(0)
         self.setTextCursor(cursor)
         self._switching_chunk = False
-        self._prefetch_large_chunk(idx + 1)
-        self._prefetch_large_chunk(idx - 1)
+
+    def _load_large_mirror_rows(self, first_row: int, last_row: int):
+        """Mirror display rows ``first_row``..``last_row`` plus a margin on each side.
+
+        Nothing is reloaded while those rows are already mirrored, so moving
+        the cursor within the window is free.
+        """
+        base = self._large_mirror_first_row
+        if (
+            base is not None
+            and not self._large_mirror_stale
+            and base <= first_row
+            and last_row < base + self.document().blockCount()
+        ):
+            return
+        start = max(0, first_row - _LARGE_MIRROR_ROWS // 2)
+        rows = self.read_large_rows(start, last_row + _LARGE_MIRROR_ROWS // 2 - start)
+        self._switching_chunk = True
+        self._large_mirror_first_row = start
+        self._large_mirror_stale = False
+        self.setPlainText("\n".join(text for _line, _column, text in rows))
+        self.document().setModified(self.is_large_edit_dirty())
+        self._switching_chunk = False
+
+    def _large_mirror_row_base(self):
+        """Display row of the mirror's first block, or ``None`` for a character chunk (Python buffer)."""
+        if self._large_mirror_first_row is not None:
+            return self._large_mirror_first_row
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0:
+            return self._large_chunk_index * self._large_chunk_lines
+        return None
 
     def _fetch_large_chunk_text(self, idx: int) -> str:
+        if self.large_edit_mode:
+            try:
+                rows = lx_engine.get_piece_table_lines(
+                    self._large_edit_handle, idx * self._large_chunk_lines + 1, self._large_chunk_lines
+                )
+                return "\n".join(rows)
+            except Exception:
+                return ""
         chunk_text = ""
+        if self._large_rows_split():
+            # Row chunks: a long line is cut into rows instead of landing whole in one chunk.
+            line, segment = self._large_rows.row_line(idx * self._large_chunk_lines)
+            try:
+                rows = lx_engine.get_text_buffer_rows(self._large_buffer_handle, line, segment, self._large_chunk_lines)
+                return "\n".join(row[2] for row in rows)
+            except Exception:
+                return ""
         if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "get_text_buffer_chunk"):
             try:
                 chunk = lx_engine.get_text_buffer_chunk(self._large_buffer_handle, idx, self._large_chunk_lines)
@@ -206,61 +487,189 @@ class EditorTab(QTextEdit):
             chunk_text = self._large_content[start:end]
         return chunk_text
 
-    def _cache_large_chunk(self, idx: int, chunk_text: str):
-        previous = self._large_chunk_cache.get(idx)
-        if previous is not None:
-            self._large_chunk_cache_chars -= len(previous)
-        self._large_chunk_cache[idx] = chunk_text
-        self._large_chunk_cache_chars += len(chunk_text)
-        if idx in self._large_chunk_cache_order:
-            self._large_chunk_cache_order.remove(idx)
-        self._large_chunk_cache_order.append(idx)
-
-        while (
-            len(self._large_chunk_cache_order) > self._large_chunk_cache_limit
-            or self._large_chunk_cache_chars > self._large_chunk_cache_char_budget
-        ):
-            stale_idx = self._large_chunk_cache_order.pop(0)
-            stale = self._large_chunk_cache.pop(stale_idx, None)
-            if stale is not None:
-                self._large_chunk_cache_chars -= len(stale)
+    def _fetch_large_row_block(self, idx: int) -> list:
+        block_rows = max(1, self._large_chunk_lines)
+        return self._fetch_large_rows(idx * block_rows, block_rows)
 
-    def _get_chunk_text_cached(self, idx: int) -> str:
-        cached = self._large_chunk_cache.get(idx)
+    def _large_row_block_count(self) -> int:
+        return max(1, math.ceil(self.large_row_count() / max(1, self._large_chunk_lines)))
+
+    def _cache_large_chunk(self, idx: int, rows: list):
+        # A short block at the end of a still-growing index would hide the rows indexed later.
+        if len(rows) < self._large_chunk_lines and not self._large_index_complete:
+            return
+        self._chunk_cache.put(self._large_cache_owner, idx, rows)
+
+    def _is_large_chunk_cached(self, idx: int) -> bool:
+        return self._chunk_cache.contains(self._large_cache_owner, idx)
+
+    def _clear_large_chunk_cache(self):
+        # Blocks still queued were read from the old rows.
+        self._cancel_large_prefetch()
+        self._chunk_cache.release_owner(self._large_cache_owner)
+        # New owner token: late prefetch results for the old buffer can never match.
+        self._large_cache_owner = next(_large_cache_owner_ids)
+
+    def _get_row_block_cached(self, idx: int) -> list:
+        cached = self._chunk_cache.get(self._large_cache_owner, idx)
         if cached is not None:
-            if idx in self._large_chunk_cache_order:
-                self._large_chunk_cache_order.remove(idx)
-            self._large_chunk_cache_order.append(idx)
             return cached
 
-        chunk_text = self._fetch_large_chunk_text(idx)
-        self._cache_large_chunk(idx, chunk_text)
-        return chunk_text
+        rows = self._fetch_large_row_block(idx)
+        self._cache_large_chunk(idx, rows)
+        return rows
 
     def _prefetch_large_chunk(self, idx: int):
-        if not self.large_file_mode:
+        """Queue a background fetch of row block ``idx`` unless it is cached or already queued."""
+        if not self.large_file_mode or self._large_prefetch_worker is None:
             return
-        if idx < 0 or idx >= self._large_chunk_count:
+        if idx < 0 or idx >= self._large_row_block_count():
             return
-        if idx in self._large_chunk_cache:
+        if idx in self._large_prefetch_pending or self._is_large_chunk_cached(idx):
             return
-        chunk_text = self._fetch_large_chunk_text(idx)
-        self._cache_large_chunk(idx, chunk_text)
+        self._large_prefetch_pending.add(idx)
+        self._large_prefetch_worker.request([idx])
 
-    def _ensure_large_line_offsets(self):
-        if self._large_line_offsets:
+    def _large_prefetch_plan(self, idx: int) -> list:
+        """Row blocks worth having around block ``idx``, ordered by scroll direction and speed."""
+        direction = -1 if self._large_scroll_velocity < 0 else 1
+        block_rows = max(1, self._large_chunk_lines)
+        # How many blocks the viewport will cross in the next ~0.5 s.
+        upcoming = int(abs(self._large_scroll_velocity) * 0.5 / block_rows)
+        ahead = max(1, min(self._large_prefetch_max_ahead, 1 + upcoming))
+        plan = [idx + direction * step for step in range(1, ahead + 1)]
+        if ahead == 1:
+            plan.append(idx - direction)
+        block_count = self._large_row_block_count()
+        return [i for i in plan if 0 <= i < block_count]
+
+    def _schedule_large_prefetch(self, idx: int):
+        if self._large_buffer_handle < 0 and not self.large_edit_mode:
+            # The worker reads Python rows through the line offsets; build them here, not there.
+            self._ensure_large_line_offsets()
+        for target in self._large_prefetch_plan(idx):
+            self._prefetch_large_chunk(target)
+
+    def _cancel_large_prefetch(self):
+        if self._large_prefetch_worker is not None:
+            self._large_prefetch_worker.cancel_pending()
+        self._large_prefetch_pending.clear()
+
+    def _on_large_chunk_prefetched(self, generation: int, idx: int, rows: list):
+        self._large_prefetch_pending.discard(idx)
+        worker = self._large_prefetch_worker
+        if not self.large_file_mode or worker is None or generation != worker.generation:
             return
-        if not self._large_content:
-            self._large_line_offsets = [0]
-            self._large_line_count = 1
+        if rows and not self._is_large_chunk_cached(idx):
+            self._cache_large_chunk(idx, rows)
+
+    def _start_large_prefetch_worker(self):
+        self._stop_large_prefetch_worker()
+        # Bind the fetcher now, so the worker never races with later monkeypatching/rebinding.
+        worker = ChunkPrefetchWorker(self._fetch_large_row_block)
+        worker.chunk_ready.connect(self._on_large_chunk_prefetched)
+        self._large_prefetch_worker = worker
+        self._large_scroll_line = 1
+        self._large_scroll_time = time.monotonic()
+        self._large_scroll_velocity = 0.0
+
+    def _stop_large_prefetch_worker(self):
+        worker = self._large_prefetch_worker
+        self._large_prefetch_worker = None
+        self._large_prefetch_pending.clear()
+        if worker is not None:
+            try:
+                worker.chunk_ready.disconnect(self._on_large_chunk_prefetched)
+            except (TypeError, RuntimeError):
+                pass
+            worker.stop()
+
+    def _track_large_scroll(self, top_line: int):
+        """Update scroll velocity (lines/s); long jumps cancel stale prefetches."""
+        now = time.monotonic()
+        delta_lines = top_line - self._large_scroll_line
+        elapsed = max(1e-3, now - self._large_scroll_time)
+        block_rows = max(1, self._large_chunk_lines)
+
+        if abs(delta_lines) > 2 * block_rows:
+            self._cancel_large_prefetch()
+            self._large_scroll_velocity = 0.0
+        elif elapsed > 0.5:
+            self._large_scroll_velocity = delta_lines / elapsed
+        else:
+            self._large_scroll_velocity = 0.6 * self._large_scroll_velocity + 0.4 * (delta_lines / elapsed)
+        self._large_scroll_line = top_line
+        self._large_scroll_time = now
+        self._schedule_large_prefetch(self.large_row_for_position(top_line, 0)[0] // block_rows)
+
+    def _apply_large_index_progress(self, progress: dict):
+        self._large_index_bytes = int(progress.get("indexed_bytes", self._large_index_bytes))
+        self._large_index_total_bytes = int(progress.get("total_bytes", self._large_index_total_bytes))
+        self._large_index_complete = bool(progress.get("complete", True))
+        line_count = int(progress.get("line_count", self._large_line_count))
+        rows_changed = self._refresh_large_rows(self._large_index_complete)
+        if line_count != self._large_line_count or rows_changed:
+            self._large_line_count = line_count
+            self._large_chunk_count = self._large_chunk_total()
+            if self._large_view is not None:
+                if rows_changed:
+                    self._large_view.invalidate_lines()
+                self._large_view.refresh_line_count()
+                self._update_large_overview_viewport()
+
+    def _poll_large_index_progress(self):
+        """Pick up the engine's "indexed up to byte X" frontier while it grows."""
+        if not self.large_file_mode or self._large_buffer_handle < 0 or not hasattr(
+            lx_engine, "get_text_buffer_index_progress"
+        ):
+            self._large_index_timer.stop()
+            return
+        try:
+            progress = lx_engine.get_text_buffer_index_progress(self._large_buffer_handle)
+        except Exception:
+            self._large_index_timer.stop()
+            return
+        self._apply_large_index_progress(progress)
+        if self._large_index_complete:
+            self._large_index_timer.stop()
+            self._schedule_large_overview()
+            if self.console:
+                elapsed = time.monotonic() - self._large_index_started
+                self.console.log(
+                    f"Large Viewer line index ready: lines={self._large_line_count}, {elapsed:.2f}s",
+                    "ENGINE",
+                )
+
+    def _wait_for_large_index(self, line_number: int):
+        """Block only if ``line_number`` lies past the indexed frontier."""
+        if self._large_index_complete or line_number <= self._large_line_count:
+            return
+        if not hasattr(lx_engine, "wait_text_buffer_index"):
+            return
+        if self.console:
+            self.console.log(f"Large Viewer: waiting for line index to reach line {line_number}...", "INFO")
+        try:
+            lx_engine.wait_text_buffer_index(self._large_buffer_handle, line_number)
+        except Exception:
             return
+        self._poll_large_index_progress()
 
-        offsets = [0]
-        for i, ch in enumerate(self._large_content):
-            if ch == '\n' and i + 1 < len(self._large_content):
-                offsets.append(i + 1)
+    def _ensure_large_line_offsets(self):
+        if self._large_line_offsets:
+            return
+        started = time.perf_counter()
+        offsets = build_line_offsets(self._large_content)
         self._large_line_offsets = offsets
         self._large_line_count = len(offsets)
+        self._large_rows = DisplayRowMap(python_long_lines(self._large_content, offsets))
+        self._large_rows_final = True
+        # Chunk-relative line table: global line index each chunk starts in.
+        self._large_chunk_first_lines = chunk_first_lines(offsets, self._large_chunk_size, self._large_chunk_count)
+        if self.console and self._large_content:
+            self.console.log(
+                f"Large Viewer line index (Python): lines={len(offsets)}, {time.perf_counter() - started:.3f}s",
+                "DEBUG",
+            )
 
     def jump_to_large_line(self, line_num: int) -> bool:
         if not self.large_file_mode:
@@ -273,74 +682,1025 @@ class EditorTab(QTextEdit):
         if target_line < 1:
             return False
 
-        chunk_index = None
-        offset_in_chunk = 0
-
-        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "get_text_buffer_chunk_for_line"):
+        if self.large_edit_mode:
+            if target_line > self._large_line_count:
+                return False
+            target_row = target_line - 1
+            chunk_index = target_row // max(1, self._large_chunk_lines)
+        elif _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "get_text_buffer_chunk_for_line"):
+            self._wait_for_large_index(target_line)
             try:
                 line_meta = lx_engine.get_text_buffer_chunk_for_line(
                     self._large_buffer_handle,
                     target_line,
                     self._large_chunk_lines,
                 )
-                chunk_index = int(line_meta.get("chunk_index", 0))
-                start_line = int(line_meta.get("start_line", 1))
-                if target_line < start_line:
+                if target_line < int(line_meta.get("start_line", 1)):
                     return False
-                offset_in_chunk = target_line - start_line
             except Exception:
                 return False
+            target_row = self._large_display_rows().first_row(target_line)
+            chunk_index = min(self._large_chunk_count - 1, target_row // max(1, self._large_chunk_lines))
         else:
             self._ensure_large_line_offsets()
             if target_line > self._large_line_count or self._large_chunk_size <= 0:
                 return False
+            target_row = self._large_display_rows().first_row(target_line)
             char_offset = self._large_line_offsets[target_line - 1]
             chunk_index = min(self._large_chunk_count - 1, char_offset // self._large_chunk_size)
-            chunk_start = chunk_index * self._large_chunk_size
-            chunk_text = self._get_chunk_text_cached(chunk_index)
-            local_offset = max(0, char_offset - chunk_start)
-            offset_in_chunk = chunk_text[:local_offset].count('\n')
 
-        self._load_large_chunk(chunk_index)
+        if chunk_index != self._large_chunk_index:
+            self._cancel_large_prefetch()
+        self._large_chunk_index = chunk_index
+        self._move_large_mirror_cursor_to_row(target_row)
+        self.ensureCursorVisible()
+        return True
+
+    def _move_large_mirror_cursor_to_row(self, row: int):
+        """Mirror the rows around display ``row`` and put the mirror's cursor at its start."""
+        self._load_large_mirror_rows(row, row)
         cursor = self.textCursor()
-        cursor.movePosition(cursor.MoveOperation.Start)
-        if offset_in_chunk > 0:
-            cursor.movePosition(
-                cursor.MoveOperation.Down,
-                cursor.MoveMode.MoveAnchor,
-                offset_in_chunk,
-            )
+        # Block lookup instead of moving Down line by line (which forces layout).
+        block = self.document().findBlockByNumber(row - self._large_mirror_first_row)
+        cursor.setPosition(block.position() if block.isValid() else 0)
         self.setTextCursor(cursor)
-        self.ensureCursorVisible()
+
+    # --- WHOLE-FILE SEARCH ---
+
+    def large_search(self, query: str, case_sensitive: bool = False, whole_words: bool = False, regex: bool = False):
+        """Return the whole-file search session for these options, starting one if needed.
+
+        A bad ``regex`` pattern raises ``ValueError`` (with the engine's message).
+        """
+        if not self.large_file_mode or not query:
+            return None
+        session = self._large_search
+        if session is not None and session.matches_options(query, case_sensitive, whole_words, regex):
+            return session
+        engine = lx_engine if _ENGINE_AVAILABLE else None
+        try:
+            # A changed query (search as you type) searches the previous
+            # session's snapshot again; a longer one rechecks its matches only.
+            refined = None
+            if session is not None:
+                refined = session.refine(query, case_sensitive, whole_words, parent=self, regex=regex)
+            self.cancel_large_search()
+            self._large_search = refined or LargeSearchSession.start(
+                self, engine, query, case_sensitive, whole_words, parent=self, regex=regex
+            )
+        except ValueError:
+            self.cancel_large_search()
+            raise
+        except Exception as e:
+            self.cancel_large_search()
+            if self.console:
+                self.console.log(f"Large Viewer search unavailable: {e}", "WARN")
+            return None
+        self._large_search.progress.connect(self._on_large_search_progress)
+        if self.console:
+            self.console.log(f"Large Viewer search started: '{query}'", "DEBUG")
+        self._request_large_search_index()
+        return self._large_search
+
+    def _request_large_search_index(self):
+        """Index a huge read-only buffer in the background once it has been searched.
+
+        Later searches of that buffer then scan only the blocks that can hold
+        a match; the one running now (and any until the index is ready) scans
+        it all, as before.
+        """
+        if self._large_search_index_requested or self.large_edit_mode or self._large_buffer_handle < 0:
+            return
+        if not _ENGINE_AVAILABLE or not hasattr(lx_engine, "build_text_buffer_search_index"):
+            return
+        self._large_search_index_requested = True
+        try:
+            info = lx_engine.get_text_buffer_search_index_info(self._large_buffer_handle)
+            if info["total_bytes"] < _SEARCH_INDEX_MIN_BYTES or info["state"] != "none":
+                return
+            lx_engine.build_text_buffer_search_index(self._large_buffer_handle)
+        except Exception as e:
+            if self.console:
+                self.console.log(f"Large Viewer search index unavailable: {e}", "WARN")
+            return
+        self._large_search_index_logged = 0
+        self._large_search_index_started = time.monotonic()
+        self._large_search_index_timer.start()
+        if self.console:
+            self.console.log(f"Large Viewer: building search index ({info['total_bytes'] // (1024 * 1024)} MB)...", "ENGINE")
+
+    def _poll_large_search_index(self):
+        if not self.large_file_mode or self._large_buffer_handle < 0:
+            self._large_search_index_timer.stop()
+            return
+        try:
+            info = lx_engine.get_text_buffer_search_index_info(self._large_buffer_handle)
+        except Exception:
+            self._large_search_index_timer.stop()
+            return
+        state = info["state"]
+        if state == "building":
+            quarter = info["indexed_bytes"] * 4 // max(1, info["total_bytes"])
+            if quarter > self._large_search_index_logged and self.console:
+                self.console.log(f"Large Viewer search index: {quarter * 25}%", "ENGINE")
+            self._large_search_index_logged = max(self._large_search_index_logged, quarter)
+            return
+        self._large_search_index_timer.stop()
+        if not self.console:
+            return
+        if state == "ready":
+            elapsed = time.monotonic() - self._large_search_index_started
+            self.console.log(
+                f"Large Viewer search index ready: {info['memory_bytes'] // (1024 * 1024)} MB, "
+                f"{info['block_bytes'] // 1024} KB blocks, {elapsed:.2f}s",
+                "ENGINE",
+            )
+        elif state == "failed":
+            self.console.log(f"Large Viewer search index not built: {info['error']}; searches scan the file", "WARN")
+
+    def cancel_large_search(self):
+        if self._large_search is not None:
+            if self._large_highlight_search is self._large_search:
+                self._large_highlight_search = None
+            self._large_search.cancel()
+            self._large_search.deleteLater()
+            self._large_search = None
+            # Drop the search heat from the overview.
+            self._schedule_large_overview()
+
+    def _on_large_search_progress(self, _total: int, done: bool):
+        if done:
+            self._schedule_large_overview()
+        if self._large_view_active() and self.sender() is self._large_highlight_search:
+            self._large_view.viewport().update()
+
+    # --- HIGHLIGHT ALL ---
+
+    def highlight_matches(self, session):
+        """Highlight every match of a Find ``session`` over this tab's text.
+
+        Normal tabs draw extra selections for the matches on screen; the
+        Large Viewer paints the visible matches of its whole-file search.
+        """
+        if self.large_file_mode:
+            self._large_highlight_search = session
+            if self._large_view_active():
+                self._large_view.viewport().update()
+            return
+        self._match_highlighter.show_session(session)
+
+    def clear_match_highlights(self):
+        self._match_highlighter.clear()
+        if self._large_highlight_search is not None:
+            self._large_highlight_search = None
+            if self._large_view_active():
+                self._large_view.viewport().update()
+
+    def large_search_matches(self, line_number: int, column: int, end_column: int) -> list:
+        """``(column, length)`` of the highlighted matches that may overlap [column, end_column) of a line."""
+        session = self._large_highlight_search
+        if session is None or session is not self._large_search:
+            return []
+        lo, hi = session.match_range(
+            line_number, max(0, column - session.longest_match), line_number, max(column, end_column)
+        )
+        return [(session.match_at(i)[1], session.match_length(i)) for i in range(lo, hi)]
+
+    def large_selection_bounds(self):
+        """Global ((line, col), (line, col)) of the viewport selection, or the cursor twice."""
+        if not self._large_view_active():
+            return (1, 0), (1, 0)
+        cursor = self._large_view.cursor_position()
+        anchor = self._large_view.anchor_position()
+        return min(anchor, cursor), max(anchor, cursor)
+
+    def select_large_match(self, line_number: int, column: int, length: int) -> bool:
+        """Select a match in the viewport and in the mirror rows around it."""
+        if not self._large_view_active():
+            return False
+        self._wait_for_large_index(line_number)
+        self._syncing_large_view = True
+        try:
+            target = self._large_chunk_for_line(line_number)
+            if target != self._large_chunk_index:
+                self._cancel_large_prefetch()
+                self._large_chunk_index = target
+            end_line, end_column = self._large_match_end(line_number, column, length)
+            self._load_large_mirror_rows(
+                self.large_row_for_position(line_number, column)[0], self.large_row_for_position(end_line, end_column)[0]
+            )
+            start = self._large_position_to_document(line_number, column)
+            end = self._large_position_to_document(end_line, end_column)
+            if start is not None and end is not None:
+                cursor = self.textCursor()
+                cursor.setPosition(start)
+                cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+                self.setTextCursor(cursor)
+            self._large_view.select_range(line_number, column, end_line, end_column)
+        finally:
+            self._syncing_large_view = False
+        return True
+
+    def _large_match_end(self, line_number: int, column: int, length: int):
+        """(line, col) ``length`` characters after (line, col); regex matches may span lines."""
+        row = self.read_large_lines(line_number, 1)
+        remaining = int(length)
+        while row and column + remaining > len(row[0]):
+            # The rest of this row plus its line break.
+            remaining -= len(row[0]) - column + 1
+            next_row = self.read_large_lines(line_number + 1, 1)
+            if not next_row:
+                return line_number, len(row[0])
+            line_number, column, row = line_number + 1, 0, next_row
+        return line_number, column + max(0, remaining)
+
+    # --- LARGE EDIT MODE (piece table) ---
+
+    def can_enable_large_edit_mode(self) -> bool:
+        return (
+            self.large_file_mode
+            and not self.large_edit_mode
+            and _ENGINE_AVAILABLE
+            and self._large_buffer_handle >= 0
+            and hasattr(lx_engine, "create_piece_table")
+        )
+
+    def enable_large_edit_mode(self) -> bool:
+        """Edit the Large Viewer buffer in place through a native piece table.
+
+        The original buffer stays untouched; edits live in an append buffer
+        plus a piece list, so memory follows the edits, not the file. Only the
+        rows on screen (and the chunk mirror) are ever handed to Qt.
+        """
+        if not self.can_enable_large_edit_mode():
+            return False
+        try:
+            handle = int(lx_engine.create_piece_table(self._large_buffer_handle))
+            info = lx_engine.get_piece_table_info(handle)
+        except Exception as e:
+            if self.console:
+                self.console.log(f"Large Edit Mode unavailable: {e}", "WARN")
+            return False
+
+        # create_piece_table waited for the line index; pick up the final counts.
+        self._poll_large_index_progress()
+        self._large_edit_handle = handle
+        self.large_edit_mode = True
+        self._large_edit_revision = int(info.get("revision", 0))
+        self._large_edit_saved_revision = self._large_edit_revision
+        self._large_edit_base_bytes = int(info.get("bytes", 0))
+        self._large_edit_base_chars = self._large_virtual_chars
+        # Chunks now come from the piece table, which is not shared with threads.
+        self._stop_large_prefetch_worker()
+        position = self._large_view.cursor_position() if self._large_view is not None else None
+        self._after_large_edit(None)
+        if self._large_rows and position is not None:
+            # Soft-split rows end here: rows are whole lines again.
+            self._large_view.reload()
+            self._large_view.set_cursor_position(*position, center=True)
+        if self.console:
+            self.console.log(
+                f"LARGE EDIT MODE ACTIVE: lines={self._large_line_count}, edits are kept as native pieces",
+                "ENGINE",
+            )
+        return True
+
+    def _release_large_edit(self):
+        if self._large_edit_handle >= 0 and hasattr(lx_engine, "release_piece_table"):
+            try:
+                lx_engine.release_piece_table(self._large_edit_handle)
+            except Exception:
+                pass
+        self._large_edit_handle = -1
+        self.large_edit_mode = False
+        self._large_edit_revision = 0
+        self._large_edit_saved_revision = 0
+        self._large_mirror_stale = False
+
+    def is_large_edit_dirty(self) -> bool:
+        return self.large_edit_mode and self._large_edit_revision != self._large_edit_saved_revision
+
+    def large_edit_snapshot(self):
+        """Frozen copy of the edited text for saving, or ``None`` outside Large Edit Mode."""
+        if not self.large_edit_mode:
+            return None
+        return PieceTableSnapshot(lx_engine, self._large_edit_handle)
+
+    def mark_large_edit_saved(self, revision: int):
+        if not self.large_edit_mode:
+            return
+        self._large_edit_saved_revision = int(revision)
+        self._sync_large_edit_modified()
+
+    def _sync_large_edit_modified(self):
+        dirty = self.is_large_edit_dirty()
+        if self.document().isModified() != dirty:
+            self.document().setModified(dirty)
+            # EditorManager refreshes the tab title on textChanged.
+            self.textChanged.emit()
+
+    def _after_large_edit(self, cursor_offset):
+        info = lx_engine.get_piece_table_info(self._large_edit_handle)
+        self._large_edit_revision = int(info.get("revision", 0))
+        self._large_line_count = int(info.get("line_count", 1))
+        self._large_chunk_count = max(1, math.ceil(self._large_line_count / max(1, self._large_chunk_lines)))
+        # Exact for ASCII edits; the status bar rounds it anyway.
+        self._large_virtual_chars = max(
+            0, self._large_edit_base_chars + int(info.get("bytes", 0)) - self._large_edit_base_bytes
+        )
+        self._clear_large_chunk_cache()
+        self._large_mirror_stale = True
+        self.cancel_large_search()
+        if self._large_view is not None:
+            self._large_view.refresh_line_count()
+            self._update_large_overview_viewport()
+            self._large_view.invalidate_lines()
+            if cursor_offset is not None:
+                line, col = lx_engine.piece_table_position(self._large_edit_handle, cursor_offset)
+                self._large_view.set_cursor_position(int(line), int(col))
+        self._schedule_large_view_sync()
+        self._schedule_large_overview()
+        self._sync_large_edit_modified()
+
+    def _large_edit_replace(self, start, end, text: str) -> str:
+        """Replace the global (line, col) range ``start``..``end`` with ``text``; returns the removed text."""
+        handle = self._large_edit_handle
+        start_offset = int(lx_engine.piece_table_offset(handle, *start))
+        end_offset = int(lx_engine.piece_table_offset(handle, *end))
+        if end_offset < start_offset:
+            start_offset, end_offset = end_offset, start_offset
+        removed = ""
+        if end_offset > start_offset:
+            removed = str(lx_engine.read_piece_table_chunk(handle, start_offset, end_offset - start_offset)[0])
+            lx_engine.piece_table_erase(handle, start_offset, end_offset - start_offset)
+        if text:
+            lx_engine.piece_table_insert(handle, start_offset, text)
+        self._after_large_edit(start_offset + len(text.encode("utf-8")))
+        return removed
+
+    def large_replace_all(self, query: str, replacement: str, case_sensitive=False, whole_words=False) -> int:
+        """Replace every match in the piece table as one undo step; returns the match count."""
+        if not self.large_edit_mode or not query:
+            return 0
+        count = int(lx_engine.piece_table_replace_all(
+            self._large_edit_handle, query, replacement, bool(case_sensitive), bool(whole_words)
+        ))
+        if count:
+            self._after_large_edit(None)
+        return count
+
+    def start_large_replace(self, query: str, replacement: str, case_sensitive=False, whole_words=False):
+        """Start a background regex Replace All over the piece table.
+
+        Returns a replace-job ``LargeSearchSession``; once it is done, apply it
+        with ``apply_large_replacements``. A bad pattern or template raises
+        ``ValueError``.
+        """
+        if not self.large_edit_mode or not query:
+            return None
+        return LargeSearchSession.start(
+            self, lx_engine, query, case_sensitive, whole_words, parent=self, regex=True, replacement=replacement
+        )
+
+    def apply_large_replacements(self, session) -> int:
+        """Apply a finished replace job as one undo step; ``ValueError`` if the text changed meanwhile."""
+        if not self.large_edit_mode or session.engine_search_id < 0:
+            return 0
+        count = int(lx_engine.piece_table_apply_search_replacements(self._large_edit_handle, session.engine_search_id))
+        if count:
+            self._after_large_edit(None)
+        return count
+
+    def replace_large_selection(self, query: str, replacement: str, case_sensitive=False, regex=False) -> bool:
+        """Replace the viewport selection if it is a match for ``query`` (Find/Replace "Replace").
+
+        With ``regex`` the selection must match the whole pattern and
+        ``replacement`` is expanded as a template (\\1, \\g<name>).
+        """
+        if not self.large_edit_mode or not self._large_view_active():
+            return False
+        selected = self._large_view.selected_text()
+        if not selected or not query:
+            return False
+        if regex:
+            replacement = lx_engine.regex_expand_match(selected, query, replacement, bool(case_sensitive))
+            if replacement is None:
+                return False
+        elif selected != query and (case_sensitive or selected.lower() != query.lower()):
+            return False
+        start, end = self.large_selection_bounds()
+        lx_engine.piece_table_break_undo_group(self._large_edit_handle)
+        self._large_edit_replace(start, end, replacement)
+        return True
+
+    def _large_edit_history(self, step) -> bool:
+        offset = int(step(self._large_edit_handle))
+        if offset < 0:
+            return False
+        self._after_large_edit(offset)
+        return True
+
+    def _large_edit_key(self, event) -> bool:
+        """Apply an editing key to the piece table; ``False`` if the key is not an edit."""
+        if event.matches(QKeySequence.StandardKey.Undo):
+            self.undo()
+            return True
+        if event.matches(QKeySequence.StandardKey.Redo):
+            self.redo()
+            return True
+        if event.matches(QKeySequence.StandardKey.Paste):
+            self.paste()
+            return True
+        if event.matches(QKeySequence.StandardKey.Cut):
+            self.cut()
+            return True
+
+        start, end = self.large_selection_bounds()
+        key = event.key()
+        if key in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
+            if start == end:
+                line, col = start
+                if key == Qt.Key.Key_Backspace:
+                    if col > 0:
+                        start = (line, col - 1)
+                    elif line > 1:
+                        start = (line - 1, len(self.read_large_lines(line - 1, 1)[0]))
+                    else:
+                        return True
+                else:
+                    row = self.read_large_lines(line, 1)
+                    if row and col < len(row[0]):
+                        end = (line, col + 1)
+                    elif line < self._large_line_count:
+                        end = (line + 1, 0)
+                    else:
+                        return True
+            self._large_edit_replace(start, end, "")
+            return True
+
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            text = "\n"
+        elif key == Qt.Key.Key_Tab:
+            text = "\t"
+        else:
+            text = event.text()
+            if not text or not text.isprintable() or event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+                return False
+        self._large_edit_replace(start, end, text)
         return True
 
-    def _on_large_scroll(self, value: int):
-        if not self.large_file_mode or self._switching_chunk:
+    def undo(self):
+        if self.large_edit_mode:
+            self._large_edit_history(lx_engine.piece_table_undo)
+            return
+        super().undo()
+
+    def redo(self):
+        if self.large_edit_mode:
+            self._large_edit_history(lx_engine.piece_table_redo)
+            return
+        super().redo()
+
+    def copy(self):
+        if self._large_view_active():
+            text = self._large_view.selected_text()
+            if text:
+                QApplication.clipboard().setText(text)
+            return
+        super().copy()
+
+    def cut(self):
+        if self.large_edit_mode:
+            start, end = self.large_selection_bounds()
+            if start != end:
+                QApplication.clipboard().setText(self._large_edit_replace(start, end, ""))
             return
-        sb = self.verticalScrollBar()
-        max_v = sb.maximum()
-        min_v = sb.minimum()
-        if max_v <= min_v:
+        super().cut()
+
+    def paste(self):
+        if self.large_edit_mode:
+            text = QApplication.clipboard().text()
+            if text:
+                start, end = self.large_selection_bounds()
+                self._large_edit_replace(start, end, text.replace("\r\n", "\n"))
             return
+        super().paste()
+
+    # --- VIRTUAL VIEWPORT ---
+
+    def large_line_count(self) -> int:
+        if not self.large_file_mode:
+            return 0
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0:
+            return self._large_line_count
+        self._ensure_large_line_offsets()
+        return self._large_line_count
+
+    def read_large_lines(self, first_line: int, count: int) -> list:
+        """Return up to ``count`` rows starting at 1-based ``first_line`` (no line terminators)."""
+        if not self.large_file_mode or count <= 0 or first_line < 1:
+            return []
+        if self.large_edit_mode:
+            try:
+                return list(lx_engine.get_piece_table_lines(self._large_edit_handle, first_line, count))
+            except Exception:
+                return []
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "get_text_buffer_lines"):
+            try:
+                return list(lx_engine.get_text_buffer_lines(self._large_buffer_handle, first_line, count))
+            except Exception:
+                return []
 
-        # Seamless chunk switching at scroll edges.
-        if value >= max_v - 1 and self._large_chunk_index < self._large_chunk_count - 1:
-            self._load_large_chunk(self._large_chunk_index + 1)
-            span = max(3, max_v - min_v)
-            sb.setValue(min_v + max(1, int(span * 0.15)))
-        elif value <= min_v + 1 and self._large_chunk_index > 0:
-            self._load_large_chunk(self._large_chunk_index - 1)
-            span = max(3, max_v - min_v)
-            sb.setValue(max(sb.minimum() + 1, sb.maximum() - max(2, int(span * 0.15))))
+        self._ensure_large_line_offsets()
+        offsets = self._large_line_offsets
+        content = self._large_content
+        rows = []
+        last_line = min(self._large_line_count, first_line + count - 1)
+        for idx in range(first_line - 1, last_line):
+            end = offsets[idx + 1] if idx + 1 < len(offsets) else len(content)
+            row = content[offsets[idx]:end]
+            if row.endswith("\n"):
+                row = row[:-1]
+            if row.endswith("\r"):
+                row = row[:-1]
+            rows.append(row)
+        return rows
 
-        self._last_scroll_value = value
+    # --- DISPLAY ROWS ---
+
+    def _large_display_rows(self) -> DisplayRowMap:
+        """Soft-split rows in effect; Large Edit Mode keeps one row per line."""
+        return _NO_DISPLAY_ROWS if self.large_edit_mode else self._large_rows
+
+    def _large_rows_split(self) -> bool:
+        """Whether engine chunks are cut into display rows instead of whole lines."""
+        if self.large_edit_mode or not _ENGINE_AVAILABLE or self._large_buffer_handle < 0:
+            return False
+        if not hasattr(lx_engine, "get_text_buffer_rows"):
+            return False
+        # Until the index is done, a long line not seen yet may sit in any chunk.
+        return bool(self._large_rows) or not self._large_rows_final
+
+    def _large_chunk_total(self) -> int:
+        rows = self._large_display_rows().row_count(self._large_line_count)
+        return max(1, math.ceil(rows / max(1, self._large_chunk_lines)))
+
+    def _refresh_large_rows(self, final: bool) -> bool:
+        """Pick up long lines the engine indexer found since the last call.
+
+        Row chunks stay small enough for soft-split rows until the finished
+        index shows there are none. Returns True if rows or chunks changed.
+        """
+        if self._large_buffer_handle < 0 or not hasattr(lx_engine, "get_text_buffer_long_lines"):
+            self._large_rows_final = True
+            return False
+        try:
+            entries = lx_engine.get_text_buffer_long_lines(self._large_buffer_handle, len(self._large_rows))
+        except Exception:
+            entries = []
+        self._large_rows_final = bool(final)
+        self._large_rows.extend(entries)
+        chunk_rows = self._large_chunk_lines_base
+        if self._large_rows_split():
+            row_bytes = int(getattr(lx_engine, "DISPLAY_ROW_BYTES", DISPLAY_ROW_CHARS))
+            chunk_rows = min(chunk_rows, max(64, _LARGE_ROW_CHUNK_BYTES // row_bytes))
+        if not entries and chunk_rows == self._large_chunk_lines:
+            return False
+        self._large_chunk_lines = chunk_rows
+        # Rows after a new long line moved (or chunks were resized): drop what was cut before.
+        self._clear_large_chunk_cache()
+        self._large_mirror_stale = True
+        self._schedule_large_view_sync()
+        return True
+
+    def large_row_count(self) -> int:
+        line_count = self.large_line_count()
+        return self._large_display_rows().row_count(line_count)
+
+    def read_large_rows(self, first_row: int, count: int) -> list:
+        """Up to ``count`` display rows from 0-based ``first_row`` as ``(line, column, text)``.
+
+        ``column`` is where the row starts in its line: 0, except on the
+        continuation rows of a soft-split long line. Rows come from the
+        shared chunk cache in blocks of ``_large_chunk_lines`` rows, which
+        scrolling prefetches ahead of the viewport.
+        """
+        if not self.large_file_mode or count <= 0 or first_row < 0:
+            return []
+        block_rows = max(1, self._large_chunk_lines)
+        idx, skip = divmod(first_row, block_rows)
+        rows = []
+        while len(rows) < count:
+            block = self._get_row_block_cached(idx)
+            rows.extend(block[skip:skip + count - len(rows)])
+            if len(block) < block_rows:
+                break
+            idx += 1
+            skip = 0
+        return rows
+
+    def _fetch_large_rows(self, first_row: int, count: int) -> list:
+        rows_map = self._large_display_rows()
+        line, segment = rows_map.row_line(first_row)
+        if (
+            not self.large_edit_mode
+            and _ENGINE_AVAILABLE
+            and self._large_buffer_handle >= 0
+            and hasattr(lx_engine, "get_text_buffer_rows")
+        ):
+            try:
+                return list(lx_engine.get_text_buffer_rows(self._large_buffer_handle, line, segment, count))
+            except Exception:
+                return []
+        if not rows_map:
+            return [(line + i, 0, text) for i, text in enumerate(self.read_large_lines(line, count))]
+
+        # Python buffer: long lines split every DISPLAY_ROW_CHARS characters.
+        offsets = self._large_line_offsets
+        content = self._large_content
+        rows = []
+        while len(rows) < count and line <= self._large_line_count:
+            start = offsets[line - 1]
+            end = offsets[line] if line < len(offsets) else len(content)
+            if content.endswith("\n", start, end):
+                end -= 1
+            if content.endswith("\r", start, end):
+                end -= 1
+            for seg in range(segment, rows_map.segment_count(line)):
+                if len(rows) >= count:
+                    break
+                seg_start = start + seg * DISPLAY_ROW_CHARS
+                rows.append((line, seg * DISPLAY_ROW_CHARS, content[seg_start:min(end, seg_start + DISPLAY_ROW_CHARS)]))
+            line += 1
+            segment = 0
+        return rows
+
+    def large_row_for_position(self, line_number: int, column: int) -> tuple:
+        """Display row holding the global (line, column), and the column within that row."""
+        rows_map = self._large_display_rows()
+        first = rows_map.first_row(line_number)
+        segments = rows_map.segment_count(line_number)
+        if segments <= 1 or column <= 0:
+            return first, column
+        if self._large_buffer_handle >= 0:
+            try:
+                segment, start = lx_engine.locate_text_buffer_column(self._large_buffer_handle, line_number, column)
+            except Exception:
+                segment, start = 0, 0
+        else:
+            segment = min(segments - 1, column // DISPLAY_ROW_CHARS)
+            start = segment * DISPLAY_ROW_CHARS
+        return first + int(segment), column - int(start)
+
+    def _large_row_start_column(self, line_number: int, segment: int) -> int:
+        if segment <= 0:
+            return 0
+        if self._large_buffer_handle >= 0:
+            try:
+                return int(lx_engine.get_text_buffer_rows(self._large_buffer_handle, line_number, segment, 1)[0][1])
+            except Exception:
+                return 0
+        return segment * DISPLAY_ROW_CHARS
+
+    # --- LINE NUMBERS ---
+
+    def cursor_line_column(self) -> tuple:
+        """1-based (line, column) of the caret in the whole file, for the status bar.
+
+        In Large Viewer mode the line is global (chunk start line + local
+        block from the engine index), not the block number inside the chunk.
+        """
+        if self._large_view_active():
+            line, col = self._large_view.cursor_position()
+            return line, col + 1
+        cursor = self.textCursor()
+        if self.large_file_mode:
+            line, col = self._large_position_from_document(cursor.position())
+            return line, col + 1
+        return cursor.blockNumber() + 1, cursor.columnNumber() + 1
+
+    def _update_line_gutter_geometry(self):
+        width = self._line_gutter.width_hint()
+        if self.viewportMargins().left() != width:
+            self.setViewportMargins(width, 0, 0, 0)
+        rect = self.contentsRect()
+        self._line_gutter.setGeometry(rect.left(), rect.top(), width, self.viewport().height())
+
+    def gutter_line_count(self) -> int:
+        return self._large_line_count if self.large_file_mode else self.document().blockCount()
+
+    def gutter_current_line(self) -> int:
+        return self.cursor_line_column()[0]
+
+    def gutter_rows(self):
+        # Large Viewer: the overlay draws its own gutter over this one.
+        if self._large_view_active():
+            return []
+        first_line = 1
+        if self.large_file_mode:
+            first_line = self._large_position_from_document(0)[0]
+        layout = self.document().documentLayout()
+        scroll = self.verticalScrollBar().value()
+        bottom = self.viewport().height()
+        block = self.cursorForPosition(QPoint(0, 0)).block()
+        # Hit tests can land past the top while Qt is still laying out lazily.
+        while block.previous().isValid() and layout.blockBoundingRect(block).top() > scroll:
+            block = block.previous()
+        rows = []
+        while block.isValid():
+            rect = layout.blockBoundingRect(block)
+            top = rect.top() - scroll
+            if top > bottom:
+                break
+            if block.isVisible():
+                rows.append((first_line + block.blockNumber(), top, rect.height()))
+            block = block.next()
+        return rows
+
+    # --- DOCUMENT OVERVIEW ---
+
+    def set_large_overview_keywords(self, keywords):
+        """Keywords whose hits the overview strip marks (case-sensitive)."""
+        self._large_overview_keywords = [str(k) for k in keywords if k]
+        self._schedule_large_overview()
+
+    def large_overview(self):
+        """Last overview dict shown in the strip, or ``None``."""
+        return self._large_overview.overview() if self._large_overview is not None else None
+
+    def _schedule_large_overview(self):
+        if self._large_view_active():
+            self._large_overview_timer.start()
+
+    def _large_overview_job(self, buckets: int):
+        """Zero-argument build for the worker; state it needs is captured here."""
+        keywords = list(self._large_overview_keywords)
+        search = self._large_search if self._large_search is not None and self._large_search.done else None
+
+        if self.large_edit_mode:
+            # The worker reads a frozen copy; typing continues on the live table.
+            snapshot = int(lx_engine.snapshot_piece_table(self._large_edit_handle))
+            search_id = search.engine_search_id if search is not None else -1
+
+            def build():
+                try:
+                    return _engine_overview(lx_engine.build_piece_table_overview, snapshot, buckets, keywords, search_id)
+                finally:
+                    lx_engine.release_piece_table(snapshot)
+
+            return build
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0 and hasattr(lx_engine, "build_text_buffer_overview"):
+            handle = self._large_buffer_handle
+            search_id = search.engine_search_id if search is not None else -1
+            return lambda: _engine_overview(lx_engine.build_text_buffer_overview, handle, buckets, keywords, search_id)
+
+        self._ensure_large_line_offsets()
+        content = self._large_content
+        offsets = self._large_line_offsets
+        search_lines = search.match_lines() if search is not None else None
+        return lambda: build_python_overview(content, offsets, buckets, keywords, True, search_lines)
+
+    def _refresh_large_overview(self):
+        if not self._large_view_active():
+            return
+        if self._large_overview_worker is not None and self._large_overview_worker.isRunning():
+            self._large_overview_pending = True
+            return
+        try:
+            build = self._large_overview_job(max(1, self._large_overview.height()))
+        except Exception as e:
+            if self.console:
+                self.console.log(f"Large Viewer overview unavailable: {e}", "WARN")
+            return
+        self._large_overview_pending = False
+        self._large_overview_generation += 1
+        worker = OverviewWorker(self._large_overview_generation, build)
+        worker.ready.connect(self._on_large_overview_ready)
+        self._large_overview_worker = worker
+        worker.start()
+
+    def _on_large_overview_ready(self, generation: int, overview):
+        if generation != self._large_overview_generation or not self._large_view_active():
+            return
+        if overview is not None:
+            self._large_overview.set_overview(overview)
+            self._update_large_overview_viewport()
+        if self._large_overview_pending:
+            self._large_overview_pending = False
+            self._schedule_large_overview()
+
+    def _update_large_overview_viewport(self):
+        if self._large_overview is not None and self._large_view is not None:
+            self._large_overview.set_viewport(
+                self._large_view.top_line(),
+                self._large_view.verticalScrollBar().pageStep(),
+                self.large_line_count(),
+            )
+
+    def _stop_large_overview(self):
+        self._large_overview_timer.stop()
+        self._large_overview_pending = False
+        self._large_overview_generation += 1
+        if self._large_overview_worker is not None:
+            # Builds are short (well under a second for 1 GB); let the last one finish.
+            self._large_overview_worker.wait(2000)
+            self._large_overview_worker = None
+        if self._large_overview is not None:
+            self._large_overview.clear()
+
+    def _set_plain_document_layout(self, enabled: bool):
+        """Use the line-based plain-text layout for the hidden chunk mirror.
+
+        The rich ``QTextDocumentLayout`` lays out everything above a cursor
+        before it can place it, so a jump deep into a big chunk cost hundreds of
+        milliseconds. The mirror is covered by ``LargeTextView`` anyway.
+        """
+        doc = self.document()
+        is_plain = isinstance(doc.documentLayout(), QPlainTextDocumentLayout)
+        if enabled and not is_plain:
+            doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+        elif not enabled and is_plain:
+            # None restores Qt's default rich-text layout.
+            doc.setDocumentLayout(None)
+
+    def _show_large_view(self):
+        if self._large_view is None:
+            self._large_view = LargeTextView(self, parent=self)
+            self._large_view.cursor_moved.connect(lambda _line, _col: self._schedule_large_view_sync())
+            self._large_view.top_line_changed.connect(self._on_large_view_scrolled)
+        if self._large_overview is None:
+            self._large_overview = LargeOverviewStrip(parent=self)
+            self._large_overview.jump_requested.connect(self.jump_to_large_line)
+        self._large_view.reload()
+        self._large_view.set_cursor_position(1, 0)
+        self._layout_large_view()
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self._large_view.show()
+        self._large_view.raise_()
+        self._large_overview.show()
+        self._large_overview.raise_()
+        if self.hasFocus():
+            self._large_view.setFocus()
+
+    def _hide_large_view(self):
+        self._large_view_sync_timer.stop()
+        if self._large_view is not None:
+            self._large_view.hide()
+        if self._large_overview is not None:
+            self._large_overview.hide()
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+
+    def _large_view_active(self) -> bool:
+        return self.large_file_mode and self._large_view is not None and not self._large_view.isHidden()
+
+    def _layout_large_view(self):
+        """Viewer fills the tab except for the overview strip on the right."""
+        rect = self.rect()
+        strip = self._large_overview
+        if strip is not None:
+            rect.setWidth(max(0, rect.width() - strip.width()))
+            resized = strip.height() != self.height()
+            strip.setGeometry(rect.width(), 0, strip.width(), self.height())
+            if resized:
+                self._schedule_large_overview()
+        if self._large_view is not None:
+            self._large_view.setGeometry(rect)
+
+    def _on_large_view_scrolled(self, top_line: int):
+        if not self.large_file_mode:
+            return
+        self._update_large_overview_viewport()
+        self._track_large_scroll(top_line)
+        self._schedule_large_view_sync()
+
+    def _schedule_large_view_sync(self):
+        if self._large_view_active() and not self._syncing_large_view:
+            self._large_view_sync_timer.start()
+
+    def _large_chunk_for_line(self, line_number: int, column: int = 0) -> int:
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0:
+            row = self.large_row_for_position(max(1, line_number), column)[0]
+            idx = row // max(1, self._large_chunk_lines)
+        else:
+            self._ensure_large_line_offsets()
+            line_idx = max(0, min(line_number - 1, self._large_line_count - 1))
+            idx = (self._large_line_offsets[line_idx] + max(0, column)) // max(1, self._large_chunk_size)
+        return max(0, min(idx, self._large_chunk_count - 1))
+
+    def _large_position_to_document(self, line_number: int, column: int):
+        """Map a global (line, column) to a position in the mirror, or ``None``."""
+        base = self._large_mirror_row_base()
+        if base is not None:
+            row, column = self.large_row_for_position(line_number, column)
+            block_no = row - base
+            block = self.document().findBlockByNumber(block_no)
+            if block_no < 0 or not block.isValid():
+                return None
+            return block.position() + min(max(0, column), max(0, block.length() - 1))
+
+        self._ensure_large_line_offsets()
+        if line_number < 1 or line_number > self._large_line_count:
+            return None
+        local = self._large_line_offsets[line_number - 1] + column - self._large_chunk_index * self._large_chunk_size
+        if local < 0 or local > max(0, self.document().characterCount() - 1):
+            return None
+        return local
+
+    def _large_position_from_document(self, position: int):
+        """Map a position in the mirror to a global (line, column)."""
+        base = self._large_mirror_row_base()
+        if base is not None:
+            block = self.document().findBlock(position)
+            row = base + max(0, block.blockNumber())
+            line, segment = self._large_display_rows().row_line(row)
+            return line, self._large_row_start_column(line, segment) + max(0, position - block.position())
+
+        self._ensure_large_line_offsets()
+        absolute = self._large_chunk_index * self._large_chunk_size + max(0, position)
+        line_idx = line_index_for_offset(self._large_line_offsets, absolute)
+        return line_idx + 1, absolute - self._large_line_offsets[line_idx]
+
+    def _sync_large_document_to_view(self):
+        """Keep the QTextDocument mirror on the rows around the viewport cursor.
+
+        The mirror only serves Replace, copy and Find selections, so it holds
+        ``_LARGE_MIRROR_ROWS`` rows around the cursor (and the selection), not
+        the whole chunk the cursor is in.
+        """
+        if not self._large_view_active():
+            return
+        view = self._large_view
+        line, col = view.cursor_position()
+        top = view.top_line()
+        keep_selection = view.has_selection()
+        if not (top <= line < top + view.height() // max(1, view.fontMetrics().lineSpacing())):
+            line, col = top, 0
+            keep_selection = False
+
+        self._syncing_large_view = True
+        try:
+            self._large_chunk_index = self._large_chunk_for_line(line, col)
+            first_row = last_row = self.large_row_for_position(line, col)[0]
+            if keep_selection:
+                anchor_row = self.large_row_for_position(*view.anchor_position())[0]
+                # A selection longer than the window stays in the viewport only.
+                keep_selection = abs(anchor_row - first_row) <= _LARGE_MIRROR_ROWS
+                if keep_selection:
+                    first_row, last_row = min(first_row, anchor_row), max(first_row, anchor_row)
+            self._load_large_mirror_rows(first_row, last_row)
+            position = self._large_position_to_document(line, col)
+            if position is not None:
+                cursor = self.textCursor()
+                anchor = None
+                if keep_selection:
+                    anchor = self._large_position_to_document(*view.anchor_position())
+                if anchor is not None:
+                    # Keep Find/keyboard selections on the mirror for Replace and copy.
+                    cursor.setPosition(anchor)
+                    cursor.setPosition(position, QTextCursor.MoveMode.KeepAnchor)
+                else:
+                    cursor.setPosition(position)
+                self.setTextCursor(cursor)
+        finally:
+            self._syncing_large_view = False
+
+    def _mirror_document_cursor_to_view(self):
+        """Show selections made on the chunk document (e.g. by Find) in the viewport."""
+        if self._switching_chunk or self._syncing_large_view or not self._large_view_active():
+            return
+        cursor = self.textCursor()
+        self._syncing_large_view = True
+        try:
+            line, col = self._large_position_from_document(cursor.position())
+            if cursor.hasSelection():
+                anchor_line, anchor_col = self._large_position_from_document(cursor.anchor())
+                self._large_view.select_range(anchor_line, anchor_col, line, col)
+            else:
+                self._large_view.set_cursor_position(line, col, center=True)
+        finally:
+            self._syncing_large_view = False
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_line_gutter_geometry()
+        self._layout_large_view()
+        self._match_highlighter.schedule_refresh()
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        if self.large_file_mode:
+            self._chunk_cache.touch(self._large_cache_owner)
+        if self._large_view_active():
+            self._large_view.setFocus()
 
     def next_large_chunk(self) -> bool:
         if not self.large_file_mode:
             return False
         if self._large_chunk_index >= self._large_chunk_count - 1:
             return False
-        self._load_large_chunk(self._large_chunk_index + 1)
+        self._step_large_chunk(self._large_chunk_index + 1)
         return True
 
     def previous_large_chunk(self) -> bool:
@@ -348,9 +1708,39 @@ class EditorTab(QTextEdit):
             return False
         if self._large_chunk_index <= 0:
             return False
-        self._load_large_chunk(self._large_chunk_index - 1)
+        self._step_large_chunk(self._large_chunk_index - 1)
         return True
 
+    def _step_large_chunk(self, idx: int):
+        """Move the mirror and the viewport to the first row of chunk ``idx``."""
+        self._large_chunk_index = idx
+        self._switching_chunk = True
+        try:
+            self._move_large_mirror_cursor_to_row(self._large_chunk_first_row(idx))
+        finally:
+            self._switching_chunk = False
+        self._mirror_chunk_start_to_view()
+
+    def _large_chunk_first_row(self, idx: int) -> int:
+        if _ENGINE_AVAILABLE and self._large_buffer_handle >= 0:
+            return idx * self._large_chunk_lines
+        # Python chunks are cut by characters, usually in the middle of a line.
+        self._ensure_large_line_offsets()
+        start = idx * self._large_chunk_size
+        line_idx = line_index_for_offset(self._large_line_offsets, start)
+        return self.large_row_for_position(line_idx + 1, start - self._large_line_offsets[line_idx])[0]
+
+    def _mirror_chunk_start_to_view(self):
+        if not self._large_view_active():
+            return
+        line, _col = self._large_position_from_document(self.textCursor().position())
+        self._syncing_large_view = True
+        try:
+            self._large_view.set_cursor_position(line, 0)
+            self._large_view.scroll_to_line(line)
+        finally:
+            self._syncing_large_view = False
+
     @staticmethod
     def _recommend_chunk_size(total_chars: int) -> int:
         if total_chars >= 100_000_000:
@@ -449,7 +1839,10 @@ class EditorTab(QTextEdit):
         return False
 
     def keyPressEvent(self, event):
-        if self.large_file_mode and self.isReadOnly():
+        if self.large_edit_mode and self._large_edit_key(event):
+            event.accept()
+            return
+        if self.large_file_mode and not self.large_edit_mode and self.isReadOnly():
             key = event.key()
             nav_keys = {
                 Qt.Key.Key_Up,
@@ -464,7 +1857,7 @@ class EditorTab(QTextEdit):
             if key not in nav_keys and not (event.modifiers() & Qt.KeyboardModifier.ControlModifier):
                 if self.console and not self._large_ro_hint_shown:
                     self.console.log(
-                        "Large Viewer Mode is read-only. Use 'Load Full Editable' to edit this file.",
+                        "Large Viewer Mode is read-only. Use 'Load Full Editable' or 'Large Edit Mode' to edit this file.",
                         "INFO",
                     )
                     self._large_ro_hint_shown = True
@@ -4,6 +4,7 @@ import shlex
 import subprocess
 import sys
 import sysconfig
+import tempfile
 from pathlib import Path
 
 UP_TO_DATE = "UP_TO_DATE"
@@ -40,6 +41,26 @@ def _pybind_flags() -> list[str]:
     return shlex.split(result.stdout.strip())
 
 
+def _zlib_flags() -> tuple[list[str], list[str]]:
+    """Compile and link flags for zlib, or empty lists if it is not installed.
+
+    zlib is optional: without it the engine builds fine but never compresses
+    idle text buffers.
+    """
+    probe = "#include <zlib.h>\nint main() { return zlibVersion() == nullptr; }\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "zlib_probe.cpp"
+        source.write_text(probe, encoding="utf-8")
+        cmd = ["g++", str(source), "-o", str(Path(tmp) / "zlib_probe"), "-lz"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except OSError:
+            return [], []
+    if result.returncode != 0:
+        return [], []
+    return ["-DLX_ENGINE_ZLIB"], ["-lz"]
+
+
 def run_build() -> str:
     base_dir = _project_root()
     sources = _source_files(base_dir)
@@ -51,9 +72,10 @@ def run_build() -> str:
     if out_lib.exists() and out_lib.stat().st_mtime >= src_latest:
         return UP_TO_DATE
 
-    flags = ["-O3", "-shared", "-std=c++17", "-fPIC", *_pybind_flags()]
+    zlib_defines, zlib_libs = _zlib_flags()
+    flags = ["-O3", "-shared", "-std=c++17", "-fPIC", "-pthread", *zlib_defines, *_pybind_flags()]
     tmp_out = Path(str(out_lib) + ".tmp")
-    cmd = ["g++", *flags, *sources, "-o", str(tmp_out)]
+    cmd = ["g++", *flags, *sources, *zlib_libs, "-o", str(tmp_out)]
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
         try:
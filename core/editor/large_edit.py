@@ -0,0 +1,111 @@
+class TextBufferStream:
+    """Streams an engine text buffer without materializing it as one ``str``.
+
+    Iterating yields UTF-8-safe ``str`` chunks (``iter_text_buffer``) and can
+    be restarted; ``write_to_file`` encodes natively chunk by chunk. With
+    ``owned=True`` the stream releases the handle on ``close()``, which lets a
+    closed tab or Safe Edit snapshot keep the buffer without copying it.
+    """
+
+    CHUNK_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, engine, handle, owned=False):
+        self._engine = engine
+        self._handle = int(handle)
+        self._owned = bool(owned)
+
+    @property
+    def handle(self) -> int:
+        return self._handle
+
+    def char_count(self) -> int:
+        info = self._engine.get_text_buffer_info(self._handle, 1)
+        return int(self._engine.convert_text_buffer_offset(self._handle, int(info.get("bytes", 0)), "byte", "char"))
+
+    def __iter__(self):
+        if self._handle < 0:
+            return iter(())
+        return iter(self._engine.iter_text_buffer(self._handle, self.CHUNK_BYTES))
+
+    def write_to_file(self, path: str, encoding: str = "utf-8") -> int:
+        return int(self._engine.write_text_buffer_to_file(self._handle, path, encoding))
+
+    def compress(self) -> bool:
+        """Ask the engine to keep this buffer compressed until it is read again.
+
+        Meant for buffers nobody is looking at (a closed tab), so it is
+        skipped while another handle (an open tab) shares the buffer. Returns
+        False when the engine cannot or will not compress it.
+        """
+        if self._handle < 0 or not hasattr(self._engine, "compress_text_buffer"):
+            return False
+        try:
+            if int(self._engine.get_text_buffer_info(self._handle, 1).get("handles", 1)) > 1:
+                return False
+            return bool(self._engine.compress_text_buffer(self._handle))
+        except Exception:
+            return False
+
+    def detach_handle(self) -> int:
+        """Hand the buffer handle (and its ownership) to the caller."""
+        handle, self._handle = self._handle, -1
+        self._owned = False
+        return handle
+
+    def close(self):
+        if self._owned and self._handle >= 0:
+            try:
+                self._engine.release_text_buffer(self._handle)
+            except Exception:
+                pass
+        self._handle = -1
+
+    def __del__(self):
+        self.close()
+
+
+class PieceTableSnapshot:
+    """Frozen copy of a Large Edit piece table for a save worker.
+
+    The engine copies only the piece list and the appended text, so taking a
+    snapshot is cheap even for a 1 GB file and the user can keep typing while
+    the worker streams it out. Iterating yields UTF-8-safe ``str`` chunks and
+    can be restarted (the save worker retries with another encoding).
+    """
+
+    CHUNK_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, engine, edit_handle):
+        self._engine = engine
+        self._handle = int(engine.snapshot_piece_table(edit_handle))
+        info = engine.get_piece_table_info(self._handle)
+        self.revision = int(info.get("revision", 0))
+        self.byte_size = int(info.get("bytes", 0))
+
+    def __iter__(self):
+        offset = 0
+        while self._handle >= 0:
+            text, next_offset = self._engine.read_piece_table_chunk(self._handle, offset, self.CHUNK_BYTES)
+            if next_offset <= offset:
+                return
+            yield text
+            offset = next_offset
+
+    def write_to_file(self, path: str, encoding: str = "utf-8") -> int:
+        """Write the pieces straight to ``path``; only non-UTF-8 output passes through Python codecs."""
+        return int(self._engine.write_piece_table_to_file(self._handle, path, encoding))
+
+    def to_text_buffer(self) -> TextBufferStream:
+        """Owned engine buffer with this text (shares the original if nothing was edited)."""
+        return TextBufferStream(self._engine, self._engine.piece_table_to_text_buffer(self._handle), owned=True)
+
+    def close(self):
+        if self._handle >= 0:
+            try:
+                self._engine.release_piece_table(self._handle)
+            except Exception:
+                pass
+            self._handle = -1
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,188 @@
+import math
+import re
+from bisect import bisect_right
+
+from PyQt6.QtCore import QThread, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPalette
+from PyQt6.QtWidgets import QWidget
+
+DEFAULT_KEYWORDS = ("ERROR",)
+
+
+def build_python_overview(content: str, offsets, buckets: int, keywords=(), case_sensitive=True, search_lines=None) -> dict:
+    """Fallback for ``build_text_buffer_overview`` when the engine is missing.
+
+    Same result layout, except that ``bucket_bytes`` counts characters.
+    ``offsets`` are the line starts from ``build_line_offsets`` and
+    ``search_lines`` the 1-based lines of the current search matches.
+    """
+    line_count = max(1, len(offsets))
+    bucket_count = max(1, min(int(buckets), line_count))
+    first_lines = [line_count * b // bucket_count for b in range(bucket_count)]
+    starts = [min(len(content), offsets[line]) for line in first_lines] + [len(content)]
+    bucket_bytes = [starts[b + 1] - starts[b] for b in range(bucket_count)]
+
+    keyword_rows = {}
+    flags = 0 if case_sensitive else re.IGNORECASE
+    for keyword in keywords:
+        hits = [0] * bucket_count
+        if keyword:
+            for match in re.finditer(re.escape(keyword), content, flags):
+                hits[bisect_right(starts, match.start(), 0, bucket_count) - 1] += 1
+        keyword_rows[keyword] = hits
+
+    search = None
+    if search_lines is not None:
+        search = [0] * bucket_count
+        for line in search_lines:
+            search[max(0, bisect_right(first_lines, line - 1) - 1)] += 1
+    return {
+        "line_count": len(offsets),
+        "bytes": len(content),
+        "first_lines": first_lines,
+        "bucket_bytes": bucket_bytes,
+        "keywords": keyword_rows,
+        "search": search,
+    }
+
+
+class OverviewWorker(QThread):
+    """Runs one overview build off the GUI thread.
+
+    ``build`` is a zero-argument callable returning the overview dict; the
+    result (``None`` on failure) comes back through ``ready`` tagged with the
+    generation it was started for, so stale builds can be dropped.
+    """
+
+    ready = pyqtSignal(int, object)
+
+    def __init__(self, generation: int, build):
+        super().__init__()
+        self._generation = int(generation)
+        self._build = build
+
+    def run(self):
+        try:
+            result = self._build()
+        except Exception:
+            result = None
+        self.ready.emit(self._generation, result)
+
+
+class LargeOverviewStrip(QWidget):
+    """Whole-file minimap drawn beside the Large Viewer.
+
+    Each pixel row stands for an even share of the file's lines, matching the
+    viewer's line-based scrollbar. Gray shows how many bytes those lines hold,
+    the right edge marks keyword hits (e.g. ``ERROR``) and the left edge the
+    current search matches; a frame marks the visible rows. Clicking or
+    dragging emits ``jump_requested`` with a 1-based line number.
+    """
+
+    jump_requested = pyqtSignal(int)
+
+    STRIP_WIDTH = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("largeOverviewStrip")
+        self.setFixedWidth(self.STRIP_WIDTH)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self._overview = None
+        self._line_count = 1
+        self._top_line = 1
+        self._visible_lines = 1
+        self._last_jump = None
+
+    # --- MODEL ---
+
+    def set_overview(self, overview):
+        self._overview = overview
+        if overview:
+            self._line_count = max(1, int(overview.get("line_count", 1)))
+        self.update()
+
+    def overview(self):
+        return self._overview
+
+    def clear(self):
+        self._overview = None
+        self.update()
+
+    def set_viewport(self, top_line: int, visible_lines: int, line_count: int):
+        viewport = (max(1, int(top_line)), max(1, int(visible_lines)), max(1, int(line_count)))
+        if viewport != (self._top_line, self._visible_lines, self._line_count):
+            self._top_line, self._visible_lines, self._line_count = viewport
+            self.update()
+
+    def line_at(self, y: int) -> int:
+        """1-based line shown at strip row ``y``."""
+        fraction = min(1.0, max(0.0, y / max(1, self.height())))
+        return min(self._line_count, int(fraction * self._line_count) + 1)
+
+    # --- RENDER ---
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        palette = self.palette()
+        height = self.height()
+        width = self.width()
+        painter.fillRect(self.rect(), palette.color(QPalette.ColorRole.Base))
+
+        overview = self._overview
+        if overview and overview.get("bucket_bytes"):
+            sizes = overview["bucket_bytes"]
+            count = len(sizes)
+            heaviest = max(sizes) or 1
+            density = palette.color(QPalette.ColorRole.Text)
+            keyword_rows = [row for row in overview.get("keywords", {}).values() if row]
+            keyword_color = QColor(220, 50, 47)
+            search = overview.get("search")
+            search_color = palette.color(QPalette.ColorRole.Highlight)
+            for b in range(count):
+                y0 = b * height // count
+                y1 = max(y0 + 1, (b + 1) * height // count)
+                if sizes[b]:
+                    density.setAlpha(20 + int(90 * sizes[b] / heaviest))
+                    painter.fillRect(3, y0, width - 6, y1 - y0, density)
+                hits = sum(row[b] for row in keyword_rows if b < len(row))
+                if hits:
+                    # Log scale so a single hit still shows next to dense bursts.
+                    keyword_color.setAlpha(min(255, 110 + int(40 * math.log2(hits))))
+                    painter.fillRect(width - 4, y0, 4, y1 - y0, keyword_color)
+                if search and b < len(search) and search[b]:
+                    search_color.setAlpha(min(255, 140 + int(30 * math.log2(search[b]))))
+                    painter.fillRect(0, y0, 4, y1 - y0, search_color)
+
+        top = (self._top_line - 1) * height // self._line_count
+        span = max(4, self._visible_lines * height // self._line_count)
+        frame = palette.color(QPalette.ColorRole.Highlight)
+        frame.setAlpha(50)
+        painter.fillRect(0, top, width, span, frame)
+        frame.setAlpha(180)
+        painter.setPen(frame)
+        painter.drawRect(0, top, width - 1, min(span, height - top) - 1)
+        painter.end()
+
+    # --- MOUSE ---
+
+    def _jump_to(self, y: int):
+        line = self.line_at(y)
+        if line != self._last_jump:
+            self._last_jump = line
+            self.jump_requested.emit(line)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._last_jump = None
+            self._jump_to(int(event.position().y()))
+            event.accept()
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._jump_to(int(event.position().y()))
+            event.accept()
+            return
+        super().mouseMoveEvent(event)
@@ -0,0 +1,390 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+def match_key(line: int, column: int) -> int:
+    """Sort key of a (line, column) match position."""
+    return (int(line) << 32) | int(column)
+
+
+def compile_search_pattern(query, case_sensitive, whole_words, regex=False):
+    """``re`` pattern with the Find options; raises ``re.error`` for a bad regex."""
+    pattern = query if regex else re.escape(query)
+    if whole_words:
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    flags = re.MULTILINE if regex else 0
+    return re.compile(pattern, flags if case_sensitive else flags | re.IGNORECASE)
+
+
+class _EngineSearchBackend:
+    """Whole-buffer search on the engine's own thread (``start_text_buffer_search``).
+
+    Regex searches run on the engine's linear-time matcher; with a
+    ``replacement`` the job also expands it for every match (a replace job).
+    ``refine`` searches the job's snapshot again through
+    ``refine_text_buffer_search``.
+    """
+
+    FETCH_BATCH = 200_000
+
+    def __init__(self, engine, start, handle, query, case_sensitive, whole_words, max_results,
+                 regex=False, replacement=None):
+        self._engine = engine
+        options = {"regex": True} if regex else {}
+        if replacement is not None:
+            options["replacement"] = replacement
+        self._search_id = int(start(handle, query, case_sensitive, whole_words, max_results, **options))
+        self._fetched = 0
+
+    @property
+    def search_id(self) -> int:
+        return self._search_id
+
+    def poll(self):
+        """Return ``(new_matches, total, done, scanned, total_size)``."""
+        rows = []
+        while True:
+            result = self._engine.get_text_buffer_search_results(self._search_id, self._fetched, self.FETCH_BATCH)
+            batch = result.get("matches", [])
+            rows.extend(batch)
+            self._fetched += len(batch)
+            if len(batch) < self.FETCH_BATCH:
+                break
+        return (
+            rows,
+            int(result.get("total", 0)),
+            bool(result.get("done", False)) and self._fetched >= int(result.get("stored", 0)),
+            int(result.get("scanned_bytes", 0)),
+            int(result.get("total_bytes", 0)),
+        )
+
+    def replaced_text(self) -> str:
+        return str(self._engine.get_text_buffer_search_replacement(self._search_id))
+
+    def refine(self, query, case_sensitive, whole_words, max_results, regex=False):
+        if not hasattr(self._engine, "refine_text_buffer_search"):
+            return None
+        return _EngineSearchBackend(
+            self._engine, self._engine.refine_text_buffer_search, self._search_id,
+            query, case_sensitive, whole_words, max_results, regex=regex,
+        )
+
+    def stop(self):
+        try:
+            self._engine.stop_text_buffer_search(self._search_id)
+        except Exception:
+            pass
+
+    def cancel(self):
+        try:
+            self._engine.cancel_text_buffer_search(self._search_id)
+        except Exception:
+            pass
+
+
+class _PythonSearchBackend:
+    """Fallback scan of the Python-held content on a plain worker thread."""
+
+    def __init__(self, content, query, case_sensitive, whole_words, max_results, regex=False, replacement=None):
+        # Raises re.error (a ValueError) for a bad pattern, like the engine.
+        self._regex = compile_search_pattern(query, case_sensitive, whole_words, regex)
+        self._content = content
+        self._max_results = max_results
+        self._replacement = replacement
+        self._replaced = None
+        self._lock = threading.Lock()
+        self._pending = []
+        self._total = 0
+        self._scanned = 0
+        self._done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LargeSearch", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        content = self._content
+        line = 1
+        line_start = 0
+        counted_to = 0
+        batch = []
+        parts = [] if self._replacement is not None else None
+        copied_to = 0
+        for match in self._regex.finditer(content):
+            if self._cancel.is_set():
+                break
+            pos = match.start()
+            newlines = content.count("\n", counted_to, pos)
+            if newlines:
+                line += newlines
+                line_start = content.rfind("\n", counted_to, pos) + 1
+            counted_to = pos
+            if not self._max_results or self._total < self._max_results:
+                batch.append((line, pos - line_start, pos, match.end() - pos))
+            if parts is not None:
+                parts.append(content[copied_to:pos])
+                parts.append(match.expand(self._replacement))
+                copied_to = match.end()
+            self._total += 1
+            if len(batch) >= 4096:
+                self._flush(batch, pos)
+                batch = []
+        self._flush(batch, len(content))
+        with self._lock:
+            if parts is not None and not self._cancel.is_set():
+                parts.append(content[copied_to:])
+                self._replaced = "".join(parts)
+            self._done = True
+
+    def _flush(self, batch, scanned):
+        with self._lock:
+            self._pending.extend(batch)
+            self._scanned = scanned
+
+    def poll(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            return rows, self._total, self._done and not self._pending, self._scanned, len(self._content)
+
+    def replaced_text(self) -> str:
+        with self._lock:
+            if self._replaced is None:
+                raise ValueError("Replace search has not finished")
+            return self._replaced
+
+    def refine(self, query, case_sensitive, whole_words, max_results, regex=False):
+        # A new scan, but of the content already held.
+        return _PythonSearchBackend(self._content, query, case_sensitive, whole_words, max_results, regex=regex)
+
+    def stop(self):
+        self._cancel.set()
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class LargeSearchSession(QObject):
+    """Streams whole-file search results for one Large Viewer tab.
+
+    Matches are kept sorted by (line, column) in flat arrays so a multi-million
+    hit result costs a few dozen bytes per match and Find Next/Previous is a
+    bisect. ``progress`` fires as results arrive with ``(total, done)``.
+
+    With ``regex`` the query is a pattern and matches vary in length (see
+    ``match_length``); a ``replacement`` turns the session into a replace job
+    whose result is ``replaced_text()`` or, for a piece table, applied by
+    ``piece_table_apply_search_replacements``.
+
+    Search as you type goes through ``refine``: the next query searches the
+    same text snapshot, and a query that only grew rechecks these matches.
+    """
+
+    MAX_STORED_MATCHES = 5_000_000
+
+    progress = pyqtSignal(int, bool)
+
+    def __init__(self, backend, query, case_sensitive, whole_words, parent=None, regex=False, replacement=None):
+        super().__init__(parent)
+        self.query = query
+        self.case_sensitive = bool(case_sensitive)
+        self.whole_words = bool(whole_words)
+        self.regex = bool(regex)
+        self.replacement = replacement
+        self._backend = backend
+        self._keys = array("q")
+        self._lines = array("q")
+        self._columns = array("q")
+        self._lengths = array("q")
+        self._longest = 0
+        self._total = 0
+        self._done = False
+        self._stopped = False
+        self._cancelled = False
+        self.scanned_bytes = 0
+        self.total_bytes = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(100)
+        self._timer.timeout.connect(self.poll)
+        self._timer.start()
+
+    @staticmethod
+    def _engine_has_regex(engine) -> bool:
+        return engine is not None and hasattr(engine, "regex_expand_match")
+
+    @classmethod
+    def start(cls, editor, engine, query, case_sensitive, whole_words, parent=None, regex=False, replacement=None):
+        if regex and not cls._engine_has_regex(engine):
+            engine = None
+        args = (query, case_sensitive, whole_words, cls.MAX_STORED_MATCHES)
+        options = {"regex": regex, "replacement": replacement}
+        if engine is not None and editor.large_edit_mode and hasattr(engine, "start_piece_table_search"):
+            # Large Edit Mode: search the edited text, not the original buffer.
+            backend = _EngineSearchBackend(
+                engine, engine.start_piece_table_search, editor._large_edit_handle, *args, **options
+            )
+        elif engine is not None and editor._large_buffer_handle >= 0 and hasattr(engine, "start_text_buffer_search"):
+            backend = _EngineSearchBackend(
+                engine, engine.start_text_buffer_search, editor._large_buffer_handle, *args, **options
+            )
+        else:
+            if editor.large_edit_mode and replacement is not None:
+                raise ValueError("Regex Replace All in Large Edit Mode needs the native engine")
+            content = "".join(editor.iter_full_text()) if editor.large_edit_mode else editor._large_content
+            backend = _PythonSearchBackend(content, *args, **options)
+        return cls(backend, query, case_sensitive, whole_words, parent=parent, **options)
+
+    @classmethod
+    def start_over_text(cls, engine, text, query, case_sensitive, whole_words, parent=None,
+                        regex=False, replacement=None):
+        """Search a plain string (a normal tab's document) in the background."""
+        if regex and not cls._engine_has_regex(engine):
+            engine = None
+        args = (query, case_sensitive, whole_words, cls.MAX_STORED_MATCHES)
+        options = {"regex": regex, "replacement": replacement}
+        if engine is not None and hasattr(engine, "create_text_buffer"):
+            handle = int(engine.create_text_buffer(text))
+            try:
+                # The job keeps its own reference to the buffer.
+                backend = _EngineSearchBackend(engine, engine.start_text_buffer_search, handle, *args, **options)
+            finally:
+                engine.release_text_buffer(handle)
+        else:
+            backend = _PythonSearchBackend(text, *args, **options)
+        return cls(backend, query, case_sensitive, whole_words, parent=parent, **options)
+
+    def matches_options(self, query, case_sensitive, whole_words, regex=False) -> bool:
+        # A stopped session holds partial results only.
+        return (
+            not self._stopped
+            and self.query == query
+            and self.case_sensitive == bool(case_sensitive)
+            and self.whole_words == bool(whole_words)
+            and self.regex == bool(regex)
+        )
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def engine_search_id(self) -> int:
+        """Engine job holding the matches natively, or -1 for the Python fallback."""
+        return getattr(self._backend, "search_id", -1)
+
+    def match_lines(self):
+        """Copy of the 1-based match lines stored so far."""
+        return array("q", self._lines)
+
+    def match_count(self) -> int:
+        return len(self._keys)
+
+    def match_at(self, index: int) -> tuple:
+        return self._lines[index], self._columns[index]
+
+    def match_length(self, index: int) -> int:
+        """Length of a match in characters (code points)."""
+        return self._lengths[index]
+
+    @property
+    def longest_match(self) -> int:
+        """Length of the longest match stored so far."""
+        return self._longest
+
+    def match_range(self, line: int, column: int, end_line: int, end_column: int) -> tuple:
+        """Indices ``(lo, hi)`` of the stored matches starting in [(line, column), (end_line, end_column))."""
+        return (
+            bisect_left(self._keys, match_key(line, column)),
+            bisect_left(self._keys, match_key(end_line, end_column)),
+        )
+
+    def match_table(self, start: int = 0) -> tuple:
+        """Copies of the sorted match keys and their lengths from index ``start`` on."""
+        return self._keys[start:], self._lengths[start:]
+
+    def replaced_text(self) -> str:
+        """Whole text with a finished replace job applied."""
+        return self._backend.replaced_text()
+
+    def poll(self):
+        if self._done:
+            return
+        try:
+            rows, total, done, scanned, total_bytes = self._backend.poll()
+        except Exception:
+            rows, total, done, scanned, total_bytes = [], self._total, True, self.scanned_bytes, self.total_bytes
+        query_length = len(self.query)
+        for row in rows:
+            line, column = row[0], row[1]
+            self._lines.append(int(line))
+            self._columns.append(int(column))
+            # Engines before regex search report (line, column, byte) only.
+            length = int(row[3]) if len(row) > 3 else query_length
+            self._lengths.append(length)
+            if length > self._longest:
+                self._longest = length
+            self._keys.append(match_key(line, column))
+        self._total = max(total, len(self._keys))
+        self.scanned_bytes = scanned
+        self.total_bytes = total_bytes
+        if done:
+            self._done = True
+            self._timer.stop()
+        if rows or done:
+            self.progress.emit(self._total, self._done)
+
+    def next_match(self, line: int, column: int):
+        """Index of the first match at or after (line, column); wraps once the scan is done."""
+        idx = bisect_left(self._keys, match_key(line, column))
+        if idx < len(self._keys):
+            return idx
+        if self._done and self._keys:
+            return 0
+        return None
+
+    def previous_match(self, line: int, column: int):
+        """Index of the last match before (line, column); wraps once the scan is done.
+
+        ``None`` means "not known yet": retry when ``progress`` fires.
+        """
+        after = bisect_left(self._keys, match_key(line, column))
+        if after == len(self._keys) and not self._done:
+            # The scan has not passed the cursor yet; a closer match may still arrive.
+            return None
+        if after > 0:
+            return after - 1
+        if self._done and self._keys:
+            return len(self._keys) - 1
+        return None
+
+    def refine(self, query, case_sensitive, whole_words, parent=None, regex=False):
+        """Search the text this session searched again, with new options.
+
+        No new copy of the text is made; when the engine can, a plain query
+        that extends this one only rechecks this session's matches. Returns
+        ``None`` when the snapshot is gone (cancelled, or an engine without
+        ``refine_text_buffer_search``); a bad pattern raises ``ValueError``.
+        """
+        if self._cancelled or self.replacement is not None:
+            return None
+        backend = self._backend.refine(query, case_sensitive, whole_words, self.MAX_STORED_MATCHES, regex=regex)
+        if backend is None:
+            return None
+        return type(self)(backend, query, case_sensitive, whole_words, parent=parent, regex=regex)
+
+    def stop(self):
+        """Stop scanning (the query changed) but keep the snapshot for ``refine``."""
+        self._stopped = True
+        self._backend.stop()
+
+    def cancel(self):
+        self._timer.stop()
+        self._backend.cancel()
+        self._cancelled = True
+        self._done = True
@@ -0,0 +1,583 @@
+from PyQt6.QtWidgets import QAbstractScrollArea, QApplication
+from PyQt6.QtGui import QPainter, QKeySequence, QPalette
+from PyQt6.QtCore import Qt, pyqtSignal
+
+from core.editor.line_number_gutter import LineNumberGutter
+
+
+class LargeTextView(QAbstractScrollArea):
+    """Virtualized read-only viewport for Large Viewer buffers.
+
+    The vertical scrollbar spans the whole file in line units, so dragging it
+    to 70% really lands at 70% of the file. Only rows intersecting the viewport
+    are pulled from ``line_source`` and painted; wheel deltas are applied in
+    pixels for smooth scrolling without chunk boundaries.
+
+    ``line_source`` must provide ``large_line_count()`` and
+    ``read_large_lines(first_line, count)`` (1-based line numbers, rows
+    without line terminators). Public positions use 1-based line numbers and
+    0-based columns, like ``jump_to_large_line`` and the status bar. The
+    line-number gutter shows those global line numbers for on-screen rows.
+
+    Sources that soft-split over-long lines also provide ``large_row_count()``,
+    ``read_large_rows(first_row, count)`` -> ``(line, column, text)`` and
+    ``large_row_for_position(line, column)`` -> ``(row, column_in_row)``. The
+    view then scrolls and paints display rows, while every public position
+    still names the real line and column.
+    """
+
+    cursor_moved = pyqtSignal(int, int)
+    top_line_changed = pyqtSignal(int)
+
+    _WINDOW_MARGIN = 128
+    _TAB_WIDTH = 4
+    _EXPAND_TABS_MAX_LEN = 20_000
+    _COPY_MAX_LINES = 200_000
+    _TEXT_MARGIN = 6
+
+    def __init__(self, line_source, parent=None):
+        super().__init__(parent)
+        self.setObjectName("largeTextView")
+        self._source = line_source
+        self._line_count = 1
+        self._pixel_offset = 0
+        self._setting_scroll = False
+        self._window_start = 0
+        self._window = []
+        self._window_origins = []
+        self._last_line = 1
+        self._max_columns = 0
+        self._cursor = (0, 0)
+        self._anchor = None
+        self._dragging = False
+        self._gutter = LineNumberGutter(self, parent=self)
+
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+        self.verticalScrollBar().valueChanged.connect(self._on_vertical_value_changed)
+        self.horizontalScrollBar().valueChanged.connect(lambda _value: self.viewport().update())
+        self.reload()
+
+    # --- MODEL ---
+
+    def _source_row_count(self) -> int:
+        self._last_line = max(1, int(self._source.large_line_count()))
+        if hasattr(self._source, "large_row_count"):
+            return int(self._source.large_row_count())
+        return self._last_line
+
+    def reload(self):
+        """Re-read line count from the source and drop cached rows."""
+        try:
+            count = self._source_row_count()
+        except Exception:
+            count = 0
+        self._line_count = max(1, count)
+        self._window_start = 0
+        self._window = []
+        self._window_origins = []
+        row, col = self._cursor
+        self._cursor = (min(row, self._line_count - 1), col)
+        self._anchor = None
+        self._update_gutter_geometry()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def refresh_line_count(self):
+        """Pick up a grown line count (e.g. while the source is still indexing), keeping position."""
+        try:
+            count = self._source_row_count()
+        except Exception:
+            return
+        count = max(1, count)
+        if count == self._line_count:
+            self._gutter.update()
+            return
+        self._line_count = count
+        self._update_gutter_geometry()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def invalidate_lines(self):
+        self._window = []
+        self._window_origins = []
+        self.viewport().update()
+
+    def line_count(self) -> int:
+        """Display rows; one per line unless the source soft-splits long lines."""
+        return self._line_count
+
+    def _read_rows(self, first: int, count: int) -> tuple:
+        """Texts and ``(line, column)`` origins of rows ``first``.. from the source."""
+        if hasattr(self._source, "read_large_rows"):
+            rows = list(self._source.read_large_rows(first, count))
+            return [row[2] for row in rows], [(row[0], row[1]) for row in rows]
+        texts = list(self._source.read_large_lines(first + 1, count))
+        return texts, [(first + 1 + i, 0) for i in range(len(texts))]
+
+    def _row_origin(self, row: int) -> tuple:
+        """``(line, column)`` where display ``row`` starts."""
+        self._rows(row, 1)
+        offset = row - self._window_start
+        if 0 <= offset < len(self._window_origins):
+            return self._window_origins[offset]
+        return row + 1, 0
+
+    def _row_for(self, line_number: int, column: int) -> tuple:
+        if hasattr(self._source, "large_row_for_position"):
+            try:
+                row, col = self._source.large_row_for_position(int(line_number), max(0, int(column)))
+                return int(row), int(col)
+            except Exception:
+                pass
+        return int(line_number) - 1, max(0, int(column))
+
+    def _rows(self, first: int, count: int) -> list:
+        first = max(0, first)
+        last = min(self._line_count, first + max(0, count))
+        if first >= last:
+            return []
+
+        window_end = self._window_start + len(self._window)
+        if not (self._window_start <= first and last <= window_end):
+            start = max(0, first - self._WINDOW_MARGIN)
+            end = min(self._line_count, last + self._WINDOW_MARGIN)
+            try:
+                rows, origins = self._read_rows(start, end - start)
+            except Exception:
+                rows, origins = [], []
+            self._window_start = start
+            self._window = rows
+            self._window_origins = origins
+            if rows:
+                widest = max(len(self._display(row)) for row in rows)
+                if widest > self._max_columns:
+                    self._max_columns = widest
+                    self._update_scrollbars()
+
+        offset = first - self._window_start
+        rows = self._window[offset:offset + (last - first)]
+        if len(rows) < last - first:
+            rows.extend([""] * (last - first - len(rows)))
+        return rows
+
+    def _row_text(self, row: int) -> str:
+        rows = self._rows(row, 1)
+        return rows[0] if rows else ""
+
+    def _display(self, text: str) -> str:
+        if "\t" in text and len(text) <= self._EXPAND_TABS_MAX_LEN:
+            return text.expandtabs(self._TAB_WIDTH)
+        return text
+
+    def _to_display_col(self, text: str, col: int) -> int:
+        if "\t" in text and len(text) <= self._EXPAND_TABS_MAX_LEN:
+            return len(text[:col].expandtabs(self._TAB_WIDTH))
+        return col
+
+    def _from_display_col(self, text: str, display_col: int) -> int:
+        if not ("\t" in text and len(text) <= self._EXPAND_TABS_MAX_LEN):
+            return max(0, min(display_col, len(text)))
+        width = 0
+        for idx, ch in enumerate(text):
+            step = self._TAB_WIDTH - (width % self._TAB_WIDTH) if ch == "\t" else 1
+            if width + step / 2 > display_col:
+                return idx
+            width += step
+        return len(text)
+
+    # --- GEOMETRIA / SCROLL ---
+
+    def _line_height(self) -> int:
+        return max(1, self.fontMetrics().lineSpacing())
+
+    def _char_width(self) -> int:
+        return max(1, self.fontMetrics().horizontalAdvance(" "))
+
+    def _visible_rows(self) -> int:
+        return max(1, self.viewport().height() // self._line_height())
+
+    def _update_scrollbars(self):
+        visible = self._visible_rows()
+        vsb = self.verticalScrollBar()
+        vsb.setRange(0, max(0, self._line_count - visible))
+        vsb.setPageStep(visible)
+        vsb.setSingleStep(1)
+
+        cw = self._char_width()
+        hsb = self.horizontalScrollBar()
+        content_width = self._max_columns * cw + 2 * self._TEXT_MARGIN
+        hsb.setRange(0, max(0, content_width - self.viewport().width()))
+        hsb.setPageStep(max(1, self.viewport().width()))
+        hsb.setSingleStep(cw)
+
+    def _on_vertical_value_changed(self, value: int):
+        if not self._setting_scroll:
+            # Scrollbar drag/keyboard moves are line-aligned.
+            self._pixel_offset = 0
+        self.viewport().update()
+        self.top_line_changed.emit(self.top_line())
+
+    def _set_scroll_pixels(self, total: int):
+        lh = self._line_height()
+        vsb = self.verticalScrollBar()
+        total = max(0, min(int(total), vsb.maximum() * lh))
+        top, offset = divmod(total, lh)
+        self._pixel_offset = offset
+        self._setting_scroll = True
+        try:
+            if vsb.value() != top:
+                vsb.setValue(top)
+            else:
+                self.viewport().update()
+        finally:
+            self._setting_scroll = False
+
+    def scroll_by_pixels(self, dy: int):
+        lh = self._line_height()
+        self._set_scroll_pixels(self.verticalScrollBar().value() * lh + self._pixel_offset + int(dy))
+
+    def top_line(self) -> int:
+        return self._row_origin(self.verticalScrollBar().value())[0]
+
+    def scroll_to_line(self, line_number: int, center: bool = False):
+        self._scroll_to_row(self._row_for(line_number, 0)[0], center=center)
+
+    def _scroll_to_row(self, row: int, center: bool = False):
+        row = max(0, min(int(row), self._line_count - 1))
+        if center:
+            row = max(0, row - self._visible_rows() // 2)
+        self._set_scroll_pixels(row * self._line_height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_gutter_geometry()
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.FontChange:
+            self._update_gutter_geometry()
+            self._update_scrollbars()
+            self.viewport().update()
+
+    def wheelEvent(self, event):
+        pixel = event.pixelDelta()
+        angle = event.angleDelta()
+        horizontal = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+
+        if not pixel.isNull():
+            dx, dy = pixel.x(), pixel.y()
+        else:
+            step = QApplication.wheelScrollLines() * self._line_height()
+            dx = int(angle.x() / 120 * step)
+            dy = int(angle.y() / 120 * step)
+        if horizontal and not dx:
+            dx, dy = dy, 0
+
+        if dy:
+            self.scroll_by_pixels(-dy)
+        if dx:
+            hsb = self.horizontalScrollBar()
+            hsb.setValue(hsb.value() - dx)
+        event.accept()
+
+    # --- GUTTER ---
+
+    def _update_gutter_geometry(self):
+        width = self._gutter.width_hint()
+        if self.viewportMargins().left() != width:
+            self.setViewportMargins(width, 0, 0, 0)
+        rect = self.contentsRect()
+        self._gutter.setGeometry(rect.left(), rect.top(), width, self.viewport().height())
+
+    def gutter_line_count(self) -> int:
+        return self._last_line
+
+    def gutter_current_line(self) -> int:
+        return self._row_origin(self._cursor[0])[0]
+
+    def gutter_rows(self):
+        lh = self._line_height()
+        top = self.verticalScrollBar().value()
+        last = min(self._line_count, top + self.viewport().height() // lh + 2)
+        self._rows(top, last - top)
+        rows = []
+        for row in range(top, last):
+            line, column = self._row_origin(row)
+            # Continuation rows of a soft-split line carry no number.
+            if column == 0:
+                rows.append((line, (row - top) * lh - self._pixel_offset, lh))
+        return rows
+
+    # --- KURSOR / ZAZNACZENIE ---
+
+    def _position(self, row: int, col: int) -> tuple:
+        line, start = self._row_origin(row)
+        return line, start + col
+
+    def cursor_position(self) -> tuple:
+        return self._position(*self._cursor)
+
+    def anchor_position(self) -> tuple:
+        return self._position(*(self._anchor if self._anchor is not None else self._cursor))
+
+    def set_cursor_position(self, line_number: int, column: int = 0, keep_anchor: bool = False, center: bool = False):
+        row, col = self._row_for(line_number, column)
+        self._move_cursor(row, col, keep_anchor=keep_anchor, center=center)
+
+    def _move_cursor(self, row: int, col: int, keep_anchor: bool = False, center: bool = False):
+        row = max(0, min(int(row), self._line_count - 1))
+        col = max(0, int(col))
+        if keep_anchor:
+            if self._anchor is None:
+                self._anchor = self._cursor
+        else:
+            self._anchor = None
+        self._cursor = (row, col)
+        self._ensure_cursor_visible(center=center)
+        self.viewport().update()
+        self.cursor_moved.emit(*self._position(row, col))
+
+    def select_range(self, line_number: int, column: int, end_line_number: int, end_column: int):
+        self.set_cursor_position(line_number, column)
+        self.set_cursor_position(end_line_number, end_column, keep_anchor=True, center=True)
+
+    def has_selection(self) -> bool:
+        return self._anchor is not None and self._anchor != self._cursor
+
+    def clear_selection(self):
+        if self._anchor is not None:
+            self._anchor = None
+            self.viewport().update()
+
+    def _selection_bounds(self):
+        if not self.has_selection():
+            return None
+        return min(self._anchor, self._cursor), max(self._anchor, self._cursor)
+
+    def selected_text(self):
+        """Return selected text, or ``None`` when the selection is too large to copy."""
+        bounds = self._selection_bounds()
+        if bounds is None:
+            return ""
+        (start_row, start_col), (end_row, end_col) = bounds
+        if end_row - start_row + 1 > self._COPY_MAX_LINES:
+            return None
+        try:
+            rows, origins = self._read_rows(start_row, end_row - start_row + 1)
+        except Exception:
+            return None
+        if not rows:
+            return ""
+        if len(rows) == 1:
+            return rows[0][start_col:end_col]
+        rows[0] = rows[0][start_col:]
+        rows[-1] = rows[-1][:end_col]
+        # Soft-split rows of one line join back without a newline.
+        parts = [rows[0]]
+        for text, (_line, column) in zip(rows[1:], origins[1:]):
+            if column == 0:
+                parts.append("\n")
+            parts.append(text)
+        return "".join(parts)
+
+    def _ensure_cursor_visible(self, center: bool = False):
+        row, col = self._cursor
+        top = self.verticalScrollBar().value()
+        visible = self._visible_rows()
+        if center and not (top <= row < top + visible):
+            self._scroll_to_row(row, center=True)
+        elif row < top or (row == top and self._pixel_offset):
+            self._set_scroll_pixels(row * self._line_height())
+        elif row >= top + visible:
+            self._set_scroll_pixels((row - visible + 1) * self._line_height())
+
+        cw = self._char_width()
+        text = self._row_text(row)
+        x = self._to_display_col(text, col) * cw
+        hsb = self.horizontalScrollBar()
+        width = max(cw, self.viewport().width() - 2 * self._TEXT_MARGIN)
+        if x < hsb.value():
+            hsb.setValue(max(0, x - width // 4))
+        elif x > hsb.value() + width:
+            hsb.setValue(x - width + width // 4)
+
+    def _position_at(self, pos) -> tuple:
+        lh = self._line_height()
+        row = self.verticalScrollBar().value() + (int(pos.y()) + self._pixel_offset) // lh
+        row = max(0, min(row, self._line_count - 1))
+        text = self._row_text(row)
+        x = int(pos.x()) - self._TEXT_MARGIN + self.horizontalScrollBar().value()
+        display_col = max(0, round(x / self._char_width()))
+        return row, self._from_display_col(text, display_col)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            super().mousePressEvent(event)
+            return
+        row, col = self._position_at(event.position())
+        keep = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+        self._move_cursor(row, col, keep_anchor=keep)
+        if not keep:
+            self._anchor = self._cursor
+        self._dragging = True
+        event.accept()
+
+    def mouseMoveEvent(self, event):
+        if not self._dragging:
+            super().mouseMoveEvent(event)
+            return
+        y = int(event.position().y())
+        if y < 0:
+            self.scroll_by_pixels(y)
+        elif y > self.viewport().height():
+            self.scroll_by_pixels(y - self.viewport().height())
+        row, col = self._position_at(event.position())
+        self._move_cursor(row, col, keep_anchor=True)
+        event.accept()
+
+    def mouseReleaseEvent(self, event):
+        self._dragging = False
+        super().mouseReleaseEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            text = self.selected_text()
+            if text is None:
+                QApplication.beep()
+            elif text:
+                QApplication.clipboard().setText(text)
+            event.accept()
+            return
+        if event.matches(QKeySequence.StandardKey.SelectAll):
+            self._move_cursor(0, 0)
+            self._move_cursor(self._line_count - 1, len(self._row_text(self._line_count - 1)), keep_anchor=True)
+            event.accept()
+            return
+
+        key = event.key()
+        keep = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+        ctrl = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        row, col = self._cursor
+        page = self._visible_rows()
+
+        if key == Qt.Key.Key_Up:
+            row -= 1
+        elif key == Qt.Key.Key_Down:
+            row += 1
+        elif key == Qt.Key.Key_PageUp:
+            row -= page
+            self.scroll_by_pixels(-page * self._line_height())
+        elif key == Qt.Key.Key_PageDown:
+            row += page
+            self.scroll_by_pixels(page * self._line_height())
+        elif key == Qt.Key.Key_Left:
+            if col > 0:
+                col -= 1
+            elif row > 0:
+                # The end of a soft-split row is the start of the next one; step past it.
+                continued = self._row_origin(row)[1] > 0
+                row -= 1
+                col = len(self._row_text(row)) - (1 if continued else 0)
+        elif key == Qt.Key.Key_Right:
+            if col < len(self._row_text(row)):
+                col += 1
+            elif row < self._line_count - 1:
+                row += 1
+                col = 1 if self._row_origin(row)[1] > 0 else 0
+        elif key == Qt.Key.Key_Home:
+            row, col = (0, 0) if ctrl else (row, 0)
+        elif key == Qt.Key.Key_End:
+            if ctrl:
+                row = self._line_count - 1
+            col = len(self._row_text(max(0, min(row, self._line_count - 1))))
+        else:
+            # Let EditorTab handle the rest (read-only hint, shortcuts).
+            event.ignore()
+            return
+
+        row = max(0, min(row, self._line_count - 1))
+        if key in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+            col = min(col, len(self._row_text(row)))
+        self._move_cursor(row, col, keep_anchor=keep)
+        event.accept()
+
+    # --- RENDER ---
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        fm = self.fontMetrics()
+        lh = self._line_height()
+        cw = self._char_width()
+        palette = self.palette()
+        width = self.viewport().width()
+
+        top = self.verticalScrollBar().value()
+        rows = self._rows(top, self.viewport().height() // lh + 2)
+        x_scroll = self.horizontalScrollBar().value()
+        first_col = max(0, x_scroll // cw - 1)
+        col_span = width // cw + 3
+        x0 = self._TEXT_MARGIN - x_scroll
+        bounds = self._selection_bounds()
+        cursor_row, cursor_col = self._cursor
+
+        current_line_color = palette.color(QPalette.ColorRole.Highlight)
+        current_line_color.setAlpha(28)
+        selection_color = palette.color(QPalette.ColorRole.Highlight)
+        text_color = palette.color(QPalette.ColorRole.Text)
+        match_color = palette.color(QPalette.ColorRole.Highlight)
+        match_color.setAlpha(90)
+        search_matches = getattr(self._source, "large_search_matches", None)
+
+        for i, text in enumerate(rows):
+            row = top + i
+            y = i * lh - self._pixel_offset
+            display = self._display(text)
+
+            if row == cursor_row and bounds is None:
+                painter.fillRect(0, y, width, lh, current_line_color)
+
+            if search_matches is not None:
+                # "Highlight all" for the Find matches on this row only.
+                line, row_col = self._row_origin(row)
+                for column, length in search_matches(line, row_col, row_col + len(text)):
+                    match_from = max(0, column - row_col)
+                    match_to = min(len(text) + 1, column + length - row_col)
+                    if match_to > match_from:
+                        x_from = self._to_display_col(text, match_from)
+                        x_to = self._to_display_col(text, match_to)
+                        painter.fillRect(x0 + x_from * cw, y, max(1, x_to - x_from) * cw, lh, match_color)
+
+            if bounds is not None:
+                (start_row, start_col), (end_row, end_col) = bounds
+                if start_row <= row <= end_row:
+                    sel_from = self._to_display_col(text, start_col) if row == start_row else 0
+                    sel_to = self._to_display_col(text, end_col) if row == end_row else len(display) + 1
+                    painter.fillRect(x0 + sel_from * cw, y, max(0, sel_to - sel_from) * cw, lh, selection_color)
+
+            painter.setPen(text_color)
+            painter.drawText(x0 + first_col * cw, y + fm.ascent(), display[first_col:first_col + col_span])
+
+            if row == cursor_row and self.hasFocus():
+                caret_x = x0 + self._to_display_col(text, cursor_col) * cw
+                painter.fillRect(caret_x, y, 1, lh, text_color)
+        painter.end()
+        # Scrolls, cursor moves and edits all repaint the viewport; keep the numbers in step.
+        self._gutter.update()
+
+    def focusNextPrevChild(self, next_child):
+        # In Large Edit Mode Tab inserts a tab instead of moving focus.
+        if getattr(self._source, "large_edit_mode", False):
+            return False
+        return super().focusNextPrevChild(next_child)
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.viewport().update()
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        self.viewport().update()
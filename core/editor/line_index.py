@@ -0,0 +1,40 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+_SCAN_BLOCK_CHARS = 4 * 1024 * 1024
+
+
+def build_line_offsets(text: str, block_chars: int = _SCAN_BLOCK_CHARS) -> array:
+    """Start offsets of every line in ``text`` as ``array('q')``.
+
+    Same semantics as the engine index: line 1 starts at 0 and a trailing
+    newline does not open an extra line. The scan runs block by block on
+    ``str.split`` and ``itertools.accumulate``, so no Python-level loop
+    touches individual characters and peak memory stays bounded by the block.
+    """
+    offsets = array("q", [0])
+    total = len(text)
+    step = max(1, int(block_chars))
+    for start in range(0, total, step):
+        parts = text[start:start + step].split("\n")
+        if len(parts) == 1:
+            continue
+        # Position right after each newline = block start + running (len + 1).
+        starts = accumulate(map((1).__add__, map(len, parts[:-1])), initial=start)
+        next(starts)
+        offsets.extend(starts)
+    if len(offsets) > 1 and offsets[-1] >= total:
+        offsets.pop()
+    return offsets
+
+
+def line_index_for_offset(offsets: array, char_offset: int) -> int:
+    """0-based index of the line containing ``char_offset``."""
+    return max(0, bisect_right(offsets, char_offset) - 1)
+
+
+def chunk_first_lines(offsets: array, chunk_size: int, chunk_count: int) -> array:
+    """0-based index of the line each fixed-size character chunk starts in."""
+    size = max(1, int(chunk_size))
+    return array("q", (line_index_for_offset(offsets, idx * size) for idx in range(max(0, chunk_count))))
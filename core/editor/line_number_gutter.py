@@ -0,0 +1,50 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainter, QPalette
+from PyQt6.QtWidgets import QWidget
+
+
+class LineNumberGutter(QWidget):
+    """Line-number column painted beside an editor viewport.
+
+    ``owner`` supplies ``gutter_rows()`` -> ``(line_number, top, height)`` for
+    the rows currently on screen (viewport coordinates), ``gutter_line_count()``
+    to size the column for the widest number and ``gutter_current_line()``.
+    Only on-screen rows are ever asked for, so painting costs the same on a
+    100-line and a 100M-line file.
+    """
+
+    PADDING = 6
+
+    def __init__(self, owner, parent=None):
+        super().__init__(parent)
+        self.setObjectName("lineNumberGutter")
+        self._owner = owner
+
+    def width_hint(self) -> int:
+        try:
+            digits = len(str(max(1, int(self._owner.gutter_line_count()))))
+        except Exception:
+            digits = 1
+        return 2 * self.PADDING + max(3, digits) * self.fontMetrics().horizontalAdvance("9")
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        palette = self.palette()
+        painter.fillRect(event.rect(), palette.color(QPalette.ColorRole.AlternateBase))
+        fm = self.fontMetrics()
+        width = self.width() - self.PADDING
+        current = self._owner.gutter_current_line()
+        dim = palette.color(QPalette.ColorRole.PlaceholderText)
+        bright = palette.color(QPalette.ColorRole.Text)
+        clip_top = event.rect().top()
+        clip_bottom = event.rect().bottom()
+        for line_number, top, height in self._owner.gutter_rows():
+            if top + height < clip_top or top > clip_bottom:
+                continue
+            painter.setPen(bright if line_number == current else dim)
+            painter.drawText(
+                0, int(top), width, max(int(height), fm.height()),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+                str(line_number),
+            )
+        painter.end()
@@ -0,0 +1,260 @@
+from array import array
+from bisect import bisect_left
+
+from PyQt6.QtCore import QObject, QPoint, QTimer
+from PyQt6.QtGui import QPalette, QTextCharFormat, QTextCursor
+from PyQt6.QtWidgets import QTextEdit
+
+from core.editor.large_search import compile_search_pattern, match_key
+
+
+def _utf16_len(text: str) -> int:
+    return len(text) + sum(1 for ch in text if ord(ch) > 0xFFFF)
+
+
+def _index_at_utf16(text: str, units: int) -> int:
+    """Index into ``text`` of the character at UTF-16 offset ``units``."""
+    index = 0
+    for ch in text:
+        if units <= 0:
+            break
+        units -= 2 if ord(ch) > 0xFFFF else 1
+        index += 1
+    return index
+
+
+class MatchHighlighter(QObject):
+    """Highlights every Find match of a ``QTextEdit``, but draws only the visible ones.
+
+    The match set comes from a ``LargeSearchSession`` (computed once per
+    query, options and text, in the background) and is copied here as sorted
+    ``(line, column)`` keys. Scrolling bisects that table for the rows on
+    screen, so only a few dozen matches ever become extra selections, even
+    with 100k matches in the document.
+
+    Edits patch the table instead of searching again: matches on the edited
+    lines are looked up in those lines only, matches below shift by the
+    change in line count. A plain query never spans lines, so this is exact;
+    regex matches may, so an edit drops regex highlights, as does an edit
+    while the search is still streaming.
+    """
+
+    REFRESH_DELAY_MS = 30
+    # Edits touching more lines than this (e.g. setPlainText) drop the highlights.
+    MAX_RESCAN_LINES = 2000
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self._editor = editor
+        self._session = None
+        self._pattern = None
+        self._keys = array("q")
+        self._lengths = array("q")
+        self._longest = 0
+        self._document = None
+        self._block_count = 0
+        self._shown = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.REFRESH_DELAY_MS)
+        self._timer.timeout.connect(self._refresh)
+        editor.verticalScrollBar().valueChanged.connect(self.schedule_refresh)
+        editor.horizontalScrollBar().valueChanged.connect(self.schedule_refresh)
+
+    def match_count(self) -> int:
+        return len(self._keys)
+
+    def visible_count(self) -> int:
+        """Matches currently drawn as extra selections."""
+        return len(self._editor.extraSelections()) if self._shown else 0
+
+    def show_session(self, session):
+        """Highlight the matches of ``session``, a search of the editor's current text."""
+        if session is self._session:
+            self.schedule_refresh()
+            return
+        self.clear()
+        self._session = session
+        if not session.regex:
+            self._pattern = compile_search_pattern(session.query, session.case_sensitive, session.whole_words)
+        self._watch_document()
+        session.progress.connect(self._on_session_progress)
+        session.destroyed.connect(self._on_session_destroyed)
+        self._on_session_progress()
+
+    def clear(self):
+        self._release_session()
+        self._pattern = None
+        self._keys = array("q")
+        self._lengths = array("q")
+        self._longest = 0
+        self._timer.stop()
+        if self._shown:
+            self._shown = False
+            self._editor.setExtraSelections([])
+
+    def schedule_refresh(self, *_args):
+        # Throttled, not debounced: a long smooth scroll still updates every few frames.
+        if (self._keys or self._shown) and not self._timer.isActive():
+            self._timer.start()
+
+    # --- MATCH TABLE ---
+
+    def _release_session(self):
+        session, self._session = self._session, None
+        if session is None:
+            return
+        for signal, slot in ((session.progress, self._on_session_progress),
+                             (session.destroyed, self._on_session_destroyed)):
+            try:
+                signal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+
+    def _on_session_progress(self, *_args):
+        session = self._session
+        if session is None:
+            return
+        keys, lengths = session.match_table(len(self._keys))
+        self._keys.extend(keys)
+        self._lengths.extend(lengths)
+        self._longest = max(self._longest, session.longest_match)
+        if session.done:
+            # The table is complete and ours now; the session may go.
+            self._release_session()
+        self.schedule_refresh()
+
+    def _on_session_destroyed(self, *_args):
+        # Dropped before it finished: a partial table would miss matches.
+        self._session = None
+        self.clear()
+
+    def _watch_document(self):
+        document = self._editor.document()
+        if document is not self._document:
+            if self._document is not None:
+                try:
+                    self._document.contentsChange.disconnect(self._on_contents_change)
+                except (TypeError, RuntimeError):
+                    pass
+            self._document = document
+            document.contentsChange.connect(self._on_contents_change)
+        self._block_count = document.blockCount()
+
+    def _on_contents_change(self, position, _removed, added):
+        document = self._document
+        block_count = document.blockCount()
+        line_delta = block_count - self._block_count
+        self._block_count = block_count
+        if not self._keys and self._session is None:
+            return
+        if self._session is not None or self._pattern is None:
+            self.clear()
+            return
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not first.isValid():
+            first = document.lastBlock()
+        if not last.isValid():
+            last = document.lastBlock()
+        first_line = first.blockNumber() + 1
+        added_lines = last.blockNumber() - first.blockNumber()
+        removed_lines = added_lines - line_delta
+        if max(added_lines, removed_lines) > self.MAX_RESCAN_LINES or removed_lines < 0:
+            self.clear()
+            return
+
+        keys, lengths = self._keys, self._lengths
+        lo = bisect_left(keys, match_key(first_line, 0))
+        hi = bisect_left(keys, match_key(first_line + removed_lines + 1, 0))
+        new_keys, new_lengths = self._scan_lines(first, added_lines + 1)
+        tail = keys[hi:]
+        if line_delta:
+            shift = line_delta << 32
+            tail = array("q", (key + shift for key in tail))
+        self._keys = keys[:lo] + new_keys + tail
+        self._lengths = lengths[:lo] + new_lengths + lengths[hi:]
+        self.schedule_refresh()
+
+    def _scan_lines(self, block, count):
+        keys = array("q")
+        lengths = array("q")
+        for _ in range(count):
+            if not block.isValid():
+                break
+            line = block.blockNumber() + 1
+            for match in self._pattern.finditer(block.text()):
+                length = match.end() - match.start()
+                if length:
+                    keys.append(match_key(line, match.start()))
+                    lengths.append(length)
+                    self._longest = max(self._longest, length)
+            block = block.next()
+        return keys, lengths
+
+    # --- RENDER ---
+
+    def _visible_range(self):
+        """Indices ``(lo, hi)`` of the matches that can show in the viewport."""
+        editor = self._editor
+        rows = editor.gutter_rows()
+        if not rows:
+            return 0, 0
+        first_line, last_line = rows[0][0], rows[-1][0]
+        lo_key = match_key(first_line, 0)
+        hi_key = match_key(last_line + 1, 0)
+        # A long wrapped line may fill the viewport: bound its columns too.
+        viewport = editor.viewport()
+        top = editor.cursorForPosition(QPoint(0, 0))
+        if top.blockNumber() + 1 == first_line:
+            column = _index_at_utf16(top.block().text(), top.positionInBlock())
+            lo_key = match_key(first_line, max(0, column - self._longest))
+        bottom = editor.cursorForPosition(QPoint(viewport.width(), viewport.height()))
+        if bottom.blockNumber() + 1 == last_line:
+            column = _index_at_utf16(bottom.block().text(), bottom.positionInBlock())
+            hi_key = match_key(last_line, column + 1)
+        return bisect_left(self._keys, lo_key), bisect_left(self._keys, hi_key)
+
+    def _refresh(self):
+        editor = self._editor
+        document = editor.document()
+        lo, hi = self._visible_range() if self._keys else (0, 0)
+        if lo == hi and not self._shown:
+            return
+
+        color = editor.palette().color(QPalette.ColorRole.Highlight)
+        color.setAlpha(90)
+        highlight = QTextCharFormat()
+        highlight.setBackground(color)
+        selections = []
+        block = document.firstBlock()
+        for i in range(lo, hi):
+            key = self._keys[i]
+            line, column = key >> 32, key & 0xFFFFFFFF
+            if block.blockNumber() != line - 1:
+                block = document.findBlockByNumber(line - 1)
+                if not block.isValid():
+                    break
+            text = block.text()
+            start = block.position() + _utf16_len(text[:column])
+            end = self._match_end(block, column, self._lengths[i])
+            cursor = QTextCursor(document)
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = cursor
+            selection.format = highlight
+            selections.append(selection)
+        editor.setExtraSelections(selections)
+        self._shown = bool(selections)
+
+    @staticmethod
+    def _match_end(block, column, length):
+        # Regex matches may run over line breaks (one character each).
+        text = block.text()
+        while column + length > len(text) and block.next().isValid():
+            length -= len(text) - column + 1
+            block = block.next()
+            text = block.text()
+            column = 0
+        return block.position() + _utf16_len(text[:column + max(0, length)])
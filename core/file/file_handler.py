@@ -1,10 +1,12 @@
 import os
 import sys
 import ctypes
+import codecs
 from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
 from PyQt6.QtCore import QTimer, QThread, pyqtSignal, Qt
 from core.file.recent_files import RecentFiles
 from core.file.operation_flows import OpenFlow, SaveFlow
+from core.editor.large_edit import TextBufferStream
 
 # --- IMPORT LxCharset (lokalny moduł projektu) ---
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -104,6 +106,62 @@ def _detect_preferred_encoding(raw_data, file_path, emit_log):
         )
     return preferred_encoding, confidence
 
+# Files above this many bytes open in the Large Viewer (see OpenFlow.finalize);
+# in a single-byte encoding bytes and characters are the same count.
+LAZY_DECODE_MIN_BYTES = 8_000_000
+
+
+def _single_byte_code_points(encoding):
+    """Code point of each byte value in ``encoding`` (-1 where undefined).
+
+    ``None`` unless ``encoding`` is a stateless single-byte codec that keeps
+    ASCII as is and maps into the BMP - what the engine's raw buffers need.
+    """
+    try:
+        codecs.lookup(encoding)
+    except (LookupError, TypeError):
+        return None
+    code_points = []
+    for byte in range(256):
+        try:
+            char = bytes([byte]).decode(encoding)
+        except UnicodeDecodeError:
+            code_points.append(-1)
+            continue
+        except Exception:
+            return None
+        if len(char) != 1 or ord(char) > 0xFFFF or (byte < 0x80 and ord(char) != byte):
+            return None
+        code_points.append(ord(char))
+    if code_points.count(-1) > 32:
+        # Multi-byte codecs reject lone lead bytes; they are not single-byte.
+        return None
+    return code_points
+
+
+def file_identity(path):
+    """(device, inode, size, mtime) of ``path``, or ``None`` if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _same_path(left, right):
+    return os.path.normcase(os.path.abspath(left)) == os.path.normcase(os.path.abspath(right))
+
+
+def _write_text_content(path, content, encoding):
+    """Write a ``str`` or a Large Viewer stream (``write_to_file``) to ``path``."""
+    if isinstance(content, str):
+        with open(path, "w", encoding=encoding) as f:
+            f.write(content)
+        return
+    # Engine buffer / piece table: streamed natively, never one huge str.
+    content.write_to_file(path, encoding)
+
+
 class BaseFileWorker(QThread):
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
@@ -117,6 +175,9 @@ class BaseFileWorker(QThread):
         self.used_encoding = "utf-8"
         self.encoding_confidence = 0.0
         self.save_encoding = "utf-8"
+        self.file_identity = None
+        # Set by the open task instead of decoded text (see _open_single_byte_lazily).
+        self.large_stream = None
 
     def _should_stop(self):
         return self.isInterruptionRequested()
@@ -152,6 +213,34 @@ class BaseFileWorker(QThread):
             )
             return None
 
+    def _open_single_byte_lazily(self, raw_data, preferred_encoding):
+        """Engine buffer over the raw bytes of a large single-byte-encoded file.
+
+        cp1250, ISO-8859-2, Latin-1 and the like map bytes 1:1 to characters,
+        so the engine indexes the raw bytes and decodes only what is read
+        instead of the whole file being transcoded here. ``None`` when that
+        does not apply; the usual decode path then runs.
+        """
+        if not preferred_encoding or len(raw_data) <= LAZY_DECODE_MIN_BYTES:
+            return None
+        if not (ENGINE_AVAILABLE and hasattr(lx_engine, "create_single_byte_text_buffer")):
+            return None
+        code_points = _single_byte_code_points(preferred_encoding)
+        if code_points is None:
+            return None
+        try:
+            handle = lx_engine.create_single_byte_text_buffer(raw_data, code_points)
+        except ValueError as err:
+            # A byte the encoding does not define: let the decoders handle it.
+            self.log_signal.emit(f"Lazy {preferred_encoding} decoding unavailable: {err}", "WARN")
+            return None
+        self.used_encoding = preferred_encoding
+        self.log_signal.emit(
+            f"Opened {os.path.basename(self.path)} as raw {preferred_encoding}; decoding on demand.",
+            "ENGINE",
+        )
+        return TextBufferStream(lx_engine, handle, owned=True)
+
     def _decode_with_fallbacks(self, raw_data, preferred_encoding, fallback_encodings):
         data = None
         if preferred_encoding:
@@ -222,6 +311,8 @@ class BaseFileWorker(QThread):
         if not os.path.exists(self.path):
             raise FileNotFoundError(f"Plik nie istnieje: {self.path}")
 
+        # Taken before reading: a later change on disk then never matches it.
+        self.file_identity = file_identity(self.path)
         with open(self.path, "rb") as f:
             raw_data = f.read()
 
@@ -238,6 +329,13 @@ class BaseFileWorker(QThread):
         if self._should_stop():
             return
 
+        self.large_stream = self._open_single_byte_lazily(raw_data, preferred_encoding)
+        if self.large_stream is not None:
+            # The Large Viewer decodes what it shows; nothing else to prepare.
+            self.progress.emit(100)
+            self.finished.emit("")
+            return
+
         fallback_encodings = ["utf-8-sig", "utf-16", "utf-8", "cp1250", "iso-8859-2", "latin-1"]
         data = self._decode_with_engine(raw_data, preferred_encoding, fallback_encodings)
         if data is None:
@@ -258,13 +356,11 @@ class BaseFileWorker(QThread):
             return
         target_encoding = str(getattr(self, "save_encoding", "utf-8") or "utf-8")
         try:
-            with open(self.path, "w", encoding=target_encoding) as f:
-                f.write(self.content)
+            self._write_content(target_encoding)
             self.used_encoding = target_encoding
         except UnicodeEncodeError:
             # Safety fallback: never lose save operation due to unsupported chars.
-            with open(self.path, "w", encoding="utf-8") as f:
-                f.write(self.content)
+            self._write_content("utf-8")
             self.used_encoding = "utf-8"
             self.log_signal.emit(
                 f"Requested save encoding '{target_encoding}' could not encode data. Saved as UTF-8 instead.",
@@ -273,6 +369,9 @@ class BaseFileWorker(QThread):
         self.progress.emit(100)
         self.finished.emit(self.path)
 
+    def _write_content(self, encoding):
+        _write_text_content(self.path, self.content, encoding)
+
     def run(self):
         raise NotImplementedError
 
@@ -317,11 +416,13 @@ class AutosaveWorker(QThread):
         errors = []
         for tab_idx, autosave_path, content in self.jobs:
             try:
-                with open(autosave_path, "w", encoding="utf-8") as file_obj:
-                    file_obj.write(content)
+                _write_text_content(autosave_path, content, "utf-8")
                 saved_count += 1
             except Exception as err:
                 errors.append((tab_idx, str(err)))
+            finally:
+                if hasattr(content, "close"):
+                    content.close()
         self.completed.emit(saved_count, errors)
 
 
@@ -399,6 +500,19 @@ class FileHandler:
             return editor.get_full_text()
         return editor.toPlainText()
 
+    @classmethod
+    def _get_save_content(cls, editor):
+        """Text to save; Large Viewer tabs hand over a stream instead of a full-size str.
+
+        Only tabs that already hold their text as a ``str`` reach
+        ``get_full_text``; an engine-backed tab without a stream raises there.
+        """
+        if hasattr(editor, "full_text_stream"):
+            stream = editor.full_text_stream()
+            if stream is not None:
+                return stream
+        return cls._get_editor_text(editor)
+
     @staticmethod
     def _get_editor_document(editor):
         document = getattr(editor, "document", None)
@@ -535,6 +649,39 @@ class FileHandler:
                 "WARN",
             )
 
+    def load_current_large_editable(self):
+        """Make the current Large Viewer tab editable in place through the engine piece table.
+
+        Unlike Load Full Editable nothing is materialized in a QTextDocument:
+        edits are stored natively and only the visible lines are loaded.
+        """
+        editor = self.main_window.editor_manager.get_current_editor()
+        if not editor:
+            return False
+        if getattr(editor, "large_edit_mode", False) or not getattr(editor, "large_file_mode", False):
+            self.console.log(self._tr("file_full_editable_already", "Current tab is already fully editable."), "INFO")
+            return False
+        if not hasattr(editor, "enable_large_edit_mode") or not editor.enable_large_edit_mode():
+            self.console.log(
+                self._tr(
+                    "file_large_edit_unavailable",
+                    "Large Edit Mode needs the native engine buffer. Use Load Full Editable instead.",
+                ),
+                "WARN",
+            )
+            return False
+        edit_menu = getattr(self.main_window, "edit_menu", None)
+        if edit_menu and hasattr(edit_menu, "update_menu_states"):
+            edit_menu.update_menu_states()
+        self.console.log(
+            self._tr(
+                "file_large_edit_enabled",
+                "Large Edit Mode enabled: edits are stored natively, only visible lines are loaded.",
+            ),
+            "ENGINE",
+        )
+        return True
+
     def load_current_full_editable(self):
         """Convert current large-viewer tab to full editable document on demand."""
         editor = self.main_window.editor_manager.get_current_editor()
@@ -544,8 +691,8 @@ class FileHandler:
             self.console.log(self._tr("file_full_editable_already", "Current tab is already fully editable."), "INFO")
             return False
 
-        full_text = self._get_editor_text(editor)
-        if len(full_text) > 2_000_000:
+        char_count = editor.get_virtual_char_count() if hasattr(editor, "get_virtual_char_count") else 0
+        if char_count > 2_000_000:
             answer = QMessageBox.question(
                 self.main_window,
                 self._tr("file_safe_edit_confirm_title", "Safe Edit Warning"),
@@ -562,15 +709,28 @@ class FileHandler:
                     "INFO",
                 )
                 return False
-        if hasattr(editor, "disable_large_file_mode"):
-            editor.disable_large_file_mode()
+        was_modified = bool(editor.document().isModified())
+        if hasattr(editor, "detach_large_text"):
+            # The engine buffer streams into the document; no full-size str copy.
+            source = editor.detach_large_text()
+        else:
+            source = self._get_editor_text(editor)
+            if hasattr(editor, "disable_large_file_mode"):
+                editor.disable_large_file_mode()
         editor.setReadOnly(False)
-        editor.setPlainText(full_text)
-        if hasattr(editor, "enable_safe_edit_mode") and len(full_text) > 1_000_000:
-            editor.enable_safe_edit_mode(snapshot_text=full_text)
-        if len(full_text) > 50000 and ENGINE_AVAILABLE and hasattr(editor, "set_turbo_mode"):
+        if hasattr(editor, "set_text_chunks"):
+            editor.set_text_chunks(source)
+        else:
+            editor.setPlainText(source)
+        if hasattr(editor, "enable_safe_edit_mode") and char_count > 1_000_000:
+            # The snapshot keeps the detached buffer instead of a second copy.
+            editor.enable_safe_edit_mode(snapshot_text=source)
+        elif hasattr(source, "close"):
+            source.close()
+        if char_count > 50000 and ENGINE_AVAILABLE and hasattr(editor, "set_turbo_mode"):
             editor.set_turbo_mode(True)
-        editor.document().setModified(False)
+        # Unsaved Large Edit changes stay unsaved.
+        editor.document().setModified(was_modified)
         self.main_window.editor_manager.handle_text_changed(editor)
         edit_menu = getattr(self.main_window, "edit_menu", None)
         if edit_menu and hasattr(edit_menu, "update_menu_states"):
@@ -600,15 +760,47 @@ class FileHandler:
         )
         return False
 
+    def _find_shared_buffer(self, path):
+        """An open Large Viewer tab holding ``path`` as it is on disk now, plus a shared handle to its buffer."""
+        identity = file_identity(path)
+        if identity is None:
+            return None, None
+        for editor in self.main_window.editor_manager.get_all_editors():
+            if not _same_path(str(getattr(editor, "file_path", "") or ""), path):
+                continue
+            if getattr(editor, "file_identity", None) != identity or not hasattr(editor, "share_large_buffer"):
+                continue
+            stream = editor.share_large_buffer()
+            if stream is not None:
+                return editor, stream
+        return None, None
+
+    def _open_shared(self, path, from_restore=False):
+        source, stream = self._find_shared_buffer(path)
+        if source is None:
+            return False
+        self._open_flow.finalize_shared(path, source, stream, from_restore=from_restore)
+        return True
+
     def open_file_by_path(self, path):
         if not os.path.exists(path):
             self._log_file_op("OPEN", "ERROR", f"not found {path}")
             return False
+        if self._open_shared(path, from_restore=True):
+            return True
 
-        existing_id, _existing = self._find_active_worker("open", path)
+        existing_id, existing = self._find_active_worker("open", path)
         if existing_id:
-            self._log_file_op("OPEN", "SKIPPED", f"already in progress {path}")
-            return False
+            # Same file listed twice (e.g. a session snapshot): reuse that read and decode.
+            def on_follow(content):
+                if existing.isInterruptionRequested():
+                    return
+                if not self._open_shared(path, from_restore=True):
+                    self._open_flow.finalize(path, content, existing, existing_id, from_restore=True)
+
+            existing.finished.connect(on_follow)
+            self._log_file_op("OPEN", "SHARED", f"waiting for load in progress {path}")
+            return True
 
         worker, worker_id = self._open_flow.new_worker(path, progress_dialog=None)
         
@@ -638,6 +830,8 @@ class FileHandler:
             if not path: return
 
         self._log_file_op("OPEN", "START", path)
+        if self._open_shared(path):
+            return
         existing_id, _existing = self._find_active_worker("open", path)
         if existing_id:
             self._log_file_op("OPEN", "SKIPPED", f"already in progress {path}")
@@ -747,7 +941,7 @@ class FileHandler:
         save_policy = getattr(self.main_window, "config", {}).get("save_encoding_policy", "preserve")
         return self._async_save(
             path,
-            self._get_editor_text(editor),
+            self._get_save_content(editor),
             editor,
             save_encoding=self._resolve_save_encoding(editor, save_policy=save_policy),
             show_progress=not batch_mode,
@@ -819,7 +1013,7 @@ class FileHandler:
             save_policy = getattr(self.main_window, "config", {}).get("save_encoding_policy", "preserve")
             return self._async_save(
                 path,
-                self._get_editor_text(editor),
+                self._get_save_content(editor),
                 editor,
                 is_as=True,
                 save_encoding=self._resolve_save_encoding(editor, save_policy=save_policy),
@@ -856,11 +1050,16 @@ class FileHandler:
                 lambda: self._cancel_worker(worker_id, worker, progress_dialog, "Save")
             )
 
+        def release_snapshot():
+            if hasattr(content, "close"):
+                content.close()
+
         def on_done(saved_path):
             if self._is_worker_canceled(worker_id):
                 if progress_dialog is not None:
                     progress_dialog.close()
                 self._cleanup_worker(worker_id)
+                release_snapshot()
                 return
             saved_encoding = str(getattr(worker, "used_encoding", save_encoding) or "utf-8")
             self._save_flow.finalize(
@@ -870,11 +1069,16 @@ class FileHandler:
                 is_as=is_as,
                 saved_encoding=saved_encoding,
             )
+            if hasattr(content, "revision") and hasattr(editor, "mark_large_edit_saved"):
+                # Edits typed while the snapshot was being written keep the tab modified.
+                editor.mark_large_edit_saved(content.revision)
+            release_snapshot()
             if progress_dialog is not None:
                 progress_dialog.close()
             self._cleanup_worker(worker_id)
 
         def on_error(err):
+            release_snapshot()
             if self._is_worker_canceled(worker_id):
                 if progress_dialog is not None:
                     progress_dialog.close()
@@ -914,7 +1118,7 @@ class FileHandler:
                 if not path:
                     continue
 
-                if getattr(editor, "large_file_mode", False):
+                if getattr(editor, "large_file_mode", False) and not getattr(editor, "large_edit_mode", False):
                     continue
 
                 document = editor.document() if hasattr(editor, "document") else None
@@ -922,7 +1126,7 @@ class FileHandler:
                     continue
 
                 autosave_path = f"{path}.autosave"
-                jobs.append((idx, autosave_path, self._get_editor_text(editor)))
+                jobs.append((idx, autosave_path, self._get_save_content(editor)))
             except Exception as e:
                 self.console.log(
                     self._tr("file_autosave_failed_tab", "Autosave failed for tab {idx}: {error}").format(
@@ -0,0 +1,378 @@
+import codecs
+import fnmatch
+import os
+import queue
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.editor.large_search import compile_search_pattern
+from core.file.file_handler import ENGINE_AVAILABLE, _detect_preferred_encoding, lx_engine
+
+# Skipped unless the user edits the exclude list: VCS metadata, dependency
+# and build trees, and file types that are never text.
+DEFAULT_EXCLUDES = (
+    ".git;.hg;.svn;node_modules;__pycache__;.venv;venv;.mypy_cache;.pytest_cache;"
+    "*.pyc;*.pyo;*.so;*.dll;*.exe;*.o;*.a;*.zip;*.gz;*.xz;*.7z;*.png;*.jpg;*.jpeg;*.gif;*.pdf"
+)
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def split_patterns(text):
+    """``"*.log; *.txt"`` -> ``["*.log", "*.txt"]`` (commas work too)."""
+    return [part.strip() for part in str(text or "").replace(",", ";").split(";") if part.strip()]
+
+
+def _matches_any(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _is_utf8(sample, complete):
+    try:
+        sample.decode("utf-8")
+        return True
+    except UnicodeDecodeError as err:
+        # A character cut off by the end of the sample is still UTF-8.
+        return not complete and err.start >= len(sample) - 3 and err.reason == "unexpected end of data"
+
+
+def sniff_encoding(sample, path, complete=False):
+    """Encoding to search ``sample`` (a file's first bytes) with, or ``None`` for binary data.
+
+    BOMs and clean UTF-8 are recognised here; anything else goes to
+    LxCharset like a file being opened, with Latin-1 as the last resort
+    since it decodes every byte.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if b"\x00" in sample:
+        return None
+    if _is_utf8(sample, complete):
+        return "utf-8"
+    encoding, _confidence = _detect_preferred_encoding(sample, path, lambda *_args: None)
+    try:
+        if encoding and codecs.lookup(encoding):
+            return encoding
+    except LookupError:
+        pass
+    return "latin-1"
+
+
+class FindInFilesSearch(QObject):
+    """Searches every text file under a directory on a bounded pool of threads.
+
+    One thread walks the tree (honouring the include and exclude patterns,
+    matched against file and directory names) and feeds a bounded queue;
+    ``workers`` threads take files from it, pick an encoding from the first
+    bytes and scan the file in ``CHUNK_BYTES`` pieces cut at line breaks,
+    so memory stays bounded however big a log gets. UTF-8 text goes
+    straight to the engine's ``search_bytes``, which releases the GIL, so
+    the workers really run in parallel; other encodings are decoded (and
+    re-encoded as UTF-8 for the engine) first. Without the engine, ``re``
+    searches the decoded text.
+
+    Results stream out through ``results`` as ``(path, line, column, length,
+    preview)`` rows (1-based line, column in characters), in file order
+    within a file but not across files. ``progress`` fires with
+    ``(matches, done)`` on every poll while the search runs.
+
+    A plain query never spans lines and neither does a regex match here:
+    each chunk is searched on its own.
+    """
+
+    CHUNK_BYTES = 4 * 1024 * 1024
+    SAMPLE_BYTES = 64 * 1024
+    LONG_LINE_BYTES = 64 * 1024 * 1024
+    MAX_RESULTS = 100_000
+    PREVIEW_CHARS = 200
+    POLL_INTERVAL_MS = 100
+
+    results = pyqtSignal(list)
+    progress = pyqtSignal(int, bool)
+
+    def __init__(self, root, query, case_sensitive=False, whole_words=False, regex=False,
+                 include="", exclude=DEFAULT_EXCLUDES, workers=0, parent=None, engine=None):
+        super().__init__(parent)
+        if not query:
+            raise ValueError("query must not be empty")
+        self.root = os.path.abspath(root)
+        self.query = query
+        self.case_sensitive = bool(case_sensitive)
+        self.whole_words = bool(whole_words)
+        self.regex = bool(regex)
+        self._include = split_patterns(include)
+        self._exclude = split_patterns(exclude)
+        # A bad pattern raises re.error (ValueError from the engine) before any thread starts.
+        self._pattern = compile_search_pattern(query, case_sensitive, whole_words, regex)
+        if engine is None and ENGINE_AVAILABLE and hasattr(lx_engine, "search_bytes"):
+            engine = lx_engine
+        self._engine = engine
+        if engine is not None and regex:
+            # Same syntax check on the engine's side (its dialect is narrower).
+            engine.search_bytes(b"", query, self.case_sensitive, self.whole_words, 1, True)
+
+        self.workers = max(1, int(workers) or os.cpu_count() or 1)
+        self._paths = queue.Queue(maxsize=self.workers * 64)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._pending = []
+        self._total = 0
+        self._running = self.workers
+        self._done = False
+        self._cancelled = False
+        self.truncated = False
+        self.files_found = 0
+        self.files_scanned = 0
+        self.files_matched = 0
+        self.files_skipped = 0
+        self.bytes_scanned = 0
+        self.errors = []
+        self._started = time.monotonic()
+        self._finished = None
+
+        self._threads = [threading.Thread(target=self._walk, name="FindInFilesWalk", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"FindInFiles-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.POLL_INTERVAL_MS)
+        self._timer.timeout.connect(self.poll)
+        self._timer.start()
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def elapsed(self) -> float:
+        end = self._finished if self._finished is not None else time.monotonic()
+        return max(0.0, end - self._started)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes scanned per second so far."""
+        elapsed = self.elapsed
+        return self.bytes_scanned / elapsed if elapsed > 0 else 0.0
+
+    def poll(self):
+        if self._done:
+            return
+        with self._lock:
+            rows, self._pending = self._pending, []
+            done = self._running == 0
+        if done:
+            self._done = True
+            self._finished = time.monotonic()
+            self._timer.stop()
+        if rows:
+            self.results.emit(rows)
+        # Every tick, not only on new rows: the file and byte counts move too.
+        self.progress.emit(self._total, self._done)
+
+    def cancel(self):
+        self._cancelled = True
+        self._cancel.set()
+        self._timer.stop()
+        if not self._done:
+            self._done = True
+            self._finished = time.monotonic()
+
+    def wait(self, timeout=None) -> bool:
+        """Block until every thread has exited (tests, shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                return False
+        return True
+
+    # --- WORKER THREADS ---
+
+    def _put(self, item):
+        while not self._cancel.is_set():
+            try:
+                self._paths.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _walk(self):
+        try:
+            for dirpath, dirnames, filenames in os.walk(self.root, onerror=self._walk_error):
+                dirnames[:] = sorted(d for d in dirnames if not _matches_any(d, self._exclude))
+                for name in sorted(filenames):
+                    if _matches_any(name, self._exclude):
+                        continue
+                    if self._include and not _matches_any(name, self._include):
+                        continue
+                    self.files_found += 1
+                    if not self._put(os.path.join(dirpath, name)):
+                        return
+        finally:
+            for _ in range(self.workers):
+                if not self._put(None):
+                    break
+
+    def _walk_error(self, err):
+        with self._lock:
+            self.errors.append(f"{getattr(err, 'filename', '') or self.root}: {err.strerror or err}")
+
+    def _work(self):
+        try:
+            while not self._cancel.is_set():
+                try:
+                    path = self._paths.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if path is None:
+                    break
+                try:
+                    self._search_file(path)
+                except OSError as err:
+                    with self._lock:
+                        self.files_skipped += 1
+                        self.errors.append(f"{path}: {err.strerror or err}")
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _search_file(self, path):
+        matched = False
+        with open(path, "rb") as f:
+            data = f.read(self.SAMPLE_BYTES)
+            encoding = sniff_encoding(data, path, complete=len(data) < self.SAMPLE_BYTES)
+            if encoding is None:
+                with self._lock:
+                    self.files_skipped += 1
+                return
+            read = len(data)
+            if encoding == "utf-8-sig":
+                data = data[len(codecs.BOM_UTF8):]
+                encoding = "utf-8"
+            native = encoding == "utf-8" and self._engine is not None
+            decoder = None if native else codecs.getincrementaldecoder(encoding)(errors="replace")
+            line_base = 0
+            carry = b"" if native else ""
+            while not self._cancel.is_set():
+                more = f.read(self.CHUNK_BYTES - len(data))
+                read += len(more)
+                data = b"".join((data, more)) if data else more
+                eof = not more and len(data) < self.CHUNK_BYTES
+                # Chunks end after a line break; an unfinished line waits for
+                # the next read unless it grew past LONG_LINE_BYTES (then it is
+                # split, and columns past the split count from it).
+                if native:
+                    chunk = b"".join((carry, data)) if carry else data
+                    cut = len(chunk) if eof else self._cut(chunk, chunk.rfind(b"\n") + 1)
+                    found, lines = self._search_utf8(chunk, line_base, path, cut) if cut else ([], 0)
+                    carry = chunk[cut:]
+                    line_base += lines
+                else:
+                    text = carry + decoder.decode(data, final=eof)
+                    cut = len(text) if eof else self._cut(text, text.rfind("\n") + 1)
+                    text, carry = text[:cut], text[cut:]
+                    if self._engine is not None:
+                        found, lines = self._search_utf8(text.encode("utf-8", errors="replace"), line_base, path)
+                    else:
+                        found, lines = self._search_text(text, line_base, path), text.count("\n")
+                    line_base += lines
+                with self._lock:
+                    self.bytes_scanned += read
+                    self._pending.extend(found)
+                    if self.truncated:
+                        self._cancel.set()
+                read = 0
+                data = b""
+                matched = matched or bool(found)
+                if eof:
+                    break
+        with self._lock:
+            self.files_scanned += 1
+            if matched:
+                self.files_matched += 1
+
+    def _cut(self, chunk, cut):
+        return cut or (len(chunk) if len(chunk) >= self.LONG_LINE_BYTES else 0)
+
+    def _reserve(self, count):
+        """How many of ``count`` new rows still fit under MAX_RESULTS."""
+        with self._lock:
+            taken = min(max(0, self.MAX_RESULTS - self._total), count)
+            self._total += taken
+            if taken < count:
+                self.truncated = True
+            return taken
+
+    def _search_utf8(self, chunk, line_base, path, end=-1):
+        result = self._engine.search_bytes(
+            chunk, self.query, self.case_sensitive, self.whole_words, self.MAX_RESULTS, self.regex, end
+        )
+        rows = result["matches"]
+        if self.regex:
+            # An empty match (``^``, ``a*``) has nothing to show.
+            rows = [row for row in rows if row[3] > 0]
+        rows = rows[:self._reserve(len(rows))]
+        found = []
+        line_start = line_end = -1
+        preview = ""
+        for line, column, byte, length in rows:
+            if not line_start <= byte < line_end:
+                line_start = chunk.rfind(b"\n", 0, byte) + 1
+                line_end = chunk.find(b"\n", byte, len(chunk) if end < 0 else end)
+                if line_end < 0:
+                    line_end = len(chunk) if end < 0 else end
+                preview = chunk[line_start:line_end].decode("utf-8", errors="replace")
+            found.append((path, line_base + line, column, length, self._clip(preview, column)))
+        return found, int(result["lines"])
+
+    def _search_text(self, text, line_base, path):
+        matches = []
+        for match in self._pattern.finditer(text):
+            if match.end() > match.start():
+                matches.append(match)
+            if len(matches) > self.MAX_RESULTS:
+                break
+        matches = matches[:self._reserve(len(matches))]
+        found = []
+        line = line_base + 1
+        line_start = 0
+        counted_to = 0
+        for match in matches:
+            pos = match.start()
+            newlines = text.count("\n", counted_to, pos)
+            if newlines:
+                line += newlines
+                line_start = text.rfind("\n", counted_to, pos) + 1
+            counted_to = pos
+            line_end = text.find("\n", pos)
+            preview = text[line_start:line_end if line_end >= 0 else len(text)]
+            found.append((path, line, pos - line_start, match.end() - pos, self._clip(preview, pos - line_start)))
+        return found
+
+    def _clip(self, preview, column):
+        preview = preview.rstrip("\r")
+        if len(preview) <= self.PREVIEW_CHARS:
+            return preview
+        # Keep the match in view on very long lines.
+        start = max(0, min(column - self.PREVIEW_CHARS // 4, len(preview) - self.PREVIEW_CHARS))
+        return ("…" if start else "") + preview[start:start + self.PREVIEW_CHARS] + "…"
@@ -21,10 +21,22 @@ class OpenFlow:
         editor.file_path = path
         editor.file_encoding = getattr(worker, "used_encoding", "utf-8")
         editor.file_encoding_confidence = float(getattr(worker, "encoding_confidence", 0.0) or 0.0)
+        editor.file_identity = getattr(worker, "file_identity", None)
         if hasattr(editor, "disable_safe_edit_mode"):
             editor.disable_safe_edit_mode()
 
-        if len(content) > 8_000_000 and hasattr(editor, "enable_large_file_mode"):
+        # A raw single-byte buffer the worker left instead of decoded text.
+        stream, worker.large_stream = getattr(worker, "large_stream", None), None
+        if stream is not None:
+            editor.enable_large_file_mode(stream)
+            self.handler.console.log(
+                self.handler._tr(
+                    "file_large_viewer_lazy_decode",
+                    "Large Viewer decodes {encoding} text on demand, without converting the whole file.",
+                ).format(encoding=str(editor.file_encoding).upper()),
+                "ENGINE",
+            )
+        elif len(content) > 8_000_000 and hasattr(editor, "enable_large_file_mode"):
             editor.enable_large_file_mode(content)
             if from_restore:
                 self.handler.console.log(
@@ -45,7 +57,7 @@ class OpenFlow:
         else:
             editor.setPlainText(content)
 
-        if len(content) > 50000 and self.handler._engine_available_for_ui() and hasattr(editor, "set_turbo_mode"):
+        if (stream is not None or len(content) > 50000) and self.handler._engine_available_for_ui() and hasattr(editor, "set_turbo_mode"):
             editor.set_turbo_mode(True)
             if not from_restore:
                 self.handler.console.log(self.handler._tr("file_turbo_enabled", "Turbo Mode enabled."), "ENGINE")
@@ -72,6 +84,32 @@ class OpenFlow:
             self.handler._log_file_op("OPEN", "SUCCESS", path)
         self.handler._cleanup_worker(worker_id)
 
+    def finalize_shared(self, path, source, stream, from_restore=False):
+        """Open ``path`` in a new tab over ``source``'s engine buffer (no read, no decode)."""
+        editor = self.handler.main_window.editor_manager.new_tab(title=os.path.basename(path))
+        editor.file_path = path
+        editor.file_encoding = getattr(source, "file_encoding", "utf-8")
+        editor.file_encoding_confidence = float(getattr(source, "file_encoding_confidence", 0.0) or 0.0)
+        editor.file_identity = getattr(source, "file_identity", None)
+        if hasattr(editor, "disable_safe_edit_mode"):
+            editor.disable_safe_edit_mode()
+        editor.enable_large_file_mode(stream)
+        editor.document().setModified(False)
+        self.handler.main_window.editor_manager.handle_text_changed(editor)
+        self.handler.recent_files.add_file(path)
+        status_bar = getattr(self.handler.main_window, "custom_status_bar", None)
+        if status_bar and hasattr(status_bar, "update_info"):
+            status_bar.update_info()
+
+        self.handler.console.log(
+            self.handler._tr(
+                "file_large_viewer_shared",
+                "Large Viewer reuses the buffer already loaded for {filename}.",
+            ).format(filename=os.path.basename(path)),
+            "ENGINE",
+        )
+        self.handler._log_file_op("OPEN", "SUCCESS", f"shared {os.path.basename(path)}" if from_restore else path)
+
 
 class SaveFlow:
     def __init__(self, handler):
@@ -83,6 +121,8 @@ class SaveFlow:
         editor.file_path = final_path
         editor.file_encoding = normalized_encoding
         editor.file_encoding_confidence = 1.0
+        # The tab's engine buffer (if any) predates this write; never share it as the file.
+        editor.file_identity = None
         if is_as:
             idx = self.handler.main_window.editor_manager.tab_widget.indexOf(editor)
             if idx >= 0:
@@ -0,0 +1,408 @@
+import codecs
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.editor.large_search import compile_search_pattern
+from core.file.file_handler import ENGINE_AVAILABLE, file_identity, lx_engine
+from core.file.find_in_files import sniff_encoding
+
+# The BOM is split off and written back byte for byte, so a big-endian
+# UTF-16 file stays big-endian (the plain "utf-16" codec would not).
+_BOM_CODECS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+class _Cancelled(Exception):
+    """The job was cancelled in the middle of a file."""
+
+
+class FileEdit:
+    """One file of a replace plan: how many matches it has and how to write it back."""
+
+    __slots__ = ("path", "count", "encoding", "bom", "identity", "size")
+
+    def __init__(self, path, count, encoding, bom, identity, size):
+        self.path = path
+        self.count = count
+        self.encoding = encoding
+        self.bom = bom
+        self.identity = identity
+        self.size = size
+
+
+class ReplaceInFilesJob(QObject):
+    """Replaces a query in a list of files as one all-or-nothing batch.
+
+    ``start_preview()`` reads every file on ``workers`` threads and builds
+    ``plan``: one ``FileEdit`` per file that has matches (files without
+    any, binary files and files that fail to decode or re-encode are left
+    out, the latter listed in ``errors``). Nothing is kept in memory but
+    the counts, so a plan over thousands of files stays small.
+
+    ``apply()`` then writes the plan on ``IO_WORKERS`` threads. Each file
+    is re-read, checked against the size and mtime seen by the preview,
+    and the new text is written next to it as a temporary file (same
+    encoding, BOM and line breaks, same permissions) together with a
+    backup of the original. Only once every file is staged are the
+    temporary files renamed over the originals; if staging fails anywhere
+    nothing is touched, and if a rename fails the files already replaced
+    are restored from their backups.
+
+    Matches are the ones Find in Files shows: the engine's ``replace_bytes``
+    searches the text (as UTF-8, in ``CHUNK_BYTES`` pieces cut at line
+    breaks, so a cancel is noticed within one piece) and expands regex
+    templates the way the editor's Replace does; empty matches are left
+    alone. Without the engine, ``re`` does both.
+
+    ``progress`` fires with ``(files done, files in phase)`` on every poll
+    and ``finished`` with the phase that ended (``"preview"`` or
+    ``"apply"``).
+    """
+
+    MAX_FILE_BYTES = 64 * 1024 * 1024
+    CHUNK_BYTES = 4 * 1024 * 1024
+    IO_WORKERS = 4
+    POLL_INTERVAL_MS = 100
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+
+    def __init__(self, paths, query, replacement, case_sensitive=False, whole_words=False, regex=False,
+                 workers=0, parent=None, engine=None):
+        super().__init__(parent)
+        if not query:
+            raise ValueError("query must not be empty")
+        self.query = query
+        self.replacement = replacement
+        self.case_sensitive = bool(case_sensitive)
+        self.whole_words = bool(whole_words)
+        self.regex = bool(regex)
+        # A bad pattern raises re.error (ValueError from the engine) before any thread starts.
+        self._pattern = compile_search_pattern(query, case_sensitive, whole_words, regex)
+        if engine is None and ENGINE_AVAILABLE and hasattr(lx_engine, "replace_bytes"):
+            engine = lx_engine
+        self._engine = engine
+        if engine is not None:
+            # The engine checks the pattern and the template up front.
+            engine.replace_bytes(b"", query, replacement, self.case_sensitive, self.whole_words, self.regex)
+        self.paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        self.workers = max(1, int(workers) or os.cpu_count() or 1)
+
+        self.plan = []
+        self.errors = []
+        self.written = []
+        self.rolled_back = False
+        self.phase = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+        self._done = True
+        self._cancelled = False
+        self._files_done = 0
+        self._files_total = 0
+        self._started = self._finished = time.monotonic()
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.POLL_INTERVAL_MS)
+        self._timer.timeout.connect(self.poll)
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def files_done(self) -> int:
+        return self._files_done
+
+    @property
+    def files_total(self) -> int:
+        return self._files_total
+
+    @property
+    def replacements(self) -> int:
+        return sum(edit.count for edit in self.plan)
+
+    @property
+    def elapsed(self) -> float:
+        end = self._finished if self._done else time.monotonic()
+        return max(0.0, end - self._started)
+
+    def start_preview(self):
+        self._start("preview", self._run_preview, len(self.paths))
+
+    def apply(self):
+        if self.phase != "preview" or not self._done or self._cancelled:
+            raise RuntimeError("apply() needs a finished, uncancelled preview")
+        self._start("apply", self._run_apply, len(self.plan))
+
+    def _start(self, phase, target, total):
+        self.phase = phase
+        self.errors = []
+        self.rolled_back = False
+        self._cancel.clear()
+        self._done = False
+        self._cancelled = False
+        self._files_done = 0
+        self._files_total = total
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(target,), name=f"ReplaceInFiles-{phase}",
+                                        daemon=True)
+        self._thread.start()
+        self._timer.start()
+
+    def poll(self):
+        if self._done:
+            return
+        finished = self._thread is not None and not self._thread.is_alive()
+        if finished:
+            self._done = True
+            self._finished = time.monotonic()
+            self._timer.stop()
+        self.progress.emit(self._files_done, self._files_total)
+        if finished:
+            self.finished.emit(self.phase)
+
+    def cancel(self):
+        """Stop the preview, or the staging of an apply (which then writes nothing).
+
+        Renames already under way are not interrupted: they are quick, and
+        stopping halfway would leave the batch half-applied.
+        """
+        if self._done:
+            return
+        self._cancelled = True
+        self._cancel.set()
+
+    def wait(self, timeout=None) -> bool:
+        """Block until the phase's threads have exited (tests, shutdown)."""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # --- WORKER THREADS ---
+
+    def _run(self, target):
+        try:
+            target()
+        except Exception as err:
+            with self._lock:
+                self.errors.append(str(err))
+
+    def _map(self, items, func, workers):
+        """``func(item)`` for every item on ``workers`` threads, results in item order.
+
+        An item whose ``func`` raises gets ``None`` and an entry in ``errors``
+        (``ValueError`` messages already name the file); a cancel leaves the
+        rest ``None``.
+        """
+        results = [None] * len(items)
+        todo = queue.Queue()
+        for index in range(len(items)):
+            todo.put(index)
+
+        def work():
+            while not self._cancel.is_set():
+                try:
+                    index = todo.get_nowait()
+                except queue.Empty:
+                    return
+                message = None
+                try:
+                    results[index] = func(items[index])
+                except OSError as err:
+                    message = f"{err.filename}: {err.strerror or err}"
+                except ValueError as err:
+                    message = str(err)
+                except _Cancelled:
+                    return
+                with self._lock:
+                    if message is not None:
+                        self.errors.append(message)
+                    self._files_done += 1
+
+        threads = [
+            threading.Thread(target=work, name=f"ReplaceInFiles-{i}", daemon=True)
+            for i in range(max(1, min(workers, len(items))))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _run_preview(self):
+        edits = self._map(self.paths, self._preview_file, self.workers)
+        self.plan = [edit for edit in edits if edit is not None and edit.count]
+
+    def _preview_file(self, path):
+        identity = file_identity(path)
+        data = self._read(path)
+        _new_data, count, encoding, bom = self._replace_bytes(data, path)
+        return FileEdit(path, count, encoding, bom, identity, len(data))
+
+    def _read(self, path):
+        if os.path.getsize(path) > self.MAX_FILE_BYTES:
+            raise ValueError(f"{path}: larger than {self.MAX_FILE_BYTES // (1024 * 1024)} MB; replace it in the editor")
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _replace_bytes(self, data, path, encoding=None, bom=None):
+        """``data`` with every match replaced, as ``(bytes, count, encoding, bom)``.
+
+        Returns ``count == 0`` for binary data. The text is decoded and
+        encoded strictly: a file that would not round-trip raises
+        ``ValueError`` instead of being written with replacement characters.
+        """
+        if encoding is None:
+            bom, encoding = b"", None
+            for mark, codec in _BOM_CODECS:
+                if data.startswith(mark):
+                    bom, encoding = mark, codec
+                    break
+            if encoding is None:
+                encoding = sniff_encoding(data, path, complete=True)
+                if encoding is None:
+                    return data, 0, None, b""
+        try:
+            text = data[len(bom):].decode(encoding)
+        except UnicodeDecodeError:
+            raise ValueError(f"{path}: not valid {encoding}; left unchanged") from None
+        try:
+            text, count = self._substitute(text)
+        except re.error as err:
+            # A bad template (\2 with one group) only fails on the first match.
+            raise ValueError(f"{path}: {err}") from None
+        if not count:
+            return data, 0, encoding, bom
+        try:
+            return bom + text.encode(encoding), count, encoding, bom
+        except UnicodeEncodeError:
+            raise ValueError(f"{path}: the replacement cannot be written as {encoding}; left unchanged") from None
+
+    def _substitute(self, text):
+        """``(text with every match replaced, number of replacements)``."""
+        if self._engine is None:
+            count = 0
+
+            def expand(match):
+                nonlocal count
+                if match.end() == match.start():
+                    return ""
+                count += 1
+                return match.expand(self.replacement) if self.regex else self.replacement
+
+            return self._pattern.sub(expand, text), count
+        data = text.encode("utf-8")
+        parts = []
+        count = 0
+        start = 0
+        while start < len(data):
+            if self._cancel.is_set():
+                raise _Cancelled()
+            end = start + self.CHUNK_BYTES
+            if end < len(data):
+                # Cut after a line break; a line longer than a chunk stays whole.
+                end = (data.rfind(b"\n", start, end) + 1 or data.find(b"\n", end) + 1) or len(data)
+            result = self._engine.replace_bytes(
+                data[start:end], self.query, self.replacement, self.case_sensitive, self.whole_words, self.regex
+            )
+            parts.append(result["data"])
+            count += int(result["count"])
+            start = end
+        return (b"".join(parts).decode("utf-8") if count else text), count
+
+    def _run_apply(self):
+        staged = self._map(self.plan, self._stage_file, self.IO_WORKERS)
+        if self._cancel.is_set() or self.errors or any(item is None for item in staged):
+            # Nothing has been renamed yet: dropping the staged files is the whole rollback.
+            self._discard(item for item in staged if item is not None)
+            self.rolled_back = True
+            return
+        committed = []
+        try:
+            for path, temp_path, _backup_path in staged:
+                os.replace(temp_path, path)
+                committed.append(path)
+        except OSError as err:
+            with self._lock:
+                self.errors.append(f"{err.filename}: {err.strerror or err}")
+            self._restore(staged, committed)
+            self.rolled_back = True
+            return
+        self.written = committed
+        for _path, _temp_path, backup_path in staged:
+            self._remove(backup_path)
+
+    def _stage_file(self, edit):
+        """Write the new text and a backup of the old one next to ``edit.path``."""
+        if file_identity(edit.path) != edit.identity:
+            raise ValueError(f"{edit.path}: changed on disk since the preview")
+        data = self._read(edit.path)
+        new_data, count, _encoding, _bom = self._replace_bytes(data, edit.path, edit.encoding, edit.bom)
+        if count != edit.count:
+            raise ValueError(f"{edit.path}: changed on disk since the preview")
+        temp_path = self._write_beside(edit.path, ".lxtmp", new_data)
+        try:
+            shutil.copymode(edit.path, temp_path)
+            backup_path = self._write_beside(edit.path, ".lxbak", data)
+        except OSError:
+            self._remove(temp_path)
+            raise
+        return edit.path, temp_path, backup_path
+
+    @staticmethod
+    def _write_beside(path, suffix, data):
+        # Same directory, so the final os.replace is a rename on one file system.
+        directory, name = os.path.split(path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=suffix, dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            ReplaceInFilesJob._remove(temp_path)
+            raise
+        return temp_path
+
+    def _restore(self, staged, committed):
+        committed = set(committed)
+        for path, temp_path, backup_path in staged:
+            if path not in committed:
+                self._remove(temp_path)
+                self._remove(backup_path)
+                continue
+            try:
+                os.replace(backup_path, path)
+            except OSError as err:
+                # Keep the backup: it is the only copy of the original now.
+                with self._lock:
+                    self.errors.append(f"{path}: could not be restored ({err.strerror or err}); original kept as {backup_path}")
+
+    def _discard(self, staged):
+        for _path, temp_path, backup_path in staged:
+            self._remove(temp_path)
+            self._remove(backup_path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -34,17 +34,22 @@ SETUP_FLAGS = {
 def run_setup():
     from setuptools import setup
     from pybind11.setup_helpers import Pybind11Extension, build_ext
+    from core.editor.engine_build_task import _zlib_flags
 
     engine_sources = sorted(glob.glob(os.path.join("core", "cengines", "**", "*.cpp"), recursive=True))
     if not engine_sources:
         raise RuntimeError("No C++ engine sources found in core/cengines")
 
+    # Same optional zlib as the in-app build: idle buffers are only compressed with it.
+    zlib_defines, _zlib_libs = _zlib_flags()
     ext_modules = [
         Pybind11Extension(
             "lx_engine",
             engine_sources,
             cxx_std=17,
             extra_compile_args=["-O3"],
+            define_macros=[("LX_ENGINE_ZLIB", None)] if zlib_defines else [],
+            libraries=["z"] if zlib_defines else [],
         ),
     ]
 
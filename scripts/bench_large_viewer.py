@@ -0,0 +1,101 @@
+"""Large Viewer navigation benchmark: Python fallback vs native engine.
+
+Usage:
+    python scripts/bench_large_viewer.py [--chars 8000000] [--jumps 200] [--legacy]
+
+Measures line-index build time and random Go To Line jumps through
+``EditorTab`` with the engine disabled (PY mode) and enabled (when
+``lx_engine`` is importable). ``--legacy`` also times the old per-character
+offset loop for reference.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from core.editor import editor_tab as et  # noqa: E402
+from core.editor.line_index import build_line_offsets  # noqa: E402
+
+
+def _make_text(target_chars: int) -> str:
+    rng = random.Random(42)
+    words = ["alpha", "beta", "gamma", "delta", "zażółć", "ERROR", "INFO", "日本語"]
+    lines = []
+    total = 0
+    while total < target_chars:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(1, 16)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _legacy_offsets(content: str) -> list:
+    offsets = [0]
+    for i, ch in enumerate(content):
+        if ch == "\n" and i + 1 < len(content):
+            offsets.append(i + 1)
+    return offsets
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def _bench_editor(content: str, targets: list, engine: bool) -> tuple:
+    editor = et.EditorTab()
+    with patch.object(et, "_ENGINE_AVAILABLE", engine and et.lx_engine is not None):
+        enable_s, _ = _timed(lambda: editor.enable_large_file_mode(content))
+        if engine:
+            index_s, _ = _timed(lambda: et.lx_engine.wait_text_buffer_index(editor._large_buffer_handle))
+        else:
+            index_s, _ = _timed(editor._ensure_large_line_offsets)
+        jumps_s, ok = _timed(lambda: all(editor.jump_to_large_line(line) for line in targets))
+        editor.disable_large_file_mode()
+    return enable_s, index_s, jumps_s / max(1, len(targets)), ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, default=8_000_000)
+    parser.add_argument("--jumps", type=int, default=200)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841 - keep the app alive
+    content = _make_text(args.chars)
+    line_total = len(build_line_offsets(content))
+    rng = random.Random(7)
+    targets = [rng.randint(1, line_total) for _ in range(args.jumps)]
+    print(f"text: {len(content):,} chars, {line_total:,} lines, {args.jumps} jumps")
+
+    if args.legacy:
+        legacy_s, _ = _timed(lambda: _legacy_offsets(content))
+        print(f"{'legacy loop':<10} index {legacy_s:8.3f}s")
+    scan_s, _ = _timed(lambda: build_line_offsets(content))
+    print(f"{'py scan':<10} index {scan_s:8.3f}s")
+
+    modes = [("python", False)]
+    if et.lx_engine is not None:
+        modes.append(("native", True))
+    for name, engine in modes:
+        enable_s, index_s, jump_s, ok = _bench_editor(content, targets, engine)
+        print(
+            f"{name:<10} enable {enable_s:8.3f}s  index {index_s:8.3f}s  "
+            f"jump {jump_s * 1000:8.3f}ms/op  {'OK' if ok else 'FAILED'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
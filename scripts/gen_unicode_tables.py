@@ -0,0 +1,119 @@
+"""Generate the engine's Unicode tables (case folding, word characters).
+
+Usage:
+    python scripts/gen_unicode_tables.py [--output core/cengines/engine/unicode_tables.hpp]
+
+Writes ``unicode_tables.hpp`` from the ``unicodedata`` of the running Python
+(its Unicode version is recorded in the header). Re-run it after moving to a
+newer Python to pick up new characters, and commit the result.
+
+- ``kCaseFold``: simple case folding for code points >= 0x80. Pairs whose
+  UTF-8 encodings differ in length (e.g. U+212A KELVIN SIGN -> ``k``) are left
+  out, so a case-insensitive match is always exactly as many bytes as the query.
+- ``kWordRanges``: code points >= 0x80 that belong to words for whole-word
+  search: letters, numbers, combining marks and connector punctuation.
+"""
+
+import argparse
+import sys
+import unicodedata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT = ROOT / "core" / "cengines" / "engine" / "unicode_tables.hpp"
+
+
+def _code_points():
+    for cp in range(0x80, sys.maxunicode + 1):
+        if not 0xD800 <= cp <= 0xDFFF:
+            yield cp, chr(cp)
+
+
+def _simple_fold(ch: str) -> str:
+    # casefold() is full folding; where it expands (e.g. U+1E9E -> "ss") the
+    # simple mapping is the single-character lowercase, if there is one.
+    folded = ch.casefold()
+    if len(folded) == 1:
+        return folded
+    lower = ch.lower()
+    return lower if len(lower) == 1 else ch
+
+
+def case_fold_pairs():
+    pairs = []
+    for cp, ch in _code_points():
+        folded = _simple_fold(ch)
+        if folded != ch and len(folded.encode("utf-8")) == len(ch.encode("utf-8")):
+            pairs.append((cp, ord(folded)))
+    return pairs
+
+
+def word_ranges():
+    ranges = []
+    for cp, ch in _code_points():
+        category = unicodedata.category(ch)
+        if category[0] not in "LNM" and category != "Pc":
+            continue
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def _rows(items, per_row):
+    for start in range(0, len(items), per_row):
+        yield "    " + " ".join(items[start:start + per_row])
+
+
+def render() -> str:
+    folds = [f"{{0x{a:X}, 0x{b:X}}}," for a, b in case_fold_pairs()]
+    words = [f"{{0x{a:X}, 0x{b:X}}}," for a, b in word_ranges()]
+    lines = [
+        "// Generated by scripts/gen_unicode_tables.py -- do not edit by hand.",
+        f"// Unicode {unicodedata.unidata_version}.",
+        "#pragma once",
+        "",
+        "#include <cstdint>",
+        "",
+        "namespace lx::engine::unicode {",
+        "",
+        "struct CaseFoldEntry {",
+        "    uint32_t from;",
+        "    uint32_t to;",
+        "};",
+        "",
+        "struct CodePointRange {",
+        "    uint32_t first;",
+        "    uint32_t last;",
+        "};",
+        "",
+        f'inline constexpr char kUnicodeVersion[] = "{unicodedata.unidata_version}";',
+        "",
+        "// Simple case folding above ASCII, same UTF-8 length only; sorted by `from`.",
+        "inline constexpr CaseFoldEntry kCaseFold[] = {",
+        *_rows(folds, 4),
+        "};",
+        "",
+        "// Word characters above ASCII (L*, N*, M*, Pc); sorted, inclusive.",
+        "inline constexpr CodePointRange kWordRanges[] = {",
+        *_rows(words, 4),
+        "};",
+        "",
+        "}  // namespace lx::engine::unicode",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+    args.output.write_text(render(), encoding="utf-8")
+    print(f"Wrote {args.output} (Unicode {unicodedata.unidata_version})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
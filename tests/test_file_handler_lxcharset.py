@@ -177,5 +177,16 @@ class TestLxCharsetBridge(unittest.TestCase):
         self.assertNotEqual(worker.used_encoding, "latin-1")
 
 
+    def test_single_byte_code_points_only_for_ascii_compatible_single_byte_codecs(self):
+        cp1250 = fh._single_byte_code_points("cp1250")
+        self.assertEqual(len(cp1250), 256)
+        self.assertEqual(cp1250[ord("A")], ord("A"))
+        self.assertEqual(cp1250[0xB3], ord("ł"))
+        self.assertEqual(cp1250[0x81], -1)
+        self.assertEqual(fh._single_byte_code_points("latin-1"), list(range(256)))
+        for encoding in ("utf-8", "utf-16", "shift_jis", "cp037", "no-such-codec"):
+            self.assertIsNone(fh._single_byte_code_points(encoding), encoding)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,229 @@
+import codecs
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from core.file import find_in_files
+from core.file.find_in_files import FindInFilesSearch, sniff_encoding, split_patterns
+from ui.dialogs.find_in_files_dialog import FindInFilesDialog
+
+
+class _DummyLangHandler:
+    def tr(self, key):
+        return key
+
+
+class _DummyConsoleLogic:
+    def __init__(self):
+        self.logs = []
+
+    def log(self, message, level="INFO"):
+        self.logs.append((message, level))
+
+
+class _DummyMainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.lang_handler = _DummyLangHandler()
+        self.console_logic = _DummyConsoleLogic()
+        self.opened = []
+
+    def open_file_at_line(self, path, line, column=0, length=0):
+        self.opened.append((path, line, column, length))
+
+
+class _SmallChunkSearch(FindInFilesSearch):
+    # Every file spans many chunks and lines cross chunk ends.
+    CHUNK_BYTES = 64
+    SAMPLE_BYTES = 16
+
+
+class TestFindInFiles(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self._write("a.txt", "alpha\nNeedle here\nnothing\nneedle again needle\n")
+        self._write("sub/b.log", "zażółć needle gęślą\n" * 3)
+        self._write("sub/c.txt", "x\nthe needle\n", encoding="utf-16")
+        self._write("sub/d.txt", "needle with a BOM\n", encoding="utf-8-sig")
+        self._write(".git/config", "needle\n")
+        self._write("node_modules/pkg/index.js", "needle\n")
+        with open(os.path.join(self.root, "blob.dat"), "wb") as f:
+            f.write(b"needle\x00\x01\x02")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, text, encoding="utf-8"):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+        return path
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def _run(self, search, timeout=30.0):
+        rows = []
+        search.results.connect(rows.extend)
+        deadline = time.monotonic() + timeout
+        while not search.done and time.monotonic() < deadline:
+            self._app.processEvents()
+            time.sleep(0.01)
+        self.assertTrue(search.done, "find in files did not finish in time")
+        self.assertTrue(search.wait(5.0))
+        return sorted(rows)
+
+    def _expected_needles(self):
+        return [
+            (self._path("a.txt"), 2, 0, 6, "Needle here"),
+            (self._path("a.txt"), 4, 0, 6, "needle again needle"),
+            (self._path("a.txt"), 4, 13, 6, "needle again needle"),
+            (self._path("sub/b.log"), 1, 7, 6, "zażółć needle gęślą"),
+            (self._path("sub/b.log"), 2, 7, 6, "zażółć needle gęślą"),
+            (self._path("sub/b.log"), 3, 7, 6, "zażółć needle gęślą"),
+            (self._path("sub/c.txt"), 2, 4, 6, "the needle"),
+            (self._path("sub/d.txt"), 1, 0, 6, "needle with a BOM"),
+        ]
+
+    def test_split_patterns_and_sniff_encoding(self):
+        self.assertEqual(split_patterns(" *.log; *.txt ,*.md;;"), ["*.log", "*.txt", "*.md"])
+        self.assertEqual(sniff_encoding("zażółć".encode("utf-8"), "x"), "utf-8")
+        # A character cut off by the end of a sample is still UTF-8; at EOF it is not.
+        cut = "ż".encode("utf-8")[:1]
+        self.assertEqual(sniff_encoding(b"abc" + cut, "x"), "utf-8")
+        self.assertNotEqual(sniff_encoding(b"abc" + cut, "x", complete=True), "utf-8")
+        self.assertEqual(sniff_encoding(codecs.BOM_UTF16_LE + "a".encode("utf-16-le"), "x"), "utf-16")
+        self.assertEqual(sniff_encoding(codecs.BOM_UTF8 + b"a", "x"), "utf-8-sig")
+        self.assertIsNone(sniff_encoding(b"ab\x00cd", "x"))
+
+    def test_walks_tree_with_ignore_rules_and_streams_rows(self):
+        search = FindInFilesSearch(self.root, "NEEDLE", workers=3)
+        rows = self._run(search)
+        self.assertEqual(rows, self._expected_needles())
+        self.assertEqual(search.total, 8)
+        self.assertEqual(search.files_found, 5)
+        self.assertEqual(search.files_scanned, 4)
+        self.assertEqual(search.files_matched, 4)
+        # blob.dat holds a NUL byte: binary, not searched.
+        self.assertEqual(search.files_skipped, 1)
+        self.assertGreater(search.bytes_scanned, 0)
+        self.assertGreaterEqual(search.throughput, 0.0)
+        self.assertFalse(search.truncated)
+        self.assertFalse(search.cancelled)
+
+        include = FindInFilesSearch(self.root, "needle", include="*.log", exclude="", workers=2)
+        self.assertEqual([row[0] for row in self._run(include)], [self._path("sub/b.log")] * 3)
+
+        # An empty exclude list searches .git and node_modules too.
+        everything = FindInFilesSearch(self.root, "needle", case_sensitive=True, exclude="", workers=2)
+        paths = {row[0] for row in self._run(everything)}
+        self.assertIn(self._path(".git/config"), paths)
+        self.assertIn(self._path("node_modules/pkg/index.js"), paths)
+        self.assertNotIn((self._path("a.txt"), 2), {row[:2] for row in self._run(
+            FindInFilesSearch(self.root, "needle", case_sensitive=True, workers=2))})
+
+    def test_chunked_reads_keep_lines_and_columns(self):
+        long_line = "x" * 150 + " needle " + "y" * 150
+        self._write("sub/long.txt", "needle\n" + long_line + "\n" + "z\n" * 40 + "end needle")
+        expected = self._expected_needles() + [
+            (self._path("sub/long.txt"), 1, 0, 6, "needle"),
+            (self._path("sub/long.txt"), 2, 151, 6, long_line),
+            (self._path("sub/long.txt"), 43, 4, 6, "end needle"),
+        ]
+        rows = self._run(_SmallChunkSearch(self.root, "needle", workers=2))
+        self.assertEqual([row[:4] for row in rows], [row[:4] for row in sorted(expected)])
+        # Long lines are previewed around the match.
+        preview = [row[4] for row in rows if row[1] == 2 and row[0].endswith("long.txt")][0]
+        self.assertIn("needle", preview)
+        self.assertLessEqual(len(preview), FindInFilesSearch.PREVIEW_CHARS + 2)
+
+        with patch.object(find_in_files, "ENGINE_AVAILABLE", False):
+            fallback = _SmallChunkSearch(self.root, "needle", workers=2)
+            self.assertIsNone(fallback._engine)
+            self.assertEqual([row[:4] for row in self._run(fallback)], [row[:4] for row in sorted(expected)])
+
+    def test_regex_whole_words_and_bad_pattern(self):
+        rows = self._run(FindInFilesSearch(self.root, r"need\w+ ag", regex=True, workers=2))
+        self.assertEqual([row[:4] for row in rows], [(self._path("a.txt"), 4, 0, 9)])
+        self._write("words.txt", "needles needle_x needle.\n")
+        rows = self._run(FindInFilesSearch(self.root, "needle", whole_words=True, include="words.txt", workers=1))
+        self.assertEqual([row[2] for row in rows], [17])
+        with self.assertRaises((ValueError, re.error)):
+            FindInFilesSearch(self.root, "(", regex=True)
+
+    def test_result_cap_and_cancel(self):
+        class _Capped(FindInFilesSearch):
+            MAX_RESULTS = 5
+
+        capped = _Capped(self.root, "needle", workers=2)
+        self.assertEqual(len(self._run(capped)), 5)
+        self.assertTrue(capped.truncated)
+        self.assertEqual(capped.total, 5)
+
+        for i in range(200):
+            self._write(f"many/f{i}.txt", "needle\n" * 50)
+        search = FindInFilesSearch(self.root, "needle", workers=2)
+        search.cancel()
+        self.assertTrue(search.done)
+        self.assertTrue(search.cancelled)
+        self.assertTrue(search.wait(10.0))
+        self.assertLess(search.files_scanned, 205)
+
+    def test_engine_search_bytes_reports_rows_and_lines(self):
+        engine = find_in_files.lx_engine
+        if engine is None or not hasattr(engine, "search_bytes"):
+            self.skipTest("lx_engine.search_bytes unavailable")
+        data = "héllo\nfoo hello HELLO\nhel".encode("utf-8")
+        result = engine.search_bytes(data, "hello")
+        self.assertEqual(result["matches"], [(2, 4, 11, 5), (2, 10, 17, 5)])
+        self.assertEqual(result["lines"], 2)
+        limited = engine.search_bytes(data, "hello", True, False, 0, False, 12)
+        self.assertEqual(limited["matches"], [])
+        self.assertEqual(limited["lines"], 1)
+
+    def test_dialog_lists_hits_and_opens_them(self):
+        parent = _DummyMainWindow()
+        dialog = FindInFilesDialog(parent, root=self.root)
+        dialog.find_input.setText("needle")
+        dialog.start_search()
+        search = dialog._search
+        self.assertIsNotNone(search)
+        self._run(search)
+        self._app.processEvents()
+        self.assertEqual(dialog.results_list.count(), 8)
+        self.assertIn("fif_status_done", dialog.status_label.text())
+        labels = sorted(dialog.results_list.item(i).text() for i in range(dialog.results_list.count()))
+        self.assertIn(os.path.join("sub", "c.txt") + ":2: the needle", labels)
+
+        item = next(
+            dialog.results_list.item(i) for i in range(dialog.results_list.count())
+            if dialog.results_list.item(i).text().startswith("a.txt:4:")
+        )
+        dialog._open_item(item)
+        self.assertIn(parent.opened[0], [(self._path("a.txt"), 4, 0, 6), (self._path("a.txt"), 4, 13, 6)])
+
+        dialog.folder_input.setText(os.path.join(self.root, "missing"))
+        dialog.start_search()
+        self.assertIsNone(dialog._search)
+        self.assertEqual(dialog.status_label.text(), "fif_status_no_folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
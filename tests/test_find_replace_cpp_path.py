@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
@@ -12,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from PyQt6.QtWidgets import QApplication, QWidget, QTextEdit
 from PyQt6.QtGui import QTextCursor
 
+from core.editor import editor_tab as et
 from ui.dialogs import find_replace_dialog
 from ui.dialogs.find_replace_dialog import FindReplaceDialog
 
@@ -75,13 +77,49 @@ class TestFindReplaceCppPath(unittest.TestCase):
         with patch.object(find_replace_dialog, "lx_engine", engine):
             dialog.find_next()
 
-        engine.find_next_position.assert_called_once_with("abc def abc", "abc", True, True, 11, True)
+        engine.find_next_position.assert_called_once_with("abc def abc", "abc", True, True, 11, True, unit="utf16")
         cursor = editor.textCursor()
         self.assertTrue(cursor.hasSelection())
         self.assertEqual(cursor.selectionStart(), 0)
         self.assertEqual(cursor.selectedText(), "abc")
         self.assertEqual(parent.console_logic.logs, [])
 
+    def test_find_next_cpp_fast_path_selects_non_ascii_match(self):
+        parent, editor, dialog = self._make_dialog("zażółć 😀 gęślą jaźń")
+        dialog.find_input.setText("jaźń")
+        dialog.case_cb.setChecked(True)
+
+        engine = Mock()
+        # UTF-16 position: the emoji before the match takes two code units.
+        engine.find_next_position.return_value = 16
+
+        with patch.object(find_replace_dialog, "lx_engine", engine):
+            dialog.find_next()
+
+        self.assertEqual(engine.find_next_position.call_args.kwargs, {"unit": "utf16"})
+        cursor = editor.textCursor()
+        self.assertEqual(cursor.selectionStart(), 16)
+        self.assertEqual(cursor.selectedText(), "jaźń")
+        self.assertEqual(parent.console_logic.logs, [])
+
+    def test_find_next_skips_byte_only_engine_for_non_ascii_text(self):
+        _, editor, dialog = self._make_dialog("zażółć abc abc")
+        dialog.find_input.setText("abc")
+        dialog.case_cb.setChecked(True)
+
+        def byte_only_find(text, query, case_sensitive, whole_words, start_pos, wrap):
+            return 10
+
+        engine = SimpleNamespace(find_next_position=Mock(side_effect=byte_only_find))
+
+        with patch.object(find_replace_dialog, "lx_engine", engine):
+            dialog.find_next()
+
+        engine.find_next_position.assert_called_once()
+        cursor = editor.textCursor()
+        self.assertEqual(cursor.selectionStart(), 7)
+        self.assertEqual(cursor.selectedText(), "abc")
+
     def test_find_next_falls_back_when_cpp_unavailable(self):
         _, editor, dialog = self._make_dialog("abc def abc")
         dialog.find_input.setText("abc")
@@ -133,7 +171,7 @@ class TestFindReplaceCppPath(unittest.TestCase):
             True,
         )
         self.assertEqual(editor.toPlainText(), "X Foo foo_bar X")
-        self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed (1 matches).", "SUCCESS"))
+        self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed (2 matches).", "SUCCESS"))
 
     def test_replace_all_falls_back_when_cpp_raises(self):
         parent, editor, dialog = self._make_dialog("one two one")
@@ -166,6 +204,401 @@ class TestFindReplaceCppPath(unittest.TestCase):
         self.assertEqual(editor.toPlainText(), "x x x")
         self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed.", "SUCCESS"))
 
+    def test_find_previous_wraps_backwards_in_document(self):
+        parent, editor, dialog = self._make_dialog("abc def abc def")
+        dialog.find_input.setText("def")
+        self._select_text(editor, 12, 15)
+
+        dialog.find_previous()
+        self.assertEqual(editor.textCursor().selectionStart(), 4)
+        dialog.find_previous()
+        self.assertEqual(editor.textCursor().selectionStart(), 12)
+
+    def test_find_in_large_viewer_searches_whole_file_with_counter(self):
+        parent = _DummyMainWindow()
+        editor = et.EditorTab()
+        editor.resize(600, 400)
+        content = "".join(("hit here\n" if i in (10, 15000, 29000) else f"row {i}\n") for i in range(30000))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+        dialog = FindReplaceDialog(parent=parent, editor_manager=_DummyEditorManager(editor))
+        dialog.find_input.setText("hit")
+
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            dialog.find_next()
+            session = editor._large_search
+            self.assertIsNotNone(session)
+            self._wait_for_session(session)
+
+            self.assertEqual(editor._large_view.cursor_position(), (11, 3))
+            self.assertEqual(dialog.status_label.text(), "fr_status_matches")
+            self.assertEqual(dialog._large_match_index, 0)
+
+            dialog.find_next()
+            self.assertEqual(editor.large_selection_bounds(), ((15001, 0), (15001, 3)))
+            self.assertEqual(editor._large_chunk_index, editor._large_chunk_for_line(15001))
+            dialog.find_next()
+            dialog.find_next()
+            self.assertEqual(dialog._large_match_index, 0)
+
+            dialog.find_previous()
+            self.assertEqual(dialog._large_match_index, 2)
+            self.assertEqual(editor._large_view.selected_text(), "hit")
+        editor.disable_large_file_mode()
+
+    def test_replace_all_in_large_viewer_edits_piece_table_natively(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "piece_table_replace_all"):
+            self.skipTest("lx_engine with piece tables is not built")
+        parent = _DummyMainWindow()
+        editor = et.EditorTab()
+        editor.resize(600, 400)
+        content = "".join(f"row {i} foo Foo food\n" for i in range(30000))
+        editor.enable_large_file_mode(content)
+        dialog = FindReplaceDialog(parent=parent, editor_manager=_DummyEditorManager(editor))
+        dialog.find_input.setText("foo")
+        dialog.replace_input.setText("bar")
+        dialog.words_cb.setChecked(True)
+
+        dialog.handle_replace_all()
+        self.assertEqual("".join(editor.iter_full_text()), content)
+        self.assertIn("Load Full Editable", parent.console_logic.logs[-1][0])
+
+        self.assertTrue(editor.enable_large_edit_mode())
+        dialog.handle_replace_all()
+        self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed (60000 matches).", "SUCCESS"))
+        self.assertEqual(editor.read_large_lines(30000, 1), ["row 29999 bar bar food"])
+        self.assertTrue(editor.document().isModified())
+        editor.undo()
+        self.assertEqual("".join(editor.iter_full_text()), content)
+        editor.disable_large_file_mode()
+
+    def test_engine_search_matches_python_for_short_and_long_queries(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "find_all"):
+            self.skipTest("lx_engine is not built")
+        engine = et.lx_engine
+        text = "Ab ab aB_ab xAB ab\nNeedle needLE needles NEEDLE\n" * 50
+        for query in ("ab", "a", "NEEDLE", "needle needle"):
+            folded, needle = text.lower(), query.lower()
+            expected = [i for i in range(len(text)) if folded.startswith(needle, i)]
+            self.assertEqual(list(engine.find_all(text, query, False, False)), expected)
+            self.assertEqual(
+                list(engine.find_all(text, query, True, False)),
+                [i for i in range(len(text)) if text.startswith(query, i)],
+            )
+        self.assertEqual(list(engine.find_all(text, "ab", False, True))[:3], [0, 3, 16])
+        self.assertEqual(list(engine.find_all(text, "needle", False, True))[:3], [19, 26, 41])
+        last = text.rfind("NEEDLE")
+        self.assertEqual(engine.find_next_position(text, "needle", False, True, last + 1, True), 19)
+        self.assertEqual(engine.find_next_position(text, "needle", True, True, last + 1, False), -1)
+        self.assertEqual(engine.replace_all("aaaa", "aa", "b", True), "bb")
+        self.assertEqual(engine.replace_all(text, "NEEDLE", "<>", False).count("<>"), 200)
+
+    def test_engine_folds_unicode_case_and_uses_unicode_word_boundaries(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "fold_case"):
+            self.skipTest("lx_engine with Unicode folding is not built")
+        engine = et.lx_engine
+        text = "Łódź, ŁÓDŹ łódźka ŻÓŁW Żółwik żółw—σΣς"
+        self.assertEqual(engine.fold_case("ŻÓŁW Σ Straße"), "żółw σ straße")
+        self.assertEqual(list(engine.find_all(text, "łódź", False, False, unit="codepoint")), [0, 6, 11])
+        self.assertEqual(list(engine.find_all(text, "łódź", False, True, unit="codepoint")), [0, 6])
+        # U+2014 EM DASH is punctuation, so the last "żółw" is a whole word.
+        self.assertEqual(list(engine.find_all(text, "żółw", False, True, unit="codepoint")), [18, 30])
+        self.assertEqual(list(engine.find_all(text, "σ", False, False, unit="codepoint")), [35, 36, 37])
+        self.assertEqual(engine.replace_all(text, "ŻÓŁW", "kot", False).count("kot"), 3)
+
+    def test_find_next_keeps_cpp_path_for_non_ascii_case_insensitive_query(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "fold_case"):
+            self.skipTest("lx_engine with Unicode folding is not built")
+        _, editor, dialog = self._make_dialog("kot ŻÓŁWIK i Żółw")
+        dialog.find_input.setText("żółw")
+        dialog.words_cb.setChecked(True)
+        engine = SimpleNamespace(
+            fold_case=et.lx_engine.fold_case,
+            find_next_position=Mock(wraps=et.lx_engine.find_next_position),
+        )
+
+        with patch.object(find_replace_dialog, "lx_engine", engine):
+            dialog.find_next()
+
+        engine.find_next_position.assert_called_once()
+        cursor = editor.textCursor()
+        self.assertEqual(cursor.selectionStart(), 13)
+        self.assertEqual(cursor.selectedText(), "Żółw")
+
+    def _wait_for_session(self, session):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if session.done:
+                return
+            session.poll()
+            self._app.processEvents()
+            time.sleep(0.01)
+        self.fail("search did not finish")
+
+    def test_engine_regex_search_runs_in_linear_time_and_expands_groups(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "regex_expand_match"):
+            self.skipTest("lx_engine with regex search is not built")
+        engine = et.lx_engine
+
+        def run(text, pattern, replacement=None, case_sensitive=True):
+            handle = engine.create_text_buffer(text)
+            search_id = engine.start_text_buffer_search(
+                handle, pattern, case_sensitive, False, 0, regex=True, replacement=replacement
+            )
+            engine.release_text_buffer(handle)
+            while not engine.get_text_buffer_search_results(search_id, 0, 1)["done"]:
+                time.sleep(0.005)
+            result = engine.get_text_buffer_search_results(search_id, 0, 0)
+            replaced = engine.get_text_buffer_search_replacement(search_id) if replacement is not None else None
+            engine.cancel_text_buffer_search(search_id)
+            return result["matches"], replaced
+
+        text = "2024-01-05 zażółć\nŻÓŁW 1999-12-31\n"
+        matches, replaced = run(text, r"(?P<y>\d{4})-(\d\d)-(?<d>\d\d)", r"\g<d>.\2.\g<y>")
+        self.assertEqual(matches, [(1, 0, 0, 10), (2, 5, 30, 10)])
+        self.assertEqual(replaced, "05.01.2024 zażółć\nŻÓŁW 31.12.1999\n")
+        self.assertEqual(run(text, r"^ż\w+", case_sensitive=False)[0], [(2, 0, 22, 4)])
+        self.assertEqual(run(text, r"[ź-ż]+", case_sensitive=False)[0], [(1, 13, 13, 1), (2, 0, 22, 1)])
+        # Python's finditer rules for empty matches.
+        self.assertEqual(run("baa", "a*", "-")[1], "-b--")
+
+        # Nested quantifiers that make backtracking engines explode.
+        started = time.perf_counter()
+        self.assertEqual(run("a" * 100000, "(a*)*b")[0], [])
+        self.assertEqual(len(run("x" * 50000 + "y", "(x+x+)+y")[0]), 1)
+        self.assertLess(time.perf_counter() - started, 15)
+
+        for pattern, message in (("(a", "unterminated subpattern"), (r"(a)\1", "backreferences"), ("a(?=b)", "lookaround")):
+            with self.assertRaisesRegex(ValueError, message):
+                run("aaa", pattern)
+        with self.assertRaisesRegex(ValueError, "invalid group reference"):
+            run("aaa", "(a)", r"\2")
+        self.assertEqual(engine.regex_expand_match("ab-12", r"(\w+)-(\d+)", r"\2-\1", True), "12-ab")
+        self.assertIsNone(engine.regex_expand_match("ab-12x", r"(\w+)-(\d+)", r"\2", True))
+
+    def test_engine_refine_search_narrows_a_grown_query(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "refine_text_buffer_search"):
+            self.skipTest("lx_engine with refinable searches is not built")
+        engine = et.lx_engine
+
+        def wait(search_id):
+            while not engine.get_text_buffer_search_results(search_id, 0, 1)["done"]:
+                time.sleep(0.005)
+            return engine.get_text_buffer_search_results(search_id, 0, 0)
+
+        text = "Łódź łódka ŁÓDŹ\naaab aab\n"
+        handle = engine.create_text_buffer(text)
+        first = engine.start_text_buffer_search(handle, "łód", False, False, 0)
+        engine.release_text_buffer(handle)
+        self.assertEqual(len(wait(first)["matches"]), 3)
+
+        # The snapshot outlives the handle; a longer query rechecks the old matches only.
+        grown = engine.refine_text_buffer_search(first, "łódź", False, False, 0)
+        result = wait(grown)
+        self.assertTrue(result["narrowed"])
+        self.assertEqual(result["matches"], [(1, 0, 0, 4), (1, 11, 16, 4)])
+        exact = engine.refine_text_buffer_search(grown, "ŁÓDŹ", True, False, 0)
+        self.assertEqual(wait(exact)["matches"], [(1, 11, 16, 4)])
+        # A shorter query or whole words scan the snapshot again.
+        shorter = engine.refine_text_buffer_search(first, "ka", False, True, 0)
+        result = wait(shorter)
+        self.assertFalse(result["narrowed"])
+        self.assertEqual(result["matches"], [])
+
+        # "aa" overlaps itself, so its matches may skip an "aab": no narrowing.
+        overlapping = engine.refine_text_buffer_search(first, "aa", True, False, 0)
+        self.assertEqual(wait(overlapping)["matches"], [(2, 0, 24, 2), (2, 5, 29, 2)])
+        result = wait(engine.refine_text_buffer_search(overlapping, "aab", True, False, 0))
+        self.assertFalse(result["narrowed"])
+        self.assertEqual(result["matches"], [(2, 1, 25, 3), (2, 5, 29, 3)])
+
+        # A stopped job keeps its snapshot but is never narrowed from.
+        engine.stop_text_buffer_search(first)
+        result = wait(engine.refine_text_buffer_search(first, "łódka", False, False, 0))
+        self.assertEqual(result["matches"], [(1, 5, 8, 5)])
+        for search_id in (first, grown, exact, shorter, overlapping):
+            engine.cancel_text_buffer_search(search_id)
+
+    def _wait_for_live_search(self, dialog, session=True):
+        deadline = time.monotonic() + 30
+        while dialog._live_timer.isActive() and time.monotonic() < deadline:
+            self._app.processEvents()
+            time.sleep(0.01)
+        self.assertFalse(dialog._live_timer.isActive())
+        if session:
+            self._wait_for_session(dialog._large_session)
+
+    def test_search_as_you_type_debounces_narrows_and_counts(self):
+        text = "alpha beta\nalphabet alp\nALPHA\n" * 50
+        parent, editor, dialog = self._make_dialog(text)
+        self._select_text(editor, 11, 11)
+
+        for typed in ("a", "al", "alp"):
+            dialog.find_input.setText(typed)
+        self.assertTrue(dialog._live_timer.isActive())
+        self.assertIsNone(dialog._large_session)
+        self._wait_for_live_search(dialog)
+        first = dialog._large_session
+        self.assertEqual(first.query, "alp")
+        self.assertEqual(first.total, 200)
+        # The first match from the cursor is selected and counted.
+        self.assertEqual(editor.textCursor().selectionStart(), 11)
+        self.assertEqual(editor.textCursor().selectedText(), "alp")
+        self.assertEqual(dialog._large_match_index, 1)
+        self.assertEqual(dialog.status_label.text(), "fr_status_matches")
+
+        # Growing the query keeps the match it grew from.
+        dialog.find_input.setText("alpha")
+        self._wait_for_live_search(dialog)
+        grown = dialog._large_session
+        self.assertIsNot(grown, first)
+        self.assertIs(dialog._document_session, grown)
+        self.assertEqual(grown.total, 150)
+        if grown.engine_search_id >= 0 and hasattr(find_replace_dialog.lx_engine, "refine_text_buffer_search"):
+            result = find_replace_dialog.lx_engine.get_text_buffer_search_results(grown.engine_search_id, 0, 1)
+            self.assertTrue(result["narrowed"])
+        self.assertEqual(editor.textCursor().selectionStart(), 11)
+        self.assertEqual(editor.textCursor().selectedText(), "alpha")
+
+        # Find Next steps through the same results.
+        dialog.find_next()
+        self.assertIs(dialog._large_session, grown)
+        self.assertEqual(editor.textCursor().selectionStart(), 24)
+        self.assertEqual(editor.textCursor().selectedText(), "ALPHA")
+        self.assertEqual(dialog._large_match_index, 2)
+
+        # A new keystroke stops the scan in flight; an empty query clears it.
+        dialog.find_input.setText("alphab")
+        self.assertTrue(grown._stopped or grown.done)
+        dialog.find_input.setText("")
+        self._wait_for_live_search(dialog, session=False)
+        self.assertIsNone(dialog._large_session)
+        self.assertIsNone(dialog._document_session)
+        self.assertEqual(dialog.status_label.text(), "")
+
+    def _wait_for_highlights(self, highlighter):
+        deadline = time.monotonic() + 30
+        while highlighter._timer.isActive() and time.monotonic() < deadline:
+            self._app.processEvents()
+            time.sleep(0.01)
+
+    def test_highlight_all_draws_visible_matches_only_and_follows_edits(self):
+        from core.editor.large_search import match_key
+
+        parent = _DummyMainWindow()
+        editor = et.EditorTab()
+        editor.resize(600, 400)
+        editor.show()
+        editor.setPlainText("".join(f"row {i} foo bar Foo\n" for i in range(20000)))
+        dialog = FindReplaceDialog(parent=parent, editor_manager=_DummyEditorManager(editor))
+        dialog.find_input.setText("foo")
+        self._wait_for_live_search(dialog)
+        highlighter = editor._match_highlighter
+        self._wait_for_highlights(highlighter)
+        self.assertEqual(highlighter.match_count(), 40000)
+        self.assertGreater(highlighter.visible_count(), 0)
+        self.assertLess(highlighter.visible_count(), 200)
+        selection = editor.extraSelections()[0]
+        self.assertEqual(selection.cursor.selectedText(), "foo")
+
+        # Edits patch the cached table: the edited lines are searched again, later lines shift.
+        cursor = QTextCursor(editor.document().findBlockByNumber(10000))
+        cursor.insertText("foo\nFOO ")
+        cursor = QTextCursor(editor.document().findBlockByNumber(5))
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        expected = [
+            match_key(line, column)
+            for line, text in enumerate(editor.toPlainText().split("\n"), 1)
+            for column in (i for i in range(len(text)) if text[i:i + 3].lower() == "foo")
+        ]
+        self.assertEqual(list(highlighter._keys), expected)
+        # Two matches removed on line 6, two added at line 10001.
+        self.assertEqual(highlighter.match_count(), 40000)
+
+        editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum())
+        self._wait_for_highlights(highlighter)
+        last = editor.extraSelections()[-1].cursor
+        self.assertEqual(last.block().blockNumber(), editor.document().blockCount() - 2)
+
+        # Closing the dialog clears them.
+        dialog.show()
+        dialog.hide()
+        self.assertEqual(highlighter.match_count(), 0)
+        self.assertEqual(editor.extraSelections(), [])
+
+    def test_regex_find_and_replace_all_in_document_run_in_background(self):
+        parent, editor, dialog = self._make_dialog("id=7 name=Ala\nid=42 name=Ola\n")
+        dialog.regex_cb.setChecked(True)
+        dialog.find_input.setText(r"id=(\d+) name=(\w+)")
+        dialog.replace_input.setText(r"\2#\1")
+
+        dialog.find_next()
+        self._wait_for_session(dialog._large_session)
+        self.assertEqual(editor.textCursor().selectedText(), "id=7 name=Ala")
+        self.assertEqual(dialog.status_label.text(), "fr_status_matches")
+        dialog.find_next()
+        self.assertEqual(editor.textCursor().selectionStart(), 14)
+        self.assertEqual(editor.textCursor().selectedText(), "id=42 name=Ola")
+
+        dialog.handle_replace()
+        self.assertTrue(editor.toPlainText().endswith("Ola#42\n"))
+
+        dialog.find_input.setText(r"(\w+)=")
+        dialog.replace_input.setText(r"<\1>")
+        dialog.handle_replace_all()
+        job = dialog._replace_job[0]
+        self._wait_for_session(job)
+        self.assertIsNone(dialog._replace_job)
+        self.assertEqual(editor.toPlainText(), "<id>7 <name>Ala\nOla#42\n")
+        self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed (2 matches).", "SUCCESS"))
+        # One edit block: a single undo restores the text.
+        editor.undo()
+        self.assertEqual(editor.toPlainText(), "id=7 name=Ala\nOla#42\n")
+
+        dialog.find_input.setText("(bad")
+        dialog.handle_replace_all()
+        self.assertIsNone(dialog._replace_job)
+        self.assertEqual(dialog.status_label.text(), "fr_status_regex_error")
+
+    def test_regex_replace_all_in_large_edit_mode_is_one_undo_step(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "piece_table_apply_search_replacements"):
+            self.skipTest("lx_engine with regex replace jobs is not built")
+        parent = _DummyMainWindow()
+        editor = et.EditorTab()
+        editor.resize(600, 400)
+        content = "".join(f"row {i} key={i % 7}\n" for i in range(30000))
+        editor.enable_large_file_mode(content)
+        self.assertTrue(editor.enable_large_edit_mode())
+        dialog = FindReplaceDialog(parent=parent, editor_manager=_DummyEditorManager(editor))
+        dialog.regex_cb.setChecked(True)
+        dialog.find_input.setText(r"key=([0-3])$")
+        dialog.replace_input.setText(r"low(\1)")
+
+        dialog.handle_replace_all()
+        self._wait_for_session(dialog._replace_job[0])
+        self.assertEqual(parent.console_logic.logs[-1], ("Replace All completed (17144 matches).", "SUCCESS"))
+        self.assertEqual(editor.read_large_lines(1, 5), ["row 0 low(0)", "row 1 low(1)", "row 2 low(2)", "row 3 low(3)", "row 4 key=4"])
+
+        dialog.find_input.setText(r"low\((\d)\)")
+        dialog.find_next()
+        self._wait_for_session(dialog._large_session)
+        self.assertEqual(editor._large_view.selected_text(), "low(0)")
+        # Highlight all: the viewport asks for the matches of the rows it paints.
+        self.assertEqual(editor.large_search_matches(1, 0, 12), [(6, 6)])
+        self.assertEqual(editor.large_search_matches(5, 0, 12), [])
+        dialog.replace_input.setText(r"key=\1")
+        dialog.handle_replace()
+        self.assertEqual(editor.read_large_lines(1, 1), ["row 0 key=0"])
+
+        # Replace is an erase plus an insert; Replace All is a single step.
+        editor.undo()
+        editor.undo()
+        self.assertEqual(editor.read_large_lines(1, 1), ["row 0 low(0)"])
+        editor.undo()
+        self.assertEqual("".join(editor.iter_full_text()), content)
+        editor.disable_large_file_mode()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,7 @@
 import os
+import re
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
@@ -9,6 +12,9 @@ from PyQt6.QtCore import Qt, QEvent
 from PyQt6.QtGui import QKeyEvent
 
 from core.editor import editor_tab as et
+from core.editor.chunk_cache import ChunkCacheService, shared_chunk_cache
+from core.editor.large_search import LargeSearchSession
+from core.editor.line_index import build_line_offsets, chunk_first_lines
 from core.file import file_handler as fh
 
 
@@ -52,12 +58,106 @@ class _DummyEditorManager:
         self.handled += 1
 
 
+class _ProgressiveIndexEngine:
+    """Fake engine whose line index is only built up to ``frontier`` lines."""
+
+    def __init__(self, line_total, frontier):
+        self.lines = [f"row {i}" for i in range(1, line_total + 1)]
+        self.frontier = frontier
+        self.waits = []
+
+    def _progress(self):
+        complete = self.frontier >= len(self.lines)
+        text_bytes = sum(len(line) + 1 for line in self.lines)
+        indexed = text_bytes if complete else sum(len(line) + 1 for line in self.lines[: self.frontier])
+        return {"indexed_bytes": indexed, "total_bytes": text_bytes, "line_count": self.frontier, "complete": complete}
+
+    def create_text_buffer(self, _text):
+        return 7
+
+    def release_text_buffer(self, _handle):
+        pass
+
+    def get_text_buffer_info(self, _handle, lines_per_chunk):
+        progress = self._progress()
+        return {
+            "bytes": progress["total_bytes"],
+            "chars": None,
+            "line_count": self.frontier,
+            "chunk_count": max(1, -(-self.frontier // lines_per_chunk)),
+            "indexed_bytes": progress["indexed_bytes"],
+            "index_complete": progress["complete"],
+        }
+
+    def get_text_buffer_index_progress(self, _handle):
+        return self._progress()
+
+    def wait_text_buffer_index(self, _handle, line_number=0, timeout_ms=-1):
+        self.waits.append(line_number)
+        self.frontier = len(self.lines)
+        return line_number <= len(self.lines)
+
+    def get_text_buffer_chunk(self, _handle, idx, lines_per_chunk):
+        start = idx * lines_per_chunk
+        rows = self.lines[start:start + lines_per_chunk]
+        return {"text": "\n".join(rows) + "\n", "start_line": start + 1}
+
+    def get_text_buffer_chunk_for_line(self, _handle, line_number, lines_per_chunk):
+        idx = (line_number - 1) // lines_per_chunk
+        return {"chunk_index": idx, "start_line": idx * lines_per_chunk + 1}
+
+    def get_text_buffer_lines(self, _handle, first_line, count):
+        last = min(self.frontier, first_line - 1 + count)
+        return self.lines[first_line - 1:last]
+
+
 class _DummyMainWindow:
     def __init__(self, editor):
         self.console_logic = _DummyConsole()
         self.editor_manager = _DummyEditorManager(editor)
 
 
+class _TabManager:
+    def __init__(self):
+        self.tabs = []
+
+    def new_tab(self, title=""):
+        editor = et.EditorTab(console=_DummyConsole())
+        self.tabs.append(editor)
+        return editor
+
+    def get_all_editors(self):
+        return list(self.tabs)
+
+    def get_current_editor(self):
+        return self.tabs[-1] if self.tabs else None
+
+    def handle_text_changed(self, _editor):
+        pass
+
+
+class _FakeOpenWorker:
+    def __init__(self, path):
+        class _Signal:
+            def __init__(self):
+                self.slots = []
+
+            def connect(self, slot):
+                self.slots.append(slot)
+
+            def emit(self, *args):
+                for slot in list(self.slots):
+                    slot(*args)
+
+        self.finished = _Signal()
+        self.used_encoding = "utf-8"
+        self.encoding_confidence = 1.0
+        self.file_identity = fh.file_identity(path)
+
+    def isInterruptionRequested(self):
+        return False
+
+
 class TestLargeViewer(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -108,6 +208,34 @@ class TestLargeViewer(unittest.TestCase):
         self.assertTrue(editor.is_turbo_mode)
         self.assertEqual(main_window.editor_manager.handled, 1)
 
+    def test_load_full_editable_and_large_edit_mode_are_separate_actions(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "create_piece_table"):
+            self.skipTest("lx_engine with piece tables is not built")
+        content = "".join(f"row {i:07d} of a huge file\n" for i in range(90000))
+        self.assertGreater(len(content), 2_000_000)
+        main_window = _DummyMainWindow(et.EditorTab(console=_DummyConsole()))
+        with patch.object(fh, "RecentFiles", _DummyRecentFiles), patch.object(fh, "QTimer", _DummyTimer):
+            handler = fh.FileHandler(main_window)
+
+        # Load Full Editable still materializes the document, even with the engine loaded.
+        editor = main_window.editor_manager.get_current_editor()
+        editor.enable_large_file_mode(content)
+        with patch.object(fh.QMessageBox, "question", return_value=fh.QMessageBox.StandardButton.Yes):
+            self.assertTrue(handler.load_current_full_editable())
+        self.assertFalse(editor.large_file_mode)
+        self.assertFalse(editor.large_edit_mode)
+        self.assertEqual(editor.toPlainText(), content)
+        self.assertFalse(handler.load_current_large_editable())
+
+        editor = et.EditorTab(console=_DummyConsole())
+        main_window.editor_manager._editor = editor
+        editor.enable_large_file_mode(content)
+        self.assertTrue(handler.load_current_large_editable())
+        self.assertTrue(editor.large_file_mode)
+        self.assertTrue(editor.large_edit_mode)
+        self.assertFalse(handler.load_current_large_editable())
+        editor.disable_large_file_mode()
+
     def test_large_viewer_keypress_blocks_edit_and_logs_hint_once(self):
         console = _DummyConsole()
         editor = et.EditorTab(console=console)
@@ -126,29 +254,31 @@ class TestLargeViewer(unittest.TestCase):
         hint_logs = [m for m, lvl in console.logs if "Large Viewer Mode is read-only" in m and lvl == "INFO"]
         self.assertEqual(len(hint_logs), 1)
 
-    def test_large_viewer_chunk_cache_reuses_loaded_chunk(self):
+    def test_large_viewer_rows_are_read_once_per_cached_block(self):
         editor = et.EditorTab(console=_DummyConsole())
-        content = "x" * 300000
+        content = "".join(f"line {i}\n" for i in range(1, 20001))
         with patch.object(et, "_ENGINE_AVAILABLE", False):
             editor.enable_large_file_mode(content, chunk_size=100000)
+            editor._stop_large_prefetch_worker()
+            editor._clear_large_chunk_cache()
+            block_rows = editor._large_chunk_lines
+            fetched = []
+            original_fetch = editor._fetch_large_row_block
 
-        fetch_calls = {"count": 0}
-        original_fetch = editor._fetch_large_chunk_text
+            def counted_fetch(idx):
+                fetched.append(idx)
+                return original_fetch(idx)
 
-        def counted_fetch(idx):
-            fetch_calls["count"] += 1
-            return original_fetch(idx)
-
-        editor._large_chunk_cache = {}
-        editor._large_chunk_cache_order = []
-        editor._fetch_large_chunk_text = counted_fetch
-
-        editor._load_large_chunk(1)
-        first_count = fetch_calls["count"]
-        editor._load_large_chunk(1)
-
-        self.assertGreaterEqual(first_count, 1)
-        self.assertEqual(fetch_calls["count"], first_count)
+            editor._fetch_large_row_block = counted_fetch
+            first = editor.read_large_rows(10, 50)
+            self.assertEqual(editor.read_large_rows(10, 50), first)
+            self.assertEqual(first[0], (11, 0, "line 11"))
+            self.assertEqual(fetched, [0])
+            # Across a block boundary only the next block is read.
+            rows = editor.read_large_rows(block_rows - 5, 10)
+            self.assertEqual([row[0] for row in rows], list(range(block_rows - 4, block_rows + 6)))
+            self.assertEqual(fetched, [0, 1])
+            editor.disable_large_file_mode()
 
     def test_large_viewer_recommended_chunk_size_grows_with_file(self):
         self.assertLess(
@@ -160,21 +290,61 @@ class TestLargeViewer(unittest.TestCase):
             et.EditorTab._recommend_chunk_size(120_000_000),
         )
 
-    def test_large_viewer_cache_respects_char_budget(self):
+    def test_large_viewer_row_reads_show_in_shared_cache_stats(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        content = "".join(f"line {i}\n" for i in range(1, 5001))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+            editor._stop_large_prefetch_worker()
+            self.assertIs(editor._chunk_cache, shared_chunk_cache())
+            editor._clear_large_chunk_cache()
+            before = shared_chunk_cache().stats()
+            editor.read_large_rows(0, 40)
+            editor.read_large_rows(20, 40)
+            after = shared_chunk_cache().stats()
+            editor.disable_large_file_mode()
+
+        # The console "cache" command reports these counters.
+        self.assertGreater(after["misses"], before["misses"])
+        self.assertGreater(after["hits"], before["hits"])
+
+    def test_large_viewer_cache_respects_byte_budget(self):
         editor = et.EditorTab(console=_DummyConsole())
-        content = "0123456789" * 50000  # 500k chars
+        content = "".join(f"{i:09d}\n" for i in range(50000))
         with patch.object(et, "_ENGINE_AVAILABLE", False):
             editor.enable_large_file_mode(content, chunk_size=100000)
-        editor._large_chunk_cache_char_budget = 150000
-        editor._large_chunk_cache_limit = 10
-        editor._large_chunk_cache = {}
-        editor._large_chunk_cache_order = []
-        editor._large_chunk_cache_chars = 0
+            editor._stop_large_prefetch_worker()
+            block_rows = editor._large_chunk_lines
+            budget = 2 * ChunkCacheService.entry_size(editor._fetch_large_row_block(0)) + 1000
+            editor._chunk_cache = ChunkCacheService(budget_bytes=budget)
+
+            for idx in [0, 1, 2, 3]:
+                editor.read_large_rows(idx * block_rows, 10)
+
+        self.assertLessEqual(editor._chunk_cache.owner_bytes(editor._large_cache_owner), budget)
+        self.assertEqual(editor._chunk_cache.owner_keys(editor._large_cache_owner), [2, 3])
+        self.assertGreaterEqual(editor._chunk_cache.stats()["evictions"], 2)
+
+    def test_chunk_cache_shares_budget_by_tab_recency(self):
+        def block(char):
+            return [(line, 0, char * 100) for line in range(1, 11)]
 
-        for idx in [0, 1, 2, 3]:
-            editor._load_large_chunk(idx)
+        cache = ChunkCacheService(budget_bytes=10 * ChunkCacheService.entry_size(block("x")))
+        for idx in range(6):
+            cache.put("old-tab", idx, block("x"))
+        for idx in range(6):
+            cache.put("active-tab", idx, block("y"))
 
-        self.assertLessEqual(editor._large_chunk_cache_chars, editor._large_chunk_cache_char_budget)
+        self.assertEqual(cache.get("active-tab", 5), block("y"))
+        self.assertIsNone(cache.get("old-tab", 0))
+        self.assertGreater(len(cache.owner_keys("active-tab")), len(cache.owner_keys("old-tab")))
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], stats["budget_bytes"])
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["evictions"], 2)
+
+        cache.release_owner("old-tab")
+        self.assertEqual(cache.stats()["owners"], 1)
 
     def test_large_viewer_jump_to_line_fallback(self):
         editor = et.EditorTab(console=_DummyConsole())
@@ -186,7 +356,28 @@ class TestLargeViewer(unittest.TestCase):
         ok = editor.jump_to_large_line(1200)
         self.assertTrue(ok)
         self.assertTrue(editor.large_file_mode)
-        self.assertEqual(editor.textCursor().blockNumber() + 1, 1200)
+        self.assertEqual(editor._large_position_from_document(editor.textCursor().position()), (1200, 0))
+        self.assertEqual(editor.textCursor().block().text(), "line 1200")
+
+    def test_python_line_index_matches_engine_semantics(self):
+        text = "a\nbb\n\nccc\n"
+        for block in (1, 2, 5, 1 << 20):
+            self.assertEqual(list(build_line_offsets(text, block_chars=block)), [0, 2, 5, 6])
+        self.assertEqual(list(build_line_offsets("")), [0])
+        self.assertEqual(list(build_line_offsets("no newline")), [0])
+        offsets = build_line_offsets(text)
+        self.assertEqual(offsets.typecode, "q")
+        self.assertEqual(list(chunk_first_lines(offsets, chunk_size=3, chunk_count=3)), [0, 1, 3])
+
+    def test_large_viewer_jump_to_line_fallback_across_mid_line_chunks(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        content = "".join(f"row {i:06d} " + "x" * 40 + "\n" for i in range(1, 6001))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100_000)
+            for line in (1, 1900, 2000, 4321, 6000):
+                self.assertTrue(editor.jump_to_large_line(line))
+                self.assertTrue(editor.textCursor().block().text().startswith(f"row {line:06d}"))
+            self.assertFalse(editor.jump_to_large_line(6001))
 
     def test_large_viewer_next_previous_chunk_navigation(self):
         editor = et.EditorTab(console=_DummyConsole())
@@ -203,6 +394,802 @@ class TestLargeViewer(unittest.TestCase):
         self.assertTrue(editor.previous_large_chunk())
         self.assertEqual(editor._large_chunk_index, 1)
 
+    def test_large_viewer_virtual_view_spans_whole_file(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        lines = [f"row {i}" for i in range(1, 30001)]
+        content = "\n".join(lines) + "\n"
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+
+            view = editor._large_view
+            self.assertEqual(view.line_count(), 30000)
+            self.assertEqual(editor.read_large_lines(29999, 5), ["row 29999", "row 30000"])
+
+            view.scroll_to_line(21000)
+            self.assertEqual(view.top_line(), 21000)
+            view.set_cursor_position(21000, 2)
+            editor._sync_large_document_to_view()
+
+        self.assertEqual(editor._large_chunk_index, editor._large_chunk_for_line(21000))
+        self.assertGreater(editor._large_chunk_index, 0)
+        self.assertEqual(view.cursor_position(), (21000, 2))
+
+    def test_large_viewer_mirror_holds_only_rows_around_the_cursor(self):
+        content = "".join(f"row {i}\n" for i in range(1, 300001))
+        engine_ready = et.lx_engine is not None and hasattr(et.lx_engine, "get_text_buffer_rows")
+        for engine in (False, True) if engine_ready else (False,):
+            with self.subTest(engine=engine), patch.object(et, "_ENGINE_AVAILABLE", engine):
+                editor = et.EditorTab(console=_DummyConsole())
+                editor.resize(600, 400)
+                editor.enable_large_file_mode(content)
+                view = editor._large_view
+                loads = []
+                original_set = editor.setPlainText
+
+                def counting_set(text):
+                    loads.append(text)
+                    original_set(text)
+
+                with patch.object(editor, "setPlainText", side_effect=counting_set):
+                    # Go To Line mirrors the rows around its target, and the view sync reuses them.
+                    self.assertTrue(editor.jump_to_large_line(250000))
+                    view.set_cursor_position(250000, 2, center=True)
+                    editor._sync_large_document_to_view()
+                    self.assertEqual(len(loads), 1)
+                    self.assertLessEqual(editor.document().blockCount(), et._LARGE_MIRROR_ROWS + 1)
+                    self.assertEqual(editor._large_chunk_index, editor._large_chunk_for_line(250000))
+                    self.assertEqual(editor._large_position_from_document(editor.textCursor().position()), (250000, 2))
+                    self.assertEqual(editor.textCursor().block().text(), "row 250000")
+
+                    # Moving within the window reuses it, a selection included.
+                    view.select_range(250000 - 50, 1, 250000 + 50, 3)
+                    editor._sync_large_document_to_view()
+                    self.assertEqual(len(loads), 1)
+                    self.assertEqual(editor.textCursor().selectedText().count("\u2029"), 100)
+                    self.assertTrue(editor.textCursor().selectedText().startswith("ow 249950"))
+
+                    # Leaving it loads another small window, not a whole chunk.
+                    view.scroll_to_line(1000)
+                    view.set_cursor_position(1000, 0)
+                    editor._sync_large_document_to_view()
+                    self.assertEqual(len(loads), 2)
+                    self.assertLessEqual(editor.document().blockCount(), et._LARGE_MIRROR_ROWS + 1)
+                    self.assertEqual(editor.textCursor().block().text(), "row 1000")
+
+                    # So does stepping to the next chunk.
+                    self.assertTrue(editor.next_large_chunk())
+                    self.assertEqual(len(loads), 3)
+                    self.assertLessEqual(editor.document().blockCount(), et._LARGE_MIRROR_ROWS + 1)
+                    first_line = editor._large_position_from_document(editor.textCursor().position())[0]
+                    self.assertEqual(view.cursor_position(), (first_line, 0))
+                    self.assertEqual(editor._large_chunk_for_line(first_line + 1), editor._large_chunk_index)
+                    self.assertEqual(editor._large_chunk_for_line(first_line - 1), editor._large_chunk_index - 1)
+                editor.disable_large_file_mode()
+
+    def test_line_number_gutter_shows_global_lines_in_large_viewer(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        editor.setPlainText("\n".join(f"row {i}" for i in range(1, 201)))
+        rows = editor.gutter_rows()
+        self.assertEqual(rows[0][0], 1)
+        self.assertEqual(editor.cursor_line_column(), (1, 1))
+        self.assertGreater(editor.viewportMargins().left(), 0)
+
+        content = "".join(f"row {i}\n" for i in range(1, 300001))
+        editor.enable_large_file_mode(content)
+        view = editor._large_view
+        self.assertEqual(editor.gutter_rows(), [])
+        small_width = view._gutter.width_hint()
+        self.assertEqual(view.viewportMargins().left(), small_width)
+
+        self.assertTrue(editor.jump_to_large_line(250000))
+        view.set_cursor_position(250000, 3, center=True)
+        numbers = [line for line, _top, _height in view.gutter_rows()]
+        self.assertIn(250000, numbers)
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + len(numbers))))
+        self.assertLessEqual(len(numbers), view.viewport().height() // view._line_height() + 2)
+        self.assertEqual(view.gutter_current_line(), 250000)
+        # The status bar reads the global line, not the block inside the chunk.
+        self.assertEqual(editor.cursor_line_column(), (250000, 4))
+        self.assertLess(editor.textCursor().blockNumber() + 1, 250000)
+        editor.disable_large_file_mode()
+
+    def test_long_lines_are_soft_split_into_rows_and_map_back(self):
+        long_line = "abcd\u00e9" * 2_000_000
+        content = "head\n" + long_line + "\ntail 3\n"
+        engine_ready = et.lx_engine is not None and hasattr(et.lx_engine, "get_text_buffer_rows")
+        for engine in (False, True) if engine_ready else (False,):
+            with self.subTest(engine=engine), patch.object(et, "_ENGINE_AVAILABLE", engine):
+                editor = et.EditorTab(console=_DummyConsole())
+                editor.resize(600, 400)
+                editor.enable_large_file_mode(content)
+                if engine:
+                    et.lx_engine.wait_text_buffer_index(editor._large_buffer_handle, 0, -1)
+                    editor._poll_large_index_progress()
+                view = editor._large_view
+                view.reload()
+
+                self.assertGreater(view.line_count(), 2 + len(long_line) // 8192)
+                rows = editor.read_large_rows(0, 40)
+                self.assertEqual(rows[0], (1, 0, "head"))
+                self.assertTrue(all(len(text) <= 4096 for _line, _col, text in rows))
+                self.assertEqual("".join(text for line, _col, text in rows if line == 2), long_line[: rows[-1][1] + len(rows[-1][2])])
+                # Neither the viewport nor the chunk mirror ever holds the whole line.
+                self.assertLess(editor.document().characterCount(), 3_000_000)
+
+                view.set_cursor_position(2, 7_000_001)
+                self.assertEqual(view.cursor_position(), (2, 7_000_001))
+                self.assertEqual(view.gutter_current_line(), 2)
+                editor._sync_large_document_to_view()
+                self.assertEqual(editor._large_position_from_document(editor.textCursor().position()), (2, 7_000_001))
+
+                view.scroll_to_line(2)
+                self.assertEqual([line for line, _top, _height in view.gutter_rows()], [2])
+                view.select_range(2, len(long_line) - 6, 3, 4)
+                self.assertEqual(view.selected_text(), long_line[-6:] + "\ntail")
+
+                self.assertTrue(editor.jump_to_large_line(3))
+                self.assertEqual(editor._large_position_from_document(editor.textCursor().position()), (3, 0))
+                editor.disable_large_file_mode()
+
+    def test_large_viewer_document_selection_is_mirrored_to_view(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        content = "\n".join(f"line {i}" for i in range(1, 5001))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=6000)
+
+            cursor = editor.textCursor()
+            start = editor.document().findBlockByNumber(41).position()
+            cursor.setPosition(start)
+            cursor.setPosition(start + 4, cursor.MoveMode.KeepAnchor)
+            editor.setTextCursor(cursor)
+
+            self.assertTrue(editor._large_view.has_selection())
+            self.assertEqual(editor._large_view.selected_text(), "line")
+            self.assertEqual(editor._large_view.cursor_position(), (42, 4))
+
+    def test_large_viewer_scroll_prefetches_the_rows_the_repaint_reads(self):
+        fetches = []
+        original_fetch = et.EditorTab._fetch_large_row_block
+
+        def recording_fetch(editor_self, idx):
+            fetches.append((idx, threading.get_ident()))
+            return original_fetch(editor_self, idx)
+
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        content = "".join(f"row {i}\n" for i in range(1, 60001))
+        main_thread = threading.get_ident()
+        with patch.object(et, "_ENGINE_AVAILABLE", False), patch.object(
+            et.EditorTab, "_fetch_large_row_block", recording_fetch
+        ):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+            view = editor._large_view
+            block_rows = editor._large_chunk_lines
+            view.scroll_to_line(2 * block_rows + 10)
+            view.grab()
+            deadline = time.monotonic() + 5
+            while not editor._is_large_chunk_cached(3) and time.monotonic() < deadline:
+                self._app.processEvents()
+                time.sleep(0.01)
+            self.assertTrue(editor._is_large_chunk_cached(3))
+
+            # Scrolling on into the prefetched block repaints without reading on the GUI thread.
+            read_on_gui = [idx for idx, ident in fetches if ident == main_thread]
+            hits = editor._chunk_cache.stats()["hits"]
+            view.scroll_to_line(3 * block_rows + 10)
+            view.grab()
+            self.assertEqual([idx for idx, ident in fetches if ident == main_thread], read_on_gui)
+            self.assertGreater(editor._chunk_cache.stats()["hits"], hits)
+            self.assertEqual(view.top_line(), 3 * block_rows + 10)
+            editor.disable_large_file_mode()
+
+        prefetched = [ident for idx, ident in fetches if idx == 3]
+        self.assertTrue(prefetched)
+        self.assertNotIn(main_thread, prefetched)
+
+    def test_large_viewer_prefetch_plan_follows_scroll_direction_and_speed(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        content = "\n".join(f"line {i}" for i in range(1, 100001))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+        chunk_count = editor._large_chunk_count
+        middle = chunk_count // 2
+
+        editor._large_scroll_velocity = 0.0
+        self.assertEqual(sorted(editor._large_prefetch_plan(middle)), [middle - 1, middle + 1])
+
+        editor._large_scroll_velocity = -10_000_000.0
+        self.assertEqual(
+            editor._large_prefetch_plan(middle),
+            [middle - step for step in range(1, editor._large_prefetch_max_ahead + 1)],
+        )
+        editor.disable_large_file_mode()
+
+
+    def test_large_viewer_grows_with_background_index_and_waits_past_frontier(self):
+        console = _DummyConsole()
+        editor = et.EditorTab(console=console)
+        engine = _ProgressiveIndexEngine(line_total=12000, frontier=3000)
+        with patch.object(et, "_ENGINE_AVAILABLE", True), patch.object(et, "lx_engine", engine):
+            editor.enable_large_file_mode("x")
+            self.assertEqual(editor.large_line_count(), 3000)
+            self.assertEqual(editor._large_view.line_count(), 3000)
+            self.assertIn("IDX", editor.get_large_viewer_label())
+            self.assertTrue(editor._large_index_timer.isActive())
+
+            # Inside the indexed prefix: no waiting.
+            self.assertTrue(editor.jump_to_large_line(2500))
+            self.assertEqual(engine.waits, [])
+
+            # Past the frontier: wait for the index, then jump.
+            self.assertTrue(editor.jump_to_large_line(11000))
+            self.assertEqual(engine.waits, [11000])
+            self.assertEqual(editor._large_view.line_count(), 12000)
+            self.assertEqual(editor._large_chunk_count, 3)
+            self.assertFalse(editor._large_index_timer.isActive())
+            self.assertNotIn("IDX", editor.get_large_viewer_label())
+            self.assertTrue(any("line index ready" in message for message, _level in console.logs))
+            editor.disable_large_file_mode()
+
+    def _wait_for_search(self, session, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while not session.done and time.monotonic() < deadline:
+            session.poll()
+            time.sleep(0.01)
+        self.assertTrue(session.done)
+
+    def test_large_viewer_whole_file_search_selects_match_in_other_chunk(self):
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        lines = [f"row {i}" for i in range(1, 20001)]
+        lines[3] = "row 4 Needle and needle"
+        lines[17999] = "tail NEEDLE"
+        content = "\n".join(lines) + "\n"
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            editor.enable_large_file_mode(content, chunk_size=100000)
+            session = editor.large_search("needle", case_sensitive=False)
+            self._wait_for_search(session)
+
+            self.assertIs(editor.large_search("needle", case_sensitive=False), session)
+            self.assertEqual(session.total, 3)
+            self.assertEqual([session.match_at(i) for i in range(3)], [(4, 6), (4, 17), (18000, 5)])
+            self.assertEqual(session.next_match(4, 7), 1)
+            self.assertEqual(session.next_match(18000, 6), 0)
+            self.assertEqual(session.previous_match(1, 0), 2)
+
+            self.assertTrue(editor.select_large_match(18000, 5, 6))
+            self.assertEqual(editor._large_chunk_index, editor._large_chunk_for_line(18000))
+            self.assertGreater(editor._large_chunk_index, 0)
+            self.assertEqual(editor._large_view.selected_text(), "NEEDLE")
+            self.assertEqual(editor.textCursor().selectedText(), "NEEDLE")
+            self.assertEqual(editor.large_selection_bounds(), ((18000, 5), (18000, 11)))
+
+            editor.disable_large_file_mode()
+            self.assertIsNone(editor._large_search)
+
+    def test_whole_file_search_engine_matches_python_fallback(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "start_text_buffer_search"):
+            self.skipTest("lx_engine with whole-buffer search is not built")
+        content = "".join(f"id={i} Foo foo_bar zażółć foo\n" for i in range(5000))
+        engine_editor = et.EditorTab(console=_DummyConsole())
+        engine_editor.enable_large_file_mode(content)
+        fallback_editor = et.EditorTab(console=_DummyConsole())
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            fallback_editor.enable_large_file_mode(content, chunk_size=100000)
+
+        for case_sensitive, whole_words in ((True, False), (False, False), (False, True)):
+            native = engine_editor.large_search("foo", case_sensitive, whole_words)
+            with patch.object(et, "_ENGINE_AVAILABLE", False):
+                python = fallback_editor.large_search("foo", case_sensitive, whole_words)
+            self._wait_for_search(native)
+            self._wait_for_search(python)
+            self.assertEqual(native.total, python.total)
+            self.assertEqual(
+                [native.match_at(i) for i in range(native.match_count())],
+                [python.match_at(i) for i in range(python.match_count())],
+            )
+        engine_editor.disable_large_file_mode()
+        fallback_editor.disable_large_file_mode()
+
+    def _wait_for_search_index(self, handle, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        info = et.lx_engine.get_text_buffer_search_index_info(handle)
+        while info["state"] == "building" and time.monotonic() < deadline:
+            time.sleep(0.01)
+            info = et.lx_engine.get_text_buffer_search_index_info(handle)
+        return info
+
+    def _engine_search(self, handle, query, case_sensitive=False, whole_words=False, regex=False):
+        search_id = et.lx_engine.start_text_buffer_search(handle, query, case_sensitive, whole_words, 0, regex)
+        deadline = time.monotonic() + 10
+        while not et.lx_engine.get_text_buffer_search_results(search_id, 0, 0)["done"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        results = et.lx_engine.get_text_buffer_search_results(search_id, 0, 1000000)
+        et.lx_engine.cancel_text_buffer_search(search_id)
+        self.assertTrue(results["done"])
+        return results
+
+    def test_search_index_gives_the_same_matches_as_a_full_scan(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "build_text_buffer_search_index"):
+            self.skipTest("lx_engine with a search index is not built")
+        lines = [f"{i:07d} INFO request served zażółć" for i in range(120000)]
+        lines[5] = "0000005 ERROR Żółw-17 timed out"
+        lines[61234] = "0061234 error ŻÓŁW-42 timed out"
+        lines[119999] = "0119999 ERROR żółw-99"
+        content = "\n".join(lines) + "\n"
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        queries = (
+            ("żółw-", False, False, False),
+            ("ERROR", True, False, False),
+            ("timed out", False, True, False),
+            (r"żółw-\d+", False, False, True),
+            (r"^0061234 \w+", True, False, True),
+            ("served", False, False, False),
+        )
+        scanned = [self._engine_search(handle, *query) for query in queries]
+        self.assertFalse(any(result["indexed"] for result in scanned))
+
+        self.assertTrue(et.lx_engine.build_text_buffer_search_index(handle))
+        info = self._wait_for_search_index(handle)
+        self.assertEqual(info["state"], "ready")
+        self.assertEqual(info["indexed_bytes"], info["total_bytes"])
+        self.assertGreater(info["memory_bytes"], 0)
+        # Building twice is a no-op.
+        self.assertFalse(et.lx_engine.build_text_buffer_search_index(handle))
+
+        for query, expected in zip(queries, scanned):
+            indexed = self._engine_search(handle, *query)
+            self.assertEqual(indexed["matches"], expected["matches"], query)
+            self.assertEqual(indexed["total"], expected["total"], query)
+            self.assertTrue(indexed["indexed"], query)
+        self.assertEqual(len(scanned[0]["matches"]), 3)
+        self.assertEqual([row[:2] for row in scanned[4]["matches"]], [(61235, 0)])
+        # A two-character query gives no trigram to filter by: it scans.
+        self.assertFalse(self._engine_search(handle, "Ż")["indexed"])
+
+        et.lx_engine.drop_text_buffer_search_index(handle)
+        self.assertEqual(et.lx_engine.get_text_buffer_search_index_info(handle)["state"], "none")
+        editor.disable_large_file_mode()
+
+    def test_indexed_search_of_a_cold_buffer_keeps_it_cold(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "build_text_buffer_search_index"):
+            self.skipTest("lx_engine with a search index is not built")
+        content = "".join(f"wiersz {i:07d} zażółć INFO\n" for i in range(300000))
+        content = content.replace("wiersz 0123456 zażółć INFO", "wiersz 0123456 zażółć ERROR Żółw-7")
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        expected = self._engine_search(handle, r"error żółw-\d", regex=True)
+        self.assertTrue(et.lx_engine.build_text_buffer_search_index(handle))
+        self.assertEqual(self._wait_for_search_index(handle)["state"], "ready")
+        stream = editor.detach_large_text()
+        if not stream.compress():
+            self.skipTest("lx_engine was built without zlib")
+        deadline = time.monotonic() + 10
+        while et.lx_engine.get_text_buffer_info(stream.handle, 4000)["resident"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(et.lx_engine.get_text_buffer_info(stream.handle, 4000)["resident"])
+
+        # Only the candidate blocks are inflated.
+        indexed = self._engine_search(stream.handle, r"error żółw-\d", regex=True)
+        self.assertTrue(indexed["indexed"])
+        self.assertEqual(indexed["matches"], expected["matches"])
+        self.assertEqual([row[:2] for row in indexed["matches"]], [(123457, 22)])
+        self.assertFalse(et.lx_engine.get_text_buffer_info(stream.handle, 4000)["resident"])
+        # A query the index cannot narrow still scans the whole text.
+        self.assertFalse(self._engine_search(stream.handle, "Ż")["indexed"])
+        self.assertTrue(et.lx_engine.get_text_buffer_info(stream.handle, 4000)["resident"])
+        stream.close()
+
+    def test_search_index_over_memory_cap_fails_and_searches_still_scan(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "build_text_buffer_search_index"):
+            self.skipTest("lx_engine with a search index is not built")
+        content = "".join(f"{i:08x} {i * 7919 % 1000003:07d}\n" for i in range(200000))
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        expected = self._engine_search(handle, "0031337")
+        self.assertTrue(et.lx_engine.build_text_buffer_search_index(handle, 64 * 1024))
+        info = self._wait_for_search_index(handle)
+        self.assertEqual(info["state"], "failed")
+        self.assertIn("does not fit", info["error"])
+        result = self._engine_search(handle, "0031337")
+        self.assertFalse(result["indexed"])
+        self.assertEqual(result["matches"], expected["matches"])
+        editor.disable_large_file_mode()
+
+    def test_first_search_of_a_huge_buffer_builds_its_index(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "build_text_buffer_search_index"):
+            self.skipTest("lx_engine with a search index is not built")
+        content = "".join(f"line {i} payload\n" for i in range(50000)) + "the needle\n"
+        console = _DummyConsole()
+        editor = et.EditorTab(console=console)
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        # Below the threshold nothing is indexed.
+        self._wait_for_search(editor.large_search("payload 7"))
+        self.assertEqual(et.lx_engine.get_text_buffer_search_index_info(handle)["state"], "none")
+        editor.disable_large_file_mode()
+
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        with patch.object(et, "_SEARCH_INDEX_MIN_BYTES", 1):
+            first = editor.large_search("needle")
+        self._wait_for_search(first)
+        self.assertEqual(first.total, 1)
+        self.assertTrue(editor._large_search_index_timer.isActive())
+        self.assertEqual(self._wait_for_search_index(handle)["state"], "ready")
+        editor._poll_large_search_index()
+        self.assertFalse(editor._large_search_index_timer.isActive())
+        self.assertTrue(any("search index ready" in message for message, _level in console.logs))
+
+        second = editor.large_search("NEEDLE", case_sensitive=True)
+        self._wait_for_search(second)
+        self.assertEqual(second.total, 0)
+        third = editor.large_search("the needle")
+        self._wait_for_search(third)
+        self.assertEqual([third.match_at(i) for i in range(third.match_count())], [(50001, 0)])
+        editor.disable_large_file_mode()
+        self.assertFalse(editor._large_search_index_timer.isActive())
+
+    def _wait_for_overview(self, editor, timeout=10.0):
+        editor._refresh_large_overview()
+        worker = editor._large_overview_worker
+        self.assertIsNotNone(worker)
+        self.assertTrue(worker.wait(int(timeout * 1000)))
+        QApplication.processEvents()
+        overview = editor.large_overview()
+        self.assertIsNotNone(overview)
+        return overview
+
+    def test_large_viewer_overview_strip_heat_and_click_to_jump(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "build_text_buffer_overview"):
+            self.skipTest("lx_engine with document overview is not built")
+        lines = [("ERROR disk full" if i % 997 == 0 else f"ok {i} needle" if i % 13 == 0 else f"ok {i}") for i in range(30000)]
+        content = "\n".join(lines) + "\n"
+        engine_editor = et.EditorTab(console=_DummyConsole())
+        engine_editor.resize(600, 400)
+        engine_editor.enable_large_file_mode(content)
+        fallback_editor = et.EditorTab(console=_DummyConsole())
+        fallback_editor.resize(600, 400)
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            fallback_editor.enable_large_file_mode(content, chunk_size=100000)
+
+        native = self._wait_for_overview(engine_editor)
+        self.assertEqual(native["line_count"], 30000)
+        self.assertEqual(len(native["first_lines"]), engine_editor._large_overview.height())
+        self.assertEqual(sum(native["bucket_bytes"]), len(content))
+        self.assertEqual(sum(native["keywords"]["ERROR"]), content.count("ERROR"))
+        self.assertIsNone(native["search"])
+
+        self._wait_for_search(engine_editor.large_search("needle"))
+        with patch.object(et, "_ENGINE_AVAILABLE", False):
+            self._wait_for_search(fallback_editor.large_search("needle"))
+            python = self._wait_for_overview(fallback_editor)
+        native = self._wait_for_overview(engine_editor)
+        self.assertEqual(sum(native["search"]), content.count("needle"))
+        for key in ("line_count", "first_lines", "bucket_bytes", "keywords", "search"):
+            self.assertEqual(native[key], python[key], key)
+
+        # Editing refreshes the heat from the piece table.
+        self.assertTrue(engine_editor.enable_large_edit_mode())
+        engine_editor.large_replace_all("ERROR", "WARN", True)
+        self.assertEqual(sum(self._wait_for_overview(engine_editor)["keywords"]["ERROR"]), 0)
+
+        strip = engine_editor._large_overview
+        strip.jump_requested.emit(strip.line_at(strip.height() * 3 // 4))
+        self.assertEqual(engine_editor.large_line_count(), 30000)
+        self.assertAlmostEqual(engine_editor._large_view.cursor_position()[0], 22500, delta=30000 // strip.height() + 1)
+        engine_editor.disable_large_file_mode()
+        fallback_editor.disable_large_file_mode()
+        self.assertIsNone(engine_editor._large_overview_worker)
+
+    def test_large_edit_mode_edits_piece_table_and_saves_snapshot(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "create_piece_table"):
+            self.skipTest("lx_engine with piece tables is not built")
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.resize(600, 400)
+        content = "".join(f"line {i}\n" for i in range(1, 50001))
+        editor.enable_large_file_mode(content)
+        self.assertTrue(editor.enable_large_edit_mode())
+        self.assertTrue(editor.get_large_viewer_label().startswith("VIEW 1/"))
+        self.assertIn(" EDIT", editor.get_large_viewer_label())
+        self.assertFalse(editor.document().isModified())
+
+        def key(k, text=""):
+            editor.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, k, Qt.KeyboardModifier.NoModifier, text))
+
+        editor._large_view.set_cursor_position(40000, 4)
+        key(Qt.Key.Key_X, "X")
+        key(Qt.Key.Key_Y, "y")
+        self.assertEqual(editor.read_large_lines(40000, 1), ["lineXy 40000"])
+        self.assertEqual(editor._large_view.cursor_position(), (40000, 6))
+        self.assertTrue(editor.document().isModified())
+
+        key(Qt.Key.Key_Return)
+        self.assertEqual(editor.large_line_count(), 50001)
+        self.assertEqual(editor.read_large_lines(40000, 2), ["lineXy", " 40000"])
+        key(Qt.Key.Key_Backspace)
+        self.assertEqual(editor.large_line_count(), 50000)
+
+        editor.undo()
+        self.assertEqual(editor.large_line_count(), 50001)
+        editor.undo()
+        editor.undo()
+        self.assertEqual(editor.read_large_lines(40000, 1), ["line 40000"])
+        self.assertFalse(editor.document().isModified())
+        editor.redo()
+        self.assertEqual(editor.read_large_lines(40000, 1), ["lineXy 40000"])
+
+        snapshot = fh.FileHandler._get_save_content(editor)
+        key(Qt.Key.Key_Z, "z")  # typed after the snapshot: not part of this save
+        path = os.path.join(os.path.dirname(__file__), "_large_edit_save.tmp")
+        try:
+            worker = fh.FileWorker("save", path, snapshot)
+            worker._run_save_task()
+            with open(path, encoding="utf-8") as f:
+                saved = f.read()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        self.assertEqual(saved, content.replace("line 40000\n", "lineXy 40000\n"))
+        editor.mark_large_edit_saved(snapshot.revision)
+        snapshot.close()
+        self.assertTrue(editor.document().isModified())
+        self.assertEqual(editor.read_large_lines(40000, 1), ["lineXyz 40000"])
+        editor.disable_large_file_mode()
+        self.assertFalse(editor.large_edit_mode)
+
+    def test_large_edit_search_reads_the_edited_pieces(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "start_piece_table_search"):
+            self.skipTest("lx_engine with piece tables is not built")
+        engine = et.lx_engine
+        content = "".join(f"line {i} zażółć\n" for i in range(200000))
+        handle = engine.create_text_buffer(content)
+        edit = engine.create_piece_table(handle)
+        text = content
+        # Matches that start in one piece and end in another, and one in added text only.
+        for offset, insert in ((len("line 0 zaż".encode("utf-8")), "NEE"), (3_000_000, "NEEDLE\n"), (5, "DLE ")):
+            engine.piece_table_insert(edit, offset, insert)
+            text = text.encode("utf-8")
+            text = (text[:offset] + insert.encode("utf-8") + text[offset:]).decode("utf-8")
+        engine.piece_table_erase(edit, 0, 4)
+        text = text[4:]
+
+        def expected(pattern):
+            rows = []
+            for match in re.finditer(pattern, text):
+                line_start = text.rfind("\n", 0, match.start()) + 1
+                rows.append((
+                    text.count("\n", 0, match.start()) + 1,
+                    match.start() - line_start,
+                    len(text[:match.start()].encode("utf-8")),
+                    len(match.group()),
+                ))
+            return rows
+
+        def search(query, regex=False, replacement=None):
+            search_id = engine.start_piece_table_search(edit, query, True, False, 0, regex, replacement)
+            while not engine.get_text_buffer_search_results(search_id, 0, 0)["done"]:
+                time.sleep(0.01)
+            return search_id, engine.get_text_buffer_search_results(search_id, 0, 0)
+
+        for query, pattern, regex in (("NEEDLE", "NEEDLE", False), ("DLE", "DLE", False),
+                                      (r"ż\w+\nline 1\b", r"ż\w+\nline 1\b", True)):
+            search_id, results = search(query, regex)
+            self.assertEqual(results["matches"], expected(pattern), query)
+            self.assertEqual(results["total_bytes"], len(text.encode("utf-8")))
+            engine.cancel_text_buffer_search(search_id)
+
+        search_id, _results = search("NEE")
+        refined = engine.refine_text_buffer_search(search_id, "NEEDLE", True, False, 0, False)
+        while not engine.get_text_buffer_search_results(refined, 0, 0)["done"]:
+            time.sleep(0.01)
+        self.assertEqual(engine.get_text_buffer_search_results(refined, 0, 0)["matches"], expected("NEEDLE"))
+        engine.cancel_text_buffer_search(refined)
+        engine.cancel_text_buffer_search(search_id)
+
+        search_id, _results = search(r"NEE(\w*)", regex=True, replacement=r"<\1>")
+        self.assertEqual(engine.get_text_buffer_search_replacement(search_id), re.sub(r"NEE(\w*)", r"<\1>", text))
+        engine.cancel_text_buffer_search(search_id)
+        engine.release_piece_table(edit)
+        engine.release_text_buffer(handle)
+
+    def test_same_file_in_two_tabs_shares_one_engine_buffer(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "share_text_buffer"):
+            self.skipTest("lx_engine with shared buffers is not built")
+        content = "".join(f"entry {i:07d} payload\n" for i in range(400000))
+        path = os.path.join(os.path.dirname(__file__), "_shared_buffer.tmp")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        main_window = _DummyMainWindow(None)
+        main_window.editor_manager = _TabManager()
+        tabs = main_window.editor_manager.tabs
+        try:
+            with patch.object(fh, "RecentFiles", _DummyRecentFiles), patch.object(fh, "QTimer", _DummyTimer):
+                handler = fh.FileHandler(main_window)
+                # A snapshot listing the file twice: the second request waits for the first load.
+                worker = _FakeOpenWorker(path)
+                worker_id = handler._register_worker(worker, "open", path)
+                self.assertTrue(handler.open_file_by_path(path))
+                handler._open_flow.finalize(path, content, worker, worker_id, from_restore=True)
+                worker.finished.emit(content)
+                self.assertEqual(len(tabs), 2)
+                first, second = tabs
+                self.assertTrue(first.large_file_mode and second.large_file_mode)
+                self.assertNotEqual(first._large_buffer_handle, second._large_buffer_handle)
+                info = et.lx_engine.get_text_buffer_info(second._large_buffer_handle, 4000)
+                self.assertEqual(info["handles"], 2)
+                self.assertEqual(second.read_large_lines(400000, 1), ["entry 0399999 payload"])
+
+                # Copy-on-write: edits in one tab never reach the shared buffer.
+                self.assertTrue(first.enable_large_edit_mode())
+                first.large_replace_all("payload", "edited", True)
+                self.assertEqual(first.read_large_lines(1, 1), ["entry 0000000 edited"])
+                self.assertEqual(second.read_large_lines(1, 1), ["entry 0000000 payload"])
+                first.disable_large_file_mode()
+                self.assertEqual(et.lx_engine.get_text_buffer_info(second._large_buffer_handle, 4000)["handles"], 1)
+                self.assertEqual(second.read_large_lines(2, 1), ["entry 0000001 payload"])
+
+                # A file changed on disk since it was loaded is read again, not shared.
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("tail\n")
+                self.assertEqual(handler._find_shared_buffer(path), (None, None))
+        finally:
+            for editor in tabs:
+                editor.disable_large_file_mode()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_large_viewer_streams_engine_buffer_without_full_copy(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "iter_text_buffer"):
+            self.skipTest("lx_engine with streaming export is not built")
+        content = "".join(f"wiersz {i} zażółć\n" for i in range(20000))
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.enable_large_file_mode(content)
+        self.assertEqual("".join(editor.iter_full_text()), content)
+        with self.assertRaisesRegex(RuntimeError, "iter_full_text"):
+            editor.get_full_text()
+        # Without a stream the save fails loudly instead of copying (or emptying) the file.
+        with patch.object(editor, "full_text_stream", return_value=None), self.assertRaises(RuntimeError):
+            fh.FileHandler._get_save_content(editor)
+
+        stream = fh.FileHandler._get_save_content(editor)
+        self.assertIsInstance(stream, et.TextBufferStream)
+        path = os.path.join(os.path.dirname(__file__), "_large_stream_save.tmp")
+        try:
+            worker = fh.FileWorker("save", path, stream)
+            worker.save_encoding = "cp1250"
+            worker._run_save_task()
+            with open(path, encoding="cp1250") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(worker.used_encoding, "cp1250")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+        # A closed tab keeps the engine buffer; reopening adopts it as-is.
+        source = editor.detach_large_text()
+        self.assertFalse(editor.large_file_mode)
+        reopened = et.EditorTab(console=_DummyConsole())
+        reopened.enable_large_file_mode(source)
+        self.assertEqual(reopened.get_virtual_char_count(), len(content))
+        self.assertEqual(reopened.read_large_lines(20000, 1), ["wiersz 19999 zażółć"])
+
+        main_window = _DummyMainWindow(reopened)
+        with patch.object(fh, "RecentFiles", _DummyRecentFiles), patch.object(
+            fh, "QTimer", _DummyTimer
+        ), patch.object(fh, "ENGINE_AVAILABLE", True):
+            handler = fh.FileHandler(main_window)
+            self.assertTrue(handler.load_current_full_editable())
+        self.assertFalse(reopened.large_file_mode)
+        self.assertEqual(reopened.toPlainText(), content)
+        self.assertFalse(reopened.document().isModified())
+
+
+    def test_idle_engine_buffer_is_compressed_and_still_reads_back(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "compress_text_buffer"):
+            self.skipTest("lx_engine with buffer compression is not built")
+        content = "".join(f"wiersz {i:07d} zażółć ERROR\n" for i in range(300000)) + "x" * 9000 + "\nkoniec"
+        editor = et.EditorTab(console=_DummyConsole())
+        editor.enable_large_file_mode(content)
+        handle = editor._large_buffer_handle
+        self.assertTrue(et.lx_engine.wait_text_buffer_index(handle, 0, 10000))
+        expected_rows = et.lx_engine.get_text_buffer_rows(handle, 300001, 1, 3)
+        stream = editor.detach_large_text()
+        if not stream.compress():
+            self.skipTest("lx_engine was built without zlib")
+        deadline = time.monotonic() + 10
+        while et.lx_engine.get_text_buffer_info(stream.handle, 4000)["resident"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        info = et.lx_engine.get_text_buffer_info(stream.handle, 4000)
+        self.assertFalse(info["resident"])
+        self.assertLess(info["compressed_bytes"], info["bytes"])
+
+        # Viewport reads inflate single blocks; the buffer stays cold.
+        reopened = et.EditorTab(console=_DummyConsole())
+        reopened.enable_large_file_mode(stream)
+        self.assertEqual(reopened.read_large_lines(250000, 2), ["wiersz 0249999 zażółć ERROR", "wiersz 0250000 zażółć ERROR"])
+        self.assertEqual(et.lx_engine.get_text_buffer_rows(reopened._large_buffer_handle, 300001, 1, 3), expected_rows)
+        self.assertEqual(reopened.get_virtual_char_count(), len(content))
+        self.assertEqual("".join(reopened.iter_full_text()), content)
+        self.assertFalse(et.lx_engine.get_text_buffer_info(reopened._large_buffer_handle, 4000)["resident"])
+
+        # Whole-text work makes it resident again.
+        search_id = et.lx_engine.start_text_buffer_search(reopened._large_buffer_handle, "0123456 zaż", True, False, 0)
+        while not et.lx_engine.get_text_buffer_search_results(search_id, 0, 0)["done"]:
+            time.sleep(0.01)
+        line_bytes = len("wiersz 0000000 zażółć ERROR\n".encode("utf-8"))
+        self.assertEqual(
+            et.lx_engine.get_text_buffer_search_results(search_id, 0, 0)["matches"],
+            [(123457, 7, 123456 * line_bytes + 7, len("0123456 zaż"))],
+        )
+        et.lx_engine.cancel_text_buffer_search(search_id)
+        self.assertTrue(et.lx_engine.get_text_buffer_info(reopened._large_buffer_handle, 4000)["resident"])
+        reopened.disable_large_file_mode()
+
+
+    def test_large_single_byte_file_opens_raw_and_decodes_on_demand(self):
+        if et.lx_engine is None or not hasattr(et.lx_engine, "create_single_byte_text_buffer"):
+            self.skipTest("lx_engine with single-byte buffers is not built")
+        content = "".join(f"pozycja {i:07d} zażółć gęślą jaźń „€”\r\n" for i in range(250000))
+        raw = content.encode("cp1250")
+        self.assertGreater(len(raw), fh.LAZY_DECODE_MIN_BYTES)
+        path = os.path.join(os.path.dirname(__file__), "_single_byte_open.tmp")
+        with open(path, "wb") as f:
+            f.write(raw)
+        main_window = _DummyMainWindow(None)
+        main_window.editor_manager = _TabManager()
+        tabs = main_window.editor_manager.tabs
+        try:
+            worker = fh.OpenFileWorker(path=path)
+            decoded = []
+            worker.finished.connect(decoded.append)
+            with patch.object(fh, "_detect_preferred_encoding", return_value=("cp1250", 0.99)):
+                worker._run_open_task()
+            self.assertEqual(decoded, [""])
+            self.assertIsInstance(worker.large_stream, et.TextBufferStream)
+            self.assertEqual(worker.used_encoding, "cp1250")
+
+            with patch.object(fh, "RecentFiles", _DummyRecentFiles), patch.object(fh, "QTimer", _DummyTimer):
+                handler = fh.FileHandler(main_window)
+                worker_id = handler._register_worker(worker, "open", path)
+                handler._open_flow.finalize(path, "", worker, worker_id)
+            editor = tabs[0]
+            self.assertIsNone(worker.large_stream)
+            self.assertTrue(editor.large_file_mode)
+            self.assertEqual(editor.file_encoding, "cp1250")
+            self.assertEqual(editor.get_virtual_char_count(), len(content))
+            info = et.lx_engine.get_text_buffer_info(editor._large_buffer_handle, 4000)
+            self.assertTrue(info["single_byte"])
+            self.assertEqual(info["bytes"], len(content.encode("utf-8")))
+            self.assertTrue(et.lx_engine.wait_text_buffer_index(editor._large_buffer_handle, 0, 10000))
+            self.assertEqual(editor.read_large_lines(200000, 1), ["pozycja 0199999 zażółć gęślą jaźń „€”"])
+            self.assertFalse(et.lx_engine.get_text_buffer_info(editor._large_buffer_handle, 4000)["resident"])
+            self.assertEqual("".join(editor.iter_full_text()), content)
+
+            # A byte cp1250 leaves undefined: the ordinary decoders take over.
+            with open(path, "ab") as f:
+                f.write(b"\x81")
+            fallback = fh.OpenFileWorker(path=path)
+            fallback_text = []
+            fallback.finished.connect(fallback_text.append)
+            with patch.object(fh, "_detect_preferred_encoding", return_value=("cp1250", 0.99)):
+                fallback._run_open_task()
+            self.assertIsNone(fallback.large_stream)
+            self.assertEqual(len(fallback_text), 1)
+            self.assertTrue(fallback_text[0].startswith("pozycja 0000000 zażółć"))
+        finally:
+            for editor in tabs:
+                editor.disable_large_file_mode()
+            if os.path.exists(path):
+                os.remove(path)
+
 
 if __name__ == "__main__":
     unittest.main()
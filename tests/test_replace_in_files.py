@@ -0,0 +1,249 @@
+import codecs
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from core.file import replace_in_files
+from core.file.replace_in_files import ReplaceInFilesJob
+from ui.dialogs.find_in_files_dialog import FindInFilesDialog
+
+
+class _DummyLangHandler:
+    def tr(self, key):
+        return key
+
+
+class _DummyConsoleLogic:
+    def __init__(self):
+        self.logs = []
+
+    def log(self, message, level="INFO"):
+        self.logs.append((message, level))
+
+
+class _DummyMainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.lang_handler = _DummyLangHandler()
+        self.console_logic = _DummyConsoleLogic()
+
+    def open_file_at_line(self, path, line, column=0, length=0):
+        pass
+
+
+class TestReplaceInFiles(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.files = {
+            "a.txt": "host = old.example\r\nport = 80\r\nbackup = old.example\r\n".encode("utf-8"),
+            "b.cfg": codecs.BOM_UTF16_BE + "host = old.example\n".encode("utf-16-be"),
+            "c.cfg": codecs.BOM_UTF8 + "# zażółć\nhost = old.example\n".encode("utf-8"),
+            "d.cfg": b"nothing to see\n",
+            "e.bin": b"old.example\x00\x01",
+        }
+        for name, data in self.files.items():
+            self._write(name, data)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _write(self, name, data):
+        with open(self._path(name), "wb") as f:
+            f.write(data)
+
+    def _read(self, name):
+        with open(self._path(name), "rb") as f:
+            return f.read()
+
+    def _run(self, job, start, timeout=30.0):
+        start()
+        deadline = time.monotonic() + timeout
+        while not job.done and time.monotonic() < deadline:
+            self._app.processEvents()
+            time.sleep(0.01)
+        self.assertTrue(job.done, "replace in files did not finish in time")
+        self.assertTrue(job.wait(5.0))
+
+    def _job(self, query="old.example", replacement="new.example", **options):
+        return ReplaceInFilesJob([self._path(name) for name in sorted(self.files)], query, replacement, **options)
+
+    def _leftovers(self):
+        return [name for name in os.listdir(self.root) if name.endswith((".lxtmp", ".lxbak"))]
+
+    def test_preview_then_apply_keeps_encoding_bom_and_line_breaks(self):
+        os.chmod(self._path("a.txt"), 0o640)
+        job = self._job(workers=3)
+        finished = []
+        job.finished.connect(finished.append)
+        self._run(job, job.start_preview)
+        self.assertEqual([(os.path.basename(edit.path), edit.count) for edit in job.plan],
+                         [("a.txt", 2), ("b.cfg", 1), ("c.cfg", 1)])
+        self.assertEqual(job.replacements, 4)
+        self.assertEqual(job.errors, [])
+        # The preview writes nothing.
+        self.assertEqual(self._read("a.txt"), self.files["a.txt"])
+
+        self._run(job, job.apply)
+        self.assertEqual(finished, ["preview", "apply"])
+        self.assertFalse(job.rolled_back)
+        self.assertEqual(sorted(os.path.basename(path) for path in job.written), ["a.txt", "b.cfg", "c.cfg"])
+        self.assertEqual(self._read("a.txt"), b"host = new.example\r\nport = 80\r\nbackup = new.example\r\n")
+        self.assertEqual(self._read("b.cfg"), codecs.BOM_UTF16_BE + "host = new.example\n".encode("utf-16-be"))
+        self.assertEqual(self._read("c.cfg"), codecs.BOM_UTF8 + "# zażółć\nhost = new.example\n".encode("utf-8"))
+        self.assertEqual(self._read("d.cfg"), self.files["d.cfg"])
+        self.assertEqual(self._read("e.bin"), self.files["e.bin"])
+        if os.name == "posix":
+            self.assertEqual(stat.S_IMODE(os.stat(self._path("a.txt")).st_mode), 0o640)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_regex_templates_and_files_that_cannot_take_the_replacement(self):
+        self._write("latin.cfg", b"caf\xe9 host = old.example\n")
+        self.files["latin.cfg"] = b""
+        job = self._job(r"host = (\w+)\.example", r"server = \1.internal", regex=True, workers=2)
+        self._run(job, job.start_preview)
+        self.assertEqual(job.replacements, 4)
+        self._run(job, job.apply)
+        self.assertEqual(self._read("c.cfg"), codecs.BOM_UTF8 + "# zażółć\nserver = old.internal\n".encode("utf-8"))
+        self.assertTrue(self._read("latin.cfg").startswith(b"caf\xe9 server = old.internal"))
+
+        # A single-byte file cannot hold the replacement: it is left out, not mangled.
+        job = self._job("internal", "中", workers=2)
+        self._run(job, job.start_preview)
+        self.assertNotIn(self._path("latin.cfg"), [edit.path for edit in job.plan])
+        self.assertTrue(any("latin.cfg" in error for error in job.errors))
+
+        # A bad template is refused up front by the engine, per file by ``re``.
+        if replace_in_files.ENGINE_AVAILABLE and hasattr(replace_in_files.lx_engine, "replace_bytes"):
+            with self.assertRaises(ValueError):
+                self._job("old", r"\2", regex=True, workers=1)
+        with patch.object(replace_in_files, "ENGINE_AVAILABLE", False):
+            bad_template = self._job("old", r"\2", regex=True, workers=1)
+        self._run(bad_template, bad_template.start_preview)
+        self.assertEqual(bad_template.plan, [])
+        self.assertTrue(bad_template.errors)
+
+    def test_matches_are_the_ones_find_in_files_reports(self):
+        if not replace_in_files.ENGINE_AVAILABLE or not hasattr(replace_in_files.lx_engine, "replace_bytes"):
+            self.skipTest("lx_engine with replace_bytes is not built")
+        self.files = {"m.txt": "id ٣4 zażółć_1\n\tend\n".encode("utf-8"), "slow.txt": b"a" * 200000 + b"b\n"}
+        for name, data in self.files.items():
+            self._write(name, data)
+        # The engine's \d is ASCII; its template escapes (\t, \\) are the editor's.
+        job = self._job(r"\d+|\w+_", r"[\0]\t", regex=True, workers=2)
+        self._run(job, job.start_preview)
+        self.assertEqual(job.replacements, 3)
+        self._run(job, job.apply)
+        self.assertEqual(self._read("m.txt"), "id ٣[4]\t [zażółć_]\t[1]\t\n\tend\n".encode("utf-8"))
+
+        # Empty matches are not replaced, as Find in Files does not list them.
+        for fallback in (False, True):
+            with patch.object(replace_in_files, "ENGINE_AVAILABLE", not fallback):
+                job = self._job(r"^|x*", "#", regex=True, workers=1)
+            self._run(job, job.start_preview)
+            self.assertEqual(job.plan, [], fallback)
+
+        # A pattern that backtracks exponentially in ``re`` runs in linear time.
+        job = self._job(r"(a|aa)*c", "x", regex=True, workers=1)
+        self._run(job, job.start_preview, timeout=10.0)
+        self.assertEqual(job.plan, [])
+        self.assertEqual(job.errors, [])
+
+    def test_long_files_are_replaced_chunk_by_chunk(self):
+        if not replace_in_files.ENGINE_AVAILABLE or not hasattr(replace_in_files.lx_engine, "replace_bytes"):
+            self.skipTest("lx_engine with replace_bytes is not built")
+        lines = [f"row {i} old.example\n" for i in range(2000)]
+        lines[700] = "x" * 5000 + " old.example\n"
+        self.files = {"long.txt": "".join(lines).encode("utf-8")}
+        self._write("long.txt", self.files["long.txt"])
+        with patch.object(ReplaceInFilesJob, "CHUNK_BYTES", 1000):
+            job = self._job()
+            self._run(job, job.start_preview)
+            self.assertEqual(job.replacements, 2000)
+            self._run(job, job.apply)
+        self.assertEqual(self._read("long.txt"), self.files["long.txt"].replace(b"old.example", b"new.example"))
+
+    def test_file_changed_after_preview_rolls_back_everything(self):
+        job = self._job(workers=2)
+        self._run(job, job.start_preview)
+        self._write("c.cfg", self.files["c.cfg"] + b"host = old.example\n")
+        self._run(job, job.apply)
+        self.assertTrue(job.rolled_back)
+        self.assertTrue(any("changed on disk" in error for error in job.errors))
+        self.assertEqual(self._read("a.txt"), self.files["a.txt"])
+        self.assertEqual(self._read("b.cfg"), self.files["b.cfg"])
+        self.assertEqual(self._leftovers(), [])
+        with self.assertRaises(RuntimeError):
+            job.apply()
+
+    def test_failed_rename_restores_files_already_replaced(self):
+        job = self._job(workers=2)
+        self._run(job, job.start_preview)
+        real_replace = os.replace
+        calls = []
+
+        def flaky_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError(13, "Permission denied", dst)
+            real_replace(src, dst)
+
+        with patch.object(replace_in_files.os, "replace", side_effect=flaky_replace):
+            self._run(job, job.apply)
+        self.assertTrue(job.rolled_back)
+        self.assertEqual(job.written, [])
+        for name in ("a.txt", "b.cfg", "c.cfg"):
+            self.assertEqual(self._read(name), self.files[name], name)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_dialog_previews_and_applies_the_search_results(self):
+        parent = _DummyMainWindow()
+        dialog = FindInFilesDialog(parent, root=self.root)
+        dialog.find_input.setText("old.example")
+        dialog.replace_input.setText("new.example")
+        dialog.preview_replace()
+        self.assertEqual(dialog.status_label.text(), "fif_status_replace_needs_search")
+
+        dialog.start_search()
+        search = dialog._search
+        deadline = time.monotonic() + 30.0
+        while not search.done and time.monotonic() < deadline:
+            self._app.processEvents()
+            time.sleep(0.01)
+        self.assertTrue(search.wait(5.0))
+
+        dialog.preview_replace()
+        job = dialog._replace_job
+        self._run(job, lambda: None)
+        self.assertEqual(dialog.results_list.count(), 3)
+        self.assertTrue(dialog.apply_btn.isEnabled())
+        self.assertEqual(dialog.status_label.text(), "fif_status_preview")
+
+        dialog.apply_replace()
+        self.assertFalse(dialog.apply_btn.isEnabled())
+        self._run(job, lambda: None)
+        self.assertEqual(dialog.status_label.text(), "fif_status_applied")
+        self.assertIn(b"new.example", self._read("a.txt"))
+        self.assertTrue(any(level == "SUCCESS" for _message, level in parent.console_logic.logs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,398 @@
+import os
+import re
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLineEdit, QPushButton, QCheckBox,
+                             QLabel, QListWidget, QListWidgetItem, QFileDialog)
+from PyQt6.QtCore import Qt
+
+from core.editor.console_logic import ConsoleLogic
+from core.file.find_in_files import DEFAULT_EXCLUDES, FindInFilesSearch
+from core.file.replace_in_files import ReplaceInFilesJob
+
+
+class FindInFilesDialog(QDialog):
+    """Searches a folder tree and lists every hit as ``path:line: preview``.
+
+    The search itself runs on ``FindInFilesSearch``'s worker pool; hits are
+    appended as each batch arrives, and activating one opens the file at
+    that line through ``open_file_at_line`` of the main window.
+
+    Replace works on the files the last search matched: Preview counts the
+    replacements per file without writing anything, Apply writes them all
+    through ``ReplaceInFilesJob`` (all files or none).
+    """
+
+    # Hits past this are counted in the status but not listed.
+    MAX_LISTED_RESULTS = 20_000
+
+    def __init__(self, parent, root=""):
+        super().__init__(parent)
+        self.main_window = parent
+        self.setWindowFlags(Qt.WindowType.Tool)
+        self.resize(760, 520)
+
+        self._search = None
+        self._listed = 0
+        # Every file the search matched, in arrival order, listed or not.
+        self._matched_paths = {}
+        self._replace_job = None
+        self._replace_unsaved = 0
+
+        self.init_ui()
+        self.folder_input.setText(root)
+        self.retranslate_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        form = QGridLayout()
+        form.setHorizontalSpacing(8)
+        self.label_find = QLabel()
+        self.find_input = QLineEdit()
+        self.find_input.setObjectName("ConsoleInput")
+        self.find_input.returnPressed.connect(self.start_search)
+        self.label_replace = QLabel()
+        self.replace_input = QLineEdit()
+        self.replace_input.setObjectName("ConsoleInput")
+        self.label_folder = QLabel()
+        self.folder_input = QLineEdit()
+        self.folder_input.setObjectName("ConsoleInput")
+        self.folder_input.returnPressed.connect(self.start_search)
+        self.browse_btn = QPushButton()
+        self.browse_btn.setObjectName("secondaryButton")
+        self.browse_btn.clicked.connect(self._browse_folder)
+        self.label_include = QLabel()
+        self.include_input = QLineEdit()
+        self.include_input.setObjectName("ConsoleInput")
+        self.label_exclude = QLabel()
+        self.exclude_input = QLineEdit(DEFAULT_EXCLUDES)
+        self.exclude_input.setObjectName("ConsoleInput")
+
+        form.addWidget(self.label_find, 0, 0)
+        form.addWidget(self.find_input, 0, 1, 1, 2)
+        form.addWidget(self.label_replace, 1, 0)
+        form.addWidget(self.replace_input, 1, 1, 1, 2)
+        form.addWidget(self.label_folder, 2, 0)
+        form.addWidget(self.folder_input, 2, 1)
+        form.addWidget(self.browse_btn, 2, 2)
+        form.addWidget(self.label_include, 3, 0)
+        form.addWidget(self.include_input, 3, 1, 1, 2)
+        form.addWidget(self.label_exclude, 4, 0)
+        form.addWidget(self.exclude_input, 4, 1, 1, 2)
+        layout.addLayout(form)
+
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(15)
+        self.case_cb = QCheckBox()
+        self.words_cb = QCheckBox()
+        self.regex_cb = QCheckBox()
+        options_layout.addWidget(self.case_cb)
+        options_layout.addWidget(self.words_cb)
+        options_layout.addWidget(self.regex_cb)
+        options_layout.addStretch()
+        self.search_btn = QPushButton()
+        self.search_btn.setObjectName("primaryButton")
+        self.search_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.search_btn.clicked.connect(self.start_search)
+        self.stop_btn = QPushButton()
+        self.stop_btn.setObjectName("secondaryButton")
+        self.stop_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.stop_btn.clicked.connect(self.stop_search)
+        self.stop_btn.setVisible(False)
+        self.preview_btn = QPushButton()
+        self.preview_btn.setObjectName("secondaryButton")
+        self.preview_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.preview_btn.clicked.connect(self.preview_replace)
+        self.apply_btn = QPushButton()
+        self.apply_btn.setObjectName("primaryButton")
+        self.apply_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.apply_btn.clicked.connect(self.apply_replace)
+        self.apply_btn.setEnabled(False)
+        options_layout.addWidget(self.stop_btn)
+        options_layout.addWidget(self.preview_btn)
+        options_layout.addWidget(self.apply_btn)
+        options_layout.addWidget(self.search_btn)
+        layout.addLayout(options_layout)
+
+        self.results_list = QListWidget()
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.itemActivated.connect(self._open_item)
+        layout.addWidget(self.results_list, 1)
+
+        self.status_label = QLabel()
+        self.status_label.setObjectName("statusLabel")
+        layout.addWidget(self.status_label)
+
+    def retranslate_ui(self):
+        tr = self.main_window.lang_handler.tr
+        self.setWindowTitle(tr("fif_title"))
+        self.label_find.setText(tr("fr_label_find"))
+        self.find_input.setPlaceholderText(tr("fr_placeholder_find"))
+        self.label_replace.setText(tr("fr_label_replace"))
+        self.replace_input.setPlaceholderText(tr("fr_placeholder_replace"))
+        self.label_folder.setText(tr("fif_label_folder"))
+        self.browse_btn.setText(tr("fif_btn_browse"))
+        self.label_include.setText(tr("fif_label_include"))
+        self.include_input.setPlaceholderText(tr("fif_placeholder_include"))
+        self.label_exclude.setText(tr("fif_label_exclude"))
+        self.case_cb.setText(tr("fr_case_sensitive"))
+        self.words_cb.setText(tr("fr_whole_words"))
+        self.regex_cb.setText(tr("fr_regex"))
+        self.search_btn.setText(tr("fif_btn_search"))
+        self.stop_btn.setText(tr("fr_btn_stop"))
+        self.preview_btn.setText(tr("fif_btn_preview_replace"))
+        self.apply_btn.setText(tr("fif_btn_apply_replace"))
+        if self._replace_job is not None:
+            self._update_replace_status()
+        else:
+            self._update_status()
+
+    def _browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, self.main_window.lang_handler.tr("fif_title"),
+                                                  self.folder_input.text())
+        if folder:
+            self.folder_input.setText(folder)
+
+    # --- SEARCH ---
+
+    def start_search(self):
+        query = self.find_input.text()
+        if not query:
+            return
+        root = self.folder_input.text().strip()
+        self._drop_search()
+        self._drop_replace()
+        self.results_list.clear()
+        self._listed = 0
+        self._matched_paths = {}
+        if not root or not os.path.isdir(root):
+            self.status_label.setText(self.main_window.lang_handler.tr("fif_status_no_folder"))
+            return
+        try:
+            self._search = FindInFilesSearch(
+                root, query, self.case_cb.isChecked(), self.words_cb.isChecked(), self.regex_cb.isChecked(),
+                include=self.include_input.text(), exclude=self.exclude_input.text(), parent=self,
+            )
+        except (ValueError, re.error) as err:
+            # A bad pattern never starts a search.
+            self.status_label.setText(self.main_window.lang_handler.tr("fr_status_regex_error").format(error=err))
+            return
+        self._search.results.connect(self._on_results)
+        self._search.progress.connect(self._on_progress)
+        self.main_window.console_logic.log(
+            f"Find in Files: searching {root} with {self._search.workers} workers.", "INFO"
+        )
+        self._update_status()
+
+    def stop_search(self):
+        if self._search is not None and not self._search.done:
+            self._search.cancel()
+            self._update_status()
+        if self._replace_job is not None and not self._replace_job.done:
+            self._replace_job.cancel()
+
+    def _drop_search(self):
+        search, self._search = self._search, None
+        if search is None:
+            return
+        search.cancel()
+        for signal, slot in ((search.results, self._on_results), (search.progress, self._on_progress)):
+            try:
+                signal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+        search.deleteLater()
+
+    def _on_results(self, rows):
+        for row in rows:
+            self._matched_paths[row[0]] = None
+        room = self.MAX_LISTED_RESULTS - self._listed
+        if room <= 0:
+            return
+        root = self._search.root if self._search is not None else ""
+        self.results_list.setUpdatesEnabled(False)
+        for path, line, column, length, preview in rows[:room]:
+            label = os.path.relpath(path, root) if root else path
+            item = QListWidgetItem(f"{label}:{line}: {preview.strip()}")
+            item.setData(Qt.ItemDataRole.UserRole, (path, line, column, length))
+            item.setToolTip(path)
+            self.results_list.addItem(item)
+        self.results_list.setUpdatesEnabled(True)
+        self._listed += min(room, len(rows))
+
+    def _on_progress(self, _total, done):
+        self._update_status()
+        if done and self._search is not None:
+            search = self._search
+            self.main_window.console_logic.log(
+                f"Find in Files: {search.total} matches in {search.files_matched} of {search.files_scanned} files, "
+                f"{ConsoleLogic._format_bytes(search.bytes_scanned)} in {search.elapsed:.2f} s "
+                f"({ConsoleLogic._format_bytes(search.throughput)}/s).",
+                "SUCCESS",
+            )
+            for error in search.errors[:20]:
+                self.main_window.console_logic.log(f"Find in Files: skipped {error}", "WARN")
+
+    def _update_status(self):
+        search = self._search
+        searching = search is not None and not search.done
+        self.stop_btn.setVisible(searching)
+        if search is None:
+            self.status_label.setText("")
+            return
+        tr = self.main_window.lang_handler.tr
+        values = {
+            "count": search.total,
+            "files": search.files_matched,
+            "scanned": search.files_scanned,
+            "skipped": search.files_skipped,
+            "size": ConsoleLogic._format_bytes(search.bytes_scanned),
+            "seconds": f"{search.elapsed:.1f}",
+            "rate": ConsoleLogic._format_bytes(search.throughput),
+        }
+        if searching:
+            key = "fif_status_searching"
+        elif search.truncated:
+            key = "fif_status_truncated"
+        elif search.cancelled:
+            key = "fif_status_stopped"
+        else:
+            key = "fif_status_done"
+        self.status_label.setText(tr(key).format(**values))
+
+    # --- REPLACE ---
+
+    def preview_replace(self):
+        search = self._search
+        tr = self.main_window.lang_handler.tr
+        if search is None or not search.done or search.cancelled or search.truncated:
+            # Replacing needs every matching file; a stopped or capped search would miss some.
+            self.status_label.setText(tr("fif_status_replace_needs_search"))
+            return
+        unsaved = self._open_paths(modified_only=True)
+        paths = [path for path in self._matched_paths if os.path.normcase(path) not in unsaved]
+        try:
+            job = ReplaceInFilesJob(
+                paths, search.query, self.replace_input.text(), search.case_sensitive, search.whole_words,
+                search.regex, parent=self,
+            )
+        except (ValueError, re.error) as err:
+            self.status_label.setText(tr("fr_status_regex_error").format(error=err))
+            return
+        self._drop_replace()
+        self._replace_job = job
+        self._replace_unsaved = len(self._matched_paths) - len(paths)
+        if self._replace_unsaved:
+            self.main_window.console_logic.log(
+                f"Replace in Files: {self._replace_unsaved} files with unsaved changes in a tab are left out.", "WARN"
+            )
+        job.progress.connect(self._update_replace_status)
+        job.finished.connect(self._on_replace_finished)
+        job.start_preview()
+        self._update_replace_status()
+
+    def apply_replace(self):
+        job = self._replace_job
+        if job is None or job.phase != "preview" or not job.done or job.cancelled or not job.plan:
+            return
+        self.apply_btn.setEnabled(False)
+        job.apply()
+        self._update_replace_status()
+
+    def _drop_replace(self):
+        job, self._replace_job = self._replace_job, None
+        self.apply_btn.setEnabled(False)
+        if job is None:
+            return
+        job.cancel()
+        for signal, slot in ((job.progress, self._update_replace_status), (job.finished, self._on_replace_finished)):
+            try:
+                signal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+        job.deleteLater()
+
+    def _on_replace_finished(self, phase):
+        job = self._replace_job
+        if job is None:
+            return
+        log = self.main_window.console_logic.log
+        for error in job.errors[:20]:
+            log(f"Replace in Files: {error}", "WARN" if phase == "preview" else "ERROR")
+        if phase == "preview":
+            tr = self.main_window.lang_handler.tr
+            self.results_list.clear()
+            self._listed = 0
+            root = self._search.root if self._search is not None else ""
+            for edit in job.plan:
+                label = os.path.relpath(edit.path, root) if root else edit.path
+                item = QListWidgetItem(f"{label}: {tr('fif_preview_row').format(count=edit.count)}")
+                item.setData(Qt.ItemDataRole.UserRole, (edit.path, 1, 0, 0))
+                item.setToolTip(f"{edit.path} ({edit.encoding})")
+                self.results_list.addItem(item)
+            self.apply_btn.setEnabled(bool(job.plan) and not job.cancelled)
+        elif job.rolled_back:
+            log(f"Replace in Files: nothing written, {len(job.plan)} files left as they were.", "ERROR")
+        else:
+            log(
+                f"Replace in Files: {job.replacements} replacements written to {len(job.written)} files "
+                f"in {job.elapsed:.2f} s.",
+                "SUCCESS",
+            )
+            for path in sorted(self._open_paths(modified_only=False) & {os.path.normcase(p) for p in job.written}):
+                log(f"Replace in Files: {path} is open in a tab and still shows the old text.", "WARN")
+        self._update_replace_status()
+
+    def _update_replace_status(self, *_args):
+        job = self._replace_job
+        if job is None:
+            return
+        running = not job.done
+        self.stop_btn.setVisible(running)
+        tr = self.main_window.lang_handler.tr
+        values = {
+            "done": job.files_done,
+            "total": job.files_total,
+            "count": job.replacements,
+            "files": len(job.plan),
+            "skipped": len(job.errors) + self._replace_unsaved,
+            "seconds": f"{job.elapsed:.1f}",
+            "error": job.errors[0] if job.errors else "",
+        }
+        if job.phase == "preview":
+            key = "fif_status_previewing" if running else "fif_status_preview"
+        elif running:
+            key = "fif_status_applying"
+        elif job.rolled_back:
+            key = "fif_status_rolled_back"
+        else:
+            key = "fif_status_applied"
+        if not running and job.cancelled:
+            key = "fif_status_replace_stopped"
+        self.status_label.setText(tr(key).format(**values))
+
+    def _open_paths(self, modified_only):
+        """Normalised paths of the files open in tabs (only the unsaved ones if ``modified_only``)."""
+        manager = getattr(self.main_window, "editor_manager", None)
+        paths = set()
+        for editor in manager.get_all_editors() if manager is not None else ():
+            path = getattr(editor, "file_path", None)
+            document = editor.document() if hasattr(editor, "document") else None
+            if not path or (modified_only and not (document is not None and document.isModified())):
+                continue
+            paths.add(os.path.normcase(os.path.abspath(path)))
+        return paths
+
+    # --- OPEN HIT ---
+
+    def _open_item(self, item):
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if data:
+            path, line, column, length = data
+            self.main_window.open_file_at_line(path, line, column, length)
+
+    def hideEvent(self, event):
+        self.stop_search()
+        super().hideEvent(event)
@@ -1,6 +1,11 @@
+import re
+import unicodedata
+
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox, QLabel
 from PyQt6.QtGui import QTextCursor, QTextDocument
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+
+from core.editor.large_search import LargeSearchSession
 
 try:
     import lx_engine
@@ -10,6 +15,8 @@ except Exception:
 class FindReplaceDialog(QDialog):
     _CPP_FIND_FASTPATH_MAX_CHARS = 2_000_000
     _CPP_REPLACE_COUNT_MAX_CHARS = 2_000_000
+    # Search as you type starts once typing pauses this long.
+    _LIVE_SEARCH_DELAY_MS = 200
 
     def __init__(self, parent, editor_manager):
         super().__init__(parent)
@@ -21,6 +28,22 @@ class FindReplaceDialog(QDialog):
         # Ustawiamy WindowType na Tool, aby okno było lżejsze i zawsze na wierzchu edytora
         self.setWindowFlags(Qt.WindowType.Tool)
         
+        # Whole-file search state for Large Viewer tabs (and regex searches
+        # of normal tabs, which run the same way over a document copy).
+        self._large_session = None
+        self._large_match_index = None
+        self._large_pending = None
+        # Regex session owned by the dialog and the (editor, revision) it searched.
+        self._document_session = None
+        self._document_session_key = None
+        # Running regex Replace All: (session, editor, document revision or None).
+        self._replace_job = None
+
+        self._live_timer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        self._live_timer.setInterval(self._LIVE_SEARCH_DELAY_MS)
+        self._live_timer.timeout.connect(self._run_live_search)
+
         self.init_ui()
         self.retranslate_ui()
 
@@ -55,12 +78,18 @@ class FindReplaceDialog(QDialog):
         
         self.case_cb = QCheckBox()
         self.words_cb = QCheckBox()
+        self.regex_cb = QCheckBox()
         
         options_layout.addWidget(self.case_cb)
         options_layout.addWidget(self.words_cb)
+        options_layout.addWidget(self.regex_cb)
         options_layout.addStretch()
         layout.addLayout(options_layout)
 
+        self.find_input.textChanged.connect(self._schedule_live_search)
+        for checkbox in (self.case_cb, self.words_cb, self.regex_cb):
+            checkbox.toggled.connect(self._schedule_live_search)
+
         # --- PRZYCISKI AKCJI ---
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(8)
@@ -68,6 +97,10 @@ class FindReplaceDialog(QDialog):
         self.find_btn = QPushButton()
         self.find_btn.setObjectName("primaryButton")
         self.find_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self.find_prev_btn = QPushButton()
+        self.find_prev_btn.setObjectName("secondaryButton")
+        self.find_prev_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         
         self.replace_btn = QPushButton()
         self.replace_btn.setObjectName("secondaryButton")
@@ -78,14 +111,29 @@ class FindReplaceDialog(QDialog):
         self.replace_all_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         
         self.find_btn.clicked.connect(self.find_next)
+        self.find_prev_btn.clicked.connect(self.find_previous)
         self.replace_btn.clicked.connect(self.handle_replace)
         self.replace_all_btn.clicked.connect(self.handle_replace_all)
 
+        btn_layout.addWidget(self.find_prev_btn)
         btn_layout.addWidget(self.find_btn)
         btn_layout.addWidget(self.replace_btn)
         btn_layout.addWidget(self.replace_all_btn)
         layout.addLayout(btn_layout)
 
+        # --- STATUS (licznik wyników) ---
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.status_label.setObjectName("statusLabel")
+        self.stop_btn = QPushButton()
+        self.stop_btn.setObjectName("secondaryButton")
+        self.stop_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.stop_btn.clicked.connect(self.stop_search)
+        self.stop_btn.setVisible(False)
+        status_layout.addWidget(self.status_label, 1)
+        status_layout.addWidget(self.stop_btn)
+        layout.addLayout(status_layout)
+
     def retranslate_ui(self):
         tr = self.main_window.lang_handler.tr
         self.setWindowTitle(tr("fr_title"))
@@ -95,9 +143,13 @@ class FindReplaceDialog(QDialog):
         self.replace_input.setPlaceholderText(tr("fr_placeholder_replace"))
         self.case_cb.setText(tr("fr_case_sensitive"))
         self.words_cb.setText(tr("fr_whole_words"))
+        self.regex_cb.setText(tr("fr_regex"))
+        self.stop_btn.setText(tr("fr_btn_stop"))
         self.find_btn.setText(tr("fr_btn_find"))
+        self.find_prev_btn.setText(tr("fr_btn_find_prev"))
         self.replace_btn.setText(tr("fr_btn_replace"))
         self.replace_all_btn.setText(tr("fr_btn_replace_all"))
+        self._update_large_status()
 
     def _find_flags(self, include_whole_words=True):
         flags = QTextDocument.FindFlag(0)
@@ -107,9 +159,19 @@ class FindReplaceDialog(QDialog):
             flags |= QTextDocument.FindFlag.FindWholeWords
         return flags
 
+    @staticmethod
+    def _utf16_len(text):
+        # Qt positions count UTF-16 code units; astral characters take two.
+        return len(text) + sum(1 for ch in text if ord(ch) > 0xFFFF)
+
     @staticmethod
     def _is_word_char(ch):
-        return ch.isalnum() or ch == "_" or ord(ch) > 127
+        # Same classes as the engine's whole-word check: letters, numbers,
+        # combining marks and connector punctuation ("_").
+        if not ch:
+            return False
+        category = unicodedata.category(ch)
+        return category[0] in "LNM" or category == "Pc"
 
     def _matches_whole_word(self, document, start, end):
         if start > 0 and self._is_word_char(document.characterAt(start - 1)):
@@ -130,15 +192,24 @@ class FindReplaceDialog(QDialog):
         except Exception:
             pass
 
+        # Engines without `fold_case` fold ASCII only; leave non-ASCII
+        # case-insensitive queries to Qt there so no earlier match is skipped.
+        if not self.case_cb.isChecked() and not query.isascii() and not hasattr(lx_engine, "fold_case"):
+            return None
+
+        text = editor.toPlainText()
+        args = (text, query, self.case_cb.isChecked(), self.words_cb.isChecked(), start_pos, True)
         try:
-            position = lx_engine.find_next_position(
-                editor.toPlainText(),
-                query,
-                self.case_cb.isChecked(),
-                self.words_cb.isChecked(),
-                start_pos,
-                True,
-            )
+            # Ask for Qt (UTF-16) positions so non-ASCII documents keep the fast path.
+            position = lx_engine.find_next_position(*args, unit="utf16")
+        except TypeError:
+            # Older engine builds only speak UTF-8 bytes, which match Qt positions for ASCII.
+            if not text.isascii():
+                return None
+            try:
+                position = lx_engine.find_next_position(*args)
+            except Exception:
+                return None
         except Exception:
             return None
 
@@ -156,7 +227,7 @@ class FindReplaceDialog(QDialog):
 
         cursor = QTextCursor(document)
         cursor.setPosition(position)
-        cursor.setPosition(position + len(query), QTextCursor.MoveMode.KeepAnchor)
+        cursor.setPosition(position + self._utf16_len(query), QTextCursor.MoveMode.KeepAnchor)
 
         # Defensive guard for out-of-sync positions.
         if not self._selection_matches(cursor, query):
@@ -216,6 +287,20 @@ class FindReplaceDialog(QDialog):
 
         return replaced_count
 
+    def _replace_all_large(self, editor, find_text, replace_text):
+        """Replace All on a Large Viewer tab: natively in the piece table, never via a full str."""
+        console = self.main_window.console_logic
+        if not getattr(editor, "large_edit_mode", False):
+            console.log("Replace All in Large Viewer Mode needs 'Load Full Editable' or 'Large Edit Mode' first.", "INFO")
+            return
+        replaced_count = editor.large_replace_all(
+            find_text, replace_text, self.case_cb.isChecked(), self.words_cb.isChecked()
+        )
+        if replaced_count:
+            console.log(f"Replace All completed ({replaced_count} matches).", "SUCCESS")
+        else:
+            console.log("Replace All: no matches found.", "INFO")
+
     def _replace_document_text(self, editor, new_text):
         cursor = editor.textCursor()
         cursor.beginEditBlock()
@@ -251,6 +336,359 @@ class FindReplaceDialog(QDialog):
 
         return search_from(0)
 
+    def _find_previous_cursor(self, editor, query):
+        document = editor.document()
+        current_cursor = editor.textCursor()
+        start_pos = current_cursor.selectionStart() if current_cursor.hasSelection() else current_cursor.position()
+        flags = self._find_flags(include_whole_words=False) | QTextDocument.FindFlag.FindBackward
+
+        def search_from(position):
+            search_cursor = QTextCursor(document)
+            search_cursor.setPosition(position)
+            while True:
+                found = document.find(query, search_cursor, flags)
+                if found.isNull():
+                    return found
+                if not self.words_cb.isChecked() or self._matches_whole_word(
+                    document, found.selectionStart(), found.selectionEnd()
+                ):
+                    return found
+                search_cursor = QTextCursor(document)
+                search_cursor.setPosition(found.selectionStart())
+
+        found = search_from(start_pos)
+        if not found.isNull():
+            return found
+        return search_from(max(0, document.characterCount() - 1))
+
+    # --- LARGE VIEWER (cały plik) ---
+
+    @staticmethod
+    def _is_large_editor(editor):
+        return bool(getattr(editor, "large_file_mode", False)) and hasattr(editor, "large_search")
+
+    def _find_in_large(self, editor, query, backward=False, from_start=False):
+        try:
+            session = editor.large_search(
+                query, self.case_cb.isChecked(), self.words_cb.isChecked(), self.regex_cb.isChecked()
+            )
+        except ValueError as e:
+            self._show_regex_error(e)
+            return
+        self._find_with_session(editor, session, backward, from_start)
+
+    def _find_with_session(self, editor, session, backward, from_start=False):
+        """Select the next (or previous) match of ``session``.
+
+        ``from_start`` looks from the start of the selection instead of its
+        end, so search as you type keeps the match it has grown from.
+        """
+        if session is None:
+            return
+        if session is not self._large_session:
+            self._large_session = session
+            self._large_match_index = None
+            session.progress.connect(self._on_large_search_progress)
+        if hasattr(editor, "highlight_matches"):
+            editor.highlight_matches(session)
+        self._large_pending = None
+        if not self._step_large_match(editor, session, backward, from_start):
+            # No match known in that direction yet: take it when results arrive.
+            self._large_pending = (editor, backward, from_start)
+        self._update_large_status()
+
+    def _step_large_match(self, editor, session, backward, from_start=False):
+        large = self._is_large_editor(editor)
+        start, end = editor.large_selection_bounds() if large else self._document_selection_bounds(editor)
+        if backward:
+            idx = session.previous_match(*start)
+        else:
+            idx = session.next_match(*(start if from_start else end))
+        if (idx is not None and not backward and not from_start and idx == self._large_match_index
+                and session.match_length(idx) == 0):
+            # Step past the empty regex match that is already selected.
+            idx = idx + 1 if idx + 1 < session.match_count() else (0 if session.done else None)
+        if idx is None:
+            return False
+        line, column = session.match_at(idx)
+        if large:
+            editor.select_large_match(line, column, session.match_length(idx))
+        else:
+            self._select_document_match(editor, line, column, session.match_length(idx))
+        self._large_match_index = idx
+        return True
+
+    def _on_large_search_progress(self, _total, done):
+        session = self.sender()
+        if session is not self._large_session:
+            return
+        if self._large_pending is not None:
+            editor, backward, from_start = self._large_pending
+            if self._step_large_match(editor, session, backward, from_start) or done:
+                self._large_pending = None
+        self._update_large_status()
+
+    def _update_large_status(self):
+        session = self._large_session
+        self.stop_btn.setVisible(self._replace_job is not None or (session is not None and not session.done))
+        if self._replace_job is not None:
+            text = self.main_window.lang_handler.tr("fr_status_replacing")
+            self.status_label.setText(text.format(count=self._replace_job[0].total))
+            return
+        if session is None:
+            self.status_label.setText("")
+            return
+        tr = self.main_window.lang_handler.tr
+        if session.done and session.total == 0:
+            text = tr("fr_status_no_matches")
+        elif self._large_match_index is not None:
+            text = tr("fr_status_matches").format(index=self._large_match_index + 1, total=session.total)
+        elif session.done:
+            text = tr("fr_status_match_count").format(total=session.total)
+        else:
+            text = tr("fr_status_searching").format(count=session.total)
+        self.status_label.setText(text)
+
+    # --- REGEX (normal tabs, background) ---
+
+    def _show_regex_error(self, error):
+        self._clear_highlights()
+        text = self.main_window.lang_handler.tr("fr_status_regex_error")
+        self.status_label.setText(text.format(error=error))
+
+    def _clear_highlights(self):
+        editor = self.em.get_current_editor()
+        if editor is not None and hasattr(editor, "clear_match_highlights"):
+            editor.clear_match_highlights()
+
+    @staticmethod
+    def _utf16_to_index(text, units):
+        """Index into ``text`` of the character at UTF-16 offset ``units``."""
+        index = 0
+        for ch in text:
+            if units <= 0:
+                break
+            units -= 2 if ord(ch) > 0xFFFF else 1
+            index += 1
+        return index
+
+    def _document_selection_bounds(self, editor):
+        """((line, col), (line, col)) of the selection in code points, like search results."""
+        cursor = editor.textCursor()
+        document = editor.document()
+        bounds = []
+        for position in (cursor.selectionStart(), cursor.selectionEnd()):
+            block = document.findBlock(position)
+            column = self._utf16_to_index(block.text(), position - block.position())
+            bounds.append((block.blockNumber() + 1, column))
+        return bounds[0], bounds[1]
+
+    def _select_document_match(self, editor, line, column, length):
+        document = editor.document()
+        block = document.findBlockByNumber(line - 1)
+        if not block.isValid():
+            return
+        start = block.position() + self._utf16_len(block.text()[:column])
+        # Regex matches may run over line breaks (one character each).
+        remaining = length
+        text = block.text()
+        while column + remaining > len(text) and block.next().isValid():
+            remaining -= len(text) - column + 1
+            block = block.next()
+            text = block.text()
+            column = 0
+        end = block.position() + self._utf16_len(text[:column + max(0, remaining)])
+        cursor = QTextCursor(document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.ensureCursorVisible()
+
+    def _drop_document_session(self):
+        session = self._document_session
+        if session is None:
+            return
+        if self._large_session is session:
+            self._large_session = None
+            self._large_match_index = None
+            self._large_pending = None
+        session.cancel()
+        session.deleteLater()
+        self._document_session = None
+        self._document_session_key = None
+
+    def _current_document_session(self, editor, query, regex):
+        """The dialog's session if it holds the results for this query and the current text."""
+        session = self._document_session
+        if session is None or self._document_session_key != (id(editor), editor.document().revision()):
+            return None
+        if not session.matches_options(query, self.case_cb.isChecked(), self.words_cb.isChecked(), regex):
+            return None
+        return session
+
+    def _document_search(self, editor, query, regex=True):
+        """Session over the editor's current text, restarted whenever the text changes.
+
+        While the text stays the same a new query refines the previous
+        session, so typing does not copy the document again.
+        """
+        session = self._current_document_session(editor, query, regex)
+        if session is not None:
+            return session
+        key = (id(editor), editor.document().revision())
+        case_sensitive, whole_words = self.case_cb.isChecked(), self.words_cb.isChecked()
+        previous = self._document_session if self._document_session_key == key else None
+        try:
+            if previous is not None:
+                session = previous.refine(query, case_sensitive, whole_words, parent=self, regex=regex)
+            if session is None:
+                session = LargeSearchSession.start_over_text(
+                    lx_engine, editor.toPlainText(), query, case_sensitive, whole_words, parent=self, regex=regex,
+                )
+        except ValueError as e:
+            if self._large_session is previous:
+                # Keep the snapshot for the next keystroke, but stop showing its results.
+                self._large_session = None
+                self._large_match_index = None
+                self._large_pending = None
+            self._show_regex_error(e)
+            return None
+        self._drop_document_session()
+        self._document_session = session
+        self._document_session_key = key
+        return session
+
+    def _find_regex_in_document(self, editor, query, backward=False):
+        self._find_with_session(editor, self._document_search(editor, query), backward)
+
+    # --- SEARCH AS YOU TYPE ---
+
+    def _schedule_live_search(self, *_args):
+        """Stop the scan for the old query now; search again once typing pauses."""
+        session = self._large_session
+        if session is not None and not session.done:
+            session.stop()
+        self._large_pending = None
+        self._live_timer.start()
+
+    def _run_live_search(self):
+        editor = self.em.get_current_editor()
+        if not editor:
+            return
+        query = self.find_input.text()
+        if not query:
+            self._clear_highlights()
+            self._drop_document_session()
+            if self._large_session is not None and self._is_large_editor(editor):
+                editor.cancel_large_search()
+            self._large_session = None
+            self._large_match_index = None
+            self._update_large_status()
+            return
+        if self._is_large_editor(editor):
+            self._find_in_large(editor, query, from_start=True)
+        else:
+            session = self._document_search(editor, query, self.regex_cb.isChecked())
+            self._find_with_session(editor, session, False, from_start=True)
+
+    def hideEvent(self, event):
+        self._live_timer.stop()
+        self._clear_highlights()
+        super().hideEvent(event)
+
+    def _expand_regex_selection(self, selected, query, replacement):
+        """Replacement for a selection the pattern matches in full, else None."""
+        case_sensitive = self.case_cb.isChecked()
+        if lx_engine is not None and hasattr(lx_engine, "regex_expand_match"):
+            return lx_engine.regex_expand_match(selected, query, replacement, case_sensitive)
+        flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+        match = re.fullmatch(query, selected, flags)
+        return match.expand(replacement) if match else None
+
+    def _start_regex_replace_all(self, editor, query, replacement):
+        """Run Replace All as a background replace job; applied when it finishes."""
+        self._cancel_replace_job()
+        console = self.main_window.console_logic
+        case_sensitive, whole_words = self.case_cb.isChecked(), self.words_cb.isChecked()
+        try:
+            if self._is_large_editor(editor):
+                if not getattr(editor, "large_edit_mode", False):
+                    console.log("Replace All in Large Viewer Mode needs 'Load Full Editable' or 'Large Edit Mode' first.", "INFO")
+                    return
+                session = editor.start_large_replace(query, replacement, case_sensitive, whole_words)
+                revision = None
+            else:
+                session = LargeSearchSession.start_over_text(
+                    lx_engine, editor.toPlainText(), query, case_sensitive, whole_words,
+                    parent=self, regex=True, replacement=replacement,
+                )
+                revision = editor.document().revision()
+        except (ValueError, re.error) as e:
+            self._show_regex_error(e)
+            return
+        if session is None:
+            return
+        self._replace_job = (session, editor, revision)
+        session.progress.connect(self._on_replace_progress)
+        self._update_large_status()
+
+    def _on_replace_progress(self, total, done):
+        job = self._replace_job
+        if job is None or self.sender() is not job[0]:
+            return
+        if not done:
+            self._update_large_status()
+            return
+        session, editor, revision = job
+        self._replace_job = None
+        console = self.main_window.console_logic
+        try:
+            if total == 0:
+                console.log("Replace All: no matches found.", "INFO")
+            elif revision is None:
+                editor.apply_large_replacements(session)
+                console.log(f"Replace All completed ({total} matches).", "SUCCESS")
+            elif editor.document().revision() != revision:
+                raise ValueError("The text changed since the search started")
+            else:
+                self._replace_document_text(editor, session.replaced_text())
+                editor.ensureCursorVisible()
+                console.log(f"Replace All completed ({total} matches).", "SUCCESS")
+        except ValueError as e:
+            console.log(f"Replace All cancelled: {e}.", "WARN")
+        finally:
+            session.cancel()
+            session.deleteLater()
+        self._update_large_status()
+
+    def _cancel_replace_job(self):
+        job = self._replace_job
+        if job is None:
+            return False
+        self._replace_job = None
+        job[0].cancel()
+        job[0].deleteLater()
+        return True
+
+    def stop_search(self):
+        """Stop the running regex Replace All or whole-file search."""
+        if self._cancel_replace_job():
+            self.main_window.console_logic.log("Replace All stopped.", "INFO")
+        session = self._large_session
+        if session is not None and not session.done:
+            if session is self._document_session:
+                self._drop_document_session()
+            else:
+                # Drop it from the tab too, so the next Find starts over.
+                editor = self.em.get_current_editor()
+                if editor is not None and self._is_large_editor(editor):
+                    editor.cancel_large_search()
+                session.cancel()
+                self._large_session = None
+                self._large_match_index = None
+        self._large_pending = None
+        self._update_large_status()
+
     def _selection_matches(self, cursor, query):
         if not cursor.hasSelection():
             return False
@@ -271,10 +709,23 @@ class FindReplaceDialog(QDialog):
         return self._matches_whole_word(document, cursor.selectionStart(), cursor.selectionEnd())
 
     def find_next(self):
+        self._live_timer.stop()
         editor = self.em.get_current_editor()
         query = self.find_input.text()
         if not editor or not query:
             return
+        if self._is_large_editor(editor):
+            self._find_in_large(editor, query)
+            return
+        if self.regex_cb.isChecked():
+            self._find_regex_in_document(editor, query)
+            return
+        live_session = self._current_document_session(editor, query, False)
+        if live_session is not None:
+            # Keep stepping through the search-as-you-type results ("n of N").
+            self._find_with_session(editor, live_session, False)
+            return
+        self._drop_document_session()
 
         current_cursor = editor.textCursor()
         start_pos = current_cursor.selectionEnd() if current_cursor.hasSelection() else current_cursor.position()
@@ -292,14 +743,64 @@ class FindReplaceDialog(QDialog):
         editor.setTextCursor(found)
         editor.ensureCursorVisible()
 
+    def find_previous(self):
+        self._live_timer.stop()
+        editor = self.em.get_current_editor()
+        query = self.find_input.text()
+        if not editor or not query:
+            return
+        if self._is_large_editor(editor):
+            self._find_in_large(editor, query, backward=True)
+            return
+        if self.regex_cb.isChecked():
+            self._find_regex_in_document(editor, query, backward=True)
+            return
+        live_session = self._current_document_session(editor, query, False)
+        if live_session is not None:
+            self._find_with_session(editor, live_session, True)
+            return
+        self._drop_document_session()
+
+        found = self._find_previous_cursor(editor, query)
+        if found.isNull():
+            return
+
+        editor.setTextCursor(found)
+        editor.ensureCursorVisible()
+
     def handle_replace(self):
         editor = self.em.get_current_editor()
         if not editor:
             return
         
-        cursor = editor.textCursor()
         query = self.find_input.text()
-        if cursor.hasSelection() and self._selection_matches(cursor, query):
+        if self._is_large_editor(editor):
+            try:
+                replaced = getattr(editor, "large_edit_mode", False) and editor.replace_large_selection(
+                    query, self.replace_input.text(), self.case_cb.isChecked(), self.regex_cb.isChecked()
+                )
+            except ValueError as e:
+                self._show_regex_error(e)
+                return
+            if replaced:
+                self.main_window.console_logic.log("Replaced occurrence.", "ACTION")
+            self.find_next()
+            return
+
+        cursor = editor.textCursor()
+        if self.regex_cb.isChecked():
+            if cursor.hasSelection() and query:
+                # Qt hands out line breaks in selections as U+2029.
+                selected = cursor.selectedText().replace("\u2029", "\n")
+                try:
+                    replacement = self._expand_regex_selection(selected, query, self.replace_input.text())
+                except (ValueError, re.error) as e:
+                    self._show_regex_error(e)
+                    return
+                if replacement is not None:
+                    cursor.insertText(replacement)
+                    self.main_window.console_logic.log("Replaced occurrence.", "ACTION")
+        elif cursor.hasSelection() and self._selection_matches(cursor, query):
             cursor.insertText(self.replace_input.text())
             self.main_window.console_logic.log("Replaced occurrence.", "ACTION")
         
@@ -315,6 +816,14 @@ class FindReplaceDialog(QDialog):
         if not find_text:
             return
 
+        if self.regex_cb.isChecked():
+            self._start_regex_replace_all(editor, find_text, replace_text)
+            return
+
+        if self._is_large_editor(editor):
+            self._replace_all_large(editor, find_text, replace_text)
+            return
+
         cpp_result = None
         document = editor.document()
         doc_chars = max(0, document.characterCount() - 1)
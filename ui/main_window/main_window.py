@@ -10,7 +10,7 @@ from core.logging import log_message
 
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                              QApplication, QMenu, QInputDialog)
-from PyQt6.QtGui import QIcon, QShortcut, QKeySequence, QAction, QPalette
+from PyQt6.QtGui import QIcon, QShortcut, QKeySequence, QAction, QPalette, QTextCursor
 from PyQt6.QtCore import Qt, QTimer
 
 # --- Importy modułów LxNotes ---
@@ -20,7 +20,7 @@ from ui.menus.info_menu import InfoMenu
 from ui.menus.statusbar_menu import LxStatusBar
 from core.editor.editor_manager import EditorManager
 from core.theme.theme_manager import ThemeManager
-from core.file.file_handler import FileHandler
+from core.file.file_handler import FileHandler, _same_path
 from core.file.print_manager import PrintManager
 from ui.dialogs.settings_dialog import SettingsDialog
 from core.editor.language_handler import LanguageHandler
@@ -62,6 +62,9 @@ class MainWindow(QMainWindow):
         self._pending_snapshot_states = {}
         self._pending_snapshot_active_path = None
         self._pending_snapshot_retries = 0
+        # Find in Files hit waiting for its file to open: (path, line, column, length).
+        self._pending_file_match = None
+        self._pending_file_match_retries = 0
         self._init_systems(startup_logs)
 
         # --- 4. Managerowie ---
@@ -70,6 +73,7 @@ class MainWindow(QMainWindow):
         self.file_handler = FileHandler(self) # FileHandler korzysta z RecentFiles wewnętrznie
         self.print_manager = PrintManager(self)
         self.find_dialog = None
+        self.find_in_files_dialog = None
 
         # --- 5. Layout i UI ---
         self._setup_layout()
@@ -320,6 +324,7 @@ class MainWindow(QMainWindow):
         )
         
         if self.find_dialog: self.find_dialog.retranslate_ui()
+        if self.find_in_files_dialog: self.find_in_files_dialog.retranslate_ui()
         if self.console_widget: self.console_widget.retranslate_ui()
 
     def open_settings(self):
@@ -330,10 +335,12 @@ class MainWindow(QMainWindow):
         self.console_shortcut = QShortcut(QKeySequence("F12"), self)
         self.console_shortcut.activated.connect(self.toggle_console)
         self.addAction(self.edit_menu.find_action)
+        self.addAction(self.edit_menu.find_in_files_action)
         self.addAction(self.edit_menu.new_tab_action)
         self.addAction(self.edit_menu.close_tab_action)
         self.addAction(self.edit_menu.reopen_tab_action)
         self.addAction(self.edit_menu.load_full_editable_action)
+        self.addAction(self.edit_menu.large_edit_action)
         self.addAction(self.edit_menu.next_chunk_action)
         self.addAction(self.edit_menu.prev_chunk_action)
         self.addAction(self.edit_menu.quick_revert_safe_action)
@@ -374,6 +381,65 @@ class MainWindow(QMainWindow):
         self.find_dialog.show()
         self.find_dialog.activateWindow()
 
+    def show_find_in_files(self):
+        if self.find_in_files_dialog is None:
+            from ui.dialogs.find_in_files_dialog import FindInFilesDialog
+            editor = self.editor_manager.get_current_editor()
+            file_path = getattr(editor, "file_path", "") or ""
+            root = os.path.dirname(file_path) if file_path else os.getcwd()
+            self.find_in_files_dialog = FindInFilesDialog(self, root=root)
+        self.find_in_files_dialog.show()
+        self.find_in_files_dialog.activateWindow()
+        self.find_in_files_dialog.find_input.setFocus()
+
+    def open_file_at_line(self, path, line, column=0, length=0):
+        """Show ``path`` with a match at (line, column) selected, opening the file if needed."""
+        for editor in self.editor_manager.get_all_editors():
+            if _same_path(str(getattr(editor, "file_path", "") or ""), path):
+                self.editor_manager.tab_widget.setCurrentWidget(editor)
+                self._select_file_match(editor, line, column, length)
+                return
+        # Opening runs on a worker; the hit is selected once the tab exists.
+        self._pending_file_match = (path, line, column, length)
+        self._pending_file_match_retries = 50
+        self.file_handler.open_file(path)
+        self._pump_pending_file_match()
+
+    def _pump_pending_file_match(self):
+        if self._pending_file_match is None:
+            return
+        path, line, column, length = self._pending_file_match
+        for editor in self.editor_manager.get_all_editors():
+            if _same_path(str(getattr(editor, "file_path", "") or ""), path):
+                self._pending_file_match = None
+                self.editor_manager.tab_widget.setCurrentWidget(editor)
+                self._select_file_match(editor, line, column, length)
+                return
+        self._pending_file_match_retries -= 1
+        if self._pending_file_match_retries > 0:
+            QTimer.singleShot(100, self._pump_pending_file_match)
+        else:
+            self._pending_file_match = None
+
+    def _select_file_match(self, editor, line, column, length):
+        if getattr(editor, "large_file_mode", False):
+            if not editor.select_large_match(line, column, length):
+                editor.jump_to_large_line(line)
+        else:
+            block = editor.document().findBlockByNumber(line - 1)
+            if not block.isValid():
+                return
+            text = block.text()
+            # Qt positions count UTF-16 code units.
+            start = block.position() + len(text[:column].encode("utf-16-le")) // 2
+            end = block.position() + len(text[:column + length].encode("utf-16-le")) // 2
+            cursor = editor.textCursor()
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            editor.setTextCursor(cursor)
+            editor.ensureCursorVisible()
+        editor.setFocus()
+
     def toggle_console(self):
         if self.console_widget is None:
             self.console_widget = ConsoleDialog(self, self.console_logic)
@@ -638,6 +704,7 @@ class MainWindow(QMainWindow):
             # --------------------------
 
             if self.find_dialog: self.find_dialog.close()
+            if self.find_in_files_dialog: self.find_in_files_dialog.close()
             if self.console_widget: self.console_widget.close()
             if hasattr(self, "console_logic"):
                 self.console_logic.shutdown()
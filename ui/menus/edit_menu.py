@@ -77,6 +77,10 @@ class EditMenu(QMenu):
         self.find_action.setShortcut(QKeySequence.StandardKey.Find)
         self.find_action.triggered.connect(self.main_window.show_find_replace)
 
+        self.find_in_files_action = QAction(self)
+        self.find_in_files_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.find_in_files_action.triggered.connect(self.main_window.show_find_in_files)
+
         # NOWOŚĆ: Akcja skoku do linii
         self.goto_line_action = QAction(self)
         self.goto_line_action.setShortcut(QKeySequence("Ctrl+G"))
@@ -86,6 +90,10 @@ class EditMenu(QMenu):
         self.load_full_editable_action.setShortcut(QKeySequence("Ctrl+Shift+E"))
         self.load_full_editable_action.triggered.connect(self.load_full_editable)
 
+        self.large_edit_action = QAction(self)
+        self.large_edit_action.setShortcut(QKeySequence("Ctrl+Alt+E"))
+        self.large_edit_action.triggered.connect(self.load_large_editable)
+
         self.next_chunk_action = QAction(self)
         self.next_chunk_action.setShortcut(QKeySequence("Ctrl+Alt+Down"))
         self.next_chunk_action.triggered.connect(self.next_large_chunk)
@@ -122,8 +130,10 @@ class EditMenu(QMenu):
         self.addAction(self.paste_action)
         self.addSeparator()
         self.addAction(self.find_action)
+        self.addAction(self.find_in_files_action)
         self.addAction(self.goto_line_action) # Dodano do menu
         self.addAction(self.load_full_editable_action)
+        self.addAction(self.large_edit_action)
         self.addAction(self.next_chunk_action)
         self.addAction(self.prev_chunk_action)
         self.addAction(self.quick_revert_safe_action)
@@ -148,8 +158,10 @@ class EditMenu(QMenu):
             self.copy_action: "action_copy",
             self.paste_action: "action_paste",
             self.find_action: "action_find_replace",
+            self.find_in_files_action: "action_find_in_files",
             self.goto_line_action: "action_goto_line", # Klucz tłumaczenia dla skoku
             self.load_full_editable_action: "action_load_full_editable",
+            self.large_edit_action: "action_large_edit_mode",
             self.next_chunk_action: "action_next_chunk",
             self.prev_chunk_action: "action_previous_chunk",
             self.quick_revert_safe_action: "action_quick_revert_safe_edit",
@@ -163,6 +175,8 @@ class EditMenu(QMenu):
                 translated = "Reopen Closed Tab"
             if translated == key and key == "action_load_full_editable":
                 translated = "Load Full Editable"
+            if translated == key and key == "action_large_edit_mode":
+                translated = "Large Edit Mode"
             if translated == key and key == "action_next_chunk":
                 translated = "Next Chunk"
             if translated == key and key == "action_previous_chunk":
@@ -217,6 +231,7 @@ class EditMenu(QMenu):
         is_large = bool(getattr(editor, "large_file_mode", False))
         self.next_chunk_action.setEnabled(is_large)
         self.prev_chunk_action.setEnabled(is_large)
+        self.large_edit_action.setEnabled(is_large)
 
     def current_editor(self):
         return self.main_window.editor_manager.get_current_editor()
@@ -249,6 +264,9 @@ class EditMenu(QMenu):
     def load_full_editable(self):
         self.main_window.file_handler.load_current_full_editable()
 
+    def load_large_editable(self):
+        self.main_window.file_handler.load_current_large_editable()
+
     def next_large_chunk(self):
         editor = self.current_editor()
         if not editor or not hasattr(editor, "next_large_chunk"):
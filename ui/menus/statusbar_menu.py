@@ -101,9 +101,13 @@ class LxStatusBar(QStatusBar):
             return
 
         # Pozycja kursora i statystyki
-        cursor = editor.textCursor()
-        line = cursor.blockNumber() + 1
-        col = cursor.columnNumber() + 1
+        if hasattr(editor, "cursor_line_column"):
+            # Large Viewer: global file line, not the block inside the loaded chunk.
+            line, col = editor.cursor_line_column()
+        else:
+            cursor = editor.textCursor()
+            line = cursor.blockNumber() + 1
+            col = cursor.columnNumber() + 1
         # O(1) counter from Qt document is much cheaper on huge files.
         if hasattr(editor, "get_virtual_char_count"):
             chars = editor.get_virtual_char_count()